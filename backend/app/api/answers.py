@@ -7,7 +7,8 @@ from typing import Dict, Any, List
 from pydantic import BaseModel
 from datetime import datetime
 
-from app.services.database import DatabaseService
+from app.services.database import DatabaseService, get_database_service
+from app.services.pagination import list_page, list_params
 from app.config.settings import get_settings, Settings
 
 router = APIRouter()
@@ -36,26 +37,34 @@ class BulkDeleteAnswers(BaseModel):
 
 
 @router.get("/")
-async def get_answers(settings: Settings = Depends(get_settings)) -> Dict[str, Any]:
+async def get_answers(
+    params: Dict[str, Any] = Depends(list_params),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
     """
-    Get all answers from the library
+    Get a page of answers from the library
+    
+    Sorted by created_at (default, newest first) or updated_at; filtered by status
+    (source_type: user or questionnaire), created_after/created_before and q (question
+    or answer text). Pass next_cursor as cursor for the next page.
     
     Returns:
-        List of all answers with their metadata
+        The page of answers with their metadata, next_cursor and has_more
     """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        answers = await db_service.get_all_answers()
+        page = await list_page(db_service, "answers", params, settings)
+        answers = page.pop("items")
         
         return {
             "success": True,
             "answers": answers,
-            "count": len(answers)
+            "count": len(answers),
+            **page
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching answers: {str(e)}")
 
@@ -63,7 +72,7 @@ async def get_answers(settings: Settings = Depends(get_settings)) -> Dict[str, A
 @router.post("/")
 async def create_answer(
     answer_data: AnswerCreate,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Create a new answer in the library
@@ -82,11 +91,6 @@ async def create_answer(
         if not answer_data.answer.strip():
             raise HTTPException(status_code=400, detail="Answer cannot be empty")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         answer_id = await db_service.create_answer({
             "question": answer_data.question.strip(),
             "answer": answer_data.answer.strip()
@@ -110,7 +114,7 @@ async def create_answer(
 @router.post("/bulk-import")
 async def bulk_import_answers(
     bulk_data: BulkAnswerCreate,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Bulk import multiple answers from Excel
@@ -129,11 +133,6 @@ async def bulk_import_answers(
         if len(bulk_data.answers) > 1000:
             raise HTTPException(status_code=400, detail="Maximum 1000 answers per import")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Prepare answers for bulk insert
         answers_to_insert = []
         for idx, answer in enumerate(bulk_data.answers):
@@ -170,7 +169,7 @@ async def bulk_import_answers(
 async def update_answer(
     answer_id: str,
     answer_data: AnswerUpdate,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Update an existing answer
@@ -190,11 +189,6 @@ async def update_answer(
         if not answer_data.answer.strip():
             raise HTTPException(status_code=400, detail="Answer cannot be empty")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if answer exists
         existing_answer = await db_service.get_answer_by_id(answer_id)
         if not existing_answer:
@@ -227,7 +221,7 @@ async def update_answer(
 @router.delete("/bulk-delete")
 async def bulk_delete_answers(
     bulk_delete: BulkDeleteAnswers,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Bulk delete multiple answers from the library
@@ -242,11 +236,6 @@ async def bulk_delete_answers(
         if not bulk_delete.answer_ids:
             raise HTTPException(status_code=400, detail="No answer IDs provided")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         deleted_count = 0
         errors = []
         
@@ -284,7 +273,7 @@ async def bulk_delete_answers(
 @router.delete("/{answer_id}")
 async def delete_answer(
     answer_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Delete an answer from the library
@@ -296,11 +285,6 @@ async def delete_answer(
         Success message
     """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if answer exists
         existing_answer = await db_service.get_answer_by_id(answer_id)
         if not existing_answer:
@@ -327,7 +311,7 @@ async def delete_answer(
 @router.get("/{answer_id}")
 async def get_answer(
     answer_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Get a specific answer by ID
@@ -339,11 +323,6 @@ async def get_answer(
         Answer data
     """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         answer = await db_service.get_answer_by_id(answer_id)
         
         if not answer:
@@ -0,0 +1,125 @@
+"""
+Bulk export and import endpoints (CSV, JSONL, Parquet) for answers, questionnaires and questions
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, File, Query, UploadFile
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from typing import Dict, Any, Optional
+import logging
+import os
+import tempfile
+
+from app.services.bulk_transfer import BULK_DATASETS, BULK_FORMATS, export_dataset, import_dataset, validate_format
+from app.services.database import DatabaseService, get_database_service
+from app.services.upload_spool import UploadTooLargeError, spool_upload
+from app.config.settings import get_settings, Settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _check_dataset(dataset: str) -> None:
+    if dataset not in BULK_DATASETS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown dataset '{dataset}'. Must be one of: {', '.join(BULK_DATASETS)}"
+        )
+
+
+@router.get("/{dataset}/export")
+async def export_bulk(
+    dataset: str,
+    format: str = Query("csv", description="csv, jsonl or parquet"),
+    questionnaire_id: Optional[str] = Query(None, description="Only the questions of this questionnaire"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """
+    Download every row of a dataset (answers, questionnaires or questions)
+
+    Rows are read from the database a page at a time and written to a file on disk,
+    so memory stays flat however many rows there are.
+    """
+    _check_dataset(dataset)
+    try:
+        fmt = validate_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if questionnaire_id and dataset != "questions":
+        raise HTTPException(status_code=400, detail="questionnaire_id only applies to the questions dataset")
+
+    try:
+        filters = {"questionnaire_id": questionnaire_id} if questionnaire_id else None
+
+        export_file = tempfile.NamedTemporaryFile(suffix=f".{fmt}", delete=False)
+        export_file.close()
+        try:
+            rows = await export_dataset(
+                db_service.iter_records(dataset, page_size=settings.bulk_batch_rows, filters=filters),
+                fmt, dataset, export_file.name
+            )
+        except Exception:
+            os.unlink(export_file.name)
+            raise
+        logger.info(f"Exported {rows} {dataset} rows as {fmt}")
+
+        return FileResponse(
+            export_file.name,
+            media_type=BULK_FORMATS[fmt],
+            filename=f"{dataset}.{fmt}",
+            background=BackgroundTask(os.unlink, export_file.name)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting {dataset}: {str(e)}")
+
+
+@router.post("/{dataset}/import")
+async def import_bulk(
+    dataset: str,
+    file: UploadFile = File(..., description="CSV (with a header row), JSONL or Parquet file"),
+    format: Optional[str] = Query(None, description="csv, jsonl or parquet (default: from the file extension)"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """
+    Import rows into a dataset (answers, questionnaires or questions)
+
+    Rows are validated a batch at a time; invalid rows are skipped and reported.
+    Rows are upserted by id, so re-importing an export updates the existing rows.
+    Import questionnaires before their questions.
+    """
+    _check_dataset(dataset)
+    try:
+        fmt = validate_format(format or os.path.splitext(file.filename or "")[1])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        upload = await spool_upload(
+            file,
+            max_size=settings.bulk_import_max_size,
+            chunk_size=settings.upload_chunk_size,
+            memory_threshold=settings.upload_spool_memory_limit,
+            spool_dir=settings.upload_spool_dir
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        with upload:
+            report = await import_dataset(db_service, upload.source(), fmt, dataset, settings.bulk_batch_rows)
+
+        return {
+            "success": True,
+            "message": f"Imported {report['imported']} rows into {dataset}",
+            **report
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing {dataset}: {str(e)}")
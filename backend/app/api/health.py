@@ -75,7 +75,7 @@ async def full_health_check(settings: Settings = Depends(get_settings)) -> Dict[
             health_status["status"] = "degraded"
         else:
             ai_service = AIService(settings.anthropic_api_key)
-            is_valid = ai_service.validate_api_key()
+            is_valid = await ai_service.validate_api_key()
             
             if is_valid:
                 health_status["checks"]["ai_service"] = {
@@ -2,14 +2,31 @@
 Questionnaire management and AI answer generation endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, File, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 import asyncio
 import logging
+import os
+import tempfile
 
 from app.services.ai_service import AIService
-from app.services.database import DatabaseService
+from app.services.database import DatabaseService, get_database_service
+from app.services.excel_export import XLSX_MEDIA_TYPE, write_answers_to_workbook, write_export_workbook
+from app.services.excel_processor import parse_column_mapping
+from app.services.answer_generation import GENERATION_MODES, generate_answers_for_questions
+from app.services.answer_cache import answer_cache_key, get_answer_cache, invalidate_answer_cache
+from app.services.answer_library import load_answer_library
+from app.services.generation_jobs import QUEUED_MODES, enqueue_generation_job, get_job_store, job_events
+from app.services.pagination import list_page, list_params
+from app.services.policy_corpus import get_policy_corpus, load_policy_context, remove_policies_from_corpus
+from app.services.policy_ingestion import report_stale_ingestions
+from app.services.policy_pages import load_policy_pages
+from app.services.progress import GenerationProgress, format_sse, get_progress_broker
+from app.services.upload_spool import UploadTooLargeError, spool_upload
 from app.config.settings import get_settings, Settings
 
 router = APIRouter()
@@ -23,31 +40,47 @@ class AnswerUpdate(BaseModel):
 class QuestionnaireStatusUpdate(BaseModel):
     status: str
 
+# Seconds between keep-alive comments on an idle generation-events stream
+SSE_HEARTBEAT_SECONDS = 15
+
+class GenerateAnswersRequest(BaseModel):
+    mode: Optional[str] = None  # "single", "batched" or "batch" (defaults to AI_GENERATION_MODE)
+    batch_size: Optional[int] = None  # Questions per request in batched mode
+
 # Background task for generating answers
 async def generate_answers_background(
     questionnaire_id: str,
-    supabase_url: str,
-    supabase_key: str,
-    anthropic_api_key: str
+    db_service: DatabaseService,
+    anthropic_api_key: str,
+    settings: Optional[Settings] = None,
+    mode: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    progress: Optional[GenerationProgress] = None
 ):
     """
     Background task to generate AI answers for all questions in a questionnaire
+    
+    Questions are processed concurrently by the GenerationEngine, which enforces
+    the configured concurrency, request/token rate limits and 429/529 backoff.
+    Per-question events and run counters are published to `progress` for the
+    generation-events stream. db_service is the request's, on the shared
+    connection pool.
     """
     logger.info(f"Starting AI answer generation for questionnaire: {questionnaire_id}")
+    settings = settings or get_settings()
     
     try:
         # Validate API key first
         if not anthropic_api_key:
             logger.error("CRITICAL: ANTHROPIC_API_KEY is not set!")
             logger.error("Please set ANTHROPIC_API_KEY in your .env file")
+            if progress:
+                progress.fail("ANTHROPIC_API_KEY is not configured")
             return
         
         logger.info("Initializing services...")
-        db_service = DatabaseService(
-            supabase_url=supabase_url,
-            supabase_key=supabase_key
-        )
-        ai_service = AIService(anthropic_api_key)
+        # The engine owns retries/backoff, so disable the SDK's own retry loop
+        ai_service = AIService(anthropic_api_key, max_retries=0, prompt_caching=settings.ai_prompt_caching)
         
         # Get questions for the questionnaire
         logger.info(f"Fetching questions for questionnaire: {questionnaire_id}")
@@ -55,62 +88,60 @@ async def generate_answers_background(
         
         if not questions:
             logger.warning(f"No questions found for questionnaire: {questionnaire_id}")
+            if progress:
+                progress.fail("No questions found for this questionnaire")
             return
         
         logger.info(f"Found {len(questions)} questions to process")
         
-        # Get all policy documents text
+        # Load policy context (retrieval index or full corpus, per settings)
         logger.info("Fetching policy documents...")
-        policies = await db_service.get_all_policies()
-        policy_context = "\n\n".join([p.get("extracted_text", "") for p in policies if p.get("extracted_text")])
+        policy_context = await load_policy_context(db_service, settings)
         
-        if not policy_context:
+        if policy_context.is_empty:
             logger.error("No policy context found! Please upload PDF policies first.")
+            if progress:
+                progress.fail("No policy documents found. Please upload PDF policies first.")
             return
         
-        logger.info(f"Policy context loaded: {len(policy_context)} characters")
-        
-        # Generate answers for each question
-        success_count = 0
-        error_count = 0
-        
-        for idx, question in enumerate(questions, 1):
-            try:
-                logger.info(f"Processing question {idx}/{len(questions)}: {question['question_text'][:50]}...")
-                
-                answer = await ai_service.generate_answer(
-                    question["question_text"], 
-                    policy_context
-                )
-                
-                # Update question with generated answer and set answer_source to 'ai'
-                await db_service.update_question_answer(
-                    question["id"], 
-                    answer, 
-                    status="unapproved",
-                    answer_source="ai"
-                )
-                
-                success_count += 1
-                logger.info(f"✓ Successfully generated answer {idx}/{len(questions)}")
-                
-                # Small delay to prevent overwhelming the API
-                await asyncio.sleep(0.5)
-                
-            except Exception as e:
-                error_count += 1
-                logger.error(f"✗ Error generating answer for question {question['id']}: {str(e)}")
-                logger.error(f"Error type: {type(e).__name__}")
-                logger.error(f"Question text: {question.get('question_text', 'N/A')[:100]}")
-                continue
+        logger.info(f"Policy context loaded: up to {policy_context.max_tokens} tokens per question")
+        
+        # Questions matching the Answers Library are answered from it without calling Claude
+        library = await load_answer_library(db_service, settings)
+        
+        stats = await generate_answers_for_questions(
+            questions,
+            db_service,
+            ai_service,
+            policy_context,
+            settings,
+            mode=mode,
+            batch_size=batch_size,
+            progress=progress,
+            library=library,
+            answer_cache=get_answer_cache(settings)
+        )
+        if progress:
+            progress.finish(stats)
         
         logger.info(f"AI generation completed for questionnaire {questionnaire_id}")
-        logger.info(f"Results: {success_count} successful, {error_count} failed")
+        logger.info(
+            f"Results: {stats.succeeded} successful, {stats.failed} failed, "
+            f"{stats.retries} retries, {stats.elapsed_seconds:.1f}s elapsed, "
+            f"{stats.library_hits} answered from the library, {stats.answer_cache_hits} from the answer cache"
+        )
+        logger.info(
+            f"Token usage: {stats.usage['input_tokens']} input, {stats.usage['output_tokens']} output, "
+            f"{stats.usage['cache_read_input_tokens']} cache read ({stats.usage['cache_hits']} hits), "
+            f"{stats.usage['cache_creation_input_tokens']} cache write ({stats.usage['cache_misses']} misses)"
+        )
                 
     except Exception as e:
         logger.error(f"CRITICAL: Background task error: {str(e)}")
         logger.error(f"Error type: {type(e).__name__}")
         logger.exception("Full traceback:")
+        if progress and not progress.finished:
+            progress.fail(str(e))
 
 class BulkApproval(BaseModel):
     question_ids: List[str]
@@ -123,43 +154,104 @@ class BulkDeleteQuestionnaires(BaseModel):
     questionnaire_ids: List[str]
 
 @router.get("/")
-async def get_questionnaires(settings: Settings = Depends(get_settings)) -> Dict[str, Any]:
-    """Get all questionnaires"""
+async def get_questionnaires(
+    params: Dict[str, Any] = Depends(list_params),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """
+    Get a page of questionnaires with their question and approved counts
+    
+    Sorted by created_at (default, newest first) or name; filtered by status,
+    created_after/created_before and q (name). Pass next_cursor as cursor for the next page.
+    """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        questionnaires = await db_service.get_all_questionnaires()
+        page = await list_page(db_service, "questionnaires", params, settings)
         
         return {
             "success": True,
-            "questionnaires": questionnaires
+            "questionnaires": page.pop("items"),
+            **page
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching questionnaires: {str(e)}")
 
 @router.get("/policies")
-async def get_policies(settings: Settings = Depends(get_settings)) -> Dict[str, Any]:
-    """Get all uploaded PDF policies"""
+async def get_policies(
+    params: Dict[str, Any] = Depends(list_params),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """
+    Get a page of uploaded PDF policies (without their extracted text)
+    
+    Sorted by created_at (default, newest first) or name; filtered by status (ingestion
+    status), created_after/created_before and q (name). Pass next_cursor as cursor for the next page.
+    """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        policies = await db_service.get_all_policies()
+        page = await list_page(db_service, "policies", params, settings)
+        policies = report_stale_ingestions(page.pop("items"), settings.policy_ingestion_stale_seconds)
         
         return {
             "success": True,
             "policies": policies,
-            "count": len(policies)
+            "count": len(policies),
+            **page
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching policies: {str(e)}")
 
 
+@router.get("/policies/{policy_id}/pages")
+async def get_policy_pages(
+    policy_id: str,
+    start: Optional[int] = Query(None, ge=1, description="First page number (inclusive)"),
+    end: Optional[int] = Query(None, ge=1, description="Last page number (inclusive)"),
+    include_content: bool = Query(True, description="Include the page text, not only page numbers and offsets"),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """
+    Get the text of a page range of a policy, without loading the whole document
+    
+    Offsets (char_start, char_end) refer to the policy's extracted_text. Policies
+    uploaded before per-page storage have no pages ("paginated": false); their
+    text is only available as a whole.
+    """
+    try:
+        if start is not None and end is not None and end < start:
+            raise HTTPException(status_code=400, detail="end must not be before start")
+        
+        policy = await db_service.get_policy_by_id(policy_id, include_text=False)
+        if not policy:
+            raise HTTPException(status_code=404, detail="Policy not found")
+        
+        pages = await load_policy_pages(db_service, policy_id, start, end, include_content=include_content)
+        paginated = bool(pages)
+        if not pages and (start is not None or end is not None):
+            # An empty range (e.g. past the last page) does not mean the policy has no pages
+            paginated = bool(await load_policy_pages(db_service, policy_id, include_content=False))
+        
+        return {
+            "success": True,
+            "policy_id": policy_id,
+            "name": policy["name"],
+            "paginated": paginated,
+            "pages": pages,
+            "count": len(pages)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching policy pages: {str(e)}")
+
+
 class BulkDeletePolicies(BaseModel):
     policy_ids: List[str]
 
@@ -167,25 +259,22 @@ class BulkDeletePolicies(BaseModel):
 @router.delete("/policies/bulk-delete")
 async def bulk_delete_policies(
     bulk_delete: BulkDeletePolicies,
-    settings: Settings = Depends(get_settings)
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Bulk delete multiple policies"""
     try:
         if not bulk_delete.policy_ids:
             raise HTTPException(status_code=400, detail="No policy IDs provided")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         deleted_count = 0
+        deleted_ids = []
         errors = []
         
         for policy_id in bulk_delete.policy_ids:
             try:
                 # Check if policy exists
-                policy = await db_service.get_policy_by_id(policy_id)
+                policy = await db_service.get_policy_by_id(policy_id, include_text=False)
                 if not policy:
                     errors.append(f"Policy {policy_id} not found")
                     continue
@@ -194,11 +283,17 @@ async def bulk_delete_policies(
                 success = await db_service.delete_policy(policy_id)
                 if success:
                     deleted_count += 1
+                    deleted_ids.append(policy_id)
                 else:
                     errors.append(f"Failed to delete policy {policy_id}")
             except Exception as e:
                 errors.append(f"Error deleting policy {policy_id}: {str(e)}")
         
+        if deleted_ids:
+            await remove_policies_from_corpus(db_service, deleted_ids)
+            # Cached answers were generated from the old policy corpus
+            invalidate_answer_cache(settings)
+        
         return {
             "success": True,
             "message": f"Deleted {deleted_count} resource{'s' if deleted_count != 1 else ''}",
@@ -217,17 +312,13 @@ async def bulk_delete_policies(
 @router.delete("/policies/{policy_id}")
 async def delete_policy(
     policy_id: str,
-    settings: Settings = Depends(get_settings)
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Delete a specific policy"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if policy exists
-        policy = await db_service.get_policy_by_id(policy_id)
+        policy = await db_service.get_policy_by_id(policy_id, include_text=False)
         if not policy:
             raise HTTPException(status_code=404, detail="Policy not found")
         
@@ -235,6 +326,9 @@ async def delete_policy(
         success = await db_service.delete_policy(policy_id)
         
         if success:
+            await remove_policies_from_corpus(db_service, [policy_id])
+            # Cached answers were generated from the old policy corpus
+            invalidate_answer_cache(settings)
             return {
                 "success": True,
                 "message": f"Policy '{policy['name']}' deleted successfully",
@@ -251,18 +345,13 @@ async def delete_policy(
 @router.delete("/bulk-delete")
 async def bulk_delete_questionnaires(
     bulk_delete: BulkDeleteQuestionnaires,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Bulk delete multiple questionnaires and all their questions"""
     try:
         if not bulk_delete.questionnaire_ids:
             raise HTTPException(status_code=400, detail="No questionnaire IDs provided")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         result = await db_service.bulk_delete_questionnaires(bulk_delete.questionnaire_ids)
         
         return {
@@ -282,18 +371,12 @@ async def bulk_delete_questionnaires(
 @router.delete("/{questionnaire_id}")
 async def delete_questionnaire(
     questionnaire_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Delete a questionnaire and all its questions"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if questionnaire exists
-        questionnaires = await db_service.get_all_questionnaires()
-        questionnaire = next((q for q in questionnaires if q["id"] == questionnaire_id), None)
+        questionnaire = await db_service.get_questionnaire_by_id(questionnaire_id)
         
         if not questionnaire:
             raise HTTPException(status_code=404, detail="Questionnaire not found")
@@ -319,7 +402,7 @@ async def delete_questionnaire(
 async def update_questionnaire_status(
     questionnaire_id: str,
     status_update: QuestionnaireStatusUpdate,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Update the status of a questionnaire"""
     try:
@@ -331,14 +414,8 @@ async def update_questionnaire_status(
                 detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
             )
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if questionnaire exists
-        questionnaires = await db_service.get_all_questionnaires()
-        questionnaire = next((q for q in questionnaires if q["id"] == questionnaire_id), None)
+        questionnaire = await db_service.get_questionnaire_by_id(questionnaire_id)
         
         if not questionnaire:
             raise HTTPException(status_code=404, detail="Questionnaire not found")
@@ -361,25 +438,52 @@ async def update_questionnaire_status(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating questionnaire status: {str(e)}")
 
+@router.get("/{questionnaire_id}")
+async def get_questionnaire(
+    questionnaire_id: str,
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """Get a questionnaire with its question, approved and answered counts"""
+    try:
+        questionnaire = await db_service.get_questionnaire_summary(questionnaire_id)
+        if not questionnaire:
+            raise HTTPException(status_code=404, detail="Questionnaire not found")
+        
+        return {
+            "success": True,
+            "questionnaire": questionnaire
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching questionnaire: {str(e)}")
+
 @router.get("/{questionnaire_id}/questions")
 async def get_questions(
     questionnaire_id: str,
-    settings: Settings = Depends(get_settings)
+    params: Dict[str, Any] = Depends(list_params),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
-    """Get all questions for a specific questionnaire"""
+    """
+    Get a page of a questionnaire's questions, in questionnaire order
+    
+    Filtered by status, created_after/created_before and q (question or answer text).
+    Pass next_cursor as cursor for the next page.
+    """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        questions = await db_service.get_questions_by_questionnaire(questionnaire_id)
+        page = await list_page(db_service, "questions", params, settings, equals={"questionnaire_id": questionnaire_id})
         
         return {
             "success": True,
             "questionnaire_id": questionnaire_id,
-            "questions": questions
+            "questions": page.pop("items"),
+            **page
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching questions: {str(e)}")
 
@@ -387,38 +491,95 @@ async def get_questions(
 async def generate_answers(
     questionnaire_id: str,
     background_tasks: BackgroundTasks,
-    settings: Settings = Depends(get_settings)
+    generation_request: Optional[GenerateAnswersRequest] = None,
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Start AI answer generation for all questions in a questionnaire using policy documents
     Returns immediately while processing happens in the background
+    
+    Optional body selects the generation mode for this run:
+    {"mode": "batched", "batch_size": 10}
+    {"mode": "batch"} submits an asynchronous message batch (results can take up to 24h;
+    track it with GET /{questionnaire_id}/generation-batches)
     """
-    try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
+    generation_request = generation_request or GenerateAnswersRequest()
+    mode = generation_request.mode or settings.ai_generation_mode
+    if mode not in GENERATION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid generation mode. Must be one of: {', '.join(GENERATION_MODES)}"
         )
-        
+    if generation_request.batch_size is not None and generation_request.batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+    
+    try:
         # Get questions for the questionnaire to validate
         questions = await db_service.get_questions_by_questionnaire(questionnaire_id)
         
         if not questions:
             raise HTTPException(status_code=404, detail="No questions found for this questionnaire")
         
-        # Get all policy documents text to validate
-        policies = await db_service.get_all_policies()
-        policy_context = "\n\n".join([p.get("extracted_text", "") for p in policies if p.get("extracted_text")])
+        # Check policy documents exist (from the cached policy corpus)
+        corpus = await get_policy_corpus(db_service, settings)
         
-        if not policy_context:
+        if corpus.is_empty:
             raise HTTPException(status_code=400, detail="No policy documents found. Please upload PDF policies first.")
         
+        events_url = f"/api/questionnaires/{questionnaire_id}/generation-events"
+        
+        # Durable run: a worker process picks the job up (batch mode already survives restarts)
+        if settings.generation_queue_enabled and mode in QUEUED_MODES:
+            store = get_job_store(settings, db_service)
+            job, created = await enqueue_generation_job(
+                store,
+                questionnaire_id,
+                questions,
+                settings,
+                mode=mode,
+                batch_size=generation_request.batch_size
+            )
+            return {
+                "success": True,
+                "message": (
+                    f"Answer generation queued for {len(questions)} questions" if created
+                    else "Answer generation is already in progress for this questionnaire"
+                ),
+                "questionnaire_id": questionnaire_id,
+                "status": "processing",
+                "mode": job["mode"],
+                "job_id": job["id"],
+                "total_questions": job["total_count"],
+                "events_url": events_url,
+                "note": "Answers are being generated by the worker processes. Subscribe to events_url for live progress."
+            }
+        
+        # Register the run so clients can subscribe to its events right away
+        progress, started = get_progress_broker().start(questionnaire_id, total=len(questions), mode=mode)
+        if not started:
+            # Two runs would both write answers; the client follows the running one
+            return {
+                "success": True,
+                "message": "Answer generation is already in progress for this questionnaire",
+                "questionnaire_id": questionnaire_id,
+                "status": "processing",
+                "mode": progress.mode,
+                "total_questions": progress.counters["total"],
+                "events_url": events_url,
+                "note": "Answers are being generated in the background. Subscribe to events_url for live progress."
+            }
+        
         # Start background task for generating answers
         background_tasks.add_task(
             generate_answers_background,
             questionnaire_id,
-            settings.supabase_url,
-            settings.supabase_key,
-            settings.anthropic_api_key
+            db_service,
+            settings.anthropic_api_key,
+            settings,
+            mode,
+            generation_request.batch_size,
+            progress
         )
         
         return {
@@ -426,26 +587,131 @@ async def generate_answers(
             "message": f"Answer generation started for {len(questions)} questions",
             "questionnaire_id": questionnaire_id,
             "status": "processing",
+            "mode": mode,
             "total_questions": len(questions),
-            "note": "Answers are being generated in the background. Please refresh to see progress."
+            "events_url": events_url,
+            "note": "Answers are being generated in the background. Subscribe to events_url for live progress."
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating answers: {str(e)}")
 
+@router.get("/{questionnaire_id}/generation-events")
+async def stream_generation_events(
+    questionnaire_id: str,
+    request: Request,
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> StreamingResponse:
+    """
+    Stream live answer generation progress as server-sent events
+    
+    Events: snapshot (state so far, sent first), question_started, token (answer text
+    deltas), question_completed, question_failed, progress (run counters), and a final
+    completed or failed. Runs processed by queue workers are followed by polling the
+    job tables and have no question_started/token events. When no run is known for
+    the questionnaire a single idle event is sent.
+    """
+    progress = get_progress_broker().get(questionnaire_id)
+    events = None
+    
+    if (progress is None or progress.finished) and settings.generation_queue_enabled:
+        try:
+            store = get_job_store(settings, db_service)
+            jobs = await store.get_generation_jobs(questionnaire_id=questionnaire_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching generation jobs: {str(e)}")
+        if jobs:
+            events = job_events(store, jobs[0]["id"], settings.generation_worker_poll_seconds)
+    
+    if events is None and progress is not None:
+        events = progress.subscribe()
+    
+    async def event_stream():
+        if events is None:
+            yield format_sse("idle", {"questionnaire_id": questionnaire_id})
+            return
+        
+        next_event = None
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({next_event}, timeout=SSE_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if not done:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                next_event = None
+                yield format_sse(event["event"], event["data"])
+        finally:
+            if next_event is not None:
+                next_event.cancel()
+                await asyncio.gather(next_event, return_exceptions=True)
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{questionnaire_id}/generation-jobs")
+async def get_generation_jobs(
+    questionnaire_id: str,
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """Get the queued generation jobs of a questionnaire (newest first) with their counters"""
+    try:
+        store = get_job_store(settings, db_service)
+        jobs = await store.get_generation_jobs(questionnaire_id=questionnaire_id)
+        
+        return {
+            "success": True,
+            "questionnaire_id": questionnaire_id,
+            "jobs": jobs,
+            "count": len(jobs)
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching generation jobs: {str(e)}")
+
+@router.get("/{questionnaire_id}/generation-batches")
+async def get_generation_batches(
+    questionnaire_id: str,
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """Get the message batches submitted for a questionnaire in batch mode"""
+    try:
+        batches = await db_service.get_generation_batches(questionnaire_id=questionnaire_id)
+        
+        return {
+            "success": True,
+            "questionnaire_id": questionnaire_id,
+            "batches": batches,
+            "count": len(batches)
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching generation batches: {str(e)}")
+
 @router.put("/questions/{question_id}/answer")
 async def update_answer(
     question_id: str, 
     answer_update: AnswerUpdate,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Update an answer for a specific question"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         await db_service.update_question_answer(
             question_id, 
             answer_update.answer, 
@@ -465,15 +731,10 @@ async def update_answer(
 @router.put("/questions/{question_id}/approve")
 async def approve_answer(
     question_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Approve an answer for a specific question"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         await db_service.update_question_status(question_id, "approved")
         
         return {
@@ -488,15 +749,10 @@ async def approve_answer(
 @router.put("/questions/bulk-approve")
 async def bulk_approve_answers(
     bulk_approval: BulkApproval,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Bulk approve/unapprove multiple answers"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         updated_count = 0
         errors = []
         
@@ -521,15 +777,10 @@ async def bulk_approve_answers(
 @router.delete("/questions/{question_id}")
 async def delete_question(
     question_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Delete a single question by ID"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Check if question exists
         question = await db_service.get_question_by_id(question_id)
         if not question:
@@ -556,18 +807,13 @@ async def delete_question(
 @router.delete("/questions/bulk-delete")
 async def bulk_delete_questions(
     bulk_delete: BulkDelete,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Bulk delete multiple questions"""
     try:
         if not bulk_delete.question_ids:
             raise HTTPException(status_code=400, detail="No question IDs provided")
         
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         result = await db_service.bulk_delete_questions(bulk_delete.question_ids)
         
         return {
@@ -587,35 +833,31 @@ async def bulk_delete_questions(
 @router.post("/questions/{question_id}/generate-answer")
 async def generate_single_answer(
     question_id: str,
-    settings: Settings = Depends(get_settings)
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Generate AI answer for a single question using policy documents
     """
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Get the question by ID
         question = await db_service.get_question_by_id(question_id)
         
         if not question:
             raise HTTPException(status_code=404, detail="Question not found")
         
-        # Get all policy documents text
-        policies = await db_service.get_all_policies()
-        policy_context = "\n\n".join([p.get("extracted_text", "") for p in policies if p.get("extracted_text")])
+        # Load policy context (retrieval index or full corpus, per settings)
+        policy_context = await load_policy_context(db_service, settings)
         
-        if not policy_context:
+        if policy_context.is_empty:
             raise HTTPException(status_code=400, detail="No policy documents found. Please upload PDF policies first.")
         
         # Initialize AI service and generate answer
-        ai_service = AIService(settings.anthropic_api_key)
+        ai_service = AIService(settings.anthropic_api_key, prompt_caching=settings.ai_prompt_caching)
         answer = await ai_service.generate_answer(
             question["question_text"], 
-            policy_context
+            policy_context.for_question(question["question_text"]),
+            cache_context=policy_context.is_shared
         )
         
         # Update question with generated answer and set answer_source to 'ai'
@@ -626,6 +868,17 @@ async def generate_single_answer(
             answer_source="ai"
         )
         
+        # Regenerating skips the answer cache but refreshes it, so later runs reuse this answer
+        answer_cache = get_answer_cache(settings)
+        if answer_cache is not None:
+            try:
+                answer_cache.put(
+                    answer_cache_key(question["question_text"], policy_context.fingerprint, ai_service.fingerprint()),
+                    answer
+                )
+            except Exception as e:
+                logger.warning(f"Could not store answer in the answer cache: {str(e)}")
+        
         return {
             "success": True,
             "message": "Answer generated successfully",
@@ -642,15 +895,10 @@ async def generate_single_answer(
 @router.get("/{questionnaire_id}/export")
 async def export_approved_answers(
     questionnaire_id: str,
-    settings: Settings = Depends(get_settings)
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """Export approved answers for a questionnaire"""
     try:
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        
         # Get approved questions only
         questions = await db_service.get_approved_questions(questionnaire_id)
         
@@ -673,3 +921,106 @@ async def export_approved_answers(
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error exporting answers: {str(e)}")
+
+def _export_filename(questionnaire: Dict[str, Any]) -> str:
+    name = os.path.splitext(questionnaire.get("name") or "questionnaire")[0]
+    return f"{name}_answers.xlsx"
+
+@router.get("/{questionnaire_id}/export.xlsx")
+async def export_answers_xlsx(
+    questionnaire_id: str,
+    approved_only: bool = Query(False, description="Only approved answers"),
+    answered_only: bool = Query(True, description="Only questions that have an answer"),
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """
+    Download a questionnaire's answers as an Excel file
+    
+    Questions are read from the database a page at a time and streamed into a
+    write-only workbook on disk, so memory stays flat for large questionnaires.
+    """
+    try:
+        questionnaire = await db_service.get_questionnaire_by_id(questionnaire_id)
+        if not questionnaire:
+            raise HTTPException(status_code=404, detail="Questionnaire not found")
+        
+        export_file = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False)
+        export_file.close()
+        try:
+            rows = await write_export_workbook(
+                db_service.iter_questions(questionnaire_id, approved_only=approved_only, answered_only=answered_only),
+                export_file.name
+            )
+        except Exception:
+            os.unlink(export_file.name)
+            raise
+        logger.info(f"Exported {rows} questions of questionnaire {questionnaire_id}")
+        
+        return FileResponse(
+            export_file.name,
+            media_type=XLSX_MEDIA_TYPE,
+            filename=_export_filename(questionnaire),
+            background=BackgroundTask(os.unlink, export_file.name)
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting answers: {str(e)}")
+
+@router.post("/{questionnaire_id}/export.xlsx")
+async def export_answers_into_workbook(
+    questionnaire_id: str,
+    file: UploadFile = File(..., description="The customer's original questionnaire workbook"),
+    approved_only: bool = Query(False, description="Only approved answers"),
+    columns: Optional[str] = Query(None, description="Column mapping used at import (see POST /api/upload/excel)"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+):
+    """
+    Fill a questionnaire's answers into the customer's original workbook
+    
+    Answers are written to the answer column of the sheet and row each question was
+    imported from (or the row with the same question text), keeping the workbook's
+    layout and formatting.
+    """
+    if not file.filename or not file.filename.lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx) can be filled in")
+    try:
+        column_mapping = parse_column_mapping(columns) if columns else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        questionnaire = await db_service.get_questionnaire_by_id(questionnaire_id)
+        if not questionnaire:
+            raise HTTPException(status_code=404, detail="Questionnaire not found")
+        
+        questions = []
+        async for page in db_service.iter_questions(questionnaire_id, approved_only=approved_only, answered_only=True):
+            questions.extend(page)
+        
+        try:
+            upload = await spool_upload(
+                file,
+                max_size=settings.max_file_size,
+                chunk_size=settings.upload_chunk_size,
+                memory_threshold=settings.upload_spool_memory_limit,
+                spool_dir=settings.upload_spool_dir
+            )
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        with upload:
+            content, written = await run_in_threadpool(write_answers_to_workbook, upload.open(), questions, column_mapping)
+        logger.info(f"Wrote {written} answers of questionnaire {questionnaire_id} into {file.filename}")
+        
+        return Response(
+            content,
+            media_type=XLSX_MEDIA_TYPE,
+            headers={"Content-Disposition": f'attachment; filename="{_export_filename(questionnaire)}"'}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting answers: {str(e)}")
@@ -2,86 +2,201 @@
 File upload endpoints for PDF and Excel files
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from typing import Dict, Any
-import io
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
+import logging
 
-from app.services.pdf_processor import PDFProcessor
-from app.services.excel_processor import ExcelProcessor
-from app.services.database import DatabaseService
+from app.services.excel_processor import ExcelProcessor, parse_column_mapping
+from app.services.database import DatabaseService, DuplicateRecordError, get_database_service
+from app.services.policy_ingestion import POLICY_QUEUED, get_policy_ingestion_pipeline
+from app.services.upload_dedup import QuestionSpool, find_duplicate_policy, find_duplicate_questionnaire
+from app.services.upload_spool import UploadTooLargeError, spool_upload
 from app.config.settings import get_settings, Settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+async def _spool(file: UploadFile, settings: Settings):
+    """Spool an upload in chunks, rejecting it with 413 as soon as it passes max_file_size"""
+    try:
+        return await spool_upload(
+            file,
+            max_size=settings.max_file_size,
+            chunk_size=settings.upload_chunk_size,
+            memory_threshold=settings.upload_spool_memory_limit,
+            spool_dir=settings.upload_spool_dir
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+async def _queue_policy(
+    file: UploadFile,
+    db_service: DatabaseService,
+    settings: Settings,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Spool a PDF upload, create its policy in "queued" state and hand it to the ingestion pipeline
+
+    An upload with the same bytes as an existing policy returns that policy instead
+    (duplicate=True) unless force is set.
+    """
+    upload = await _spool(file, settings)
+    try:
+        if not force:
+            existing = await find_duplicate_policy(db_service, content_sha256=upload.sha256)
+            if existing:
+                upload.close()
+                return {
+                    "policy_id": existing["id"],
+                    "filename": file.filename,
+                    "file_size": upload.size,
+                    "content_sha256": upload.sha256,
+                    "status": existing.get("status"),
+                    "duplicate": True,
+                    "duplicate_of": existing["name"],
+                }
+        policy_id = await db_service.create_policy({
+            "name": file.filename,
+            "filename": file.filename,
+            "extracted_text": None,
+            "file_size": upload.size,
+            "status": POLICY_QUEUED,
+            "content_sha256": upload.sha256,
+        })
+    except Exception:
+        upload.close()
+        raise
+    
+    # The pipeline owns the spooled file from here and closes it when done
+    get_policy_ingestion_pipeline(settings).submit(db_service, policy_id, file.filename, upload, force=force)
+    return {
+        "policy_id": policy_id,
+        "filename": file.filename,
+        "file_size": upload.size,
+        "content_sha256": upload.sha256,
+        "status": POLICY_QUEUED,
+        "duplicate": False,
+    }
 
 @router.post("/pdf")
 async def upload_pdf(
     file: UploadFile = File(...),
-    settings: Settings = Depends(get_settings)
+    force: bool = Query(False, description="Import even if the same policy was already uploaded"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
-    Upload and process a PDF file using PyPDF2
+    Upload a PDF policy; it is processed in the background
     
     Workflow:
-    1. Validate file type and size
-    2. Read file content into BytesIO
-    3. Extract text using PyPDF2
-    4. Store metadata and text in database
+    1. Validate file type
+    2. Spool the upload in chunks, enforcing the size limit while reading
+    3. Create the policy with status "queued" and return its ID
+    4. In the background: extract text using PyPDF2, store it, chunk it into retrieval
+       passages and add it to the policy corpus (status "extracting", then "indexed"
+       or "failed"; see app/services/policy_ingestion.py)
+    
+    A file already uploaded (same bytes, or same text once extracted) is not
+    processed again unless force=true; see app/services/upload_dedup.py.
     """
     
     # Validate file type
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Read file content
     try:
-        file_content = await file.read()
-        
-        # Check file size
-        if len(file_content) > settings.max_file_size:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
-            )
-        
-        # Process PDF with PyPDF2
-        pdf_processor = PDFProcessor()
-        extracted_text = pdf_processor.extract_text_from_bytes(file_content)
+        queued = await _queue_policy(file, db_service, settings, force=force)
         
-        # Store in database
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        policy_data = {
-            "name": file.filename,
-            "filename": file.filename,
-            "extracted_text": extracted_text,
-            "file_size": len(file_content),
+        if queued["duplicate"]:
+            message = f"This PDF was already uploaded as '{queued['duplicate_of']}'"
+        else:
+            message = "PDF uploaded, processing in the background"
+        return {
+            "success": True,
+            "message": message,
+            **queued
         }
         
-        policy_id = await db_service.create_policy(policy_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+
+@router.post("/pdf/batch")
+async def upload_pdf_batch(
+    files: List[UploadFile] = File(...),
+    force: bool = Query(False, description="Import files even if they were already uploaded"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
+) -> Dict[str, Any]:
+    """
+    Upload several PDF policies in one request; each is queued like POST /pdf
+    
+    Files that are rejected (wrong type, too large) are reported in "errors"
+    without failing the others. Files already uploaded are returned with
+    duplicate=True and the existing policy's ID.
+    """
+    if len(files) > settings.max_batch_upload_files:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.max_batch_upload_files} files can be uploaded at once"
+        )
+    
+    try:
+        policies = []
+        errors = []
+        for file in files:
+            if not file.filename.lower().endswith('.pdf'):
+                errors.append({"filename": file.filename, "error": "Only PDF files are allowed"})
+                continue
+            try:
+                policies.append(await _queue_policy(file, db_service, settings, force=force))
+            except HTTPException as e:
+                errors.append({"filename": file.filename, "error": e.detail})
+            except Exception as e:
+                errors.append({"filename": file.filename, "error": str(e)})
         
+        queued_count = sum(1 for policy in policies if not policy["duplicate"])
+        message = f"Queued {queued_count} of {len(files)} PDF{'s' if len(files) != 1 else ''} for processing"
+        if queued_count < len(policies):
+            message += f", {len(policies) - queued_count} already uploaded"
         return {
-            "success": True,
-            "message": "PDF uploaded and processed successfully",
-            "policy_id": policy_id,
-            "filename": file.filename,
-            "file_size": len(file_content),
-            "text_length": len(extracted_text),
-            "text_preview": extracted_text[:200] + "..." if len(extracted_text) > 200 else extracted_text
+            "success": len(policies) > 0,
+            "message": message,
+            "policies": policies,
+            "errors": errors
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error processing PDFs: {str(e)}")
 
 @router.post("/excel")
 async def upload_excel(
     file: UploadFile = File(...),
-    settings: Settings = Depends(get_settings)
+    force: bool = Query(False, description="Import even if the same questionnaire was already uploaded"),
+    columns: Optional[str] = Query(
+        None,
+        description='Column mapping overriding header detection, e.g. "question=C,answer=E,id=A,section=B" '
+                    '(column letters or header names)'
+    ),
+    sheets: Optional[str] = Query(None, description="Comma-separated worksheet names (default: every visible sheet with a question header row)"),
+    settings: Settings = Depends(get_settings),
+    db_service: DatabaseService = Depends(get_database_service)
 ) -> Dict[str, Any]:
     """
     Upload and process an Excel file containing questionnaire data
+    
+    Every visible worksheet is parsed as a stream, its question/answer/ID/section
+    columns found from the header row (or given by columns); questions are hashed into
+    a temporary spool and then stored in batches.
+    
+    A file with the same bytes as an existing questionnaire is not parsed again, and
+    one with the same questions is not stored: the existing questionnaire is returned
+    (duplicate=True) unless force=true.
     """
     
     # Validate file type
@@ -92,40 +207,75 @@ async def upload_excel(
         )
     
     try:
-        file_content = await file.read()
-        
-        # Check file size
-        if len(file_content) > settings.max_file_size:
-            raise HTTPException(
-                status_code=413, 
-                detail=f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
-            )
-        
-        # Process Excel file
-        excel_processor = ExcelProcessor()
-        questions = excel_processor.extract_questions_from_bytes(file_content)
-        
-        # Store in database
-        db_service = DatabaseService(
-            supabase_url=settings.supabase_url,
-            supabase_key=settings.supabase_key
-        )
-        questionnaire_data = {
-            "name": file.filename,
-            "filename": file.filename,
-        }
+        column_mapping = parse_column_mapping(columns) if columns else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    sheet_names = [name.strip() for name in sheets.split(",") if name.strip()] if sheets else None
+    
+    try:
+        # Process Excel file straight from the size-capped spool
+        with await _spool(file, settings) as upload:
+            existing = None if force else await find_duplicate_questionnaire(db_service, content_sha256=upload.sha256)
+            if existing is None:
+                with QuestionSpool(settings.upload_spool_memory_limit, settings.upload_spool_dir) as questions:
+                    # Hash the questions into a spool first, so a duplicate is found before anything is stored;
+                    # parsing is CPU bound, so it runs off the event loop
+                    await run_in_threadpool(
+                        questions.extend, ExcelProcessor().iter_questions(upload.open(), column_mapping, sheet_names)
+                    )
+                    if not questions.count:
+                        raise HTTPException(status_code=400, detail="No valid questions found in Excel file")
+                    
+                    text_sha256 = questions.hexdigest()
+                    existing = await find_duplicate_questionnaire(db_service, text_sha256=text_sha256)
+                    if existing is None or force:
+                        questionnaire_data = {
+                            "name": file.filename,
+                            "filename": file.filename,
+                            "content_sha256": upload.sha256,
+                            # text_sha256 is unique: a forced copy leaves it to the earlier questionnaire
+                            "text_sha256": None if existing else text_sha256,
+                        }
+                        try:
+                            questionnaire_id = await db_service.create_questionnaire(questionnaire_data, questions)
+                            existing = None
+                        except DuplicateRecordError:
+                            # A concurrent upload of the same questions stored it first
+                            existing = await find_duplicate_questionnaire(db_service, text_sha256=text_sha256)
+                            if existing is None:
+                                raise
+                            if force:
+                                questionnaire_data["text_sha256"] = None
+                                questionnaire_id = await db_service.create_questionnaire(questionnaire_data, questions)
+                                existing = None
+                    preview = questions.preview
+                    questions_count = questions.count
         
-        questionnaire_id = await db_service.create_questionnaire(questionnaire_data, questions)
+        if existing:
+            return {
+                "success": True,
+                "message": f"This questionnaire was already uploaded as '{existing['name']}'",
+                "questionnaire_id": existing["id"],
+                "filename": file.filename,
+                "file_size": upload.size,
+                "content_sha256": upload.sha256,
+                "duplicate": True,
+                "duplicate_of": existing["name"],
+            }
         
         return {
             "success": True,
             "message": "Excel file uploaded and processed successfully",
             "questionnaire_id": questionnaire_id,
             "filename": file.filename,
-            "file_size": len(file_content),
-            "questions_count": len(questions),
-            "questions_preview": questions[:3] if len(questions) > 3 else questions
+            "file_size": upload.size,
+            "content_sha256": upload.sha256,
+            "duplicate": False,
+            "questions_count": questions_count,
+            "questions_preview": preview
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing Excel file: {str(e)}")
@@ -17,9 +17,68 @@ class Settings(BaseSettings):
     supabase_url: Optional[str] = None
     supabase_key: Optional[str] = None
     
+    # Database HTTP Client Configuration (one pooled Supabase client per process)
+    db_http_max_connections: int = 20
+    db_http_max_keepalive_connections: int = 10
+    db_http_keepalive_expiry_seconds: float = 30.0
+    db_http_connect_timeout_seconds: float = 5.0
+    db_http_timeout_seconds: float = 30.0  # Read/write/pool timeout per request
+    db_http2: bool = True  # Used when the h2 package is installed
+    
     # AI Configuration
     anthropic_api_key: Optional[str] = None
     
+    # Anthropic HTTP Client Configuration (one pooled async client per process)
+    ai_http_max_connections: int = 32
+    ai_http_max_keepalive_connections: int = 16
+    ai_http_keepalive_expiry_seconds: float = 30.0
+    ai_http_connect_timeout_seconds: float = 10.0
+    ai_http_timeout_seconds: float = 120.0  # Read/write/pool timeout per request
+    ai_http2: bool = True  # Used when the h2 package is installed
+    
+    # AI Generation Engine Configuration
+    ai_max_concurrency: int = 8  # Parallel in-flight Claude requests per generation run
+    ai_requests_per_minute: int = 50  # Client-side request limit (0 disables)
+    ai_tokens_per_minute: int = 0  # Client-side input token limit (0 disables)
+    ai_max_retries: int = 5  # Retries per question on 429/529 and transient errors
+    ai_backoff_base_seconds: float = 1.0
+    ai_backoff_max_seconds: float = 60.0
+    ai_prompt_caching: bool = True  # Mark the shared prompt prefix for Anthropic prompt caching
+    ai_generation_mode: str = "single"  # "single" (one question per request), "batched" or "batch"
+    ai_batch_size: int = 10  # Questions per request in batched mode
+    
+    # Message Batches Configuration ("batch" mode: asynchronous, half-price, up to 24h)
+    ai_batch_backend: str = "anthropic"  # "anthropic" or "fake" (in-process stand-in for offline runs)
+    ai_batch_poll_interval_seconds: float = 30.0
+    ai_batch_max_resubmits: int = 2  # Resubmissions of errored/expired requests
+    ai_batch_resume_after_seconds: float = 300.0  # A batch left unpolled this long is collected by another process
+    
+    # Generation Job Queue Configuration (durable runs processed by `python -m app.worker`)
+    generation_queue_enabled: bool = False  # False generates in the web process (FastAPI background task)
+    generation_queue_backend: str = "supabase"  # "supabase" (generation_jobs tables) or "sqlite" (local file)
+    generation_queue_sqlite_path: str = "generation_queue.db"
+    generation_lease_seconds: int = 120  # Task lease; renewed every third of it while a worker is alive
+    generation_task_max_attempts: int = 3  # Attempts per question before its task fails
+    generation_worker_poll_seconds: float = 2.0  # Idle delay between claims, and between event polls
+    
+    # Answers Library Reuse Configuration (matching library questions skip the LLM)
+    library_reuse_enabled: bool = True
+    library_match_threshold: float = 0.9  # Minimum TF-IDF cosine for a fuzzy match (1.0 = exact matches only)
+    
+    # Answer Cache Configuration (answers keyed by question + policy corpus + prompt fingerprints)
+    answer_cache_enabled: bool = True
+    answer_cache_path: str = "answer_cache.db"  # Local SQLite file (":memory:" for a per-process cache)
+    answer_cache_max_entries: int = 20000  # Least recently used entries are evicted beyond this
+    answer_cache_ttl_seconds: int = 30 * 24 * 3600  # Maximum entry age (0 disables expiry)
+    
+    # Policy Retrieval Configuration (BM25 passage selection per question)
+    retrieval_enabled: bool = True  # False sends the full policy corpus with every question
+    retrieval_top_k: int = 8  # Maximum passages per question
+    retrieval_token_budget: int = 6000  # Maximum policy context tokens per question
+    retrieval_batch_token_budget: int = 12000  # Maximum policy context tokens per batched request (all its questions)
+    retrieval_chunk_tokens: int = 400
+    retrieval_chunk_overlap_tokens: int = 50
+    
     # CORS Configuration
     cors_origins: Union[List[str], str] = Field(default=["http://localhost:3000", "http://localhost:3001"])
     
@@ -37,6 +96,34 @@ class Settings(BaseSettings):
     
     # File Upload Configuration
     max_file_size: int = 10 * 1024 * 1024  # 10MB
+    upload_chunk_size: int = 1024 * 1024  # Bytes read per chunk while spooling an upload
+    upload_spool_memory_limit: int = 2 * 1024 * 1024  # Larger uploads are spooled to a temp file
+    upload_spool_dir: str = ""  # Directory for spooled uploads ("" = system temp directory)
+    max_batch_upload_files: int = 20  # PDFs per batch upload request
+    bulk_import_max_size: int = 200 * 1024 * 1024  # CSV/JSONL/Parquet files of POST /api/bulk/{dataset}/import
+    bulk_batch_rows: int = 1000  # Rows per bulk import batch (read, validate, upsert) and per export page
+    
+    # List Pagination Configuration (questionnaire, policy, answer and question lists)
+    list_page_size: int = 50  # Rows per page when a list request sets no limit
+    list_max_page_size: int = 500  # Largest limit a list request may ask for
+    
+    # Policy Ingestion Configuration (PDFs are processed in the background after upload)
+    policy_ingestion_workers: int = 2  # Policies extracted and indexed concurrently per process
+    policy_ingestion_stale_seconds: int = 1800  # Policies still processing after this are shown as failed (e.g. after a restart)
+    
+    # PDF Extraction Configuration (process pool, off the event loop)
+    pdf_backend: str = "pypdf2"  # PDF text extraction engine: "pypdf2", "pdfium" (pypdfium2) or "pdfminer" (pdfminer.six)
+    pdf_normalize_text: bool = True  # Strip repeated headers/footers, page numbers and hyphenation before storing policy text
+    pdf_extraction_workers: int = 0  # Worker processes per API process (0 = one per CPU core, up to 4)
+    pdf_pages_per_task: int = 25  # Pages per extraction task; larger PDFs are split across workers
+    pdf_extraction_timeout_seconds: float = 120.0  # Per document; workers running longer are killed
+    pdf_ocr_enabled: bool = False  # OCR pages without a text layer (scanned PDFs) with a local Tesseract install
+    pdf_ocr_command: str = "tesseract"  # Tesseract executable
+    pdf_ocr_language: str = "eng"  # Tesseract language(s), e.g. "eng+deu"
+    pdf_ocr_workers: int = 1  # Pages OCR'd at the same time per API process (each occupies one extraction worker)
+    pdf_ocr_dpi: int = 300  # Resolution scanned pages are rendered at for OCR
+    pdf_ocr_timeout_seconds: float = 60.0  # Per page; Tesseract running longer is killed and the page left empty
+    pdf_ocr_cache_path: str = "ocr_cache.db"  # Local SQLite file of OCR text keyed by page image hash ("" disables)
     allowed_pdf_extensions: list = [".pdf"]
     allowed_excel_extensions: list = [".xlsx", ".xls"]
     
@@ -2,13 +2,26 @@
 Main FastAPI application for Summit Security Questionnaire App
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 
-from app.api import health, upload, questionnaires, answers
+from app.api import health, upload, questionnaires, answers, bulk
 from app.config.settings import get_settings
+from app.services.anthropic_client import close_anthropic_clients, get_anthropic_client
+from app.services.batch_generation import resume_generation_batches
+from app.services.database_client import close_database_clients, get_database_client
+from app.services.generation_jobs import close_job_stores
+from app.services.pdf_extraction import shutdown_pdf_extraction_pool
+from app.services.policy_ingestion import shutdown_policy_ingestion
+from app.services.upload_spool import UploadSizeLimitMiddleware
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
 
 # Load environment variables
 load_dotenv()
@@ -16,14 +29,57 @@ load_dotenv()
 # Get settings
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
+async def _resume_batches():
+    """Collect message batches whose process stopped polling them (e.g. before the last restart)"""
+    while True:
+        try:
+            collected = await resume_generation_batches(settings)
+            if collected:
+                logger.info(f"Collected {collected} message batches from a previous run")
+        except Exception as e:
+            logger.warning(f"Could not resume message batches: {str(e)}")
+        await asyncio.sleep(settings.ai_batch_resume_after_seconds)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled Anthropic client per process, shared by every AIService
+    if settings.anthropic_api_key:
+        get_anthropic_client(settings.anthropic_api_key)
+    resume_task = None
+    if settings.supabase_url and settings.supabase_key:
+        # One pooled Supabase client per process, shared by every DatabaseService
+        get_database_client(settings.supabase_url, settings.supabase_key)
+        resume_task = asyncio.create_task(_resume_batches())
+    yield
+    if resume_task and not resume_task.done():
+        resume_task.cancel()
+    await shutdown_policy_ingestion()
+    shutdown_pdf_extraction_pool()
+    await close_anthropic_clients()
+    close_database_clients()
+    close_job_stores()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Summit Security Questionnaire API",
     description="Backend API for processing PDF policies and generating AI-powered questionnaire answers",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Reject oversized uploads before their body is buffered (margin for multipart headers)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/upload": settings.max_file_size + 64 * 1024,
+        "/api/upload/pdf/batch": settings.max_batch_upload_files * (settings.max_file_size + 64 * 1024),
+        "/api/bulk": settings.bulk_import_max_size + 64 * 1024,
+    }
 )
 
-# Configure CORS
+# Configure CORS (added last so it also wraps 413 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -37,6 +93,7 @@ app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
 app.include_router(questionnaires.router, prefix="/api/questionnaires", tags=["questionnaires"])
 app.include_router(answers.router, prefix="/api/answers", tags=["answers"])
+app.include_router(bulk.router, prefix="/api/bulk", tags=["bulk"])
 
 @app.get("/")
 async def root():
@@ -3,47 +3,194 @@ AI service for generating questionnaire answers using Claude Sonnet 4 API
 """
 
 import anthropic
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+import hashlib
+import json
 import logging
 import os
+import time
 from datetime import datetime
 from pathlib import Path
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from app.services.anthropic_client import get_anthropic_client
+
 logger = logging.getLogger(__name__)
 
+# API statuses worth retrying (timeouts, conflicts, rate limits, overload and transient 5xx)
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class AIRetryableError(Exception):
+    """Raised when the Anthropic API rejects a call with a retryable status (e.g. 429/529)"""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(response: Any) -> Optional[float]:
+    """Read the retry-after header (seconds) from an API error response, if any"""
+    try:
+        value = response.headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+# Appended to the instructions when several questions are answered in one request
+BATCH_RESPONSE_INSTRUCTIONS = """BATCH MODE: You will receive several questions, each wrapped in <question id="..."> tags.
+Answer every question independently, applying all of the rules above to each answer.
+Respond with ONLY a JSON array and no other text, in exactly this shape:
+[{"id": "<question id>", "answer": "<answer text>"}]
+Include exactly one object per question id. Use \\n for line breaks inside an answer."""
+
+
+def parse_batch_response(text: str, expected_ids: List[str]) -> Dict[str, str]:
+    """
+    Parse a batched JSON answer array, keeping only valid answers for expected ids
+    
+    Tolerates code fences or stray text around the array. Items with unknown ids,
+    duplicate ids or empty/non-string answers are dropped (and later retried singly).
+    
+    Args:
+        text: Raw model response
+        expected_ids: Question ids that were sent
+        
+    Returns:
+        Dict[str, str]: Answer text by question id
+    """
+    start = text.find("[")
+    end = text.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    
+    try:
+        items = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    
+    if not isinstance(items, list):
+        return {}
+    
+    expected = set(expected_ids)
+    answers: Dict[str, str] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        question_id = str(item.get("id", ""))
+        answer = item.get("answer")
+        if question_id not in expected or question_id in answers:
+            continue
+        if not isinstance(answer, str) or not answer.strip():
+            continue
+        answers[question_id] = answer.strip()
+    return answers
+
+
+class UsageStats:
+    """Token usage accumulated across the calls of one AIService instance (one generation run)"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_creation_input_tokens = 0
+        self.cache_read_input_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.request_seconds = 0.0  # Wall-clock time of synchronous Messages API calls
+    
+    def record(self, usage: Any, seconds: float = 0.0) -> None:
+        """Add the usage block (and latency) of one Messages API response"""
+        if usage is None:
+            return
+        self.request_seconds += seconds
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        cache_creation = getattr(usage, "cache_creation_input_tokens", None) or 0
+        self.requests += 1
+        self.input_tokens += getattr(usage, "input_tokens", None) or 0
+        self.output_tokens += getattr(usage, "output_tokens", None) or 0
+        self.cache_read_input_tokens += cache_read
+        self.cache_creation_input_tokens += cache_creation
+        if cache_read:
+            self.cache_hits += 1
+        elif cache_creation:
+            self.cache_misses += 1
+    
+    def to_dict(self) -> dict:
+        total_input = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_token_ratio": round(self.cache_read_input_tokens / total_input, 3) if total_input else 0.0,
+            "request_seconds": round(self.request_seconds, 3)
+        }
+
+
 class AIService:
     """AI service for generating answers using Anthropic Claude API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        client: Optional[Any] = None,
+        max_retries: Optional[int] = None,
+        prompt_caching: bool = True
+    ):
         """
         Initialize AI service
         
         Args:
             api_key: Anthropic API key (will use environment variable if not provided)
+            client: Async Anthropic-compatible client (defaults to the shared process-wide client)
+            max_retries: SDK-level retries (set to 0 when the generation engine owns backoff)
+            prompt_caching: Mark the stable prompt prefix for provider-side prompt caching
         """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         
-        if not self.api_key:
-            raise ValueError("Anthropic API key is required. Set ANTHROPIC_API_KEY environment variable or pass api_key parameter.")
-        
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        if client is not None:
+            self.client = client
+        else:
+            if not self.api_key:
+                raise ValueError("Anthropic API key is required. Set ANTHROPIC_API_KEY environment variable or pass api_key parameter.")
+            
+            # Shared client: keep-alive connections are reused across services and calls
+            self.client = get_anthropic_client(self.api_key)
+            if max_retries is not None:
+                self.client = self.client.with_options(max_retries=max_retries)
         
         # Claude model configuration
         self.model = "claude-3-5-haiku-20241022"  # Updated to stable Claude 3.5 haiku
         self.max_tokens = 2000
         self.temperature = 0.2  # Lower temperature for more consistent, factual responses
+        self.prompt_caching = prompt_caching
+        
+        # Token usage (including prompt cache hits/misses) for this instance's run
+        self.usage = UsageStats()
+        self._instructions: Optional[str] = None
     
-    async def generate_answer(self, question: str, policy_context: str) -> str:
+    async def generate_answer(
+        self,
+        question: str,
+        policy_context: str,
+        cache_context: bool = False,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> str:
         """
         Generate an answer for a question based on policy documents
         
         Args:
             question: The security questionnaire question
-            policy_context: Full text content from all policy documents
+            policy_context: Policy documents content (full corpus or retrieved passages)
+            cache_context: True when the same policy_context is sent with every question
+                of a run, so it belongs in the cached prompt prefix
+            on_text: Optional callback receiving answer text deltas as they stream in
             
         Returns:
             str: Generated answer
@@ -51,43 +198,83 @@ class AIService:
         Raises:
             Exception: If AI generation fails
         """
-        try:
-            logger.info(f"Generating answer for question: {question[:100]}...")
-            logger.info(f"Using model: {self.model}")
-            logger.info(f"Policy context length: {len(policy_context)} characters")
+        logger.info(f"Generating answer for question: {question[:100]}...")
+        logger.info(f"Using model: {self.model}")
+        logger.info(f"Policy context length: {len(policy_context)} characters")
+        
+        # Create prompt: cacheable system prefix + small per-question message
+        system, user_message = self._create_prompt(question, policy_context, cache_context)
+        logger.info(f"Prompt created, length: {sum(len(b['text']) for b in system) + len(user_message)} characters")
+        
+        answer = await self._create_message(system, user_message, on_text=on_text)
+        
+        logger.info(f"Successfully generated answer ({len(answer)} characters)")
+        logger.info(f"Answer preview: {answer[:100]}...")
+        
+        return answer
+    
+    async def _create_message(
+        self,
+        system: List[dict],
+        user_message: str,
+        max_tokens: Optional[int] = None,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Call the Claude Messages API and return the response text
+        
+        Args:
+            system: System prompt blocks
+            user_message: User message content
+            max_tokens: Output token limit (defaults to self.max_tokens)
+            on_text: Stream the response and pass each text delta to this callback
             
-            # Create prompt for accurate answer generation
-            prompt = self._create_prompt(question, policy_context)
-            logger.info(f"Prompt created, length: {len(prompt)} characters")
+        Returns:
+            str: Response text
             
+        Raises:
+            AIRetryableError: For rate limits, overload and transient API failures
+            Exception: For any other failure
+        """
+        try:
             # Call Claude API asynchronously
             logger.info("Calling Claude API asynchronously...")
             
-            # Run the synchronous API call in a thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                response = await loop.run_in_executor(
-                    executor,
-                    lambda: self.client.messages.create(
-                        model=self.model,
-                        max_tokens=self.max_tokens,
-                        temperature=self.temperature,
-                        messages=[
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ]
-                    )
-                )
-            
-            answer = response.content[0].text.strip()
-            
-            logger.info(f"Successfully generated answer ({len(answer)} characters)")
-            logger.info(f"Answer preview: {answer[:100]}...")
-            
-            return answer
+            request = {
+                "model": self.model,
+                "max_tokens": max_tokens or self.max_tokens,
+                "temperature": self.temperature,
+                "system": system,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": user_message
+                    }
+                ]
+            }
+            
+            started = time.monotonic()
+            if on_text:
+                async with self.client.messages.stream(**request) as stream:
+                    async for text in stream.text_stream:
+                        on_text(text)
+                    response = await stream.get_final_message()
+            else:
+                response = await self.client.messages.create(**request)
             
+            self.usage.record(getattr(response, "usage", None), seconds=time.monotonic() - started)
+            return response.content[0].text.strip()
+            
+        except anthropic.APIStatusError as e:
+            if e.status_code in RETRYABLE_STATUS_CODES:
+                logger.warning(f"Retryable Anthropic API error ({e.status_code}): {str(e)}")
+                raise AIRetryableError(str(e), status_code=e.status_code, retry_after=_parse_retry_after(e.response))
+            logger.error(f"Anthropic API error: {str(e)}")
+            logger.error(f"API error type: {type(e).__name__}")
+            raise Exception(f"AI service error: {str(e)}")
+        except anthropic.APIConnectionError as e:
+            logger.warning(f"Anthropic API connection error: {str(e)}")
+            raise AIRetryableError(str(e))
         except anthropic.APIError as e:
             logger.error(f"Anthropic API error: {str(e)}")
             logger.error(f"API error type: {type(e).__name__}")
@@ -98,6 +285,11 @@ class AIService:
             logger.error(f"Error type: {type(e).__name__}")
             raise Exception(f"Error generating answer: {str(e)}")
     
+    def fingerprint(self) -> str:
+        """Hash of the instructions and model parameters, so cached answers follow prompt changes"""
+        parts = [self._load_ai_instructions(), self.model, str(self.max_tokens), str(self.temperature)]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+    
     def _load_ai_instructions(self) -> str:
         """
         Load AI instructions from markdown file
@@ -108,6 +300,9 @@ class AIService:
         Raises:
             Exception: If instructions file cannot be loaded
         """
+        if self._instructions is not None:
+            return self._instructions
+        
         try:
             # Get the directory where this file is located
             current_dir = Path(__file__).parent
@@ -121,7 +316,8 @@ class AIService:
             instructions = instructions_file.read_text(encoding='utf-8')
             if not instructions.strip():
                 raise ValueError("AI instructions file is empty")
-                
+            
+            self._instructions = instructions
             return instructions
                 
         except Exception as e:
@@ -129,40 +325,189 @@ class AIService:
             raise Exception(f"Cannot proceed without AI instructions: {str(e)}")
     
     
-    def _create_prompt(self, question: str, policy_context: str) -> str:
+    def _create_prompt(self, question: str, policy_context: str, cache_context: bool = False) -> tuple:
         """
         Create a well-structured prompt for answer generation
         
+        The prompt is split into a stable system prefix (instructions, plus the policy
+        documents when they are shared across the run) marked with cache_control, and a
+        small per-question user message. Repeated calls in a run then hit the provider's
+        prompt cache instead of re-processing the whole prefix.
+        
         Args:
             question: The question to answer
             policy_context: Policy documents content
+            cache_context: Put the policy documents in the cached prefix
             
         Returns:
-            str: Formatted prompt
+            tuple: (system blocks, user message)
         """
         
         # Load instructions from markdown file
         instructions = self._load_ai_instructions()
         
-        prompt = f"""{instructions}
+        system = [{"type": "text", "text": instructions}]
+        
+        if cache_context:
+            system.append({"type": "text", "text": f"POLICY DOCUMENTS:\n{policy_context}"})
+            user_message = f"""QUESTION TO ANSWER:
+{question}
 
-POLICY DOCUMENTS:
+ANSWER:"""
+        else:
+            user_message = f"""POLICY DOCUMENTS:
 {policy_context}
 
 QUESTION TO ANSWER:
 {question}
 
 ANSWER:"""
+        
+        if self.prompt_caching:
+            # The cache breakpoint covers every block up to and including this one
+            system[-1]["cache_control"] = {"type": "ephemeral"}
+        
+        return system, user_message
+    
+    def _create_batch_prompt(self, questions: List[Dict[str, str]], policy_context: str, cache_context: bool = False) -> tuple:
+        """
+        Create a prompt answering several questions in one request
+        
+        Args:
+            questions: Items with "id" and "question_text"
+            policy_context: Policy documents content
+            cache_context: Put the policy documents in the cached prefix
+            
+        Returns:
+            tuple: (system blocks, user message)
+        """
+        instructions = self._load_ai_instructions()
+        
+        system = [{"type": "text", "text": f"{instructions}\n\n{BATCH_RESPONSE_INSTRUCTIONS}"}]
+        
+        question_blocks = "\n".join(
+            f'<question id="{q["id"]}">{q["question_text"]}</question>' for q in questions
+        )
+        
+        if cache_context:
+            system.append({"type": "text", "text": f"POLICY DOCUMENTS:\n{policy_context}"})
+            user_message = f"""QUESTIONS TO ANSWER:
+{question_blocks}
 
-        return prompt
+JSON ANSWERS:"""
+        else:
+            user_message = f"""POLICY DOCUMENTS:
+{policy_context}
+
+QUESTIONS TO ANSWER:
+{question_blocks}
+
+JSON ANSWERS:"""
+        
+        if self.prompt_caching:
+            system[-1]["cache_control"] = {"type": "ephemeral"}
+        
+        return system, user_message
     
-    async def generate_multiple_answers(self, questions: list, policy_context: str) -> dict:
+    async def generate_batched_answers(
+        self,
+        questions: List[Dict[str, Any]],
+        policy_context: str,
+        cache_context: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Answer several questions with a single API call
+        
+        Questions are sent with short positional ids (q1, q2, ...) and the model returns
+        a JSON array keyed by those ids. Missing or malformed items are reported back so
+        the caller can retry them singly.
+        
+        Args:
+            questions: Question records with "id" and "question_text"
+            policy_context: Policy documents content
+            cache_context: Put the policy documents in the cached prefix
+            
+        Returns:
+            dict: {"answers": {question_id: answer}, "missing": [question_id, ...]}
+        """
+        local_ids = {f"q{idx}": question["id"] for idx, question in enumerate(questions, 1)}
+        prompt_questions = [
+            {"id": local_id, "question_text": question["question_text"]}
+            for local_id, question in zip(local_ids, questions)
+        ]
+        
+        logger.info(f"Generating batched answers for {len(questions)} questions")
+        system, user_message = self._create_batch_prompt(prompt_questions, policy_context, cache_context)
+        
+        # Budget roughly one single-answer's worth of output per question, within the model limit
+        max_tokens = min(8192, max(self.max_tokens, 400 * len(questions)))
+        response_text = await self._create_message(system, user_message, max_tokens=max_tokens)
+        
+        parsed = parse_batch_response(response_text, list(local_ids))
+        answers = {local_ids[local_id]: answer for local_id, answer in parsed.items()}
+        missing = [question["id"] for question in questions if question["id"] not in answers]
+        
+        if missing:
+            logger.warning(f"Batched response missing/malformed for {len(missing)} of {len(questions)} questions")
+        logger.info(f"Batched generation returned {len(answers)} answers")
+        
+        return {"answers": answers, "missing": missing}
+    
+    def create_batch_request(
+        self,
+        custom_id: str,
+        question: str,
+        policy_context: str,
+        cache_context: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Build one Message Batches API request for a question
+        
+        Uses the same prompt and model parameters as generate_answer, so batch results
+        are interchangeable with answers generated synchronously.
+        
+        Args:
+            custom_id: Identifier echoed back with the result (the question ID)
+            question: The question to answer
+            policy_context: Policy documents content
+            cache_context: Put the policy documents in the cached prefix
+            
+        Returns:
+            dict: {"custom_id": ..., "params": {...messages.create arguments...}}
+        """
+        system, user_message = self._create_prompt(question, policy_context, cache_context)
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "system": system,
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": user_message
+                    }
+                ]
+            }
+        }
+    
+    async def generate_multiple_answers(
+        self,
+        questions: list,
+        policy_context: str,
+        cache_context: bool = True,
+        batch_size: int = 1
+    ) -> dict:
         """
         Generate answers for multiple questions in batch
         
         Args:
             questions: List of question dictionaries
             policy_context: Policy documents content
+            cache_context: Put the policy documents in the cached prefix
+            batch_size: Questions per API call (1 = one call per question). Items missing
+                from a batched response are retried singly.
             
         Returns:
             dict: Results with successful generations and errors
@@ -173,10 +518,33 @@ ANSWER:"""
             "total_questions": len(questions)
         }
         
-        for question_data in questions:
+        pending = list(questions)
+        if batch_size > 1:
+            pending = []
+            for start in range(0, len(questions), batch_size):
+                batch = questions[start:start + batch_size]
+                try:
+                    batch_result = await self.generate_batched_answers(batch, policy_context, cache_context)
+                except Exception as e:
+                    logger.error(f"Batched generation failed, retrying {len(batch)} questions singly: {str(e)}")
+                    pending.extend(batch)
+                    continue
+                
+                for question_data in batch:
+                    answer = batch_result["answers"].get(question_data.get("id"))
+                    if answer is None:
+                        pending.append(question_data)
+                        continue
+                    results["successful"].append({
+                        "question_id": question_data.get("id"),
+                        "question_text": question_data.get("question_text", ""),
+                        "answer": answer
+                    })
+        
+        for question_data in pending:
             try:
                 question_text = question_data.get("question_text", "")
-                answer = await self.generate_answer(question_text, policy_context)
+                answer = await self.generate_answer(question_text, policy_context, cache_context=cache_context)
                 
                 results["successful"].append({
                     "question_id": question_data.get("id"),
@@ -197,7 +565,7 @@ ANSWER:"""
         
         return results
     
-    def validate_api_key(self) -> bool:
+    async def validate_api_key(self) -> bool:
         """
         Test if the API key is valid
         
@@ -206,7 +574,7 @@ ANSWER:"""
         """
         try:
             # Make a simple test call
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=10,
                 messages=[
@@ -232,5 +600,6 @@ ANSWER:"""
             "model": self.model,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
+            "usage": self.usage.to_dict(),
             "timestamp": datetime.utcnow().isoformat()
         }
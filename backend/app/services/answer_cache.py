@@ -0,0 +1,151 @@
+"""
+Content-addressed cache of generated answers
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.answer_library import normalize_question
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answer_cache (
+  key TEXT PRIMARY KEY,
+  answer TEXT NOT NULL,
+  created_at REAL NOT NULL,
+  last_used_at REAL NOT NULL,
+  hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_answer_cache_last_used ON answer_cache(last_used_at);
+"""
+
+
+def answer_cache_key(question: str, context_fingerprint: str, prompt_fingerprint: str) -> str:
+    """Cache key for a question answered with a given policy context and prompt"""
+    source = "\0".join([normalize_question(question), context_fingerprint, prompt_fingerprint])
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Persistent answer cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0, busy_timeout_seconds: float = 30.0):
+        """
+        Initialize answer cache
+
+        Args:
+            path: SQLite file (created if missing; ":memory:" keeps the cache in-process)
+            max_entries: Entries kept after eviction (least recently used go first)
+            ttl_seconds: Maximum entry age (0 disables expiry)
+            busy_timeout_seconds: How long to wait for another process's write lock
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_seconds, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answer_cache").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cached answers for the keys that have an unexpired entry (marks them recently used)"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        oldest = now - self.ttl_seconds if self.ttl_seconds > 0 else 0
+        found: Dict[str, str] = {}
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, answer FROM answer_cache WHERE key IN ({placeholders}) AND created_at >= ?",
+                    (*chunk, oldest)
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    "UPDATE answer_cache SET last_used_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        return found
+
+    def put_many(self, entries: List[Tuple[str, str]]) -> None:
+        """Store (key, answer) pairs, then evict expired and least recently used entries"""
+        if not entries:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO answer_cache (key, answer, created_at, last_used_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET answer = excluded.answer, created_at = excluded.created_at, "
+                    "last_used_at = excluded.last_used_at",
+                    [(key, answer, now, now) for key, answer in entries]
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def put(self, key: str, answer: str) -> None:
+        self.put_many([(key, answer)])
+
+    def clear(self) -> int:
+        """Remove every entry; returns the number removed"""
+        with self._lock:
+            return self._conn.execute("DELETE FROM answer_cache").rowcount
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds > 0:
+            self._conn.execute("DELETE FROM answer_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries > 0:
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE key IN ("
+                "SELECT key FROM answer_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+
+_caches: Dict[str, AnswerCache] = {}
+
+
+def get_answer_cache(settings) -> Optional[AnswerCache]:
+    """Process-wide answer cache for the configured path, or None when caching is disabled"""
+    if not settings.answer_cache_enabled:
+        return None
+    path = settings.answer_cache_path
+    if path not in _caches:
+        _caches[path] = AnswerCache(
+            path,
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds
+        )
+    return _caches[path]
+
+
+def invalidate_answer_cache(settings) -> None:
+    """Drop cached answers after the policy corpus changed (best effort)"""
+    try:
+        cache = get_answer_cache(settings)
+        if cache is not None:
+            logger.info(f"Policy corpus changed: cleared {cache.clear()} cached answers")
+    except Exception as e:
+        logger.warning(f"Could not clear the answer cache: {str(e)}")
@@ -0,0 +1,322 @@
+"""
+Answer generation runs: turns a questionnaire's questions into saved AI answers
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.ai_service import AIService
+from app.services.answer_cache import AnswerCache, answer_cache_key
+from app.services.answer_library import AnswerLibrary
+from app.services.batch_generation import generate_answers_in_batch
+from app.services.database import DatabaseService
+from app.services.generation_engine import GenerationEngine, GenerationStats, estimate_tokens
+from app.services.policy_index import PolicyContext
+from app.services.progress import GenerationProgress
+
+logger = logging.getLogger(__name__)
+
+GENERATION_MODES = ("single", "batched", "batch")
+
+
+async def generate_answers_for_questions(
+    questions: List[Dict[str, Any]],
+    db_service: DatabaseService,
+    ai_service: AIService,
+    policy_context: PolicyContext,
+    settings,
+    mode: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    progress: Optional[GenerationProgress] = None,
+    library: Optional[AnswerLibrary] = None,
+    answer_cache: Optional[AnswerCache] = None
+) -> GenerationStats:
+    """
+    Generate and save answers for a list of questions
+
+    Args:
+        questions: Question records with "id" and "question_text"
+        db_service: Database service used to save answers
+        ai_service: AI service (its usage counters are attached to the returned stats)
+        policy_context: Policy context for the run
+        settings: Application settings
+        mode: "single", "batched" or "batch" (defaults to settings.ai_generation_mode)
+        batch_size: Questions per batched request (defaults to settings.ai_batch_size)
+        progress: Optional live progress to publish question events and counters to
+        library: Optional Answers Library matcher; matching questions skip the LLM
+        answer_cache: Optional answer cache; cached questions skip the LLM and new answers are stored
+
+    Returns:
+        GenerationStats: Question-level counters for the run
+    """
+    mode = mode or settings.ai_generation_mode
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Invalid generation mode '{mode}'. Must be one of: {', '.join(GENERATION_MODES)}")
+
+    reused = await reuse_library_answers(questions, library, db_service, progress) if library else {}
+    remaining = [q for q in questions if q["id"] not in reused]
+
+    cached: Dict[str, str] = {}
+    if answer_cache is not None and remaining:
+        keys = {
+            q["id"]: answer_cache_key(q["question_text"], policy_context.fingerprint, ai_service.fingerprint())
+            for q in remaining
+        }
+        cached = await reuse_cached_answers(remaining, keys, answer_cache, db_service, progress)
+        remaining = [q for q in remaining if q["id"] not in cached]
+        db_service = _CachingAnswerSink(db_service, answer_cache, keys)
+
+    if not remaining:
+        stats = GenerationStats()
+    elif mode == "batch":
+        stats = await generate_answers_in_batch(remaining, db_service, ai_service, policy_context, settings, progress=progress)
+    else:
+        stats = await _generate_with_engine(remaining, db_service, ai_service, policy_context, settings, mode, batch_size, progress)
+
+    skipped = len(reused) + len(cached)
+    if skipped:
+        stats.total += skipped
+        stats.succeeded += skipped
+        stats.library_hits = len(reused)
+        stats.answer_cache_hits = len(cached)
+    if reused:
+        # Claude request time per LLM answer in this run; unknown when every question was reused
+        answered_by_llm = stats.succeeded - skipped
+        if answered_by_llm and ai_service.usage.request_seconds:
+            stats.library_seconds_saved = len(reused) * ai_service.usage.request_seconds / answered_by_llm
+        logger.info(
+            f"Answers Library: {len(reused)}/{stats.total} questions reused "
+            f"({len(reused) / stats.total:.0%} hit rate), ~{stats.library_seconds_saved:.1f}s of LLM latency saved"
+        )
+    if cached:
+        logger.info(f"Answer cache: {len(cached)}/{stats.total} questions served from cache")
+    stats.usage = ai_service.usage.to_dict()
+    return stats
+
+
+async def reuse_library_answers(
+    questions: List[Dict[str, Any]],
+    library: AnswerLibrary,
+    db_service: DatabaseService,
+    progress: Optional[GenerationProgress] = None
+) -> Dict[str, str]:
+    """
+    Save Answers Library answers for the questions that match a library entry
+
+    Returns:
+        dict: Question ID to reused answer, for every question saved
+    """
+    started = time.monotonic()
+    reused: Dict[str, str] = {}
+    for question in questions:
+        match = library.match(question["question_text"])
+        if match is None:
+            continue
+        if await db_service.update_question_answer(question["id"], match.answer, status="unapproved", answer_source="library"):
+            reused[question["id"]] = match.answer
+            logger.info(
+                f"Question {question['id']} answered from library entry {match.answer_id} "
+                f"({'exact' if match.exact else f'similarity {match.score:.2f}'})"
+            )
+            if progress:
+                progress.question_completed(question["id"], match.answer, answer_source="library")
+    logger.info(f"Library matching for {len(questions)} questions took {time.monotonic() - started:.3f}s")
+    return reused
+
+
+async def reuse_cached_answers(
+    questions: List[Dict[str, Any]],
+    keys: Dict[str, str],
+    answer_cache: AnswerCache,
+    db_service: DatabaseService,
+    progress: Optional[GenerationProgress] = None
+) -> Dict[str, str]:
+    """
+    Save cached answers for the questions answered before with the same policies and prompt
+
+    Returns:
+        dict: Question ID to cached answer, for every question saved
+    """
+    started = time.monotonic()
+    try:
+        found = answer_cache.get_many(keys.values())
+    except Exception as e:
+        # The cache is an optimisation: generate everything if it cannot be read
+        logger.warning(f"Answer cache lookup failed: {str(e)}")
+        return {}
+    lookup_ms = (time.monotonic() - started) * 1000
+
+    reused: Dict[str, str] = {}
+    for question in questions:
+        answer = found.get(keys[question["id"]])
+        if answer is None:
+            continue
+        if await db_service.update_question_answer(question["id"], answer, status="unapproved", answer_source="ai"):
+            reused[question["id"]] = answer
+            if progress:
+                progress.question_completed(question["id"], answer)
+    logger.info(f"Answer cache lookup for {len(questions)} questions took {lookup_ms:.1f}ms ({len(found)} hits)")
+    return reused
+
+
+class _CachingAnswerSink:
+    """Database proxy that also stores newly generated answers in the answer cache"""
+
+    def __init__(self, db_service: Any, answer_cache: AnswerCache, keys: Dict[str, str]):
+        self._db_service = db_service
+        self._answer_cache = answer_cache
+        self._keys = keys
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db_service, name)
+
+    async def update_question_answer(self, question_id: str, answer: str, status: str = "unapproved",
+                                     answer_source: Optional[str] = None) -> bool:
+        saved = await self._db_service.update_question_answer(question_id, answer, status=status, answer_source=answer_source)
+        if saved and answer_source == "ai":
+            self._store({question_id: answer})
+        return saved
+
+    async def bulk_update_question_answers(self, answers: Dict[str, str], status: str = "unapproved",
+                                           answer_source: Optional[str] = None) -> Dict[str, Any]:
+        result = await self._db_service.bulk_update_question_answers(answers, status=status, answer_source=answer_source)
+        if answer_source == "ai":
+            # Only the answers the database confirmed: a retry must not be served answers that were never saved
+            saved = set(result.get("updated_ids") or ())
+            self._store({qid: answer for qid, answer in answers.items() if qid in saved})
+        return result
+
+    def _store(self, answers: Dict[str, str]) -> None:
+        try:
+            self._answer_cache.put_many([(self._keys[qid], answer) for qid, answer in answers.items() if qid in self._keys])
+        except Exception as e:
+            logger.warning(f"Could not store answers in the answer cache: {str(e)}")
+
+
+async def _generate_with_engine(
+    questions: List[Dict[str, Any]],
+    db_service: DatabaseService,
+    ai_service: AIService,
+    policy_context: PolicyContext,
+    settings,
+    mode: str,
+    batch_size: Optional[int],
+    progress: Optional[GenerationProgress]
+) -> GenerationStats:
+    """Answer questions in single or batched mode through the GenerationEngine"""
+    engine = GenerationEngine.from_settings(settings)
+    # Answer one request first so its response populates the prompt cache
+    warmup_items = 1 if settings.ai_prompt_caching else 0
+
+    async def save_answer(question_id: str, answer: str) -> None:
+        # Update question with generated answer and set answer_source to 'ai'
+        await db_service.update_question_answer(
+            question_id,
+            answer,
+            status="unapproved",
+            answer_source="ai"
+        )
+        if progress:
+            progress.question_completed(question_id, answer)
+
+    async def answer_question(question: Dict[str, Any]) -> str:
+        on_text = None
+        if progress:
+            progress.question_started(question["id"])
+            on_text = lambda text: progress.token_delta(question["id"], text)
+        answer = await ai_service.generate_answer(
+            question["question_text"],
+            policy_context.for_question(question["question_text"]),
+            cache_context=policy_context.is_shared,
+            on_text=on_text
+        )
+        await save_answer(question["id"], answer)
+        return answer
+
+    async def report_failure(question: Dict[str, Any], error: Exception) -> None:
+        if progress:
+            progress.question_failed(question["id"], str(error))
+
+    on_progress = progress.update_counters if progress else None
+
+    def estimate_question_tokens(question: Dict[str, Any]) -> int:
+        return policy_context.max_tokens + estimate_tokens(question["question_text"])
+
+    if mode == "single":
+        stats = await engine.run(
+            questions,
+            answer_question,
+            estimate_tokens=estimate_question_tokens,
+            on_error=report_failure,
+            warmup_items=warmup_items,
+            on_progress=on_progress
+        )
+    else:
+        batch_size = max(1, batch_size or settings.ai_batch_size)
+        batches = [questions[start:start + batch_size] for start in range(0, len(questions), batch_size)]
+        retry_singly: List[Dict[str, Any]] = []
+        # Each batch's policy context, built once for its rate-limit estimate and its request
+        batch_contexts: Dict[int, str] = {}
+
+        def batch_context(batch: List[Dict[str, Any]]) -> str:
+            if id(batch) not in batch_contexts:
+                batch_contexts[id(batch)] = policy_context.for_questions([q["question_text"] for q in batch])
+            return batch_contexts[id(batch)]
+
+        def estimate_batch_tokens(batch: List[Dict[str, Any]]) -> int:
+            return estimate_tokens(batch_context(batch)) + sum(estimate_tokens(q["question_text"]) for q in batch)
+
+        async def answer_batch(batch: List[Dict[str, Any]]) -> int:
+            if progress:
+                for question in batch:
+                    progress.question_started(question["id"])
+            context = batch_context(batch)
+            batch_contexts.pop(id(batch), None)
+            result = await ai_service.generate_batched_answers(
+                batch,
+                context,
+                cache_context=policy_context.is_shared
+            )
+            for question in batch:
+                answer = result["answers"].get(question["id"])
+                if answer is None:
+                    retry_singly.append(question)
+                else:
+                    await save_answer(question["id"], answer)
+            return len(result["answers"])
+
+        async def requeue_batch(batch: List[Dict[str, Any]], error: Exception) -> None:
+            retry_singly.extend(batch)
+
+        logger.info(f"Batched mode: {len(questions)} questions in {len(batches)} requests of up to {batch_size}")
+        batch_stats = await engine.run(
+            batches,
+            answer_batch,
+            estimate_tokens=estimate_batch_tokens,
+            on_error=requeue_batch,
+            warmup_items=warmup_items,
+            on_progress=on_progress
+        )
+
+        if retry_singly:
+            logger.info(f"Retrying {len(retry_singly)} missing/malformed batched answers singly")
+        single_stats = await engine.run(
+            retry_singly,
+            answer_question,
+            estimate_tokens=estimate_question_tokens,
+            on_error=report_failure,
+            on_progress=on_progress
+        )
+
+        stats = GenerationStats(
+            total=len(questions),
+            succeeded=len(questions) - single_stats.failed,
+            failed=single_stats.failed
+        )
+        stats.merge(batch_stats)
+        stats.merge(single_stats)
+        # Batch-level errors were recovered by the single retries; keep only final failures
+        stats.errors = single_stats.errors
+
+    return stats
@@ -0,0 +1,162 @@
+"""
+Answer reuse from the Answers Library before calling Claude
+"""
+
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from app.services.policy_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Leading enumerators such as "1.", "2.3)", "1.2 ", "A.1 -", "Q12:" or "Question 4."
+# (a bare number needs a following space, so "2FA" and "24/7" are kept)
+_NUMBERING_PATTERN = re.compile(
+    r"^\s*(?:(?:q|question)\s*)?(?:(?:[a-z][.\-]?)?\d+(?:[.\-]\d+)*(?:\s*[.):\-]|\s)|[a-z]\s*[.):\-])\s*",
+    re.IGNORECASE
+)
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(text: str) -> str:
+    """Canonical form of a question for exact matching"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _NUMBERING_PATTERN.sub("", text)
+    return _NON_ALPHANUMERIC.sub(" ", text).strip()
+
+
+# Negations and quantifiers flip or narrow a question's meaning, so they are kept as
+# terms (tokenize drops them as stopwords) and must agree for a match. "t" is what
+# normalisation leaves of "n't"
+_QUALIFIERS = {
+    "not": "not", "no": "not", "nor": "not", "never": "not", "none": "not", "neither": "not",
+    "without": "not", "cannot": "not", "t": "not",
+    "all": "all", "every": "all", "each": "all", "any": "any", "some": "some", "only": "only",
+}
+
+
+def _terms(text: str) -> List[str]:
+    terms = []
+    for word in normalize_question(text).split():
+        terms.extend([_QUALIFIERS[word]] if word in _QUALIFIERS else tokenize(word))
+    return terms
+
+
+def _qualifiers(text: str) -> FrozenSet[str]:
+    """Negations and quantifiers of a question (see _QUALIFIERS)"""
+    return frozenset(_QUALIFIERS[word] for word in normalize_question(text).split() if word in _QUALIFIERS)
+
+
+def _features(text: str) -> List[str]:
+    terms = _terms(text)
+    # Bigrams keep some word order, so "access review" and "review access logs" differ
+    return terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+
+
+@dataclass
+class LibraryMatch:
+    """A library answer chosen for a question"""
+
+    answer_id: str
+    question: str
+    answer: str
+    score: float  # 1.0 for exact matches, cosine similarity otherwise
+    exact: bool
+
+
+class AnswerLibrary:
+    """In-memory matcher over the Answers Library"""
+
+    def __init__(self, entries: List[Dict[str, Any]], threshold: float = 0.9):
+        """
+        Build the exact-match table and TF-IDF index
+
+        Args:
+            entries: Answer records with "id", "question" and "answer" (newest first wins ties)
+            threshold: Minimum cosine similarity for a fuzzy match (1.0 allows exact matches only)
+        """
+        self.threshold = threshold
+        self.entries = [e for e in entries if (e.get("question") or "").strip() and (e.get("answer") or "").strip()]
+        self._exact: Dict[str, int] = {}
+        for index, entry in enumerate(self.entries):
+            self._exact.setdefault(normalize_question(entry["question"]), index)
+
+        self._qualifiers = [_qualifiers(entry["question"]) for entry in self.entries]
+
+        features = [Counter(_features(entry["question"])) for entry in self.entries]
+        document_frequency: Counter = Counter()
+        for counts in features:
+            document_frequency.update(counts.keys())
+        total = len(self.entries)
+        self._idf = {term: math.log((1 + total) / (1 + df)) + 1.0 for term, df in document_frequency.items()}
+
+        # Inverted index of L2-normalised TF-IDF weights: term -> [(entry index, weight)]
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)
+        for index, counts in enumerate(features):
+            vector = self._vector(counts)
+            for term, weight in vector.items():
+                self._postings[term].append((index, weight))
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.entries
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        weights = {
+            term: (1.0 + math.log(count)) * self._idf[term]
+            for term, count in counts.items()
+            if term in self._idf
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()} if norm else {}
+
+    def match(self, question: str) -> Optional[LibraryMatch]:
+        """Best library answer for a question, or None when nothing reaches the threshold"""
+        if self.is_empty:
+            return None
+
+        index = self._exact.get(normalize_question(question))
+        if index is not None:
+            return self._match(index, 1.0, exact=True)
+        if self.threshold >= 1.0:
+            return None
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, weight in self._vector(Counter(_features(question))).items():
+            for entry_index, entry_weight in self._postings[term]:
+                scores[entry_index] += weight * entry_weight
+        # "Do you not encrypt…" must not reuse the answer to "Do you encrypt…"
+        qualifiers = _qualifiers(question)
+        scores = {index: score for index, score in scores.items() if self._qualifiers[index] == qualifiers}
+        if not scores:
+            return None
+        best = max(scores, key=lambda i: (scores[i], -i))
+        if scores[best] < self.threshold:
+            return None
+        return self._match(best, scores[best], exact=False)
+
+    def _match(self, index: int, score: float, exact: bool) -> LibraryMatch:
+        entry = self.entries[index]
+        return LibraryMatch(
+            answer_id=entry.get("id", ""),
+            question=entry["question"],
+            answer=entry["answer"],
+            score=round(min(score, 1.0), 4),
+            exact=exact
+        )
+
+
+async def load_answer_library(db_service, settings) -> Optional[AnswerLibrary]:
+    """Load the Answers Library matcher, or None when library reuse is disabled"""
+    if not settings.library_reuse_enabled:
+        return None
+    started = time.monotonic()
+    library = AnswerLibrary(await db_service.get_all_answers(), threshold=settings.library_match_threshold)
+    logger.info(f"Answers Library loaded: {len(library.entries)} entries in {time.monotonic() - started:.2f}s")
+    return library
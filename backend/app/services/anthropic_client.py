@@ -0,0 +1,82 @@
+"""
+Process-wide async Anthropic client
+"""
+
+import importlib.util
+import logging
+from typing import Dict, Optional
+
+import anthropic
+import httpx
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, anthropic.AsyncAnthropic] = {}
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install "httpx[http2]")"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_anthropic_client(api_key: str, settings=None) -> anthropic.AsyncAnthropic:
+    """
+    Create an async Anthropic client with a tuned connection pool
+
+    Args:
+        api_key: Anthropic API key
+        settings: Application settings (pool limits, timeouts, HTTP/2)
+
+    Returns:
+        anthropic.AsyncAnthropic: New client (the caller owns closing it)
+    """
+    settings = settings or get_settings()
+    http2 = settings.ai_http2 and http2_available()
+    http_client = anthropic.DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.ai_http_max_connections,
+            max_keepalive_connections=settings.ai_http_max_keepalive_connections,
+            keepalive_expiry=settings.ai_http_keepalive_expiry_seconds
+        )
+    )
+    logger.info(
+        f"Created Anthropic client (http2={http2}, max_connections={settings.ai_http_max_connections}, "
+        f"keepalive={settings.ai_http_max_keepalive_connections})"
+    )
+    return anthropic.AsyncAnthropic(
+        api_key=api_key,
+        http_client=http_client,
+        timeout=anthropic.Timeout(
+            settings.ai_http_timeout_seconds,
+            connect=settings.ai_http_connect_timeout_seconds
+        )
+    )
+
+
+def get_anthropic_client(api_key: Optional[str] = None) -> anthropic.AsyncAnthropic:
+    """
+    Get the shared client for an API key, creating it on first use
+
+    Use `client.with_options(...)` for per-caller settings such as max_retries;
+    the copy keeps sharing the same connection pool.
+    """
+    api_key = api_key or get_settings().anthropic_api_key
+    if not api_key:
+        raise ValueError("Anthropic API key is required. Set ANTHROPIC_API_KEY environment variable or pass api_key parameter.")
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = create_anthropic_client(api_key)
+    return client
+
+
+async def close_anthropic_clients() -> None:
+    """Close every shared client and its connection pool (application shutdown)"""
+    while _clients:
+        _, client = _clients.popitem()
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Error closing Anthropic client: {str(e)}")
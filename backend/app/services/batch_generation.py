@@ -0,0 +1,290 @@
+"""
+Offline bulk answer generation through the Anthropic Message Batches API
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.services.ai_service import AIService, UsageStats
+from app.services.anthropic_client import get_anthropic_client
+from app.services.database import DatabaseService
+from app.services.fake_batches import get_fake_batches
+from app.services.generation_engine import GenerationStats
+from app.services.policy_index import PolicyContext
+from app.services.progress import GenerationProgress
+
+logger = logging.getLogger(__name__)
+
+BATCH_BACKENDS = ("anthropic", "fake")
+
+# Result types worth submitting again; "canceled" means someone stopped the batch on purpose
+RESUBMIT_RESULT_TYPES = {"errored", "expired"}
+
+# Message Batches API limits per batch: 100,000 requests and 256 MB of requests
+MAX_BATCH_REQUESTS = 100_000
+MAX_BATCH_BYTES = 250 * 1000 * 1000  # Headroom for the request envelope
+
+
+def split_batch_requests(
+    requests: List[Dict[str, Any]],
+    max_requests: int = MAX_BATCH_REQUESTS,
+    max_bytes: int = MAX_BATCH_BYTES
+) -> List[List[Dict[str, Any]]]:
+    """Split batch requests, in order, into batches under the request-count and size limits"""
+    chunks: List[List[Dict[str, Any]]] = []
+    size = 0
+    for request in requests:
+        request_size = len(json.dumps(request))
+        if not chunks or len(chunks[-1]) >= max_requests or size + request_size > max_bytes:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(request)
+        size += request_size
+    return chunks
+
+
+def get_batch_client(settings, client: Optional[Any] = None) -> Any:
+    """
+    Get the `messages.batches` resource for the configured backend
+
+    Args:
+        settings: Application settings (ai_batch_backend selects the backend)
+        client: Async Anthropic client for the "anthropic" backend (defaults to the shared client)
+    """
+    if settings.ai_batch_backend not in BATCH_BACKENDS:
+        raise ValueError(f"Invalid batch backend '{settings.ai_batch_backend}'. Must be one of: {', '.join(BATCH_BACKENDS)}")
+    if settings.ai_batch_backend == "fake":
+        return get_fake_batches()
+    if client is None:
+        client = get_anthropic_client(settings.anthropic_api_key)
+    return client.messages.batches
+
+
+async def generate_answers_in_batch(
+    questions: List[Dict[str, Any]],
+    db_service: DatabaseService,
+    ai_service: AIService,
+    policy_context: PolicyContext,
+    settings,
+    batches: Optional[Any] = None,
+    progress: Optional[GenerationProgress] = None
+) -> GenerationStats:
+    """
+    Generate and save answers for a list of questions with message batches
+
+    Args:
+        questions: Question records with "id", "questionnaire_id" and "question_text"
+        db_service: Database service used to record batches and save answers
+        ai_service: AI service that builds the prompts (its usage counters are updated)
+        policy_context: Policy context for the run
+        settings: Application settings
+        batches: `messages.batches` resource (defaults to the configured backend)
+        progress: Optional live progress to publish question events and counters to
+
+    Returns:
+        GenerationStats: Question-level counters for the run
+    """
+    batches = batches or get_batch_client(settings, ai_service.client)
+    stats = GenerationStats(total=len(questions))
+    started = time.monotonic()
+    pending = list(questions)
+
+    for attempt in range(settings.ai_batch_max_resubmits + 1):
+        requests = [
+            ai_service.create_batch_request(
+                question["id"],
+                question["question_text"],
+                policy_context.for_question(question["question_text"]),
+                cache_context=policy_context.is_shared
+            )
+            for question in pending
+        ]
+
+        batch_ids = []
+        for chunk in split_batch_requests(requests):
+            batch = await batches.create(requests=chunk)
+            logger.info(f"Submitted message batch {batch.id} with {len(chunk)} requests (attempt {attempt + 1})")
+            await db_service.create_generation_batch({
+                "questionnaire_id": pending[0]["questionnaire_id"],
+                "batch_id": batch.id,
+                "backend": settings.ai_batch_backend,
+                "request_count": len(chunk),
+                "attempt": attempt
+            })
+            batch_ids.append(batch.id)
+
+        outcomes = await asyncio.gather(*(
+            collect_generation_batch(
+                batch_id,
+                db_service,
+                batches,
+                settings.ai_batch_poll_interval_seconds,
+                usage=ai_service.usage,
+                progress=progress
+            )
+            for batch_id in batch_ids
+        ))
+        outcome = {
+            "saved": sum(o["saved"] for o in outcomes),
+            "failed": {question_id: result for o in outcomes for question_id, result in o["failed"].items()},
+            "errors": [error for o in outcomes for error in o["errors"]]
+        }
+        stats.succeeded += outcome["saved"]
+        if attempt > 0:
+            stats.retries += len(pending)
+        if progress:
+            stats.elapsed_seconds = time.monotonic() - started
+            progress.update_counters(stats)
+
+        pending = [q for q in pending if outcome["failed"].get(q["id"]) in RESUBMIT_RESULT_TYPES]
+        if not pending:
+            break
+        if attempt < settings.ai_batch_max_resubmits:
+            logger.info(f"Resubmitting {len(pending)} errored/expired requests")
+
+    stats.failed = stats.total - stats.succeeded
+    stats.errors = outcome["errors"]
+    stats.elapsed_seconds = time.monotonic() - started
+    stats.usage = ai_service.usage.to_dict()
+    return stats
+
+
+async def collect_generation_batch(
+    batch_id: str,
+    db_service: DatabaseService,
+    batches: Any,
+    poll_interval_seconds: float,
+    usage: Optional[UsageStats] = None,
+    progress: Optional[GenerationProgress] = None
+) -> Dict[str, Any]:
+    """
+    Wait for a message batch to end and save its answers
+
+    Args:
+        batch_id: Provider batch ID
+        db_service: Database service used to save answers and update the batch record
+        batches: `messages.batches` resource the batch was submitted to
+        poll_interval_seconds: Delay between status checks
+        usage: Optional usage counters to record the batch's token usage in
+        progress: Optional live progress to publish saved answers and failures to
+
+    Returns:
+        dict: {"saved": int, "failed": {question_id: result type}, "errors": [...]}
+    """
+    batch = await batches.retrieve(batch_id)
+    while batch.processing_status != "ended":
+        await asyncio.sleep(poll_interval_seconds)
+        batch = await batches.retrieve(batch_id)
+        try:
+            # Shows other processes the batch is still being polled (see resume_generation_batches)
+            await db_service.update_generation_batch(batch_id, {})
+        except Exception as e:
+            logger.warning(f"Could not refresh message batch {batch_id}: {str(e)}")
+
+    counts = batch.request_counts
+    await db_service.update_generation_batch(batch_id, {
+        "status": "ended",
+        "succeeded_count": counts.succeeded,
+        "errored_count": counts.errored,
+        "expired_count": counts.expired,
+        "ended_at": batch.ended_at.isoformat() if batch.ended_at else None
+    })
+    logger.info(
+        f"Message batch {batch_id} ended: {counts.succeeded} succeeded, "
+        f"{counts.errored} errored, {counts.expired} expired, {counts.canceled} canceled"
+    )
+
+    answers: Dict[str, str] = {}
+    failed: Dict[str, str] = {}
+    errors: List[Dict[str, Any]] = []
+    async for item in await batches.results(batch_id):
+        if item.result.type == "succeeded":
+            message = item.result.message
+            if usage is not None:
+                usage.record(getattr(message, "usage", None))
+            answers[item.custom_id] = message.content[0].text.strip()
+        else:
+            failed[item.custom_id] = item.result.type
+            errors.append({"item": f"question {item.custom_id}", "error": _describe_failure(item.result)})
+
+    saved = await db_service.bulk_update_question_answers(answers, status="unapproved", answer_source="ai")
+    for error in saved["errors"]:
+        errors.append({"item": "save", "error": error})
+    if progress:
+        for question_id, answer in answers.items():
+            progress.question_completed(question_id, answer)
+        for question_id, result_type in failed.items():
+            progress.question_failed(question_id, f"Batch request {result_type}")
+
+    await db_service.update_generation_batch(batch_id, {"status": "collected"})
+    return {"saved": saved["updated_count"], "failed": failed, "errors": errors}
+
+
+async def resume_generation_batches(settings, db_service: Optional[DatabaseService] = None, batches: Optional[Any] = None) -> int:
+    """
+    Collect message batches left unfinished by a process that stopped polling them
+
+    A batch is left alone while its record was updated in the last
+    ai_batch_resume_after_seconds (the submitting process polls it), and is claimed
+    with a compare-and-set first, so with several API processes only one collects it.
+    Resubmission is not attempted here: errored/expired questions keep their previous
+    answer and can be regenerated from the UI.
+
+    Args:
+        settings: Application settings
+        db_service: Database service (defaults to one for the configured project)
+        batches: `messages.batches` resource (defaults to the configured backend)
+
+    Returns:
+        int: Number of batches collected
+    """
+    db_service = db_service or DatabaseService(
+        supabase_url=settings.supabase_url,
+        supabase_key=settings.supabase_key
+    )
+    records = await db_service.get_generation_batches(status="in_progress")
+    records += await db_service.get_generation_batches(status="ended")
+    if not records:
+        return 0
+
+    collected = 0
+    now = datetime.now(timezone.utc)
+    for record in records:
+        if (now - _parse_timestamp(record["updated_at"])).total_seconds() < settings.ai_batch_resume_after_seconds:
+            continue
+        if not await db_service.claim_generation_batch(record["batch_id"], record["updated_at"]):
+            logger.info(f"Message batch {record['batch_id']} was claimed by another process")
+            continue
+        try:
+            if record["backend"] != settings.ai_batch_backend:
+                raise ValueError(f"Batch backend '{record['backend']}' is not the configured backend")
+            outcome = await collect_generation_batch(
+                record["batch_id"],
+                db_service,
+                batches or get_batch_client(settings),
+                settings.ai_batch_poll_interval_seconds
+            )
+            logger.info(f"Resumed message batch {record['batch_id']}: {outcome['saved']} answers saved")
+            collected += 1
+        except Exception as e:
+            logger.error(f"Could not resume message batch {record['batch_id']}: {str(e)}")
+            await db_service.update_generation_batch(record["batch_id"], {"status": "failed"})
+    return collected
+
+
+def _parse_timestamp(value: str) -> datetime:
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def _describe_failure(result: Any) -> str:
+    if result.type == "errored":
+        error = getattr(getattr(result, "error", None), "error", None)
+        if error is not None:
+            return f"errored: {getattr(error, 'type', 'error')}: {getattr(error, 'message', '')}"
+        return "errored"
+    return result.type
@@ -0,0 +1,411 @@
+"""
+Bulk export and import of answers, questions and questionnaires (CSV, JSONL, Parquet)
+"""
+
+import io
+import itertools
+import json
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+BULK_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Columns of each dataset (in file order) with their types, and the validation rules
+BULK_DATASETS: Dict[str, Dict[str, Any]] = {
+    "answers": {
+        "columns": {
+            "id": pa.string(),
+            "question": pa.string(),
+            "answer": pa.string(),
+            "source_type": pa.string(),
+            "source_name": pa.string(),
+            "created_at": pa.string(),
+            "updated_at": pa.string(),
+        },
+        "required": ("question", "answer"),
+        "allowed": {"source_type": ("user", "questionnaire")},
+        "defaults": {"source_type": "user", "source_name": "File"},
+        "uuids": ("id",),
+    },
+    "questionnaires": {
+        "columns": {
+            "id": pa.string(),
+            "name": pa.string(),
+            "filename": pa.string(),
+            "status": pa.string(),
+            "content_sha256": pa.string(),
+            "text_sha256": pa.string(),
+            "upload_date": pa.string(),
+            "created_at": pa.string(),
+            "updated_at": pa.string(),
+        },
+        "required": ("name",),
+        "allowed": {"status": ("in_progress", "approved", "complete")},
+        "defaults": {"status": "in_progress"},
+        "uuids": ("id",),
+    },
+    "questions": {
+        "columns": {
+            "id": pa.string(),
+            "questionnaire_id": pa.string(),
+            "question_text": pa.string(),
+            "answer": pa.string(),
+            "status": pa.string(),
+            "answer_source": pa.string(),
+            "sheet_name": pa.string(),
+            "row_number": pa.int64(),
+            "section": pa.string(),
+            "external_id": pa.string(),
+            "created_at": pa.string(),
+            "updated_at": pa.string(),
+        },
+        "required": ("questionnaire_id", "question_text"),
+        "allowed": {
+            "status": ("unapproved", "approved"),
+            "answer_source": ("ai", "user", "copied", "not_found", "library"),
+        },
+        "defaults": {"status": "unapproved"},
+        "uuids": ("id", "questionnaire_id"),
+    },
+}
+
+# Invalid rows listed in an import report (all of them are counted)
+MAX_REPORTED_ERRORS = 100
+# Bytes per CSV block read
+CSV_BLOCK_SIZE = 1024 * 1024
+
+_UUID = r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+_INTEGER = r"^[+-]?\d{1,18}$"
+
+Source = Union[bytes, str, BinaryIO]
+
+
+def _dataset(name: str) -> Dict[str, Any]:
+    if name not in BULK_DATASETS:
+        raise ValueError(f"Invalid dataset '{name}'. Must be one of: {', '.join(BULK_DATASETS)}")
+    return BULK_DATASETS[name]
+
+
+def validate_format(fmt: str) -> str:
+    """Return the format, lower-cased, or raise ValueError if it is not supported"""
+    fmt = (fmt or "").lower().lstrip(".")
+    if fmt not in BULK_FORMATS:
+        raise ValueError(f"Invalid format '{fmt}'. Must be one of: {', '.join(BULK_FORMATS)}")
+    return fmt
+
+
+def export_schema(dataset: str) -> pa.Schema:
+    return pa.schema(list(_dataset(dataset)["columns"].items()))
+
+
+# IMPORT
+
+def _rechunk(batches: Iterator[pa.RecordBatch], batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """Split reader batches larger than batch_rows"""
+    for batch in batches:
+        for offset in range(0, batch.num_rows, batch_rows):
+            yield batch.slice(offset, batch_rows)
+
+
+def _jsonl_batches(stream: BinaryIO, columns: Dict[str, pa.DataType], batch_rows: int) -> Iterator[pa.RecordBatch]:
+    """JSON objects, one per line, as record batches of the dataset's columns"""
+    line_number = 0
+    lines = iter(stream)
+    while True:
+        records = []
+        consumed = line_number
+        for line in itertools.islice(lines, batch_rows):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Line {line_number} is not valid JSON: {str(e)}")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {line_number} is not a JSON object")
+            records.append(record)
+        if line_number == consumed:
+            return
+        if not records:
+            continue
+        arrays = []
+        for column in columns:
+            values = [record.get(column) for record in records]
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Mixed types (e.g. numbers and strings): validated as text
+                arrays.append(pa.array([None if value is None else str(value) for value in values]))
+        yield pa.RecordBatch.from_arrays(arrays, names=list(columns))
+
+
+def iter_import_batches(source: Source, fmt: str, dataset: str, batch_rows: int = 1000) -> Iterator[pa.RecordBatch]:
+    """
+    Read a bulk import file a batch of rows at a time
+
+    Columns are matched by name; unknown columns are ignored and missing ones are
+    read as empty.
+
+    Args:
+        source: File content (bytes), path or binary file
+        fmt: "csv" (with a header row), "jsonl" or "parquet"
+        dataset: "answers", "questionnaires" or "questions"
+        batch_rows: Maximum rows per batch
+
+    Yields:
+        pa.RecordBatch: The next rows, as read (see validate_batch)
+    """
+    columns = _dataset(dataset)["columns"]
+    fmt = validate_format(fmt)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    if fmt == "csv":
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            convert_options=pacsv.ConvertOptions(
+                # Read as text; types are checked by validate_batch
+                column_types={column: pa.string() for column in columns},
+                include_columns=list(columns),
+                include_missing_columns=True,
+                strings_can_be_null=True
+            )
+        )
+        yield from _rechunk(reader, batch_rows)
+    elif fmt == "parquet":
+        parquet_file = pq.ParquetFile(source)
+        present = [column for column in columns if column in parquet_file.schema_arrow.names]
+        yield from parquet_file.iter_batches(batch_size=batch_rows, columns=present)
+    else:
+        stream = open(source, "rb") if isinstance(source, str) else source
+        try:
+            yield from _jsonl_batches(stream, columns, batch_rows)
+        finally:
+            if stream is not source:
+                stream.close()
+
+
+def _blank_to_null(array: pa.Array) -> pa.Array:
+    trimmed = pc.utf8_trim_whitespace(array)
+    return pc.if_else(pc.equal(trimmed, ""), pa.scalar(None, pa.string()), trimmed)
+
+
+def validate_batch(
+    batch: Union[pa.RecordBatch, pa.Table],
+    dataset: str,
+    first_row: int = 1
+) -> Tuple[List[Dict[str, Any]], int, List[str]]:
+    """
+    Validate a batch of imported rows column by column and fill in defaults
+
+    Text is trimmed (blank values become empty), required columns must have a value,
+    constrained columns one of their allowed values, ids UUIDs and integer columns
+    whole numbers. Rows without an id get a new one; missing timestamps are now.
+
+    Args:
+        batch: Rows read by iter_import_batches
+        dataset: "answers", "questionnaires" or "questions"
+        first_row: Row number of the batch's first row in the file (for error messages)
+
+    Returns:
+        tuple: (valid rows as records for the database, number of invalid rows,
+            error messages for up to MAX_REPORTED_ERRORS invalid rows)
+    """
+    spec = _dataset(dataset)
+    rows = batch.num_rows
+    names = batch.schema.names
+    columns: Dict[str, pa.Array] = {}
+    problems: List[Tuple[pa.Array, str]] = []
+
+    for column, data_type in spec["columns"].items():
+        if column not in names:
+            columns[column] = pa.nulls(rows, data_type)
+            continue
+        array = batch.column(names.index(column))
+        if isinstance(array, pa.ChunkedArray):
+            array = array.combine_chunks()
+        text = _blank_to_null(pc.cast(array, pa.string()))
+        if pa.types.is_integer(data_type):
+            whole = pc.match_substring_regex(text, _INTEGER)
+            problems.append((pc.invert(pc.fill_null(whole, True)), f"{column} is not a whole number"))
+            text = pc.if_else(pc.fill_null(whole, False), text, pa.scalar(None, pa.string()))
+            columns[column] = pc.cast(text, data_type)
+        else:
+            columns[column] = text
+
+    for column in spec["required"]:
+        problems.append((pc.is_null(columns[column]), f"{column} is missing"))
+    for column, allowed in spec["allowed"].items():
+        known = pc.is_in(columns[column], value_set=pa.array(allowed))
+        problems.append((pc.invert(pc.or_(known, pc.is_null(columns[column]))), f"{column} must be one of: {', '.join(allowed)}"))
+    for column in spec["uuids"]:
+        problems.append((pc.invert(pc.fill_null(pc.match_substring_regex(columns[column], _UUID), True)), f"{column} is not a UUID"))
+
+    invalid = pa.array([False] * rows)
+    for failed, _ in problems:
+        invalid = pc.or_(invalid, failed)
+    invalid_count = pc.sum(invalid).as_py() or 0
+
+    errors = []
+    if invalid_count:
+        for index in pc.indices_nonzero(invalid).to_pylist()[:MAX_REPORTED_ERRORS]:
+            reasons = [message for failed, message in problems if failed[index].as_py()]
+            errors.append(f"Row {first_row + index}: {'; '.join(reasons)}")
+
+    for column, default in spec["defaults"].items():
+        columns[column] = pc.fill_null(columns[column], default)
+    if dataset == "questionnaires":
+        columns["filename"] = pc.coalesce(columns["filename"], columns["name"])
+    now = datetime.utcnow().isoformat()
+    for column in ("upload_date", "created_at", "updated_at"):
+        if column in columns:
+            columns[column] = pc.fill_null(columns[column], now)
+
+    table = pa.table(columns).filter(pc.invert(invalid))
+    records = table.to_pylist()
+    for record in records:
+        if record["id"] is None:
+            record["id"] = str(uuid.uuid4())
+    return records, invalid_count, errors
+
+
+async def import_dataset(
+    db_service,
+    source: Source,
+    fmt: str,
+    dataset: str,
+    batch_rows: int = 1000
+) -> Dict[str, Any]:
+    """
+    Import a CSV, JSONL or Parquet file into a table, a batch at a time
+
+    Rows are read and validated in a worker thread and upserted by id, so the event
+    loop stays free and memory is bounded by batch_rows.
+
+    Args:
+        db_service: DatabaseService (upsert_records)
+        source: File content (bytes), path or binary file
+        fmt: "csv", "jsonl" or "parquet"
+        dataset: "answers", "questionnaires" or "questions"
+        batch_rows: Rows per read, validation and upsert batch
+
+    Returns:
+        dict: Rows read, imported and rejected, up to MAX_REPORTED_ERRORS error
+            messages and the elapsed seconds
+
+    Raises:
+        ValueError: If the dataset or format is unknown or the file cannot be parsed
+    """
+    _dataset(dataset)
+    fmt = validate_format(fmt)
+    started = time.monotonic()
+    batches = iter_import_batches(source, fmt, dataset, batch_rows)
+    rows_read = 0
+    imported = 0
+    rejected = 0
+    errors: List[str] = []
+    while True:
+        try:
+            batch = await run_in_threadpool(next, batches, None)
+        except pa.ArrowException as e:
+            raise ValueError(f"Could not read {fmt} file after {rows_read} rows: {str(e)}")
+        if batch is None:
+            break
+        records, invalid, batch_errors = await run_in_threadpool(validate_batch, batch, dataset, rows_read + 1)
+        rows_read += batch.num_rows
+        rejected += invalid
+        errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+        if records:
+            imported += await db_service.upsert_records(dataset, records)
+
+    elapsed = time.monotonic() - started
+    logger.info(f"Imported {imported} of {rows_read} {dataset} rows ({fmt}) in {elapsed:.2f}s, {rejected} rejected")
+    return {
+        "rows_read": rows_read,
+        "imported": imported,
+        "rejected": rejected,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+    }
+
+
+# EXPORT
+
+class BulkExportWriter:
+    """Writes pages of database rows to a CSV, JSONL or Parquet file"""
+
+    def __init__(self, fmt: str, dataset: str, target: str):
+        self.fmt = validate_format(fmt)
+        self.schema = export_schema(dataset)
+        self.rows = 0
+        if self.fmt == "csv":
+            self._writer = pacsv.CSVWriter(target, self.schema)
+        elif self.fmt == "parquet":
+            self._writer = pq.ParquetWriter(target, self.schema)
+        else:
+            self._file = open(target, "w", encoding="utf-8")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Write rows (keys outside the dataset's columns are dropped; missing ones are empty)"""
+        if not records:
+            return
+        if self.fmt == "jsonl":
+            names = self.schema.names
+            self._file.writelines(
+                json.dumps({name: record.get(name) for name in names}, ensure_ascii=False) + "\n"
+                for record in records
+            )
+        else:
+            arrays = []
+            for field in self.schema:
+                values = [record.get(field.name) for record in records]
+                if pa.types.is_string(field.type):
+                    values = [None if value is None else str(value) for value in values]
+                arrays.append(pa.array(values, type=field.type))
+            self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self.rows += len(records)
+
+    def close(self) -> int:
+        """Finish the file; returns the number of rows written"""
+        if self.fmt == "jsonl":
+            self._file.close()
+        else:
+            self._writer.close()
+        return self.rows
+
+
+async def export_dataset(
+    pages: AsyncIterator[List[Dict[str, Any]]],
+    fmt: str,
+    dataset: str,
+    target: str
+) -> int:
+    """
+    Write pages of rows (see DatabaseService.iter_records) to a CSV, JSONL or Parquet file
+
+    Returns:
+        int: Number of rows written
+    """
+    writer = BulkExportWriter(fmt, dataset, target)
+    try:
+        async for page in pages:
+            await run_in_threadpool(writer.write, page)
+    finally:
+        rows = await run_in_threadpool(writer.close)
+    return rows
@@ -2,37 +2,138 @@
 Database service for Supabase operations
 """
 
-from supabase import create_client, Client
-from typing import List, Dict, Any, Optional
+from fastapi import Depends, HTTPException
+from supabase import Client
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Tuple
+import itertools
 import os
 import logging
 from datetime import datetime
+import re
 import uuid
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from app.config.settings import Settings, get_settings
+from app.services.database_client import get_database_client
+
 logger = logging.getLogger(__name__)
 
+# Policy columns listed without the (potentially very large) extracted_text
+POLICY_SUMMARY_COLUMNS = "id, name, filename, file_size, upload_date, created_at, updated_at"
+
+# Columns added by later migrations, and the migration adding each one
+OPTIONAL_COLUMNS = {
+    "policies": {
+        "status": "add_policy_ingestion_status.sql",
+        "status_message": "add_policy_ingestion_status.sql",
+        "content_sha256": "add_policy_ingestion_status.sql",
+        "text_sha256": "add_content_hashes.sql",
+        "normalization_report": "add_policy_normalization_report.sql",
+    },
+    "questionnaires": {
+        "content_sha256": "add_content_hashes.sql",
+        "text_sha256": "add_content_hashes.sql",
+    },
+    "questions": {
+        "row_number": "add_question_source_columns.sql",
+        "sheet_name": "add_question_source_columns.sql",
+        "section": "add_question_source_columns.sql",
+        "external_id": "add_question_source_columns.sql",
+    },
+    "policy_chunks": {
+        "page_start": "add_policy_pages_table.sql",
+        "page_end": "add_policy_pages_table.sql",
+    },
+}
+
+
+def _missing_columns(error: Exception, table: str, columns) -> List[str]:
+    """Optional columns of the table that the error reports as not existing"""
+    message = str(error).lower()
+    if "column" not in message:
+        return []
+    return [
+        column for column in columns
+        if column in OPTIONAL_COLUMNS.get(table, {}) and re.search(rf"\b{column}\b", message)
+    ]
+
+
+def _missing_relation(error: Exception, name: str) -> bool:
+    """Whether the error reports that the table or view does not exist (migration not run yet)"""
+    message = str(error).lower()
+    return name in message and ("does not exist" in message or "could not find" in message)
+
+
+def _unique_violation(error: Exception, column: str) -> bool:
+    """Whether the error reports a unique index violation on the column"""
+    message = str(error)
+    return ("23505" in message or "unique constraint" in message.lower()) and column in message
+
+
+class DuplicateRecordError(Exception):
+    """Raised when a record collides with an existing one on a unique column (e.g. text_sha256)"""
+
+    def __init__(self, table: str, column: str):
+        super().__init__(f"A {table} record with the same {column} already exists")
+        self.table = table
+        self.column = column
+
+
+def _filter_value(value: Any) -> str:
+    """A value quoted for PostgREST's or=(...) filters, where commas and parentheses are syntax"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def _execute_with_optional_columns(table: str, data, build):
+    """
+    Run build(data); while the error names optional columns missing from the schema
+    (migration not run yet), drop them from data (a record or a list of records) and retry
+    """
+    while True:
+        try:
+            return build(data)
+        except Exception as e:
+            columns = {column for record in data for column in record} if isinstance(data, list) else data
+            missing = _missing_columns(e, table, columns)
+            if not missing:
+                raise
+            for column in missing:
+                logger.warning(f"{table}.{column} column does not exist. Run migration: {OPTIONAL_COLUMNS[table][column]}")
+            if isinstance(data, list):
+                data = [{k: v for k, v in record.items() if k not in missing} for record in data]
+            else:
+                data = {k: v for k, v in data.items() if k not in missing}
+
+
 class DatabaseService:
     """Database service for managing policies, questionnaires, and questions in Supabase"""
     
-    def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None):
+    def __init__(
+        self,
+        supabase_url: Optional[str] = None,
+        supabase_key: Optional[str] = None,
+        client: Optional[Client] = None
+    ):
         """
         Initialize database service
         
         Args:
             supabase_url: Supabase URL (will use environment variable if not provided)
             supabase_key: Supabase API key (will use environment variable if not provided)
+            client: Supabase client to use (default: the process-wide pooled client for the URL and key)
         """
         self.supabase_url = supabase_url or os.getenv("SUPABASE_URL")
         self.supabase_key = supabase_key or os.getenv("SUPABASE_KEY")
         
+        if client is not None:
+            self.client: Client = client
+            return
+        
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("Supabase URL and key are required. Set SUPABASE_URL and SUPABASE_KEY environment variables.")
         
         try:
-            self.client: Client = create_client(self.supabase_url, self.supabase_key)
-            logger.info("Successfully connected to Supabase")
+            self.client = get_database_client(self.supabase_url, self.supabase_key)
         except Exception as e:
             logger.error(f"Failed to connect to Supabase: {str(e)}")
             raise Exception(f"Database connection failed: {str(e)}")
@@ -44,7 +145,8 @@ class DatabaseService:
         Create a new policy record
         
         Args:
-            policy_data: Policy information including name, filename, extracted_text, file_size
+            policy_data: Policy information including name, filename, extracted_text, file_size,
+                and optionally the ingestion status and content_sha256
             
         Returns:
             str: Policy ID
@@ -54,14 +156,20 @@ class DatabaseService:
                 "id": str(uuid.uuid4()),
                 "name": policy_data["name"],
                 "filename": policy_data["filename"],
-                "extracted_text": policy_data["extracted_text"],
+                "extracted_text": policy_data.get("extracted_text"),
                 "file_size": policy_data["file_size"],
                 "upload_date": datetime.utcnow().isoformat(),
                 "created_at": datetime.utcnow().isoformat(),
                 "updated_at": datetime.utcnow().isoformat()
             }
+            for column in OPTIONAL_COLUMNS["policies"]:
+                if policy_data.get(column) is not None:
+                    policy_record[column] = policy_data[column]
             
-            result = self.client.table("policies").insert(policy_record).execute()
+            result = _execute_with_optional_columns(
+                "policies", policy_record,
+                lambda record: self.client.table("policies").insert(record).execute()
+            )
             
             if result.data:
                 policy_id = result.data[0]["id"]
@@ -74,24 +182,101 @@ class DatabaseService:
             logger.error(f"Error creating policy: {str(e)}")
             raise Exception(f"Database error creating policy: {str(e)}")
     
-    async def get_all_policies(self) -> List[Dict[str, Any]]:
-        """Get all policies"""
+    async def get_all_policies(self, include_text: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get all policies
+        
+        Args:
+            include_text: Include the (potentially very large) extracted_text column
+        """
         try:
-            result = self.client.table("policies").select("*").order("created_at", desc=True).execute()
+            columns = POLICY_SUMMARY_COLUMNS
+            if include_text:
+                result = self.client.table("policies").select("*").order("created_at", desc=True).execute()
+                return result.data
+            result = _execute_with_optional_columns(
+                "policies", dict.fromkeys(("status", "status_message", "content_sha256")),
+                lambda optional: self.client.table("policies").select(
+                    ", ".join([columns, *optional])
+                ).order("created_at", desc=True).execute()
+            )
             return result.data
         except Exception as e:
             logger.error(f"Error fetching policies: {str(e)}")
             raise Exception(f"Database error fetching policies: {str(e)}")
     
-    async def get_policy_by_id(self, policy_id: str) -> Optional[Dict[str, Any]]:
-        """Get a specific policy by ID"""
+    async def get_policy_texts(self, policy_ids: List[str]) -> Dict[str, str]:
+        """Get the extracted_text of the given policies, keyed by policy ID"""
+        try:
+            if not policy_ids:
+                return {}
+            result = self.client.table("policies").select("id, extracted_text").in_("id", policy_ids).execute()
+            return {row["id"]: row.get("extracted_text") or "" for row in result.data}
+        except Exception as e:
+            logger.error(f"Error fetching policy texts: {str(e)}")
+            raise Exception(f"Database error fetching policy texts: {str(e)}")
+    
+    async def get_policy_by_id(self, policy_id: str, include_text: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a specific policy by ID (include_text=False skips extracted_text)"""
         try:
-            result = self.client.table("policies").select("*").eq("id", policy_id).execute()
+            columns = "*" if include_text else POLICY_SUMMARY_COLUMNS
+            result = self.client.table("policies").select(columns).eq("id", policy_id).execute()
             return result.data[0] if result.data else None
         except Exception as e:
             logger.error(f"Error fetching policy {policy_id}: {str(e)}")
             raise Exception(f"Database error fetching policy: {str(e)}")
     
+    async def update_policy(self, policy_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Update a policy (extracted text, ingestion status, ...)
+        
+        Returns:
+            bool: False if the policy no longer exists
+        """
+        try:
+            update_data = {**updates, "updated_at": datetime.utcnow().isoformat()}
+            # Without the migrations only the text is stored; the status is not tracked
+            result = _execute_with_optional_columns(
+                "policies", update_data,
+                lambda data: self.client.table("policies").update(data).eq("id", policy_id).execute()
+            )
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error updating policy {policy_id}: {str(e)}")
+            raise Exception(f"Database error updating policy: {str(e)}")
+    
+    async def find_policy_by_hash(
+        self,
+        column: str,
+        value: str,
+        exclude_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the oldest usable policy (not failed or itself a duplicate) by content hash
+        
+        Args:
+            column: "content_sha256" (uploaded bytes) or "text_sha256" (normalised text)
+            value: Hash to look up
+            exclude_id: Policy to ignore (the one being checked)
+            
+        Returns:
+            Optional[Dict]: id, name and status of the match; None if none (or the column is missing)
+        """
+        try:
+            query = self.client.table("policies").select("id, name, status").eq(column, value)
+            query = query.not_.in_("status", ["failed", "duplicate"])
+            if exclude_id:
+                query = query.neq("id", exclude_id)
+            result = query.order("created_at").limit(1).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            missing = _missing_columns(e, "policies", [column, "status"])
+            if missing:
+                logger.warning(f"policies.{missing[0]} column does not exist. Run migration: {OPTIONAL_COLUMNS['policies'][missing[0]]}")
+                return None
+            logger.error(f"Error finding policy by {column}: {str(e)}")
+            raise Exception(f"Database error finding policy: {str(e)}")
+    
     async def delete_policy(self, policy_id: str) -> bool:
         """Delete a policy"""
         try:
@@ -101,22 +286,226 @@ class DatabaseService:
             logger.error(f"Error deleting policy {policy_id}: {str(e)}")
             raise Exception(f"Database error deleting policy: {str(e)}")
     
+    # POLICY CHUNK OPERATIONS
+    
+    async def create_policy_chunks(self, policy_id: str, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Store retrieval passages for a policy
+        
+        Args:
+            policy_id: Owning policy ID
+            chunks: Passages with chunk_index, content, token_count and optionally
+                page_start/page_end
+            
+        Returns:
+            int: Number of chunks stored
+        """
+        try:
+            if not chunks:
+                return 0
+            
+            chunk_records = []
+            for chunk in chunks:
+                record = {
+                    "id": str(uuid.uuid4()),
+                    "policy_id": policy_id,
+                    "chunk_index": chunk["chunk_index"],
+                    "content": chunk["content"],
+                    "token_count": chunk["token_count"],
+                    "created_at": datetime.utcnow().isoformat()
+                }
+                for column in OPTIONAL_COLUMNS["policy_chunks"]:
+                    if chunk.get(column) is not None:
+                        record[column] = chunk[column]
+                chunk_records.append(record)
+            
+            result = _execute_with_optional_columns(
+                "policy_chunks", chunk_records,
+                lambda records: self.client.table("policy_chunks").insert(records).execute()
+            )
+            logger.info(f"Stored {len(result.data)} chunks for policy {policy_id}")
+            return len(result.data)
+        except Exception as e:
+            logger.error(f"Error storing chunks for policy {policy_id}: {str(e)}")
+            raise Exception(f"Database error storing policy chunks: {str(e)}")
+    
+    async def get_policy_chunks(self, policy_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get retrieval passages (without the owning policy's full text), optionally only for some policies"""
+        try:
+            if policy_ids is not None and not policy_ids:
+                return []
+            # Page through results: PostgREST caps a single response (1000 rows by default)
+            page_size = 1000
+            chunks = []
+            # Page provenance columns come from add_policy_pages_table.sql
+            optional = list(OPTIONAL_COLUMNS["policy_chunks"])
+            while True:
+                def fetch(columns):
+                    optional[:] = columns  # Later pages only select the columns that exist
+                    query = self.client.table("policy_chunks").select(
+                        ", ".join(["id, policy_id, chunk_index, content, token_count", *columns])
+                    )
+                    if policy_ids is not None:
+                        query = query.in_("policy_id", policy_ids)
+                    return query.order("policy_id").order("chunk_index").range(len(chunks), len(chunks) + page_size - 1).execute()
+                
+                result = _execute_with_optional_columns("policy_chunks", dict.fromkeys(optional), fetch)
+                chunks.extend(result.data)
+                if len(result.data) < page_size:
+                    return chunks
+        except Exception as e:
+            logger.error(f"Error fetching policy chunks: {str(e)}")
+            raise Exception(f"Database error fetching policy chunks: {str(e)}")
+    
+    # POLICY PAGE OPERATIONS
+    # Note: Run the migration in backend/migrations/add_policy_pages_table.sql
+    
+    async def create_policy_pages(self, policy_id: str, pages: List[Dict[str, Any]]) -> int:
+        """
+        Store the text of a policy's pages
+        
+        Args:
+            policy_id: Owning policy ID
+            pages: Pages with page_number, char_start, char_end and content
+            
+        Returns:
+            int: Number of pages stored
+        """
+        try:
+            stored = 0
+            # Several inserts for long documents, to keep each request body reasonable
+            for start in range(0, len(pages), 200):
+                page_records = [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "policy_id": policy_id,
+                        "page_number": page["page_number"],
+                        "char_start": page["char_start"],
+                        "char_end": page["char_end"],
+                        "content": page["content"],
+                        "created_at": datetime.utcnow().isoformat()
+                    }
+                    for page in pages[start:start + 200]
+                ]
+                result = self.client.table("policy_pages").insert(page_records).execute()
+                stored += len(result.data)
+            logger.info(f"Stored {stored} pages for policy {policy_id}")
+            return stored
+        except Exception as e:
+            logger.error(f"Error storing pages for policy {policy_id}: {str(e)}")
+            raise Exception(f"Database error storing policy pages: {str(e)}")
+    
+    async def get_policy_pages(
+        self,
+        policy_id: str,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None,
+        include_content: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a policy's pages in page order, optionally only a range
+        
+        Args:
+            policy_id: Policy ID
+            start_page: First page number (1-based, inclusive)
+            end_page: Last page number (inclusive)
+            include_content: Include the page text (otherwise only numbers and offsets)
+            
+        Returns:
+            List[Dict]: page_number, char_start, char_end (and content) of each stored page
+        """
+        try:
+            columns = "page_number, char_start, char_end" + (", content" if include_content else "")
+            page_size = 1000
+            pages = []
+            while True:
+                query = self.client.table("policy_pages").select(columns).eq("policy_id", policy_id)
+                if start_page is not None:
+                    query = query.gte("page_number", start_page)
+                if end_page is not None:
+                    query = query.lte("page_number", end_page)
+                result = query.order("page_number").range(len(pages), len(pages) + page_size - 1).execute()
+                pages.extend(result.data)
+                if len(result.data) < page_size:
+                    return pages
+        except Exception as e:
+            logger.error(f"Error fetching pages of policy {policy_id}: {str(e)}")
+            raise Exception(f"Database error fetching policy pages: {str(e)}")
+    
+    # POLICY CORPUS OPERATIONS
+    # Note: Run the migration in backend/migrations/add_policy_corpus_table.sql
+    
+    async def get_policy_corpus_version(self) -> Optional[int]:
+        """Get the policy corpus version (None when the corpus has not been built)"""
+        try:
+            result = self.client.table("policy_corpus").select("version").eq("id", 1).execute()
+            return result.data[0]["version"] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching policy corpus version: {str(e)}")
+            raise Exception(f"Database error fetching policy corpus version: {str(e)}")
+    
+    async def get_policy_corpus(self) -> Optional[Dict[str, Any]]:
+        """Get the policy corpus manifest (policy texts stay in the policies table)"""
+        try:
+            result = self.client.table("policy_corpus").select("version, manifest, stale, updated_at").eq("id", 1).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching policy corpus: {str(e)}")
+            raise Exception(f"Database error fetching policy corpus: {str(e)}")
+    
+    async def save_policy_corpus(self, corpus_data: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
+        """
+        Save the policy corpus
+        
+        Args:
+            corpus_data: version and any of manifest and stale
+            expected_version: Only save if the stored version still equals this (compare-and-set);
+                None only creates the corpus when it does not exist yet
+            
+        Returns:
+            bool: False when another writer changed (or created) the corpus first
+        """
+        try:
+            record = {**corpus_data, "updated_at": datetime.utcnow().isoformat()}
+            if expected_version is None:
+                result = self.client.table("policy_corpus").upsert({"id": 1, **record}, ignore_duplicates=True).execute()
+            else:
+                result = self.client.table("policy_corpus").update(record).eq("id", 1).eq("version", expected_version).execute()
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error saving policy corpus: {str(e)}")
+            raise Exception(f"Database error saving policy corpus: {str(e)}")
+    
     # QUESTIONNAIRE OPERATIONS
     
-    async def create_questionnaire(self, questionnaire_data: Dict[str, Any], questions: List[Dict[str, Any]]) -> str:
+    async def create_questionnaire(
+        self,
+        questionnaire_data: Dict[str, Any],
+        questions: Iterable[Dict[str, Any]],
+        batch_size: int = 500
+    ) -> str:
         """
         Create a new questionnaire with questions
         
+        Questions are inserted in batches as they are consumed, so any iterable (a
+        generator, or the upload's QuestionSpool) is stored without building a list.
+        If anything fails, the questionnaire and the questions stored so far are deleted.
+        
         Args:
-            questionnaire_data: Questionnaire metadata
-            questions: List of questions to create
+            questionnaire_data: Questionnaire metadata (name, filename, optionally content_sha256
+                and text_sha256)
+            questions: Questions to create (a list or any iterable)
+            batch_size: Questions per insert request
             
         Returns:
             str: Questionnaire ID
+        
+        Raises:
+            DuplicateRecordError: A questionnaire with the same text_sha256 already exists
         """
+        questionnaire_id = str(uuid.uuid4())
+        created = False
         try:
-            questionnaire_id = str(uuid.uuid4())
-            
             # Create questionnaire record
             questionnaire_record = {
                 "id": questionnaire_id,
@@ -126,57 +515,163 @@ class DatabaseService:
                 "created_at": datetime.utcnow().isoformat(),
                 "updated_at": datetime.utcnow().isoformat()
             }
+            for column in OPTIONAL_COLUMNS["questionnaires"]:
+                if questionnaire_data.get(column) is not None:
+                    questionnaire_record[column] = questionnaire_data[column]
             
-            result = self.client.table("questionnaires").insert(questionnaire_record).execute()
+            try:
+                result = _execute_with_optional_columns(
+                    "questionnaires", questionnaire_record,
+                    lambda record: self.client.table("questionnaires").insert(record).execute()
+                )
+            except Exception as e:
+                if _unique_violation(e, "text_sha256"):
+                    raise DuplicateRecordError("questionnaires", "text_sha256")
+                raise
             
             if not result.data:
                 raise Exception("Failed to create questionnaire record")
+            created = True
             
-            # Create question records
-            question_records = []
-            for question in questions:
-                question_record = {
-                    "id": str(uuid.uuid4()),
-                    "question_text": question["question_text"],
-                    "answer": question.get("answer"),
-                    "status": question.get("status", "unapproved"),
-                    "questionnaire_id": questionnaire_id,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "updated_at": datetime.utcnow().isoformat()
-                }
-                question_records.append(question_record)
-            
-            if question_records:
-                questions_result = self.client.table("questions").insert(question_records).execute()
+            # Create question records, a batch at a time
+            stored = 0
+            iterator = iter(questions)
+            while True:
+                question_records = []
+                for question in itertools.islice(iterator, batch_size):
+                    question_record = {
+                        "id": str(uuid.uuid4()),
+                        "question_text": question["question_text"],
+                        "answer": question.get("answer"),
+                        "status": question.get("status", "unapproved"),
+                        "questionnaire_id": questionnaire_id,
+                        "created_at": datetime.utcnow().isoformat(),
+                        "updated_at": datetime.utcnow().isoformat()
+                    }
+                    for column in OPTIONAL_COLUMNS["questions"]:
+                        if question.get(column) is not None:
+                            question_record[column] = question[column]
+                    question_records.append(question_record)
+                if not question_records:
+                    break
+                
+                questions_result = _execute_with_optional_columns(
+                    "questions", question_records,
+                    lambda records: self.client.table("questions").insert(records).execute()
+                )
                 if not questions_result.data:
-                    # Rollback questionnaire creation if questions fail
-                    await self.delete_questionnaire(questionnaire_id)
                     raise Exception("Failed to create question records")
+                stored += len(questions_result.data)
             
-            logger.info(f"Created questionnaire: {questionnaire_id} with {len(question_records)} questions")
+            logger.info(f"Created questionnaire: {questionnaire_id} with {stored} questions")
             return questionnaire_id
             
+        except DuplicateRecordError:
+            raise
         except Exception as e:
             logger.error(f"Error creating questionnaire: {str(e)}")
+            if created:
+                # Rollback questionnaire creation if questions fail
+                try:
+                    await self.delete_questionnaire(questionnaire_id)
+                except Exception:
+                    # Already logged by delete_questionnaire
+                    pass
             raise Exception(f"Database error creating questionnaire: {str(e)}")
     
+    async def get_questionnaire_by_id(self, questionnaire_id: str) -> Optional[Dict[str, Any]]:
+        """Get a questionnaire record (without its questions)"""
+        try:
+            result = self.client.table("questionnaires").select("*").eq("id", questionnaire_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching questionnaire {questionnaire_id}: {str(e)}")
+            raise Exception(f"Database error fetching questionnaire: {str(e)}")
+    
+    async def get_questionnaire_summary(self, questionnaire_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a questionnaire with its question_count, approved_count and answered_count
+        
+        The counts are counted by the database (count=exact, no rows returned), from the
+        questions(questionnaire_id, status) index.
+        """
+        try:
+            result = self.client.table("questionnaires").select("*").eq("id", questionnaire_id).execute()
+            if not result.data:
+                return None
+            questionnaire = result.data[0]
+            
+            def count(status: Optional[str] = None, answered: bool = False) -> int:
+                query = self.client.table("questions").select("id", count="exact", head=True).eq("questionnaire_id", questionnaire_id)
+                if status:
+                    query = query.eq("status", status)
+                if answered:
+                    # NULL answers fail the comparison too
+                    query = query.neq("answer", "")
+                return query.execute().count or 0
+            
+            questionnaire["question_count"] = count()
+            questionnaire["approved_count"] = count(status="approved")
+            questionnaire["answered_count"] = count(answered=True)
+            return questionnaire
+        except Exception as e:
+            logger.error(f"Error fetching questionnaire {questionnaire_id}: {str(e)}")
+            raise Exception(f"Database error fetching questionnaire: {str(e)}")
+    
+    async def find_questionnaire_by_hash(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the oldest questionnaire with the given content hash
+        
+        Args:
+            column: "content_sha256" (uploaded bytes) or "text_sha256" (normalised questions)
+            value: Hash to look up
+        
+        Returns:
+            Optional[Dict]: id and name of the match; None if none (or the column is missing)
+        """
+        try:
+            result = self.client.table("questionnaires").select("id, name").eq(column, value).order("created_at").limit(1).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            if _missing_columns(e, "questionnaires", [column]):
+                logger.warning(f"questionnaires.{column} column does not exist. Run migration: add_content_hashes.sql")
+                return None
+            logger.error(f"Error finding questionnaire by {column}: {str(e)}")
+            raise Exception(f"Database error finding questionnaire: {str(e)}")
+    
     async def get_all_questionnaires(self) -> List[Dict[str, Any]]:
-        """Get all questionnaires with question counts and approved counts"""
+        """
+        Get all questionnaires with question counts and approved counts
+        
+        The counts come from the questionnaire_summaries view in the same query (see
+        migrations/add_questionnaire_summaries_view.sql). Without the view, every
+        question's questionnaire and status is fetched once and counted here.
+        """
         try:
-            # Get questionnaires
-            questionnaires_result = self.client.table("questionnaires").select("*").order("created_at", desc=True).execute()
-            questionnaires = questionnaires_result.data
+            try:
+                result = self.client.table("questionnaire_summaries").select("*").order("created_at", desc=True).execute()
+                return result.data
+            except Exception as e:
+                if not _missing_relation(e, "questionnaire_summaries"):
+                    raise
+                logger.warning("questionnaire_summaries view does not exist. Run migration: add_questionnaire_summaries_view.sql")
             
-            # Get question counts and approved counts for each questionnaire
+            questionnaires = self.client.table("questionnaires").select("*").order("created_at", desc=True).execute().data
+            counts: Dict[str, List[int]] = {questionnaire["id"]: [0, 0] for questionnaire in questionnaires}
+            start = 0
+            page_size = 1000
+            while True:
+                # Page through results: PostgREST caps a single response (1000 rows by default)
+                page = self.client.table("questions").select("questionnaire_id, status").order("id").range(start, start + page_size - 1).execute().data
+                for question in page:
+                    if question["questionnaire_id"] in counts:
+                        counts[question["questionnaire_id"]][0] += 1
+                        counts[question["questionnaire_id"]][1] += question["status"] == "approved"
+                if len(page) < page_size:
+                    break
+                start += page_size
             for questionnaire in questionnaires:
-                # Get total question count
-                questions_result = self.client.table("questions").select("id").eq("questionnaire_id", questionnaire["id"]).execute()
-                questionnaire["question_count"] = len(questions_result.data)
-                
-                # Get approved question count
-                approved_result = self.client.table("questions").select("id").eq("questionnaire_id", questionnaire["id"]).eq("status", "approved").execute()
-                questionnaire["approved_count"] = len(approved_result.data)
-            
+                questionnaire["question_count"], questionnaire["approved_count"] = counts[questionnaire["id"]]
             return questionnaires
         except Exception as e:
             logger.error(f"Error fetching questionnaires: {str(e)}")
@@ -231,6 +726,44 @@ class DatabaseService:
             logger.error(f"Error fetching questions for questionnaire {questionnaire_id}: {str(e)}")
             raise Exception(f"Database error fetching questions: {str(e)}")
     
+    async def iter_questions(
+        self,
+        questionnaire_id: str,
+        page_size: int = 1000,
+        approved_only: bool = False,
+        answered_only: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Page through a questionnaire's questions in order, one request per page
+        
+        Args:
+            questionnaire_id: Questionnaire ID
+            page_size: Questions per page
+            approved_only: Only approved questions
+            answered_only: Only questions with a non-empty answer
+            
+        Yields:
+            List[Dict]: The next page of questions
+        """
+        start = 0
+        while True:
+            try:
+                query = self.client.table("questions").select("*").eq("questionnaire_id", questionnaire_id)
+                if approved_only:
+                    query = query.eq("status", "approved")
+                if answered_only:
+                    # NULL answers fail the comparison too
+                    query = query.neq("answer", "")
+                result = query.order("created_at").order("id").range(start, start + page_size - 1).execute()
+            except Exception as e:
+                logger.error(f"Error fetching questions for questionnaire {questionnaire_id}: {str(e)}")
+                raise Exception(f"Database error fetching questions: {str(e)}")
+            if result.data:
+                yield result.data
+            if len(result.data) < page_size:
+                return
+            start += page_size
+    
     async def get_question_by_id(self, question_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific question by ID"""
         try:
@@ -352,6 +885,303 @@ class DatabaseService:
             logger.error(f"Error in bulk delete questions: {str(e)}")
             raise Exception(f"Database error bulk deleting questions: {str(e)}")
     
+    async def bulk_update_question_answers(
+        self,
+        answers: Dict[str, str],
+        status: str = "unapproved",
+        answer_source: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Save many generated answers at once
+        
+        Args:
+            answers: Mapping of question ID to answer text
+            status: Status to set on every question
+            answer_source: Optional answer_source to set on every question
+            
+        Returns:
+            Dictionary with updated count, the IDs of the questions saved and error details
+        """
+        updated_ids = []
+        errors = []
+        
+        for question_id, answer in answers.items():
+            try:
+                if await self.update_question_answer(question_id, answer, status=status, answer_source=answer_source):
+                    updated_ids.append(question_id)
+                else:
+                    errors.append(f"Question {question_id} not found")
+            except Exception as e:
+                errors.append(f"Error updating question {question_id}: {str(e)}")
+        
+        logger.info(f"Bulk updated {len(updated_ids)} question answers")
+        return {
+            "updated_count": len(updated_ids),
+            "updated_ids": updated_ids,
+            "errors": errors
+        }
+    
+    # GENERATION BATCH OPERATIONS
+    
+    async def create_generation_batch(self, batch_data: Dict[str, Any]) -> str:
+        """Record a submitted message batch and return its row ID"""
+        try:
+            record_id = str(uuid.uuid4())
+            batch_record = {
+                "id": record_id,
+                "questionnaire_id": batch_data["questionnaire_id"],
+                "batch_id": batch_data["batch_id"],
+                "backend": batch_data.get("backend", "anthropic"),
+                "status": batch_data.get("status", "in_progress"),
+                "request_count": batch_data.get("request_count", 0),
+                "attempt": batch_data.get("attempt", 0),
+                "created_at": datetime.utcnow().isoformat(),
+                "updated_at": datetime.utcnow().isoformat()
+            }
+            
+            result = self.client.table("generation_batches").insert(batch_record).execute()
+            if result.data:
+                return record_id
+            raise Exception("Failed to record generation batch")
+        except Exception as e:
+            logger.error(f"Error recording generation batch: {str(e)}")
+            raise Exception(f"Database error recording generation batch: {str(e)}")
+    
+    async def update_generation_batch(self, batch_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update a message batch record by its provider batch ID"""
+        try:
+            update_data = {**update_data, "updated_at": datetime.utcnow().isoformat()}
+            result = self.client.table("generation_batches").update(update_data).eq("batch_id", batch_id).execute()
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error updating generation batch {batch_id}: {str(e)}")
+            raise Exception(f"Database error updating generation batch: {str(e)}")
+    
+    async def claim_generation_batch(self, batch_id: str, updated_at: str) -> bool:
+        """
+        Take over collecting a message batch (compare-and-set on updated_at)
+
+        Returns:
+            bool: False when the record changed since it was read (another process
+                polled or claimed it first)
+        """
+        try:
+            result = (
+                self.client.table("generation_batches")
+                .update({"updated_at": datetime.utcnow().isoformat()})
+                .eq("batch_id", batch_id)
+                .eq("updated_at", updated_at)
+                .in_("status", ["in_progress", "ended"])
+                .execute()
+            )
+            return len(result.data) > 0
+        except Exception as e:
+            logger.error(f"Error claiming generation batch {batch_id}: {str(e)}")
+            raise Exception(f"Database error claiming generation batch: {str(e)}")
+    
+    async def get_generation_batches(
+        self,
+        questionnaire_id: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get message batch records, optionally filtered by questionnaire and status"""
+        try:
+            query = self.client.table("generation_batches").select("*")
+            if questionnaire_id:
+                query = query.eq("questionnaire_id", questionnaire_id)
+            if status:
+                query = query.eq("status", status)
+            result = query.order("created_at", desc=True).execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error fetching generation batches: {str(e)}")
+            raise Exception(f"Database error fetching generation batches: {str(e)}")
+
+    # GENERATION JOB OPERATIONS (see migrations/add_generation_jobs_tables.sql)
+
+    async def create_generation_job(self, job_data: Dict[str, Any], questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Queue a generation job with one task per question
+
+        Args:
+            job_data: Job information including questionnaire_id, mode, batch_size, max_attempts
+            questions: Question records with "id" and "question_text"
+
+        Returns:
+            dict: The created job record
+        """
+        try:
+            job_id = str(uuid.uuid4())
+            job_record = {
+                "id": job_id,
+                "questionnaire_id": job_data["questionnaire_id"],
+                "mode": job_data.get("mode", "single"),
+                "batch_size": job_data.get("batch_size", 1),
+                "status": "queued",
+                "total_count": len(questions),
+                "max_attempts": job_data.get("max_attempts", 3),
+                "created_at": datetime.utcnow().isoformat(),
+                "updated_at": datetime.utcnow().isoformat()
+            }
+
+            result = self.client.table("generation_jobs").insert(job_record).execute()
+            if not result.data:
+                raise Exception("Failed to create generation job")
+
+            task_records = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "job_id": job_id,
+                    "question_id": question["id"],
+                    "question_text": question["question_text"],
+                    "position": position
+                }
+                for position, question in enumerate(questions)
+            ]
+            try:
+                # Insert in pages to stay under request size limits
+                page_size = 500
+                for start in range(0, len(task_records), page_size):
+                    self.client.table("generation_tasks").insert(task_records[start:start + page_size]).execute()
+            except Exception:
+                self.client.table("generation_jobs").delete().eq("id", job_id).execute()
+                raise
+
+            logger.info(f"Queued generation job {job_id} with {len(task_records)} tasks")
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error creating generation job: {str(e)}")
+            raise Exception(f"Database error creating generation job: {str(e)}")
+
+    async def get_generation_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a generation job by ID"""
+        try:
+            result = self.client.table("generation_jobs").select("*").eq("id", job_id).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error fetching generation job {job_id}: {str(e)}")
+            raise Exception(f"Database error fetching generation job: {str(e)}")
+
+    async def get_generation_jobs(
+        self,
+        questionnaire_id: Optional[str] = None,
+        statuses: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get generation jobs (newest first), optionally filtered by questionnaire and statuses"""
+        try:
+            query = self.client.table("generation_jobs").select("*")
+            if questionnaire_id:
+                query = query.eq("questionnaire_id", questionnaire_id)
+            if statuses:
+                query = query.in_("status", statuses)
+            result = query.order("created_at", desc=True).execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error fetching generation jobs: {str(e)}")
+            raise Exception(f"Database error fetching generation jobs: {str(e)}")
+
+    async def get_finished_generation_tasks(self, job_id: str, since: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Get a job's succeeded/failed tasks with their answers, optionally only those finished at or after `since`"""
+        try:
+            query = self.client.table("generation_tasks").select(
+                "id, question_id, status, error, finished_at, questions(answer, answer_source)"
+            ).eq("job_id", job_id).in_("status", ["succeeded", "failed"])
+            if since is not None:
+                query = query.gte("finished_at", since)
+            result = query.order("finished_at").execute()
+            tasks = result.data
+            for task in tasks:
+                question = task.pop("questions", None) or {}
+                task["answer"] = question.get("answer")
+                task["answer_source"] = question.get("answer_source")
+            return tasks
+        except Exception as e:
+            logger.error(f"Error fetching generation tasks for job {job_id}: {str(e)}")
+            raise Exception(f"Database error fetching generation tasks: {str(e)}")
+
+    async def claim_generation_tasks(self, worker_id: str, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` requests' worth of claimable tasks from the oldest active job"""
+        try:
+            result = self.client.rpc("claim_generation_tasks", {
+                "p_worker_id": worker_id,
+                "p_limit": limit,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return result.data or []
+        except Exception as e:
+            logger.error(f"Error claiming generation tasks: {str(e)}")
+            raise Exception(f"Database error claiming generation tasks: {str(e)}")
+
+    async def renew_generation_leases(self, worker_id: str, task_ids: List[str], lease_seconds: int) -> int:
+        """Extend the leases this worker holds; returns how many are still held"""
+        try:
+            result = self.client.rpc("renew_generation_leases", {
+                "p_worker_id": worker_id,
+                "p_task_ids": task_ids,
+                "p_lease_seconds": lease_seconds
+            }).execute()
+            return result.data or 0
+        except Exception as e:
+            logger.error(f"Error renewing generation leases: {str(e)}")
+            raise Exception(f"Database error renewing generation leases: {str(e)}")
+
+    async def complete_generation_task(self, task_id: str, worker_id: str, answer: str, answer_source: str = "ai") -> bool:
+        """Save a task's answer to its question and mark it succeeded, if the lease is still held"""
+        try:
+            result = self.client.rpc("complete_generation_task", {
+                "p_task_id": task_id,
+                "p_worker_id": worker_id,
+                "p_answer": answer,
+                "p_answer_source": answer_source
+            }).execute()
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error completing generation task {task_id}: {str(e)}")
+            raise Exception(f"Database error completing generation task: {str(e)}")
+
+    async def fail_generation_task(self, task_id: str, worker_id: str, error: str) -> Optional[str]:
+        """Record a failed attempt; returns the new status ("pending" or "failed") or None if the lease was lost"""
+        try:
+            result = self.client.rpc("fail_generation_task", {
+                "p_task_id": task_id,
+                "p_worker_id": worker_id,
+                "p_error": error
+            }).execute()
+            return result.data
+        except Exception as e:
+            logger.error(f"Error failing generation task {task_id}: {str(e)}")
+            raise Exception(f"Database error failing generation task: {str(e)}")
+
+    async def release_generation_tasks(self, worker_id: str, task_ids: List[str]) -> int:
+        """Return unstarted tasks to the queue without counting an attempt"""
+        try:
+            result = self.client.rpc("release_generation_tasks", {
+                "p_worker_id": worker_id,
+                "p_task_ids": task_ids
+            }).execute()
+            return result.data or 0
+        except Exception as e:
+            logger.error(f"Error releasing generation tasks: {str(e)}")
+            raise Exception(f"Database error releasing generation tasks: {str(e)}")
+
+    async def finish_generation_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Mark a job completed if all its tasks are done; returns the job when it was finished now"""
+        try:
+            result = self.client.rpc("finish_generation_job", {"p_job_id": job_id}).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error finishing generation job {job_id}: {str(e)}")
+            raise Exception(f"Database error finishing generation job: {str(e)}")
+
+    async def fail_generation_job(self, job_id: str, error: str) -> bool:
+        """Fail a job and all of its unfinished tasks"""
+        try:
+            result = self.client.rpc("fail_generation_job", {"p_job_id": job_id, "p_error": error}).execute()
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Error failing generation job {job_id}: {str(e)}")
+            raise Exception(f"Database error failing generation job: {str(e)}")
+
     # UTILITY OPERATIONS
     
     async def test_connection(self) -> bool:
@@ -364,10 +1194,11 @@ class DatabaseService:
             logger.error(f"Database connection test failed: {str(e)}")
             return False
     
-    async def get_policy_by_id(self, policy_id: str) -> Optional[Dict[str, Any]]:
-        """Get a single policy by ID"""
+    async def get_policy_by_id(self, policy_id: str, include_text: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a single policy by ID (include_text=False skips the potentially very large extracted_text)"""
         try:
-            response = self.client.table("policies").select("*").eq("id", policy_id).execute()
+            columns = "*" if include_text else POLICY_SUMMARY_COLUMNS
+            response = self.client.table("policies").select(columns).eq("id", policy_id).execute()
             
             if response.data and len(response.data) > 0:
                 return response.data[0]
@@ -597,4 +1428,180 @@ class DatabaseService:
             return len(result.data) > 0
         except Exception as e:
             logger.error(f"Error deleting answer {answer_id}: {str(e)}")
-            raise Exception(f"Database error deleting answer: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Database error deleting answer: {str(e)}")    
+    # LIST OPERATIONS (see app/services/pagination.py)
+    
+    def _select_page(
+        self,
+        table: str,
+        columns: Optional[List[str]],
+        sort: str,
+        descending: bool,
+        limit: int,
+        after: Optional[Tuple[Any, str]] = None,
+        filters: Optional[Dict[str, List[Any]]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        search_columns: Iterable[str] = (),
+        search: Optional[str] = None,
+        count: Optional[str] = None,
+        optional_table: Optional[str] = None
+    ):
+        """One keyset page of a table or view (see list_records); raises the client's errors"""
+        def build(selected) -> Any:
+            query = self.client.table(table).select(", ".join(selected) if selected is not None else "*", count=count)
+            for column, values in (filters or {}).items():
+                query = query.eq(column, values[0]) if len(values) == 1 else query.in_(column, values)
+            if created_after:
+                query = query.gte("created_at", created_after)
+            if created_before:
+                query = query.lt("created_at", created_before)
+            if search:
+                pattern = _filter_value(f"*{search}*")
+                query = query.or_(",".join(f"{column}.ilike.{pattern}" for column in search_columns))
+            if after:
+                # Rows after (value, id) in (sort, id) order. PostgREST has no row comparison, so the
+                # bound on sort alone is repeated outside the or: it is what makes the page a range
+                # scan of the (sort, id) index, with the or only checked for rows with an equal value
+                operator = "lt" if descending else "gt"
+                query = query.lte(sort, after[0]) if descending else query.gte(sort, after[0])
+                value, row_id = _filter_value(after[0]), _filter_value(after[1])
+                query = query.or_(f"{sort}.{operator}.{value},and({sort}.eq.{value},id.{operator}.{row_id})")
+            return query.order(sort, desc=descending).order("id", desc=descending).limit(limit).execute()
+        
+        if columns is None:
+            return build(None)
+        return _execute_with_optional_columns(optional_table or table, dict.fromkeys(columns), build)
+    
+    async def list_records(self, table: str, **query) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of a table in (sort, id) order, starting after a cursor
+        
+        Args:
+            table: Table or view name
+            columns: Columns to select (None: every column); missing optional columns are skipped
+            sort: Sort column
+            descending: Sort direction
+            limit: Maximum number of rows
+            after: (sort value, id) of the last row of the previous page
+            filters: Column -> values rows must have one of
+            created_after: Only rows created at or after this timestamp
+            created_before: Only rows created before this timestamp
+            search_columns: Columns searched for search (case-insensitive substring)
+            search: Text to search for
+            count: PostgREST count method for the total ("exact", "planned", "estimated")
+        
+        Returns:
+            Tuple: The rows, and the total number of matching rows (None without count)
+        """
+        try:
+            result = self._select_page(table, **query)
+            return result.data, result.count
+        except Exception as e:
+            logger.error(f"Error listing {table}: {str(e)}")
+            raise Exception(f"Database error listing {table}: {str(e)}")
+    
+    async def list_questionnaires(self, **query) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of questionnaires with their question_count and approved_count (see list_records)
+        
+        Reads the questionnaire_summaries view; without it (migration not run yet) the
+        questions of the page's questionnaires are counted here.
+        """
+        try:
+            try:
+                result = self._select_page("questionnaire_summaries", optional_table="questionnaires", **query)
+                return result.data, result.count
+            except Exception as e:
+                if not _missing_relation(e, "questionnaire_summaries"):
+                    raise
+                logger.warning("questionnaire_summaries view does not exist. Run migration: add_questionnaire_summaries_view.sql")
+            
+            columns = query.get("columns")
+            if columns is not None:
+                columns = [column for column in columns if column not in ("question_count", "approved_count")]
+            result = self._select_page("questionnaires", **{**query, "columns": columns})
+            counts: Dict[str, List[int]] = {questionnaire["id"]: [0, 0] for questionnaire in result.data}
+            ids = list(counts)
+            page_size = 1000
+            # 100 ids per request keeps the URL short
+            for start in range(0, len(ids), 100):
+                last_id = None
+                while True:
+                    # Keyset pages by id: no OFFSET rows to re-read on every page
+                    questions = self.client.table("questions").select("id, questionnaire_id, status").in_("questionnaire_id", ids[start:start + 100])
+                    if last_id:
+                        questions = questions.gt("id", last_id)
+                    page = questions.order("id").limit(page_size).execute().data
+                    for question in page:
+                        counts[question["questionnaire_id"]][0] += 1
+                        counts[question["questionnaire_id"]][1] += question["status"] == "approved"
+                    if len(page) < page_size:
+                        break
+                    last_id = page[-1]["id"]
+            for questionnaire in result.data:
+                questionnaire["question_count"], questionnaire["approved_count"] = counts[questionnaire["id"]]
+            return result.data, result.count
+        except Exception as e:
+            logger.error(f"Error listing questionnaires: {str(e)}")
+            raise Exception(f"Database error listing questionnaires: {str(e)}")
+    
+    # BULK OPERATIONS (see app/services/bulk_transfer.py)
+    
+    async def iter_records(
+        self,
+        table: str,
+        page_size: int = 1000,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Page through every row of a table in creation order, one request per page
+        
+        Args:
+            table: Table name
+            page_size: Rows per page
+            filters: Column values rows must equal (e.g. {"questionnaire_id": ...})
+            
+        Yields:
+            List[Dict]: The next page of rows
+        """
+        start = 0
+        while True:
+            try:
+                query = self.client.table(table).select("*")
+                for column, value in (filters or {}).items():
+                    query = query.eq(column, value)
+                result = query.order("created_at").order("id").range(start, start + page_size - 1).execute()
+            except Exception as e:
+                logger.error(f"Error fetching {table} rows: {str(e)}")
+                raise Exception(f"Database error fetching {table}: {str(e)}")
+            if result.data:
+                yield result.data
+            if len(result.data) < page_size:
+                return
+            start += page_size
+    
+    async def upsert_records(self, table: str, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert rows, or update the rows with the same id, in one request
+        
+        Returns:
+            int: Number of rows written
+        """
+        try:
+            result = _execute_with_optional_columns(
+                table, records,
+                lambda data: self.client.table(table).upsert(data).execute()
+            )
+            return len(result.data)
+        except Exception as e:
+            logger.error(f"Error upserting {len(records)} {table} rows: {str(e)}")
+            raise Exception(f"Database error importing {table}: {str(e)}")
+
+
+def get_database_service(settings: Settings = Depends(get_settings)) -> DatabaseService:
+    """FastAPI dependency: a DatabaseService on the process-wide pooled client (see database_client.py)"""
+    try:
+        return DatabaseService(supabase_url=settings.supabase_url, supabase_key=settings.supabase_key)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
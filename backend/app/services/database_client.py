@@ -0,0 +1,78 @@
+"""
+Process-wide Supabase client
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+from supabase import Client, ClientOptions, create_client
+
+from app.config.settings import get_settings
+from app.services.anthropic_client import http2_available
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple[str, str], Tuple[Client, httpx.Client]] = {}
+
+
+def create_database_client(supabase_url: str, supabase_key: str, settings=None) -> Tuple[Client, httpx.Client]:
+    """
+    Create a Supabase client on a tuned HTTP connection pool
+
+    Args:
+        supabase_url: Supabase project URL
+        supabase_key: Supabase API key
+        settings: Application settings (pool limits, timeouts, HTTP/2)
+
+    Returns:
+        Tuple: The client and its HTTP client (the caller owns closing it)
+    """
+    settings = settings or get_settings()
+    http2 = settings.db_http2 and http2_available()
+    http_client = httpx.Client(
+        http2=http2,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.db_http_max_connections,
+            max_keepalive_connections=settings.db_http_max_keepalive_connections,
+            keepalive_expiry=settings.db_http_keepalive_expiry_seconds
+        ),
+        timeout=httpx.Timeout(
+            settings.db_http_timeout_seconds,
+            connect=settings.db_http_connect_timeout_seconds
+        )
+    )
+    try:
+        client = create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+    except Exception:
+        http_client.close()
+        raise
+    logger.info(
+        f"Created Supabase client (http2={http2}, max_connections={settings.db_http_max_connections}, "
+        f"keepalive={settings.db_http_max_keepalive_connections})"
+    )
+    return client, http_client
+
+
+def get_database_client(supabase_url: Optional[str] = None, supabase_key: Optional[str] = None) -> Client:
+    """Get the shared client for a project URL and key, creating it on first use"""
+    settings = get_settings()
+    supabase_url = supabase_url or settings.supabase_url
+    supabase_key = supabase_key or settings.supabase_key
+    if not supabase_url or not supabase_key:
+        raise ValueError("Supabase URL and key are required. Set SUPABASE_URL and SUPABASE_KEY environment variables.")
+    entry = _clients.get((supabase_url, supabase_key))
+    if entry is None:
+        entry = _clients[(supabase_url, supabase_key)] = create_database_client(supabase_url, supabase_key, settings)
+    return entry[0]
+
+
+def close_database_clients() -> None:
+    """Close every shared client and its connection pool (application shutdown)"""
+    while _clients:
+        _, (_, http_client) = _clients.popitem()
+        try:
+            http_client.close()
+        except Exception as e:
+            logger.warning(f"Error closing Supabase HTTP client: {str(e)}")
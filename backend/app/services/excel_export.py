@@ -0,0 +1,153 @@
+"""
+Excel export of questionnaire answers
+"""
+
+import io
+import itertools
+import logging
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+from starlette.concurrency import run_in_threadpool
+
+from app.services.excel_processor import HEADER_SCAN_ROWS, iter_filled_rows, locate_columns
+
+logger = logging.getLogger(__name__)
+
+# (header, question field) of the export columns; ID and Section only when the questions have them
+EXPORT_COLUMNS = [
+    ("ID", "external_id"),
+    ("Section", "section"),
+    ("Question", "question_text"),
+    ("Answer", "answer"),
+    ("Status", "status"),
+]
+OPTIONAL_EXPORT_FIELDS = ("external_id", "section")
+# Widest column, in characters
+MAX_COLUMN_WIDTH = 100
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class ExportWriter:
+    """Write-only export workbook: columns sized from the first rows, then rows streamed"""
+
+    def __init__(self, title: str = "Questionnaire Answers"):
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet(title)
+        self.columns: Optional[List[Tuple[str, str]]] = None
+        self.rows = 0
+
+    def start(self, sample: List[Dict[str, Any]]) -> None:
+        """Choose the columns and their widths from the first rows, then write the header"""
+        self.columns = [
+            (header, field) for header, field in EXPORT_COLUMNS
+            if field not in OPTIONAL_EXPORT_FIELDS or any(question.get(field) for question in sample)
+        ]
+        for index, (header, field) in enumerate(self.columns, 1):
+            longest = max([len(header)] + [len(str(question.get(field) or "")) for question in sample])
+            self.worksheet.column_dimensions[get_column_letter(index)].width = min(longest + 2, MAX_COLUMN_WIDTH)
+        self.worksheet.append([header for header, _ in self.columns])
+
+    def append(self, questions: Iterable[Dict[str, Any]]) -> None:
+        if self.columns is None:
+            questions = list(questions)
+            self.start(questions)
+        for question in questions:
+            self.worksheet.append([question.get(field) or "" for _, field in self.columns])
+            self.rows += 1
+
+    def save(self, target: Union[str, BinaryIO]) -> int:
+        """Write the workbook to a path or binary file; returns the number of rows"""
+        if self.columns is None:
+            self.start([])
+        self.workbook.save(target)
+        return self.rows
+
+
+async def write_export_workbook(pages: AsyncIterator[List[Dict[str, Any]]], target: Union[str, BinaryIO]) -> int:
+    """
+    Write pages of questions (see DatabaseService.iter_questions) to an export workbook
+
+    Returns:
+        int: Number of questions written
+    """
+    writer = ExportWriter()
+    async for page in pages:
+        writer.append(page)
+    # Zipping the workbook is CPU bound
+    return await run_in_threadpool(writer.save, target)
+
+
+def _normalized(text: Any) -> str:
+    return " ".join(str(text or "").split()).casefold()
+
+
+def write_answers_to_workbook(
+    source: Union[bytes, str, BinaryIO],
+    questions: Iterable[Dict[str, Any]],
+    column_mapping: Optional[Dict[str, Union[int, str]]] = None
+) -> Tuple[bytes, int]:
+    """
+    Fill answers into the customer's original workbook, keeping its formatting
+
+    Each answer goes to the answer column of the sheet and row its question was
+    imported from; questions without a recorded position are matched by question
+    text in the question column. A sheet without an answer column gets an "Answer"
+    column after its last header cell.
+
+    Args:
+        source: The original workbook (bytes, path or binary file)
+        questions: Questions with answer, and sheet_name/row_number where known
+        column_mapping: Column mapping used at import (see parse_column_mapping)
+
+    Returns:
+        tuple: (the filled-in workbook, number of answers written)
+    """
+    workbook = openpyxl.load_workbook(io.BytesIO(source) if isinstance(source, bytes) else source)
+    by_position: Dict[Tuple[str, int], str] = {}
+    by_text: Dict[str, str] = {}
+    for question in questions:
+        if not question.get("answer"):
+            continue
+        if question.get("sheet_name") and question.get("row_number"):
+            by_position[(question["sheet_name"], question["row_number"])] = question["answer"]
+        else:
+            by_text.setdefault(_normalized(question.get("question_text")), question["answer"])
+
+    written = 0
+    for worksheet in workbook.worksheets:
+        rows = iter_filled_rows(worksheet)
+        top = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+        header, columns = locate_columns(top, column_mapping)
+        if columns is None:
+            if column_mapping is not None:
+                # Skipped at import too
+                continue
+            # No header: question in column A, answer in column B (as imported)
+            columns = {"question": 0, "answer": 1}
+        answer_column = columns.get("answer")
+        if answer_column is None:
+            answer_column = columns["question"] + 1
+            if header is not None:
+                # New column after the last header cell
+                header_row, header_cells = top[header]
+                filled = [index for index, value in enumerate(header_cells) if value is not None]
+                answer_column = max(answer_column, filled[-1] + 1)
+                worksheet.cell(row=header_row, column=answer_column + 1, value="Answer")
+
+        body = top if header is None else top[header + 1:]
+        for row_idx, row in itertools.chain(body, rows):
+            answer = by_position.get((worksheet.title, row_idx))
+            if answer is None and by_text:
+                question_cell = row[columns["question"]] if columns["question"] < len(row) else None
+                answer = by_text.get(_normalized(question_cell))
+            if answer is not None:
+                worksheet.cell(row=row_idx, column=answer_column + 1, value=answer)
+                written += 1
+
+    output = io.BytesIO()
+    workbook.save(output)
+    workbook.close()
+    logger.info(f"Wrote {written} answers into the original workbook")
+    return output.getvalue(), written
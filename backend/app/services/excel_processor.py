@@ -3,101 +3,307 @@ Excel processing service using openpyxl for questionnaire data extraction
 """
 
 import io
-from typing import List, Dict, Any
+import itertools
+import os
+import re
+from typing import BinaryIO, Dict, Iterator, List, Any, Optional, Tuple, Union
 import openpyxl
-from openpyxl.workbook import Workbook
+from openpyxl.utils import column_index_from_string
 from openpyxl.worksheet.worksheet import Worksheet
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Header names of each mapped column (compared case-insensitively, punctuation ignored)
+COLUMN_HEADERS = {
+    "question": ("question", "questions", "question text", "query", "queries", "requirement",
+                 "control question", "description", "item", "items", "text"),
+    "answer": ("answer", "answers", "response", "responses", "vendor response", "reply", "comment", "comments"),
+    "id": ("id", "question id", "ref", "reference", "ref no", "no", "number", "control id", "item no", "#"),
+    "section": ("section", "category", "domain", "area", "topic", "control area", "group"),
+}
+# Non-empty rows at the top of a sheet searched for the header row
+HEADER_SCAN_ROWS = 10
+
+_HEADER_PUNCTUATION = re.compile(r"[^\w#]+")
+
+
+def _header_name(value: Any) -> str:
+    return " ".join(_HEADER_PUNCTUATION.sub(" ", str(value)).split()).casefold()
+
+
+def _match_headers(row, partial: bool = True) -> Dict[str, int]:
+    """
+    0-based column index of each field whose header name is in the row
+
+    Args:
+        row: Cell values
+        partial: Also match short headers containing a question/answer word
+            (e.g. "Supplier Response") to the fields no header names exactly
+    """
+    names = [(index, _header_name(value)) for index, value in enumerate(row) if value is not None]
+    columns: Dict[str, int] = {}
+    for index, name in names:
+        for field, headers in COLUMN_HEADERS.items():
+            if field not in columns and name in headers:
+                columns[field] = index
+                break
+    if not partial:
+        return columns
+    for index, name in names:
+        words = name.split()
+        if index in columns.values() or len(words) > 4:
+            continue
+        for field in ("question", "answer"):
+            if field not in columns and set(words) & set(COLUMN_HEADERS[field]):
+                columns[field] = index
+                break
+    return columns
+
+
+def detect_columns(row, first: bool = True) -> Optional[Dict[str, int]]:
+    """
+    Map a header row's cells to question/answer/id/section columns
+
+    Args:
+        row: Cell values
+        first: Whether the row is the sheet's first filled row. Any other row is only
+            a header row when it names the question column exactly, so a data row
+            such as "Incident response item" is not taken for one
+
+    Returns:
+        Optional[Dict]: 0-based column index of each recognised field, or None if the
+            row has no question column (it is not a header row)
+    """
+    if not first and "question" not in _match_headers(row, partial=False):
+        return None
+    columns = _match_headers(row)
+    return columns if "question" in columns else None
+
+
+def parse_column_mapping(text: str) -> Dict[str, Union[int, str]]:
+    """
+    Parse a column mapping such as "question=C,answer=E,id=A" (letters) or
+    "question=Requirement,answer=Response" (header names)
+
+    Raises:
+        ValueError: If a field is unknown or the question column is missing
+    """
+    mapping: Dict[str, Union[int, str]] = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        field, _, column = part.partition("=")
+        field, column = field.strip().lower(), column.strip()
+        if field not in COLUMN_HEADERS or not column:
+            raise ValueError(f"Invalid column mapping '{part}'. Use field=column with fields: {', '.join(COLUMN_HEADERS)}")
+        mapping[field] = column_index_from_string(column.upper()) - 1 if re.fullmatch(r"[A-Za-z]{1,3}", column) else column
+    if "question" not in mapping:
+        raise ValueError("The column mapping must include the question column")
+    return mapping
+
+
+def _resolve_mapping(mapping: Dict[str, Union[int, str]], header: Optional[tuple]) -> Optional[Dict[str, int]]:
+    """Column indexes of a mapping, header names looked up in the header row"""
+    names = {_header_name(value): index for index, value in enumerate(header or ()) if value is not None}
+    columns = {}
+    for field, column in mapping.items():
+        if isinstance(column, int):
+            columns[field] = column
+        elif _header_name(column) in names:
+            columns[field] = names[_header_name(column)]
+        else:
+            return None
+    return columns
+
+
+def locate_columns(
+    top: List[tuple],
+    column_mapping: Optional[Dict[str, Union[int, str]]] = None
+) -> Tuple[Optional[int], Optional[Dict[str, int]]]:
+    """
+    Find the header row among a sheet's first rows and the columns it maps
+
+    Args:
+        top: (row number, cell values) of the first non-empty rows of a sheet
+        column_mapping: Explicit mapping (see parse_column_mapping)
+
+    Returns:
+        tuple: (position of the header row in top, or None without one; 0-based column
+            index of each field, or None when no header row gives the question column)
+    """
+    by_index = column_mapping is not None and all(isinstance(column, int) for column in column_mapping.values())
+    for position, (_, row) in enumerate(top):
+        if column_mapping is None:
+            columns = detect_columns(row, first=position == 0)
+        elif by_index:
+            # Mapped by letter: the header row only needs to be recognised to be skipped
+            columns = dict(column_mapping) if _match_headers(row, partial=position == 0) else None
+        else:
+            columns = _resolve_mapping(column_mapping, row)
+        if columns:
+            return position, columns
+    return None, dict(column_mapping) if by_index else None
+
+
+def _cell_text(row: tuple, index: Optional[int]) -> str:
+    if index is None or index >= len(row) or row[index] is None:
+        return ""
+    value = row[index]
+    # Numeric IDs are read as floats
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_filled_rows(worksheet) -> Iterator[Tuple[int, tuple]]:
+    """(row number, cell values) of a worksheet's non-empty rows"""
+    for row_idx, row in enumerate(worksheet.iter_rows(values_only=True), 1):
+        if any(value is not None and str(value).strip() for value in row):
+            yield row_idx, row
+
+
 class ExcelProcessor:
     """Excel processing service using openpyxl library"""
     
     def extract_questions_from_bytes(self, excel_bytes: bytes) -> List[Dict[str, Any]]:
         """
-        Extract questions from Excel file bytes
+        Extract questions from Excel file bytes (see extract_questions)
+        """
+        return self.extract_questions(excel_bytes)
+    
+    def extract_questions(
+        self,
+        source: Union[bytes, str, BinaryIO],
+        column_mapping: Optional[Dict[str, Union[int, str]]] = None,
+        sheets: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract every question of an Excel file (see iter_questions)
         
-        Expected format:
-        - Column A: Question text
-        - Column B: Answer (optional, can be empty)
-        - First row can be headers (will be skipped if detected)
+        Raises:
+            Exception: If Excel processing fails or no question is found
+        """
+        try:
+            questions = list(self.iter_questions(source, column_mapping, sheets))
+        except Exception as e:
+            logger.error(f"Error processing Excel file: {str(e)}")
+            raise Exception(f"Error processing Excel file: {str(e)}")
+        
+        if not questions:
+            raise Exception("Error processing Excel file: No valid questions found in Excel file")
+        
+        return questions
+    
+    def iter_questions(
+        self,
+        source: Union[bytes, str, BinaryIO],
+        column_mapping: Optional[Dict[str, Union[int, str]]] = None,
+        sheets: Optional[List[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the questions of an Excel file, sheet by sheet, as they are read
         
         Args:
-            excel_bytes: Excel file content as bytes
+            source: Excel file content as bytes, a file path, or a seekable binary file
+            column_mapping: Field ("question", "answer", "id", "section") to 0-based column
+                index or header name (see parse_column_mapping); overrides detection
+            sheets: Names of the worksheets to read (defaults to the visible sheets with a header row, see _question_sheets)
             
-        Returns:
-            List[Dict]: List of questions with text and optional answers
-            
-        Raises:
-            Exception: If Excel processing fails
+        Yields:
+            Dict: question_text, answer (None if empty), status, row_number, sheet_name,
+                section and external_id (None when the column is absent)
         """
+        # Bytes are wrapped in BytesIO; paths and file objects are read in place
+        excel_stream = io.BytesIO(source) if isinstance(source, bytes) else source
+        
+        # Load workbook (read-only mode streams rows instead of loading every cell)
+        workbook = openpyxl.load_workbook(excel_stream, read_only=True)
         try:
-            # Read Excel content into BytesIO object
-            excel_stream = io.BytesIO(excel_bytes)
-            
-            # Load workbook from memory
-            workbook = openpyxl.load_workbook(excel_stream, read_only=True)
-            
-            # Get the first worksheet
-            worksheet = workbook.active
-            
-            logger.info(f"Processing Excel worksheet: {worksheet.title}")
-            
-            questions = []
-            row_count = 0
-            
-            # Iterate through rows
-            for row_idx, row in enumerate(worksheet.iter_rows(values_only=True), 1):
-                # Skip empty rows
-                if not any(row):
-                    continue
-                
-                # Get question text from first column
-                question_text = str(row[0]).strip() if row[0] else ""
-                
-                # Skip if no question text
-                if not question_text:
-                    continue
-                
-                # Check if this looks like a header row (skip it)
-                if row_idx == 1 and self._is_header_row(question_text):
-                    logger.info("Skipping header row")
-                    continue
-                
-                # Get answer from second column if present
-                answer = str(row[1]).strip() if len(row) > 1 and row[1] else ""
-                
-                question_data = {
-                    "question_text": question_text,
-                    "answer": answer if answer else None,
-                    "status": "unapproved",
-                    "row_number": row_idx
-                }
-                
-                questions.append(question_data)
-                row_count += 1
-                
-                logger.info(f"Extracted question {row_count}: {question_text[:50]}...")
-            
+            if sheets is not None:
+                worksheets = [worksheet for worksheet in workbook.worksheets if worksheet.title in sheets]
+            else:
+                worksheets = self._question_sheets(
+                    [worksheet for worksheet in workbook.worksheets if worksheet.sheet_state == "visible"],
+                    column_mapping
+                )
+            for worksheet in worksheets:
+                yield from self._iter_sheet_questions(worksheet, column_mapping)
+        finally:
             workbook.close()
+    
+    def _question_sheets(self, worksheets: List[Worksheet], column_mapping: Optional[Dict[str, Union[int, str]]]) -> List[Worksheet]:
+        """
+        The visible sheets holding questions, when no sheet list was given
+
+        Sheets with a recognised header row are read; sheets without one (instructions,
+        cover pages) are skipped. A workbook with no header row anywhere is read from
+        its first sheet only (column A/B), as other sheets cannot be told apart from notes.
+        """
+        if column_mapping is not None or len(worksheets) < 2:
+            return worksheets
+        with_header = []
+        for worksheet in worksheets:
+            top = list(itertools.islice(iter_filled_rows(worksheet), HEADER_SCAN_ROWS))
+            if locate_columns(top)[1] is not None:
+                with_header.append(worksheet)
+        selected = with_header or worksheets[:1]
+        skipped = [worksheet.title for worksheet in worksheets if worksheet not in selected]
+        if skipped:
+            logger.warning(
+                f"Skipping worksheets without a question header row: {', '.join(skipped)} "
+                f"(name them in sheets= to import them)"
+            )
+        return selected
+    
+    def _iter_sheet_questions(
+        self,
+        worksheet: Worksheet,
+        column_mapping: Optional[Dict[str, Union[int, str]]]
+    ) -> Iterator[Dict[str, Any]]:
+        rows = iter_filled_rows(worksheet)
+        
+        # Look for the header row among the first non-empty rows
+        top = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+        header, columns = locate_columns(top, column_mapping)
+        # Rows above the header are the questionnaire's title block
+        body = top if header is None else top[header + 1:]
+        if header:
+            skipped = ", ".join(str(row_idx) for row_idx, _ in top[:header])
+            logger.info(f"Worksheet {worksheet.title}: row{'s' if header != 1 else ''} {skipped} above the header row skipped as the title block")
+        
+        if columns is None:
+            if column_mapping is not None:
+                logger.warning(f"Skipping worksheet {worksheet.title}: mapped column headers not found")
+                return
+            # No header: question in column A, answer in column B
+            columns = {"question": 0, "answer": 1}
+            if top and top[0][0] == 1 and self._is_header_row(_cell_text(top[0][1], 0)):
+                body = top[1:]
+        
+        count = 0
+        for row_idx, row in itertools.chain(body, rows):
+            question_text = _cell_text(row, columns["question"])
             
-            if not questions:
-                raise Exception("No valid questions found in Excel file")
-            
-            logger.info(f"Successfully extracted {len(questions)} questions from Excel file")
-            
-            return questions
+            # Skip if no question text
+            if not question_text:
+                continue
             
-        except Exception as e:
-            logger.error(f"Error processing Excel file: {str(e)}")
-            raise Exception(f"Error processing Excel file: {str(e)}")
+            answer = _cell_text(row, columns.get("answer"))
+            count += 1
+            yield {
+                "question_text": question_text,
+                "answer": answer if answer else None,
+                "status": "unapproved",
+                "row_number": row_idx,
+                "sheet_name": worksheet.title,
+                "section": _cell_text(row, columns.get("section")) or None,
+                "external_id": _cell_text(row, columns.get("id")) or None,
+            }
+        
+        logger.info(f"Extracted {count} questions from worksheet {worksheet.title}")
     
     def _is_header_row(self, text: str) -> bool:
         """
-        Check if a row appears to be a header row
+        Check if a row appears to be a header row (when no column header was recognised)
         
         Args:
             text: Text from first column of row
@@ -122,10 +328,10 @@ class ExcelProcessor:
         Returns:
             List[Dict]: List of questions
         """
+        if not os.path.exists(file_path):
+            raise Exception(f"Excel file not found: {file_path}")
         try:
-            with open(file_path, 'rb') as file:
-                excel_bytes = file.read()
-                return self.extract_questions_from_bytes(excel_bytes)
+            return self.extract_questions(file_path)
         except FileNotFoundError:
             raise Exception(f"Excel file not found: {file_path}")
         except Exception as e:
@@ -133,7 +339,7 @@ class ExcelProcessor:
     
     def create_export_excel(self, questions: List[Dict[str, Any]], filename: str = "questionnaire_export.xlsx") -> bytes:
         """
-        Create Excel file from questions and answers for export
+        Create Excel file from questions and answers for export (see excel_export.ExportWriter)
         
         Args:
             questions: List of question dictionaries with answers
@@ -142,42 +348,15 @@ class ExcelProcessor:
         Returns:
             bytes: Excel file content as bytes
         """
+        from app.services.excel_export import ExportWriter
+        
         try:
-            # Create new workbook
-            workbook = Workbook()
-            worksheet = workbook.active
-            worksheet.title = "Questionnaire Answers"
-            
-            # Add headers
-            headers = ["Question", "Answer", "Status"]
-            for col_idx, header in enumerate(headers, 1):
-                worksheet.cell(row=1, column=col_idx, value=header)
-            
-            # Add questions and answers
-            for row_idx, question in enumerate(questions, 2):
-                worksheet.cell(row=row_idx, column=1, value=question.get("question_text", ""))
-                worksheet.cell(row=row_idx, column=2, value=question.get("answer", ""))
-                worksheet.cell(row=row_idx, column=3, value=question.get("status", ""))
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 100)  # Cap at 100 characters
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            # Save to BytesIO
-            excel_stream = io.BytesIO()
-            workbook.save(excel_stream)
-            excel_stream.seek(0)
+            # Write-only workbook; column widths come from the same pass over the rows
+            writer = ExportWriter()
+            writer.append(questions)
             
-            workbook.close()
+            excel_stream = io.BytesIO()
+            writer.save(excel_stream)
             
             logger.info(f"Created Excel export with {len(questions)} questions")
             
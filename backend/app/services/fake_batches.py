@@ -0,0 +1,131 @@
+"""
+In-process stand-in for the Anthropic Message Batches API
+"""
+
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+def _default_answer(params: Dict[str, Any]) -> str:
+    return "Yes, documented procedures.\nPolicy reference generated by the offline batch server."
+
+
+class FakeMessageBatches:
+    """Fake of the async `client.messages.batches` resource"""
+
+    def __init__(
+        self,
+        processing_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        expire_rate: float = 0.0,
+        expire_batch: bool = False,
+        answer_fn: Callable[[Dict[str, Any]], str] = _default_answer,
+        seed: int = 3,
+    ):
+        """
+        Args:
+            processing_seconds: Time a batch stays "in_progress" after creation
+            error_rate: Probability that an individual request ends as "errored"
+            expire_rate: Probability that an individual request ends as "expired"
+            expire_batch: Expire every request (the batch hit its 24h limit)
+            answer_fn: Produces the answer text for a request's params
+            seed: Random seed for reproducible failure injection
+        """
+        self.processing_seconds = processing_seconds
+        self.error_rate = error_rate
+        self.expire_rate = expire_rate
+        self.expire_batch = expire_batch
+        self.answer_fn = answer_fn
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    async def create(self, requests: List[Dict[str, Any]], **kwargs) -> SimpleNamespace:
+        batch_id = f"msgbatch_fake_{uuid.uuid4().hex[:24]}"
+        with self._lock:
+            outcomes = {}
+            for request in requests:
+                roll = self._random.random()
+                if self.expire_batch or roll < self.expire_rate:
+                    outcomes[request["custom_id"]] = "expired"
+                elif roll < self.expire_rate + self.error_rate:
+                    outcomes[request["custom_id"]] = "errored"
+                else:
+                    outcomes[request["custom_id"]] = "succeeded"
+            self._batches[batch_id] = {
+                "requests": list(requests),
+                "outcomes": outcomes,
+                "created_at": datetime.utcnow(),
+                "ready_at": time.monotonic() + self.processing_seconds,
+            }
+        return await self.retrieve(batch_id)
+
+    async def retrieve(self, message_batch_id: str, **kwargs) -> SimpleNamespace:
+        with self._lock:
+            batch = self._batches.get(message_batch_id)
+        if batch is None:
+            raise KeyError(f"Unknown message batch: {message_batch_id}")
+
+        ended = time.monotonic() >= batch["ready_at"]
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0}
+        if ended:
+            for outcome in batch["outcomes"].values():
+                counts[outcome] += 1
+        else:
+            counts["processing"] = len(batch["requests"])
+
+        return SimpleNamespace(
+            id=message_batch_id,
+            type="message_batch",
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(**counts),
+            created_at=batch["created_at"],
+            ended_at=datetime.utcnow() if ended else None,
+            expires_at=batch["created_at"] + timedelta(hours=24),
+        )
+
+    async def results(self, message_batch_id: str, **kwargs) -> AsyncIterator[SimpleNamespace]:
+        """Like the SDK, returns an async iterator over the batch's results"""
+        if (await self.retrieve(message_batch_id)).processing_status != "ended":
+            raise RuntimeError(f"Batch {message_batch_id} is still processing")
+
+        with self._lock:
+            batch = self._batches[message_batch_id]
+        return self._iter_results(batch)
+
+    async def _iter_results(self, batch: Dict[str, Any]) -> AsyncIterator[SimpleNamespace]:
+        for request in batch["requests"]:
+            outcome = batch["outcomes"][request["custom_id"]]
+            if outcome == "succeeded":
+                text = self.answer_fn(request["params"])
+                result = SimpleNamespace(
+                    type="succeeded",
+                    message=SimpleNamespace(
+                        content=[SimpleNamespace(type="text", text=text)],
+                        usage=SimpleNamespace(input_tokens=0, output_tokens=len(text) // 4),
+                    ),
+                )
+            elif outcome == "errored":
+                result = SimpleNamespace(
+                    type="errored",
+                    error=SimpleNamespace(type="error", error=SimpleNamespace(type="api_error", message="Internal server error")),
+                )
+            else:
+                result = SimpleNamespace(type=outcome)
+            yield SimpleNamespace(custom_id=request["custom_id"], result=result)
+
+
+_shared_fake: Optional[FakeMessageBatches] = None
+
+
+def get_fake_batches() -> FakeMessageBatches:
+    """Process-wide fake so batches created by one request can be polled by another"""
+    global _shared_fake
+    if _shared_fake is None:
+        _shared_fake = FakeMessageBatches(processing_seconds=5.0)
+    return _shared_fake
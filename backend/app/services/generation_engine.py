@@ -0,0 +1,342 @@
+"""
+Concurrent, rate-limit-aware generation engine for questionnaire answers
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.services.ai_service import AIRetryableError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate_per_minute: Tokens added per minute (0 or less disables the bucket)
+            capacity: Maximum burst size (defaults to one minute of tokens)
+        """
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self.enabled = rate_per_minute > 0
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+
+    async def acquire(self, amount: float = 1) -> float:
+        """
+        Wait until `amount` tokens are available and consume them
+
+        Requests larger than the bucket capacity are clamped to the capacity so they
+        can still run (they simply drain the whole bucket).
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+
+        # The lock keeps waiters FIFO so large requests are not starved by small ones
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate_per_second
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit that halves on throttling and grows back additively (AIMD)"""
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_throttled(self) -> None:
+        async with self._condition:
+            new_limit = max(self.min_limit, self.limit // 2)
+            if new_limit != self.limit:
+                logger.warning(f"Rate limited: reducing concurrency {self.limit} -> {new_limit}")
+            self.limit = new_limit
+            self._successes = 0
+
+    async def on_success(self) -> None:
+        async with self._condition:
+            if self.limit >= self.max_limit:
+                return
+            self._successes += 1
+            if self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+
+@dataclass
+class GenerationStats:
+    """Counters collected during a generation run"""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    throttled: int = 0
+    rate_limit_wait_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    library_hits: int = 0  # Answered from the Answers Library without an LLM call
+    library_seconds_saved: float = 0.0  # Estimated LLM latency avoided by library hits
+    answer_cache_hits: int = 0  # Served from the answer cache without an LLM call
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    usage: Dict[str, Any] = field(default_factory=dict)
+
+    def merge(self, other: "GenerationStats") -> None:
+        """Fold the retry/throttle/timing counters of a follow-up run into this one"""
+        self.retries += other.retries
+        self.throttled += other.throttled
+        self.rate_limit_wait_seconds += other.rate_limit_wait_seconds
+        self.elapsed_seconds += other.elapsed_seconds
+        self.errors.extend(other.errors)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 3),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "throughput_per_minute": round(self.succeeded / self.elapsed_seconds * 60, 2) if self.elapsed_seconds else 0.0,
+            "library_hits": self.library_hits,
+            "library_hit_rate": round(self.library_hits / self.total, 4) if self.total else 0.0,
+            "library_seconds_saved": round(self.library_seconds_saved, 3),
+            "answer_cache_hits": self.answer_cache_hits,
+            "answer_cache_hit_rate": round(self.answer_cache_hits / self.total, 4) if self.total else 0.0,
+            "errors": self.errors,
+            "usage": self.usage,
+        }
+
+
+class GenerationEngine:
+    """Runs an async handler over many items with bounded concurrency and rate limiting"""
+
+    # Statuses that mean "slow down" rather than "try again"
+    THROTTLE_STATUS_CODES = {429, 529}
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+    ):
+        """
+        Initialize generation engine
+
+        Args:
+            max_concurrency: Maximum number of in-flight requests
+            requests_per_minute: Client-side request limit (0 disables)
+            tokens_per_minute: Client-side input token limit (0 disables)
+            max_retries: Retries per item for retryable API errors
+            backoff_base_seconds: First backoff delay, doubled on each retry
+            backoff_max_seconds: Upper bound for a single backoff delay
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self._limiter = AdaptiveConcurrencyLimiter(self.max_concurrency)
+        self._cooldown_until = 0.0
+
+    @classmethod
+    def from_settings(cls, settings) -> "GenerationEngine":
+        """Create an engine configured from application settings"""
+        return cls(
+            max_concurrency=settings.ai_max_concurrency,
+            requests_per_minute=settings.ai_requests_per_minute,
+            tokens_per_minute=settings.ai_tokens_per_minute,
+            max_retries=settings.ai_max_retries,
+            backoff_base_seconds=settings.ai_backoff_base_seconds,
+            backoff_max_seconds=settings.ai_backoff_max_seconds,
+        )
+
+    async def run(
+        self,
+        items: Iterable[Any],
+        handler: Callable[[Any], Awaitable[Any]],
+        estimate_tokens: Optional[Callable[[Any], int]] = None,
+        on_error: Optional[Callable[[Any, Exception], Awaitable[None]]] = None,
+        warmup_items: int = 0,
+        on_progress: Optional[Callable[[GenerationStats], None]] = None,
+    ) -> GenerationStats:
+        """
+        Process all items with the handler
+
+        Args:
+            items: Work items (e.g. question records)
+            handler: Async callable doing the work for one item (LLM call + persistence)
+            estimate_tokens: Optional input token estimate per item for the token bucket
+            on_error: Optional async callback for items that failed permanently
+            warmup_items: Items processed alone before fanning out, so the first response
+                writes the prompt cache that the concurrent requests then read
+            on_progress: Optional callback receiving the live stats after every finished item
+
+        Returns:
+            GenerationStats: Run counters
+        """
+        items = list(items)
+        stats = GenerationStats(total=len(items))
+        started = time.monotonic()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+
+        async def process_one(item: Any) -> None:
+            try:
+                await self._process(item, handler, estimate_tokens, stats)
+                stats.succeeded += 1
+            except Exception as e:
+                stats.failed += 1
+                stats.errors.append({"item": _describe(item), "error": str(e)})
+                logger.error(f"✗ Generation failed for {_describe(item)}: {str(e)}")
+                if on_error:
+                    try:
+                        await on_error(item, e)
+                    except Exception as callback_error:
+                        logger.error(f"Error callback failed: {str(callback_error)}")
+            if on_progress:
+                stats.elapsed_seconds = time.monotonic() - started
+                on_progress(stats)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await process_one(item)
+
+        for _ in range(min(warmup_items, len(items))):
+            await process_one(queue.get_nowait())
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, queue.qsize()))]
+        await asyncio.gather(*workers)
+
+        stats.elapsed_seconds = time.monotonic() - started
+        logger.info(
+            f"Generation run finished: {stats.succeeded}/{stats.total} succeeded, "
+            f"{stats.failed} failed, {stats.throttled} throttled in {stats.elapsed_seconds:.1f}s"
+        )
+        return stats
+
+    async def _process(
+        self,
+        item: Any,
+        handler: Callable[[Any], Awaitable[Any]],
+        estimate_tokens: Optional[Callable[[Any], int]],
+        stats: GenerationStats,
+    ) -> Any:
+        attempt = 0
+        tokens = estimate_tokens(item) if estimate_tokens else 0
+
+        while True:
+            await self._wait_for_cooldown()
+            stats.rate_limit_wait_seconds += await self.request_bucket.acquire(1)
+            if tokens:
+                stats.rate_limit_wait_seconds += await self.token_bucket.acquire(tokens)
+
+            await self._limiter.acquire()
+            try:
+                result = await handler(item)
+            except AIRetryableError as e:
+                error = e
+            else:
+                await self._limiter.on_success()
+                return result
+            finally:
+                await self._limiter.release()
+
+            # Back off outside the limiter so the slot is free while we wait
+            attempt += 1
+            throttled = error.status_code in self.THROTTLE_STATUS_CODES
+            if throttled:
+                stats.throttled += 1
+                await self._limiter.on_throttled()
+            if attempt > self.max_retries:
+                raise error
+
+            stats.retries += 1
+            delay = self._backoff_delay(attempt, error.retry_after)
+            if throttled:
+                # Pause every worker, not just this one: the limit is shared
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            logger.warning(
+                f"Retryable error ({error.status_code}) for {_describe(item)}, "
+                f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _wait_for_cooldown(self) -> None:
+        while True:
+            remaining = self._cooldown_until - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None and retry_after > 0:
+            return min(retry_after, self.backoff_max_seconds)
+        delay = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** (attempt - 1)))
+        # Equal jitter: at least half the backoff, spread so workers do not retry in lockstep
+        return random.uniform(delay / 2, delay)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for client-side budgeting"""
+    return max(1, len(text) // 4)
+
+
+def _describe(item: Any) -> str:
+    if isinstance(item, dict):
+        return f"question {item.get('id', '?')}"
+    return repr(item)[:60]
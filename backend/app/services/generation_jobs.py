@@ -0,0 +1,362 @@
+"""
+Durable answer generation jobs processed by worker processes
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.ai_service import AIService
+from app.services.answer_generation import generate_answers_for_questions
+from app.services.answer_cache import AnswerCache
+from app.services.answer_library import AnswerLibrary
+from app.services.policy_index import PolicyContext
+from app.services.sqlite_job_store import SQLiteJobStore
+
+logger = logging.getLogger(__name__)
+
+QUEUE_BACKENDS = ("supabase", "sqlite")
+
+# Generation modes that run through the queue
+QUEUED_MODES = ("single", "batched")
+
+ACTIVE_JOB_STATUSES = ["queued", "running"]
+
+# One SQLite store (and connection) per path for the process
+_sqlite_stores: Dict[str, SQLiteJobStore] = {}
+
+
+def get_job_store(settings, db_service: Optional[Any] = None) -> Any:
+    """
+    Get the job store for the configured queue backend
+
+    Args:
+        settings: Application settings (generation_queue_backend selects the backend)
+        db_service: DatabaseService; the supabase store itself, and where the sqlite
+            store saves completed answers
+    """
+    if settings.generation_queue_backend not in QUEUE_BACKENDS:
+        raise ValueError(
+            f"Invalid queue backend '{settings.generation_queue_backend}'. Must be one of: {', '.join(QUEUE_BACKENDS)}"
+        )
+    if settings.generation_queue_backend == "sqlite":
+        path = settings.generation_queue_sqlite_path
+        store = _sqlite_stores.get(path)
+        if store is None:
+            store = _sqlite_stores[path] = SQLiteJobStore(path, db_service=db_service)
+        elif store.db_service is None:
+            # Every DatabaseService shares the process-wide Supabase client, so any one will do
+            store.db_service = db_service
+        return store
+    if db_service is None:
+        raise ValueError("The supabase queue backend requires a DatabaseService")
+    return db_service
+
+
+def close_job_stores() -> None:
+    """Close the shared SQLite job stores (application and worker shutdown)"""
+    while _sqlite_stores:
+        _, store = _sqlite_stores.popitem()
+        try:
+            store.close()
+        except Exception as e:
+            logger.warning(f"Error closing SQLite job store: {str(e)}")
+
+
+async def enqueue_generation_job(
+    store: Any,
+    questionnaire_id: str,
+    questions: List[Dict[str, Any]],
+    settings,
+    mode: str = "single",
+    batch_size: Optional[int] = None
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Queue a generation job unless the questionnaire already has an active one
+
+    Returns:
+        tuple: (job record, True if a new job was created)
+    """
+    if mode not in QUEUED_MODES:
+        raise ValueError(f"Mode '{mode}' cannot be queued. Must be one of: {', '.join(QUEUED_MODES)}")
+
+    active = await store.get_generation_jobs(questionnaire_id=questionnaire_id, statuses=ACTIVE_JOB_STATUSES)
+    if active:
+        return active[0], False
+
+    job = await store.create_generation_job({
+        "questionnaire_id": questionnaire_id,
+        "mode": mode,
+        "batch_size": max(1, batch_size or settings.ai_batch_size) if mode == "batched" else 1,
+        "max_attempts": settings.generation_task_max_attempts
+    }, questions)
+    return job, True
+
+
+def default_worker_id() -> str:
+    """Unique, human-readable worker identity: host, pid and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class _TaskAnswerSink:
+    """Stands in for DatabaseService in generate_answers_for_questions: answers complete their tasks"""
+
+    def __init__(self, store: Any, worker_id: str, tasks: List[Dict[str, Any]]):
+        self._store = store
+        self._worker_id = worker_id
+        self._task_ids = {task["question_id"]: task["id"] for task in tasks}
+        self.completed: set = set()
+
+    async def update_question_answer(self, question_id: str, answer: str, status: str = "unapproved",
+                                     answer_source: Optional[str] = None) -> bool:
+        task_id = self._task_ids[question_id]
+        if await self._store.complete_generation_task(task_id, self._worker_id, answer, answer_source=answer_source or "ai"):
+            self.completed.add(task_id)
+            return True
+        logger.warning(f"Lease on task {task_id} was lost; answer for question {question_id} discarded")
+        return False
+
+
+class GenerationWorker:
+    """Claims generation tasks from the job store and answers them"""
+
+    def __init__(
+        self,
+        store: Any,
+        ai_service: AIService,
+        settings,
+        load_context: Callable[[], Awaitable[PolicyContext]],
+        worker_id: Optional[str] = None,
+        load_library: Optional[Callable[[], Awaitable[Optional[AnswerLibrary]]]] = None,
+        answer_cache: Optional[AnswerCache] = None
+    ):
+        """
+        Initialize generation worker
+
+        Args:
+            store: Job store (DatabaseService or SQLiteJobStore)
+            ai_service: AI service used for every task
+            settings: Application settings (engine limits and queue settings)
+            load_context: Loads the policy context; called once per job
+            worker_id: Lease owner name (defaults to host:pid:random)
+            load_library: Loads the Answers Library matcher; called once per job
+            answer_cache: Optional answer cache shared by the worker's jobs
+        """
+        self.store = store
+        self.ai_service = ai_service
+        self.settings = settings
+        self.load_context = load_context
+        self.load_library = load_library
+        self.answer_cache = answer_cache
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = settings.generation_lease_seconds
+        self._context_job_id: Optional[str] = None
+        self._context: Optional[PolicyContext] = None
+        self._library: Optional[AnswerLibrary] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def run(self, stop: Optional[asyncio.Event] = None, exit_when_idle: bool = False) -> int:
+        """
+        Process claims until `stop` is set (the current claim is finished first)
+
+        Args:
+            stop: Event that ends the loop
+            exit_when_idle: Return as soon as no task can be claimed
+
+        Returns:
+            int: Number of tasks answered
+        """
+        stop = stop or asyncio.Event()
+        answered = 0
+        logger.info(f"Generation worker {self.worker_id} started")
+        while not stop.is_set():
+            claimed = await self.process_next_claim()
+            if claimed is None:
+                if exit_when_idle:
+                    break
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.settings.generation_worker_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            answered += claimed
+        logger.info(f"Generation worker {self.worker_id} stopped after answering {answered} questions")
+        return answered
+
+    async def process_next_claim(self) -> Optional[int]:
+        """
+        Claim one slice of tasks and answer them
+
+        Returns:
+            Optional[int]: Tasks answered, or None when nothing could be claimed
+        """
+        tasks = await self.store.claim_generation_tasks(
+            self.worker_id,
+            max(1, self.settings.ai_max_concurrency),
+            self.lease_seconds
+        )
+        if not tasks:
+            return None
+
+        job_id = tasks[0]["job_id"]
+        job = await self._get_job(job_id)
+        logger.info(f"Claimed {len(tasks)} tasks of job {job_id} ({job['mode']} mode)")
+
+        sink = _TaskAnswerSink(self.store, self.worker_id, tasks)
+        heartbeat = asyncio.create_task(self._renew_leases(tasks, sink))
+        try:
+            context = await self._get_context(job_id)
+            if context.is_empty:
+                await self.store.fail_generation_job(job_id, "No policy documents found. Please upload PDF policies first.")
+                return 0
+            await self._answer(tasks, job, context, sink)
+        except asyncio.CancelledError:
+            # Shutting down mid-claim: hand the unanswered tasks back without using up an attempt
+            unanswered = [task["id"] for task in tasks if task["id"] not in sink.completed]
+            await asyncio.shield(self.store.release_generation_tasks(self.worker_id, unanswered))
+            raise
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        finished = await self.store.finish_generation_job(job_id)
+        if finished:
+            self._jobs.pop(job_id, None)
+            logger.info(
+                f"Generation job {job_id} completed: {finished['succeeded_count']} succeeded, "
+                f"{finished['failed_count']} failed"
+            )
+        return len(sink.completed)
+
+    async def _answer(self, tasks: List[Dict[str, Any]], job: Dict[str, Any], context: PolicyContext,
+                      sink: _TaskAnswerSink) -> None:
+        questions = [
+            {"id": task["question_id"], "questionnaire_id": job["questionnaire_id"], "question_text": task["question_text"]}
+            for task in tasks
+        ]
+        try:
+            stats = await generate_answers_for_questions(
+                questions,
+                sink,
+                self.ai_service,
+                context,
+                self.settings,
+                mode=job["mode"],
+                batch_size=job["batch_size"],
+                library=self._library,
+                answer_cache=self.answer_cache
+            )
+            errors = {error["item"]: error["error"] for error in stats.errors}
+        except Exception as e:
+            logger.error(f"Generation failed for a claim of job {job['id']}: {str(e)}")
+            errors = {}
+            default_error = str(e)
+        else:
+            default_error = "No answer generated"
+
+        for task in tasks:
+            if task["id"] in sink.completed:
+                continue
+            error = errors.get(f"question {task['question_id']}", default_error)
+            status = await self.store.fail_generation_task(task["id"], self.worker_id, error)
+            if status is None:
+                logger.warning(f"Task {task['id']} failed after its lease was lost ({error})")
+            else:
+                logger.warning(f"Task {task['id']} attempt {task['attempts']} failed ({error}); now {status}")
+
+    async def _renew_leases(self, tasks: List[Dict[str, Any]], sink: _TaskAnswerSink) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            held = [task["id"] for task in tasks if task["id"] not in sink.completed]
+            try:
+                renewed = await self.store.renew_generation_leases(self.worker_id, held, self.lease_seconds)
+                if renewed < len(held):
+                    logger.warning(f"Worker {self.worker_id} lost {len(held) - renewed} task leases")
+            except Exception as e:
+                logger.error(f"Could not renew task leases: {str(e)}")
+
+    async def _get_job(self, job_id: str) -> Dict[str, Any]:
+        if job_id not in self._jobs:
+            self._jobs[job_id] = await self.store.get_generation_job(job_id)
+        return self._jobs[job_id]
+
+    async def _get_context(self, job_id: str) -> PolicyContext:
+        # Policies and the library can change between runs, so both are loaded once per job
+        if self._context_job_id != job_id:
+            self._context = await self.load_context()
+            self._library = await self.load_library() if self.load_library else None
+            self._context_job_id = job_id
+        return self._context
+
+
+def _run_status(job: Dict[str, Any]) -> str:
+    return "running" if job["status"] in ACTIVE_JOB_STATUSES else job["status"]
+
+
+def _job_counters(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "total": job["total_count"],
+        "succeeded": job["succeeded_count"],
+        "failed": job["failed_count"]
+    }
+
+
+async def job_events(store: Any, job_id: str, poll_interval_seconds: float = 2.0) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield generation events for a queued job, in the same shape as GenerationProgress
+
+    Workers run in other processes, so the job tables are polled: a snapshot first,
+    then question_completed / question_failed for newly finished tasks, progress
+    counters when they change, and completed or failed at the end. Token deltas are
+    only available for in-process runs.
+    """
+    job = await store.get_generation_job(job_id)
+    finished_tasks = await store.get_finished_generation_tasks(job_id)
+    yield {"event": "snapshot", "data": {
+        "questionnaire_id": job["questionnaire_id"],
+        "mode": job["mode"],
+        "status": _run_status(job),
+        "counters": _job_counters(job),
+        "active": {},
+        "answers": {t["question_id"]: t.get("answer") or "" for t in finished_tasks if t["status"] == "succeeded"},
+        "errors": {t["question_id"]: t.get("error") or "" for t in finished_tasks if t["status"] == "failed"}
+    }}
+    if _run_status(job) != "running":
+        return
+
+    seen = {task["id"] for task in finished_tasks}
+    cursor = finished_tasks[-1]["finished_at"] if finished_tasks else None
+    counters = _job_counters(job)
+    while True:
+        await asyncio.sleep(poll_interval_seconds)
+        job = await store.get_generation_job(job_id)
+        # Tasks finishing in the same instant as the cursor are fetched again and skipped via `seen`
+        for task in await store.get_finished_generation_tasks(job_id, since=cursor):
+            cursor = task["finished_at"]
+            if task["id"] in seen:
+                continue
+            seen.add(task["id"])
+            if task["status"] == "succeeded":
+                yield {"event": "question_completed", "data": {
+                    "question_id": task["question_id"],
+                    "answer": task.get("answer") or "",
+                    "answer_source": task.get("answer_source") or "ai",
+                    "status": "unapproved"
+                }}
+            else:
+                yield {"event": "question_failed", "data": {"question_id": task["question_id"], "error": task.get("error") or ""}}
+
+        if _job_counters(job) != counters:
+            counters = _job_counters(job)
+            yield {"event": "progress", "data": dict(counters)}
+
+        status = _run_status(job)
+        if status == "completed":
+            yield {"event": "completed", "data": {"counters": counters, "usage": {}}}
+            return
+        if status == "failed":
+            yield {"event": "failed", "data": {"counters": counters, "error": job.get("error") or "Generation job failed"}}
+            return
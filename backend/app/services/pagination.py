@@ -0,0 +1,252 @@
+"""
+Keyset (cursor) pagination for the list endpoints
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Query
+
+logger = logging.getLogger(__name__)
+
+# What each list can return, sort on, filter on and search
+LIST_RESOURCES: Dict[str, Dict[str, Any]] = {
+    "questionnaires": {
+        "table": "questionnaire_summaries",
+        "columns": (
+            "id", "name", "filename", "status", "upload_date", "created_at", "updated_at",
+            "question_count", "approved_count",
+        ),
+        "default_fields": None,
+        "sorts": ("created_at", "name"),
+        "default_sort": ("created_at", "desc"),
+        "statuses": ("in_progress", "approved", "complete"),
+        "search": ("name",),
+    },
+    "policies": {
+        "table": "policies",
+        "columns": (
+            "id", "name", "filename", "file_size", "upload_date", "created_at", "updated_at",
+            "status", "status_message", "content_sha256", "normalization_report",
+        ),
+        # Without the (potentially very large) extracted_text
+        "default_fields": (
+            "id", "name", "filename", "file_size", "upload_date", "created_at", "updated_at",
+            "status", "status_message", "content_sha256", "normalization_report",
+        ),
+        "sorts": ("created_at", "name"),
+        "default_sort": ("created_at", "desc"),
+        "statuses": ("queued", "extracting", "indexed", "failed", "duplicate"),
+        "search": ("name",),
+    },
+    "answers": {
+        "table": "answers",
+        "columns": ("id", "question", "answer", "source_type", "source_name", "created_at", "updated_at"),
+        "default_fields": None,
+        "sorts": ("created_at", "updated_at"),
+        "default_sort": ("created_at", "desc"),
+        # The library has no status; source_type is filtered instead
+        "status_column": "source_type",
+        "statuses": ("user", "questionnaire"),
+        "search": ("question", "answer"),
+    },
+    "questions": {
+        "table": "questions",
+        "columns": (
+            "id", "question_text", "answer", "status", "answer_source", "questionnaire_id",
+            "row_number", "sheet_name", "section", "external_id", "created_at", "updated_at",
+        ),
+        "default_fields": None,
+        "sorts": ("created_at",),
+        # Questionnaire order
+        "default_sort": ("created_at", "asc"),
+        "statuses": ("approved", "unapproved"),
+        "search": ("question_text", "answer"),
+    },
+}
+
+
+def encode_cursor(sort: str, order: str, row: Dict[str, Any]) -> str:
+    """Cursor for the page after row"""
+    payload = json.dumps([sort, order, row.get(sort), row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple[Any, str]:
+    """
+    The (sort value, id) a cursor continues after
+
+    Raises:
+        ValueError: Malformed cursor, or one made for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise ValueError(f"Cursor was made for sort={cursor_sort}&order={cursor_order}, not sort={sort}&order={order}")
+    if value is None or not isinstance(row_id, str):
+        raise ValueError("Invalid cursor")
+    return value, row_id
+
+
+def _parse_timestamp(name: str, value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).isoformat()
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or timestamp, not '{value}'")
+
+
+def build_list_query(
+    resource: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+    status: Optional[str] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    q: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Validate list parameters into the arguments of DatabaseService.list_records
+
+    Args:
+        resource: Key of LIST_RESOURCES
+        limit: Rows per page (already bounded by the endpoint)
+        cursor: next_cursor of the previous page
+        fields: Comma-separated columns (default: the resource's default columns)
+        sort: Sort column (default: the resource's default sort)
+        order: "asc" or "desc"
+        status: Comma-separated statuses to keep
+        created_after: Only rows created at or after this ISO 8601 date/timestamp
+        created_before: Only rows created before this ISO 8601 date/timestamp
+        q: Case-insensitive text search over the resource's search columns
+
+    Raises:
+        ValueError: An invalid parameter (reported as 400)
+    """
+    spec = LIST_RESOURCES[resource]
+    default_sort, default_order = spec["default_sort"]
+    sort = sort or default_sort
+    order = (order or (default_order if sort == default_sort else "asc")).lower()
+    if sort not in spec["sorts"]:
+        raise ValueError(f"Cannot sort {resource} by '{sort}'. Must be one of: {', '.join(spec['sorts'])}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    columns = spec["default_fields"]
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in spec["columns"]]
+        if unknown:
+            raise ValueError(f"Unknown {resource} fields: {', '.join(unknown)}. Must be among: {', '.join(spec['columns'])}")
+        columns = requested
+    if columns is not None:
+        # The cursor is built from the sort column and id
+        columns = list(dict.fromkeys(["id", sort, *columns]))
+
+    filters: Dict[str, List[str]] = {}
+    if status:
+        statuses = [value.strip() for value in status.split(",") if value.strip()]
+        invalid = [value for value in statuses if value not in spec["statuses"]]
+        if invalid:
+            raise ValueError(f"Invalid status: {', '.join(invalid)}. Must be among: {', '.join(spec['statuses'])}")
+        filters[spec.get("status_column", "status")] = statuses
+
+    return {
+        "columns": columns,
+        "sort": sort,
+        "descending": order == "desc",
+        "limit": limit,
+        "after": decode_cursor(cursor, sort, order) if cursor else None,
+        "filters": filters,
+        "created_after": _parse_timestamp("created_after", created_after),
+        "created_before": _parse_timestamp("created_before", created_before),
+        "search_columns": spec["search"] if q and q.strip() else (),
+        "search": q.strip() if q and q.strip() else None,
+    }
+
+
+async def fetch_list_page(
+    db_service,
+    resource: str,
+    query: Dict[str, Any],
+    equals: Optional[Dict[str, Any]] = None,
+    with_total: bool = False
+) -> Dict[str, Any]:
+    """
+    Fetch one page of a list
+
+    Args:
+        db_service: DatabaseService
+        resource: Key of LIST_RESOURCES
+        query: Result of build_list_query
+        equals: Extra column values rows must equal (e.g. {"questionnaire_id": ...})
+        with_total: Also return the (estimated) number of matching rows
+
+    Returns:
+        Dict: items, next_cursor (None on the last page), has_more and, with with_total, total
+    """
+    arguments = {
+        **query,
+        "filters": {**query["filters"], **{column: [value] for column, value in (equals or {}).items()}},
+        # One more row than the page tells whether there is a next page
+        "limit": query["limit"] + 1,
+        "count": "estimated" if with_total else None,
+    }
+    if resource == "questionnaires":
+        rows, total = await db_service.list_questionnaires(**arguments)
+    else:
+        rows, total = await db_service.list_records(LIST_RESOURCES[resource]["table"], **arguments)
+
+    has_more = len(rows) > query["limit"]
+    items = rows[:query["limit"]]
+    page = {
+        "items": items,
+        "next_cursor": encode_cursor(query["sort"], "desc" if query["descending"] else "asc", items[-1]) if has_more else None,
+        "has_more": has_more,
+    }
+    if with_total:
+        page["total"] = total
+    return page
+
+
+def list_params(
+    limit: Optional[int] = Query(None, ge=1, description="Rows per page (default LIST_PAGE_SIZE, at most LIST_MAX_PAGE_SIZE)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    sort: Optional[str] = Query(None, description="Sort column"),
+    order: Optional[str] = Query(None, description="asc or desc"),
+    status: Optional[str] = Query(None, description="Comma-separated statuses to keep"),
+    created_after: Optional[str] = Query(None, description="Only rows created at or after this ISO 8601 date/timestamp"),
+    created_before: Optional[str] = Query(None, description="Only rows created before this ISO 8601 date/timestamp"),
+    q: Optional[str] = Query(None, description="Case-insensitive text search"),
+    with_total: bool = Query(False, description="Also return the estimated number of matching rows"),
+) -> Dict[str, Any]:
+    """Query parameters shared by the list endpoints (a FastAPI dependency)"""
+    return {
+        "limit": limit, "cursor": cursor, "fields": fields, "sort": sort, "order": order, "status": status,
+        "created_after": created_after, "created_before": created_before, "q": q, "with_total": with_total,
+    }
+
+
+async def list_page(db_service, resource: str, params: Dict[str, Any], settings, equals: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    One page of a list endpoint from its list_params
+
+    Raises:
+        ValueError: An invalid parameter (reported as 400)
+    """
+    params = dict(params)
+    with_total = params.pop("with_total")
+    limit = min(params.pop("limit") or settings.list_page_size, settings.list_max_page_size)
+    query = build_list_query(resource, limit, **params)
+    return await fetch_list_page(db_service, resource, query, equals=equals, with_total=with_total)
@@ -0,0 +1,172 @@
+"""
+Pluggable PDF text extraction engines
+"""
+
+import io
+from typing import Any, Union
+
+PDF_BACKENDS = ("pypdf2", "pdfium", "pdfminer")
+
+# A PDF given as its bytes or as a path to the file
+PDFSource = Union[bytes, str]
+
+
+class PDFReadError(Exception):
+    """The PDF could not be parsed (the message starts with "Invalid or corrupted PDF file")"""
+
+
+class PDFBackend:
+    """Text extraction engine: open a document, then extract its pages by index"""
+
+    name = ""
+
+    def open(self, source: PDFSource) -> Any:
+        raise NotImplementedError
+
+    def page_count(self, document: Any) -> int:
+        raise NotImplementedError
+
+    def extract_page(self, document: Any, page_index: int) -> str:
+        raise NotImplementedError
+
+    def close(self, document: Any) -> None:
+        pass
+
+
+class PyPDF2Backend(PDFBackend):
+    name = "pypdf2"
+
+    def __init__(self):
+        import PyPDF2
+        self._pypdf2 = PyPDF2
+
+    def open(self, source: PDFSource) -> Any:
+        if isinstance(source, self._pypdf2.PdfReader):
+            return source
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                return self._pypdf2.PdfReader(io.BytesIO(source))
+            return self._pypdf2.PdfReader(source)
+        except self._pypdf2.errors.PdfReadError as e:
+            raise PDFReadError(f"Invalid or corrupted PDF file: {str(e)}")
+
+    def page_count(self, document: Any) -> int:
+        return len(document.pages)
+
+    def extract_page(self, document: Any, page_index: int) -> str:
+        return document.pages[page_index].extract_text() or ""
+
+
+class PdfiumBackend(PDFBackend):
+    name = "pdfium"
+
+    def __init__(self):
+        try:
+            import pypdfium2
+        except ImportError:
+            raise Exception("The pdfium PDF backend requires pypdfium2 (pip install pypdfium2)")
+        self._pdfium = pypdfium2
+
+    def open(self, source: PDFSource) -> Any:
+        try:
+            return self._pdfium.PdfDocument(bytes(source) if isinstance(source, (bytearray, memoryview)) else source)
+        except self._pdfium.PdfiumError as e:
+            raise PDFReadError(f"Invalid or corrupted PDF file: {str(e)}")
+
+    def page_count(self, document: Any) -> int:
+        return len(document)
+
+    def extract_page(self, document: Any, page_index: int) -> str:
+        page = document[page_index]
+        text_page = page.get_textpage()
+        try:
+            # PDFium ends lines with \r\n
+            return text_page.get_text_bounded().replace("\r\n", "\n").replace("\r", "\n")
+        finally:
+            text_page.close()
+            page.close()
+
+    def close(self, document: Any) -> None:
+        document.close()
+
+
+class _PdfMinerDocument:
+    def __init__(self, stream, pages, resources):
+        self.stream = stream
+        self.pages = pages
+        # Shared by the document's pages so fonts are parsed once
+        self.resources = resources
+
+
+class PdfMinerBackend(PDFBackend):
+    name = "pdfminer"
+
+    def __init__(self, line_margin: float = 0.5, char_margin: float = 2.0, word_margin: float = 0.1, boxes_flow: float = 0.5):
+        """
+        Args:
+            line_margin: Lines closer than this (relative to line height) join one text block
+            char_margin: Characters closer than this (relative to char width) join one line
+            word_margin: Gaps wider than this (relative to char width) become spaces
+            boxes_flow: -1.0 (horizontal position only) to 1.0 (vertical only) weighting of
+                the reading order of text blocks; 0.5 reads columns top to bottom
+        """
+        try:
+            from pdfminer.layout import LAParams
+        except ImportError:
+            raise Exception("The pdfminer PDF backend requires pdfminer.six (pip install pdfminer.six)")
+        self.laparams = LAParams(
+            line_margin=line_margin,
+            char_margin=char_margin,
+            word_margin=word_margin,
+            boxes_flow=boxes_flow
+        )
+
+    def open(self, source: PDFSource) -> Any:
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfinterp import PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+
+        stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else open(source, "rb")
+        try:
+            document = PDFDocument(PDFParser(stream))
+            return _PdfMinerDocument(stream, list(PDFPage.create_pages(document)), PDFResourceManager(caching=True))
+        except Exception as e:
+            stream.close()
+            raise PDFReadError(f"Invalid or corrupted PDF file: {str(e)}")
+
+    def page_count(self, document: Any) -> int:
+        return len(document.pages)
+
+    def extract_page(self, document: Any, page_index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.pdfinterp import PDFPageInterpreter
+
+        output = io.StringIO()
+        device = TextConverter(document.resources, output, laparams=self.laparams)
+        try:
+            PDFPageInterpreter(document.resources, device).process_page(document.pages[page_index])
+        finally:
+            device.close()
+        # TextConverter ends every page with a form feed
+        return output.getvalue().rstrip("\x0c")
+
+    def close(self, document: Any) -> None:
+        document.stream.close()
+
+
+def get_pdf_backend(name: str = "pypdf2") -> PDFBackend:
+    """
+    Get a PDF extraction backend by name
+
+    Raises:
+        ValueError: If the name is not one of PDF_BACKENDS
+        Exception: If the backend's library is not installed
+    """
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Invalid PDF backend '{name}'. Must be one of: {', '.join(PDF_BACKENDS)}")
+    if name == "pdfium":
+        return PdfiumBackend()
+    if name == "pdfminer":
+        return PdfMinerBackend()
+    return PyPDF2Backend()
@@ -0,0 +1,197 @@
+"""
+PDF text extraction in a bounded process pool
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.pdf_backends import get_pdf_backend
+from app.services.pdf_ocr import PageOCR
+from app.services.pdf_processor import PAGE_SEPARATOR, PDFProcessor, PDFSource
+from app.services.text_normalization import normalize_pages
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_page_range(source: PDFSource, start: int, end: Optional[int], backend: str = "pypdf2") -> Tuple[int, List[Tuple[int, str]]]:
+    """Worker: (page count, pages [start, end)) of a PDF"""
+    return PDFProcessor(backend).extract_page_range(source, start, end)
+
+
+class PDFExtractionPool:
+    """Extracts PDF text in worker processes with per-page-range parallelism"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        pages_per_task: int = 25,
+        timeout_seconds: float = 120.0,
+        backend: str = "pypdf2",
+        normalize_text: bool = True,
+        ocr: Optional[PageOCR] = None
+    ):
+        """
+        Initialize extraction pool (processes start on first use)
+
+        Args:
+            max_workers: Worker processes (bounds CPU used by extraction)
+            pages_per_task: Minimum pages per task; larger documents are split across workers
+            timeout_seconds: Maximum extraction time per document (0 disables)
+            backend: Text extraction engine, one of pdf_backends.PDF_BACKENDS
+            normalize_text: Strip repeated headers/footers and page numbers, de-hyphenate
+                and collapse whitespace before pagination
+            ocr: OCR of pages without a text layer, run in this pool's workers (None disables)
+
+        Raises:
+            ValueError: If the backend is unknown (or Exception if its library is missing)
+        """
+        # Fail at start-up rather than on the first upload
+        get_pdf_backend(backend)
+        self.backend = backend
+        self.normalize_text = normalize_text
+        self.ocr = ocr
+        self.max_workers = max(1, max_workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _restart(self) -> None:
+        """Kill the worker processes (cancelling whatever they run) and start afresh on next use"""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract_pages(self, source: PDFSource) -> List[Tuple[int, str]]:
+        """
+        Extract every page of a PDF (bytes or file path) without blocking the event loop
+
+        Returns:
+            list: (page number, text) in page order
+
+        Raises:
+            Exception: If the PDF cannot be read or extraction times out
+        """
+        for attempt in range(2):
+            try:
+                if self.timeout_seconds > 0:
+                    return await asyncio.wait_for(self._extract(source), timeout=self.timeout_seconds)
+                return await self._extract(source)
+            except asyncio.TimeoutError:
+                self._restart()
+                raise Exception(f"PDF extraction timed out after {self.timeout_seconds:g}s")
+            except BrokenProcessPool:
+                # Killed by another document's timeout, or a worker crashed: retry once on a fresh pool
+                self._restart()
+                if attempt:
+                    raise Exception("PDF extraction worker crashed")
+                logger.warning("PDF extraction pool was restarted, retrying document")
+        raise AssertionError("unreachable")
+
+    async def extract_paginated(self, source: PDFSource) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Extract a PDF's non-empty pages with their offsets in the joined text (see PDFProcessor.paginate)
+
+        Returns:
+            tuple: (page records, text normalisation report or None when normalisation is off)
+        """
+        started = time.monotonic()
+        report = None
+        pages = await self.extract_pages(source)
+        if self.ocr is not None:
+            pages = await self.ocr.ocr_empty_pages(self._get_executor(), source, pages)
+        if self.normalize_text:
+            # Whole-document pass (boilerplate is found across pages), off the event loop
+            loop = asyncio.get_running_loop()
+            pages, report = await loop.run_in_executor(self._get_executor(), normalize_pages, pages)
+            logger.info(
+                f"Normalised text: {report['characters_before']} -> {report['characters_after']} characters "
+                f"({report['ratio']:.0%}), {report['lines_removed']} boilerplate lines removed, "
+                f"{report['hyphenations']} words de-hyphenated"
+            )
+        records = PDFProcessor(self.backend).paginate(pages)
+        logger.info(
+            f"Extracted {records[-1]['char_end']} characters from {len(pages)} pages "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return records, report
+
+    async def extract_text(self, source: PDFSource) -> str:
+        """Extract a PDF's text, pages joined in order (see PDFProcessor.join_pages)"""
+        records, _ = await self.extract_paginated(source)
+        return PAGE_SEPARATOR.join(page["content"] for page in records)
+
+    async def _extract(self, source: PDFSource) -> List[Tuple[int, str]]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        # The first task also reports the page count, so small documents need one round trip
+        page_count, pages = await loop.run_in_executor(executor, _extract_page_range, source, 0, self.pages_per_task, self.backend)
+        remaining = page_count - self.pages_per_task
+        size = max(self.pages_per_task, -(-remaining // self.max_workers))
+        ranges = [
+            (start, min(start + size, page_count))
+            for start in range(self.pages_per_task, page_count, size)
+        ]
+        if ranges:
+            logger.info(f"Extracting {page_count} pages in {len(ranges) + 1} ranges")
+        results = await asyncio.gather(*(
+            loop.run_in_executor(executor, _extract_page_range, source, start, end, self.backend)
+            for start, end in ranges
+        ))
+        for _, range_pages in results:
+            pages.extend(range_pages)
+        return pages
+
+
+_pool: Optional[PDFExtractionPool] = None
+
+
+def get_pdf_extraction_pool(settings) -> PDFExtractionPool:
+    """Process-wide PDF extraction pool"""
+    global _pool
+    if _pool is None:
+        _pool = PDFExtractionPool(
+            max_workers=settings.pdf_extraction_workers or min(4, os.cpu_count() or 1),
+            pages_per_task=settings.pdf_pages_per_task,
+            timeout_seconds=settings.pdf_extraction_timeout_seconds,
+            backend=settings.pdf_backend,
+            normalize_text=settings.pdf_normalize_text,
+            ocr=PageOCR(
+                language=settings.pdf_ocr_language,
+                max_concurrency=settings.pdf_ocr_workers,
+                dpi=settings.pdf_ocr_dpi,
+                timeout_seconds=settings.pdf_ocr_timeout_seconds,
+                command=settings.pdf_ocr_command,
+                cache_path=settings.pdf_ocr_cache_path
+            ) if settings.pdf_ocr_enabled else None
+        )
+    return _pool
+
+
+def shutdown_pdf_extraction_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,220 @@
+"""
+OCR fallback for scanned policy PDFs (pages without a text layer)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.pdf_backends import PDFSource
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_cache (
+  key TEXT PRIMARY KEY,
+  text TEXT NOT NULL,
+  created_at REAL NOT NULL
+);
+"""
+
+
+def render_page(source: PDFSource, page_index: int, dpi: int = 300) -> bytes:
+    """Render a PDF page as a grayscale PGM image (a format Tesseract reads from stdin)"""
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(bytes(source) if isinstance(source, (bytearray, memoryview)) else source)
+    try:
+        page = document[page_index]
+        try:
+            bitmap = page.render(scale=dpi / 72, grayscale=True)
+            width, height, stride = bitmap.width, bitmap.height, bitmap.stride
+            pixels = bytes(bitmap.buffer)
+            bitmap.close()
+        finally:
+            page.close()
+    finally:
+        document.close()
+    if stride != width:
+        pixels = b"".join(pixels[row * stride:row * stride + width] for row in range(height))
+    return b"P5\n%d %d\n255\n" % (width, height) + pixels
+
+
+def ocr_cache_key(image: bytes, language: str) -> str:
+    """Cache key of a page image read in a language"""
+    return hashlib.sha256(image + b"\0" + language.encode("utf-8")).hexdigest()
+
+
+def run_tesseract(image: bytes, language: str = "eng", timeout_seconds: float = 60.0, command: str = "tesseract") -> str:
+    """
+    Read the text of a page image with Tesseract
+
+    Raises:
+        Exception: If Tesseract fails or runs longer than timeout_seconds (it is killed)
+    """
+    try:
+        result = subprocess.run(
+            [command, "stdin", "stdout", "-l", language],
+            input=image,
+            capture_output=True,
+            timeout=timeout_seconds or None,
+            # One thread per Tesseract process: concurrency is capped by PageOCR
+            env={**os.environ, "OMP_THREAD_LIMIT": "1"}
+        )
+    except subprocess.TimeoutExpired:
+        raise Exception(f"OCR timed out after {timeout_seconds:g}s")
+    if result.returncode != 0:
+        raise Exception(f"Tesseract failed: {result.stderr.decode('utf-8', 'replace').strip()[:500]}")
+    return result.stdout.decode("utf-8", "replace").strip()
+
+
+class OCRCache:
+    """Persistent OCR text by page image hash, shared by the worker processes"""
+
+    def __init__(self, path: str, busy_timeout_seconds: float = 30.0):
+        """
+        Args:
+            path: SQLite file (created if missing)
+            busy_timeout_seconds: How long to wait for another process's write lock
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_seconds, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT text FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, text: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ocr_cache (key, text, created_at) VALUES (?, ?, ?)",
+            (key, text, time.time())
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# One cache connection per worker process and path
+_caches: Dict[str, OCRCache] = {}
+
+
+def ocr_page(
+    source: PDFSource,
+    page_index: int,
+    language: str = "eng",
+    dpi: int = 300,
+    timeout_seconds: float = 60.0,
+    command: str = "tesseract",
+    cache_path: str = ""
+) -> Tuple[str, bool]:
+    """
+    Worker: OCR one page of a PDF, through the cache when cache_path is set
+
+    Returns:
+        tuple: (page text, whether it came from the cache)
+    """
+    image = render_page(source, page_index, dpi)
+    key = ocr_cache_key(image, language)
+    cache = None
+    if cache_path:
+        if cache_path not in _caches:
+            _caches[cache_path] = OCRCache(cache_path)
+        cache = _caches[cache_path]
+        text = cache.get(key)
+        if text is not None:
+            return text, True
+    text = run_tesseract(image, language, timeout_seconds, command)
+    if cache is not None:
+        cache.put(key, text)
+    return text, False
+
+
+class PageOCR:
+    """OCR of the pages without a text layer, run in an extraction pool's workers with a concurrency cap"""
+
+    def __init__(
+        self,
+        language: str = "eng",
+        max_concurrency: int = 1,
+        dpi: int = 300,
+        timeout_seconds: float = 60.0,
+        command: str = "tesseract",
+        cache_path: str = "ocr_cache.db"
+    ):
+        """
+        Args:
+            language: Tesseract language(s), e.g. "eng" or "eng+deu"
+            max_concurrency: Pages OCR'd at the same time in this process
+            dpi: Resolution pages are rendered at
+            timeout_seconds: Maximum OCR time per page (0 disables)
+            command: Tesseract executable
+            cache_path: SQLite file of cached OCR text (empty disables the cache)
+
+        Raises:
+            Exception: If Tesseract or pypdfium2 is not installed
+        """
+        if shutil.which(command) is None:
+            raise Exception(f"PDF OCR requires Tesseract ('{command}' not found; e.g. apt install tesseract-ocr)")
+        try:
+            import pypdfium2  # noqa: F401
+        except ImportError:
+            raise Exception("PDF OCR requires pypdfium2 (pip install pypdfium2)")
+        self.language = language
+        self.max_concurrency = max(1, max_concurrency)
+        self.dpi = dpi
+        self.timeout_seconds = timeout_seconds
+        self.command = command
+        self.cache_path = cache_path
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def ocr_empty_pages(self, executor, source: PDFSource, pages: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """
+        Fill in the text of the pages that have none by OCR
+
+        Args:
+            executor: Process pool the pages are rendered and OCR'd in
+            source: The PDF (bytes or file path)
+            pages: (page number, text) as extracted
+
+        Returns:
+            list: The pages in the same order, empty pages replaced by their OCR text
+        """
+        empty = [page_num for page_num, text in pages if not text.strip()]
+        if not empty:
+            return pages
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        cached = 0
+
+        async def run(page_num: int) -> Tuple[int, str]:
+            nonlocal cached
+            async with self._semaphore:
+                try:
+                    text, from_cache = await loop.run_in_executor(
+                        executor, ocr_page, source, page_num, self.language, self.dpi,
+                        self.timeout_seconds, self.command, self.cache_path
+                    )
+                except Exception as e:
+                    logger.warning(f"OCR of page {page_num + 1} failed: {str(e)}")
+                    return page_num, ""
+            cached += from_cache
+            return page_num, text
+
+        results = dict(await asyncio.gather(*(run(page_num) for page_num in empty)))
+        logger.info(
+            f"OCR of {len(empty)} pages without a text layer in {time.monotonic() - started:.2f}s "
+            f"({cached} from cache)"
+        )
+        return [(page_num, results.get(page_num, text)) for page_num, text in pages]
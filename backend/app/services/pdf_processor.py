@@ -11,16 +11,112 @@ Implements the workflow:
 """
 
 import io
-from typing import Union
+from typing import Any, Dict, List, Optional, Tuple
 import PyPDF2
 import logging
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+from app.services.pdf_backends import PDFReadError, PDFSource, get_pdf_backend
+
 logger = logging.getLogger(__name__)
 
+# Between consecutive pages in the joined text
+PAGE_SEPARATOR = "\n\n"
+
+
 class PDFProcessor:
-    """PDF processing service using PyPDF2 library"""
+    """PDF processing service (PyPDF2 by default, or another extraction backend)"""
+    
+    def __init__(self, backend: str = "pypdf2"):
+        """
+        Args:
+            backend: Text extraction engine, one of pdf_backends.PDF_BACKENDS
+        """
+        self.backend = get_pdf_backend(backend)
+    
+    def count_pages(self, source: PDFSource) -> int:
+        """Number of pages in a PDF (bytes or file path)"""
+        return self.extract_page_range(source, 0, 0)[0]
+    
+    def extract_page_range(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Extract the text of pages [start, end) of a PDF, opening it once
+        
+        Args:
+            source: PDF file content as bytes or a file path
+            start: First page (0-based)
+            end: Page after the last one (defaults to the last page)
+            
+        Returns:
+            tuple: (page count of the document, [(page number, text)] for every page in
+                the range; unreadable pages have empty text)
+            
+        Raises:
+            PDFReadError: If the PDF cannot be parsed
+        """
+        document = self.backend.open(source)
+        try:
+            page_count = self.backend.page_count(document)
+            end = page_count if end is None else min(end, page_count)
+            pages = []
+            for page_num in range(start, end):
+                try:
+                    page_text = self.backend.extract_page(document, page_num)
+                except Exception as e:
+                    logger.error(f"Error extracting text from page {page_num + 1}: {str(e)}")
+                    # Continue processing other pages even if one fails
+                    page_text = ""
+                pages.append((page_num, page_text))
+            return page_count, pages
+        finally:
+            self.backend.close(document)
+    
+    def extract_pages(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Extract the text of pages [start, end) of a PDF
+        
+        Returns:
+            list: (page number, text) for every page in the range (see extract_page_range)
+        """
+        return self.extract_page_range(source, start, end)[1]
+    
+    def paginate(self, pages: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+        """
+        Lay out extracted pages as they appear in the joined text, in page order, skipping empty pages
+        
+        Returns:
+            list: page_number (1-based), char_start and char_end (offsets in the joined
+                text) and content for every non-empty page
+            
+        Raises:
+            Exception: If no page has readable text
+        """
+        records = []
+        offset = 0
+        for page_num, page_text in sorted(pages):
+            if not page_text.strip():  # Only add non-empty pages
+                logger.warning(f"Page {page_num + 1} appears to be empty")
+                continue
+            records.append({
+                "page_number": page_num + 1,
+                "char_start": offset,
+                "char_end": offset + len(page_text),
+                "content": page_text,
+            })
+            offset += len(page_text) + len(PAGE_SEPARATOR)
+        
+        if not records:
+            raise Exception("No readable text found in PDF")
+        
+        return records
+    
+    def join_pages(self, pages: List[Tuple[int, str]]) -> str:
+        """
+        Combine extracted pages into one string, in page order, skipping empty pages
+        
+        Raises:
+            Exception: If no page has readable text
+        """
+        return PAGE_SEPARATOR.join(page["content"] for page in self.paginate(pages))
     
     def extract_text_from_bytes(self, pdf_bytes: bytes) -> str:
         """
@@ -36,44 +132,23 @@ class PDFProcessor:
             Exception: If PDF processing fails
         """
         try:
-            # Step 2: Memory Processing - Read PDF content into BytesIO object
-            pdf_stream = io.BytesIO(pdf_bytes)
-            
-            # Step 3: Text Extraction - Use PyPDF2.PdfReader to process PDF from memory
-            pdf_reader = PyPDF2.PdfReader(pdf_stream)
+            # Steps 2-4: Read the bytes through BytesIO with the extraction backend
+            # (PyPDF2.PdfReader by default) and extract every page
+            pages = self.extract_pages(pdf_bytes)
             
             # Log PDF info
-            logger.info(f"Processing PDF with {len(pdf_reader.pages)} pages")
-            
-            # Step 4: Page Iteration - Loop through all pages to extract text
-            extracted_text_pages = []
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():  # Only add non-empty pages
-                        extracted_text_pages.append(page_text)
-                        logger.info(f"Extracted {len(page_text)} characters from page {page_num + 1}")
-                    else:
-                        logger.warning(f"Page {page_num + 1} appears to be empty")
-                except Exception as e:
-                    logger.error(f"Error extracting text from page {page_num + 1}: {str(e)}")
-                    # Continue processing other pages even if one fails
-                    continue
+            logger.info(f"Processing PDF with {len(pages)} pages")
             
             # Step 5: Text Concatenation - Combine all page text into a single string
-            if not extracted_text_pages:
-                raise Exception("No readable text found in PDF")
-            
-            full_text = "\n\n".join(extracted_text_pages)
+            full_text = self.join_pages(pages)
             
             logger.info(f"Successfully extracted {len(full_text)} total characters from PDF")
             
             return full_text
             
-        except PyPDF2.errors.PdfReadError as e:
+        except PDFReadError as e:
             logger.error(f"PDF read error: {str(e)}")
-            raise Exception(f"Invalid or corrupted PDF file: {str(e)}")
+            raise Exception(str(e))
         except Exception as e:
             logger.error(f"Unexpected error processing PDF: {str(e)}")
             raise Exception(f"Error processing PDF: {str(e)}")
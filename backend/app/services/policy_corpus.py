@@ -0,0 +1,266 @@
+"""
+Precomputed, versioned policy corpus
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.policy_index import PolicyContext, PolicyRetriever, load_policy_chunks
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n"
+MAX_UPDATE_ATTEMPTS = 5
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _manifest_entry(policy: Dict[str, Any], text: str) -> Dict[str, Any]:
+    return {
+        "id": policy["id"],
+        "name": policy.get("name"),
+        "content_hash": policy.get("content_hash") or content_hash(text),
+        "length": len(text or ""),
+    }
+
+
+class PolicyCorpus:
+    """
+    One version of the policy corpus
+
+    The stored corpus is only a manifest; policy texts stay in the policies table
+    and are fetched per policy, once per process, when the joined text is needed.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        manifest: List[Dict[str, Any]],
+        full_text: Optional[str] = None,
+        previous: Optional["PolicyCorpus"] = None
+    ):
+        """
+        Args:
+            version: Corpus version (0 when built without the policy_corpus table)
+            manifest: Policies with id, name and (when known) content_hash and length
+            full_text: Joined policy text, when loaded
+            previous: Corpus this one replaces; texts and passages of unchanged policies are reused
+        """
+        self.version = version
+        self.policies = manifest
+        self.full_text = full_text
+        self._retriever: Optional[PolicyRetriever] = None
+        self._texts: Dict[Tuple[str, str], str] = {}
+        self._chunks: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        if previous is not None:
+            current = {(p["id"], p.get("content_hash")) for p in manifest}
+            self._texts = {key: text for key, text in previous._texts.items() if key in current}
+            self._chunks = {key: chunks for key, chunks in previous._chunks.items() if key in current}
+
+    @property
+    def is_empty(self) -> bool:
+        # Policies still being ingested are listed with no text yet
+        return not any(p.get("length", 1) for p in self.policies)
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """Hash of the policy IDs and content hashes (None when content hashes are unknown)"""
+        if any(not p.get("content_hash") for p in self.policies):
+            return None
+        entries = sorted(f"{p['id']}:{p['content_hash']}" for p in self.policies)
+        return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+    async def get_full_text(self, db_service) -> str:
+        """Joined policy texts (newest first), fetching only the policies not in the previous version"""
+        if self.full_text is None:
+            missing = [p["id"] for p in self.policies if (p["id"], p.get("content_hash")) not in self._texts]
+            if missing:
+                loaded = await db_service.get_policy_texts(missing)
+                for policy in self.policies:
+                    if policy["id"] in loaded:
+                        self._texts[(policy["id"], policy.get("content_hash"))] = loaded[policy["id"]] or ""
+            texts = [self._texts.get((p["id"], p.get("content_hash")), "") for p in self.policies]
+            self.full_text = SEPARATOR.join(text for text in texts if text)
+            logger.info(
+                f"Policy text joined for corpus version {self.version}: {len(self.full_text)} characters from "
+                f"{len(self.policies)} policies ({len(missing)} fetched)"
+            )
+        return self.full_text
+
+    async def get_retriever(self, db_service, settings) -> PolicyRetriever:
+        """BM25 retriever over the corpus passages, built once per version"""
+        if self._retriever is None:
+            missing = [p for p in self.policies if (p["id"], p.get("content_hash")) not in self._chunks]
+            if missing:
+                loaded = await load_policy_chunks(db_service, settings, missing)
+                for policy in missing:
+                    self._chunks[(policy["id"], policy.get("content_hash"))] = [
+                        c for c in loaded if c["policy_id"] == policy["id"]
+                    ]
+            chunks = [c for p in self.policies for c in self._chunks[(p["id"], p.get("content_hash"))]]
+            self._retriever = PolicyRetriever(chunks)
+            logger.info(
+                f"Policy index built for corpus version {self.version}: {len(chunks)} passages from "
+                f"{len(self.policies)} policies ({len(missing)} fetched)"
+            )
+        return self._retriever
+
+
+_corpus: Optional[PolicyCorpus] = None
+
+
+async def get_policy_corpus(db_service, settings) -> PolicyCorpus:
+    """
+    Current policy corpus, from the in-process cache unless its version changed
+
+    Builds the corpus from the policies table when it does not exist yet or was
+    marked stale. Without the policy_corpus table (migration not run) every call
+    reads the policies table.
+    """
+    global _corpus
+    include_text = not settings.retrieval_enabled
+    try:
+        version = await db_service.get_policy_corpus_version()
+        if version is None:
+            version = await rebuild_policy_corpus(db_service)
+    except Exception as e:
+        logger.warning(f"policy_corpus table unavailable, reading every policy: {str(e)}")
+        logger.warning("Run migration: add_policy_corpus_table.sql")
+        return await _corpus_from_policies(db_service, include_text)
+
+    cached = _corpus
+    if cached is not None and cached.version == version:
+        return cached
+
+    row = await db_service.get_policy_corpus()
+    if row is None or row.get("stale"):
+        # A failed incremental update marked it stale: rebuild once
+        await rebuild_policy_corpus(db_service)
+        row = await db_service.get_policy_corpus()
+        if row is None or row.get("stale"):
+            # Invalidated again meanwhile: serve this call from the policies table
+            return await _corpus_from_policies(db_service, include_text)
+    corpus = PolicyCorpus(row["version"], row["manifest"] or [], previous=cached)
+    _corpus = corpus
+    logger.info(f"Policy corpus version {corpus.version} loaded: {len(corpus.policies)} policies")
+    return corpus
+
+
+async def load_policy_context(db_service, settings) -> PolicyContext:
+    """Load the policy context for a generation run according to the retrieval settings"""
+    corpus = await get_policy_corpus(db_service, settings)
+    if settings.retrieval_enabled:
+        return PolicyContext(
+            retriever=await corpus.get_retriever(db_service, settings),
+            top_k=settings.retrieval_top_k,
+            token_budget=settings.retrieval_token_budget,
+            batch_token_budget=settings.retrieval_batch_token_budget,
+            corpus_hash=corpus.fingerprint
+        )
+    return PolicyContext(full_text=await corpus.get_full_text(db_service), corpus_hash=corpus.fingerprint)
+
+
+async def _corpus_from_policies(db_service, include_text: bool) -> PolicyCorpus:
+    policies = await db_service.get_all_policies(include_text=include_text)
+    if not include_text:
+        return PolicyCorpus(0, [{"id": p["id"], "name": p.get("name")} for p in policies])
+    texts = [p.get("extracted_text") or "" for p in policies]
+    manifest = [_manifest_entry(p, text) for p, text in zip(policies, texts)]
+    return PolicyCorpus(0, manifest, SEPARATOR.join(text for text in texts if text))
+
+
+async def rebuild_policy_corpus(db_service) -> int:
+    """
+    Build the corpus from the policies table; returns the new version
+
+    Versions only ever increase, so a process caching an older corpus always
+    notices the change. The save is a compare-and-set on the version read before
+    the policies, so a concurrent update is never overwritten with older policies.
+    """
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        current = await db_service.get_policy_corpus_version()
+        policies = await db_service.get_all_policies()
+        manifest = [_manifest_entry({"id": p["id"], "name": p.get("name")}, p.get("extracted_text") or "") for p in policies]
+        version = (current or 0) + 1
+        saved = await db_service.save_policy_corpus(
+            {"version": version, "manifest": manifest, "stale": False},
+            expected_version=current
+        )
+        if saved:
+            logger.info(f"Policy corpus rebuilt: version {version}, {len(manifest)} policies")
+            return version
+    raise Exception(f"Policy corpus changed concurrently {MAX_UPDATE_ATTEMPTS} times while rebuilding")
+
+
+async def _invalidate_policy_corpus(db_service) -> None:
+    """Mark the corpus stale under a new version, so every process rebuilds it rather than serving it"""
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        version = await db_service.get_policy_corpus_version()
+        if version is None:
+            return
+        if await db_service.save_policy_corpus({"version": version + 1, "stale": True}, expected_version=version):
+            return
+    raise Exception(f"corpus changed concurrently {MAX_UPDATE_ATTEMPTS} times")
+
+
+async def _update_policy_corpus(
+    db_service,
+    change: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+    description: str
+) -> None:
+    """
+    Apply an incremental change to the stored manifest (best effort, never raises)
+
+    Only the manifest (a few hundred bytes per policy) is read and rewritten, never
+    the policy texts. If the change cannot be applied, the corpus is marked stale so
+    it is rebuilt from the policies table on next use rather than served stale.
+    """
+    try:
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            row = await db_service.get_policy_corpus()
+            if row is None:
+                # Not built yet: the next load builds it from the (already updated) policies table
+                return
+            if row.get("stale"):
+                # Still bump the version, so a rebuild that read the policies before this change retries
+                saved = await db_service.save_policy_corpus({"version": row["version"] + 1}, expected_version=row["version"])
+            else:
+                saved = await db_service.save_policy_corpus(
+                    {"version": row["version"] + 1, "manifest": change(row["manifest"] or [])},
+                    expected_version=row["version"]
+                )
+            if saved:
+                logger.info(f"Policy corpus version {row['version'] + 1}: {description}")
+                return
+        raise Exception(f"corpus changed concurrently {MAX_UPDATE_ATTEMPTS} times")
+    except Exception as e:
+        logger.warning(f"Could not update the policy corpus ({description}): {str(e)}")
+        try:
+            await _invalidate_policy_corpus(db_service)
+        except Exception as invalidate_error:
+            logger.error(f"Could not mark the policy corpus stale: {str(invalidate_error)}")
+
+
+async def add_policy_to_corpus(db_service, policy_id: str, name: str, extracted_text: str) -> None:
+    """Add an uploaded policy to the corpus (newest first, like the policies list)"""
+    entry = _manifest_entry({"id": policy_id, "name": name}, extracted_text)
+    await _update_policy_corpus(
+        db_service,
+        lambda manifest: [entry] + [p for p in manifest if p["id"] != policy_id],
+        f"added policy {policy_id}"
+    )
+
+
+async def remove_policies_from_corpus(db_service, policy_ids: List[str]) -> None:
+    """Remove deleted policies from the corpus"""
+    removed = set(policy_ids)
+    if not removed:
+        return
+    await _update_policy_corpus(
+        db_service,
+        lambda manifest: [p for p in manifest if p["id"] not in removed],
+        f"removed {len(removed)} {'policy' if len(removed) == 1 else 'policies'}"
+    )
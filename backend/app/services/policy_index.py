@@ -0,0 +1,404 @@
+"""
+Retrieval-augmented policy context using a local BM25 index
+"""
+
+import hashlib
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from app.services.generation_engine import estimate_tokens
+from app.services.policy_pages import format_page_range, load_policy_pages, pages_for_span
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_WORD_PATTERN = re.compile(r"\S+")
+
+_STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been before being below between both but by
+can could did do does doing during each for from further had has have having how i if in into is
+it its itself may more most must no nor not of on once only or other our ours out over own same
+shall should so some such than that the their theirs them then there these they this those through
+to too under until up very was we were what when where which while who whom why will with would
+you your yours
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into alphanumeric terms, drop stopwords and apply light stemming"""
+    terms = []
+    for term in _TOKEN_PATTERN.findall(text.lower()):
+        if len(term) < 2 or term in _STOPWORDS:
+            continue
+        # Light plural stemming so "policies"/"policy" and "controls"/"control" match
+        if len(term) > 4 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def _paragraphs(text: str) -> List[tuple]:
+    """Non-empty paragraphs (split on blank lines, stripped) with their start and end offsets"""
+    paragraphs = []
+    start = 0
+    for match in [*_PARAGRAPH_BREAK.finditer(text), None]:
+        segment = text[start:match.start() if match else len(text)]
+        paragraph = segment.strip()
+        if paragraph:
+            offset = start + len(segment) - len(segment.lstrip())
+            paragraphs.append((paragraph, offset, offset + len(paragraph)))
+        if match:
+            start = match.end()
+    return paragraphs
+
+
+def chunk_text(
+    text: str,
+    chunk_tokens: int = 400,
+    overlap_tokens: int = 50,
+    pages: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Split policy text into passages of roughly `chunk_tokens` tokens
+
+    Paragraphs are packed together until the chunk is full; paragraphs longer than
+    a chunk are split into overlapping word windows.
+
+    Args:
+        text: Full extracted policy text
+        chunk_tokens: Target passage size in (estimated) tokens
+        overlap_tokens: Overlap between windows of an oversized paragraph
+        pages: The policy's page records (see PDFProcessor.paginate), to record the
+            pages each passage spans
+
+    Returns:
+        List[Dict]: Passages with chunk_index, content and token_count (and page_start,
+            page_end when pages are given)
+    """
+    chunk_chars = chunk_tokens * 4
+    overlap_chars = overlap_tokens * 4
+
+    # Pieces and words carry their (start, end) offsets in the text for page provenance
+    pieces: List[tuple] = []
+    for paragraph, paragraph_start, paragraph_end in _paragraphs(text or ""):
+        if len(paragraph) <= chunk_chars:
+            pieces.append((paragraph, paragraph_start, paragraph_end))
+            continue
+        words = [
+            (m.group(), paragraph_start + m.start(), paragraph_start + m.end())
+            for m in _WORD_PATTERN.finditer(paragraph)
+        ]
+        window: List[tuple] = []
+        window_len = 0
+        for word in words:
+            window.append(word)
+            window_len += len(word[0]) + 1
+            if window_len >= chunk_chars:
+                pieces.append((" ".join(w[0] for w in window), window[0][1], window[-1][2]))
+                # Carry the tail of the window over as overlap
+                tail: List[tuple] = []
+                tail_len = 0
+                for tail_word in reversed(window):
+                    if tail_len + len(tail_word[0]) + 1 > overlap_chars:
+                        break
+                    tail.insert(0, tail_word)
+                    tail_len += len(tail_word[0]) + 1
+                window, window_len = tail, tail_len
+        if window:
+            pieces.append((" ".join(w[0] for w in window), window[0][1], window[-1][2]))
+
+    spans: List[tuple] = []
+    current: List[tuple] = []
+    current_len = 0
+    for piece in pieces:
+        if current and current_len + len(piece[0]) > chunk_chars:
+            spans.append(("\n\n".join(p[0] for p in current), current[0][1], current[-1][2]))
+            current, current_len = [], 0
+        current.append(piece)
+        current_len += len(piece[0]) + 2
+    if current:
+        spans.append(("\n\n".join(p[0] for p in current), current[0][1], current[-1][2]))
+
+    chunks = []
+    for idx, (content, start, end) in enumerate(spans):
+        chunk = {"chunk_index": idx, "content": content, "token_count": estimate_tokens(content)}
+        if pages:
+            chunk["page_start"], chunk["page_end"] = pages_for_span(pages, start, end)
+        chunks.append(chunk)
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a list of passages, kept entirely in memory"""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_count = len(documents)
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)
+
+        for doc_idx, document in enumerate(documents):
+            terms = tokenize(document)
+            self.doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((doc_idx, frequency))
+
+        self.avg_doc_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0.0
+        self.idf = {
+            term: math.log(1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int = 10) -> List[tuple]:
+        """
+        Score passages against a query
+
+        Returns:
+            List[tuple]: (doc_index, score) pairs, best first, only positive scores
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_idx, frequency in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_idx] / (self.avg_doc_length or 1)
+                scores[doc_idx] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+
+class PolicyRetriever:
+    """Selects the most relevant policy passages for a question"""
+
+    def __init__(self, chunks: List[Dict[str, Any]]):
+        """
+        Args:
+            chunks: Passages with policy_id, policy_name, chunk_index, content and token_count
+        """
+        self.chunks = chunks
+        self.index = BM25Index([c["content"] for c in chunks])
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.chunks
+
+    def select_passages(self, question: str, top_k: int = 8, token_budget: int = 6000) -> List[Dict[str, Any]]:
+        """Return the best-scoring passages that fit in the token budget"""
+        return _fit_budget([self.rank_passages(question, top_k)], token_budget)
+
+    def rank_passages(self, question: str, top_k: int = 8) -> List[Dict[str, Any]]:
+        """Return the top_k passages for a question with their scores, best first"""
+        return [{**self.chunks[doc_idx], "score": score} for doc_idx, score in self.index.search(question, top_k=top_k)]
+
+    def select_context(self, question: str, top_k: int = 8, token_budget: int = 6000) -> str:
+        """Build the policy context string for a single question"""
+        return format_passages(self.select_passages(question, top_k, token_budget))
+
+
+def _fit_budget(rankings: List[List[Dict[str, Any]]], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Select deduplicated passages from ranked lists under one token budget
+
+    The lists are taken in turns (every list's best passage, then every list's
+    second best, ...) so no question of a batch crowds out the others.
+    """
+    selected: Dict[tuple, Dict[str, Any]] = {}
+    used_tokens = 0
+    for rank in range(max((len(r) for r in rankings), default=0)):
+        for ranking in rankings:
+            if rank >= len(ranking):
+                continue
+            passage = ranking[rank]
+            key = (passage.get("policy_id"), passage["chunk_index"])
+            if key in selected:
+                continue
+            tokens = passage.get("token_count") or estimate_tokens(passage["content"])
+            if used_tokens + tokens > token_budget:
+                continue
+            selected[key] = passage
+            used_tokens += tokens
+
+    # Present passages in document order so related sections read naturally
+    return sorted(selected.values(), key=lambda c: (c.get("policy_name") or "", c["chunk_index"]))
+
+
+def _passage_header(passage: Dict[str, Any]) -> str:
+    fields = [f"Policy: {passage.get('policy_name') or 'Unknown'}", f"Section {passage['chunk_index'] + 1}"]
+    page_range = format_page_range(passage.get("page_start"), passage.get("page_end"))
+    if page_range:
+        fields.append(page_range)
+    return f"[{' | '.join(fields)}]"
+
+
+def format_passages(passages: List[Dict[str, Any]]) -> str:
+    """Render passages with a policy (and page) header so answers can reference the source"""
+    return "\n\n".join(f"{_passage_header(p)}\n{p['content']}" for p in passages)
+
+
+async def ingest_policy_chunks(
+    db_service,
+    policy_id: str,
+    extracted_text: str,
+    settings,
+    pages: Optional[List[Dict[str, Any]]] = None
+) -> int:
+    """
+    Chunk a policy and store its passages (called from ingest_policy)
+
+    Args:
+        pages: The policy's page records, to store the pages each passage spans
+
+    Returns:
+        int: Number of passages stored
+    """
+    chunks = chunk_text(
+        extracted_text,
+        chunk_tokens=settings.retrieval_chunk_tokens,
+        overlap_tokens=settings.retrieval_chunk_overlap_tokens,
+        pages=pages
+    )
+    await db_service.create_policy_chunks(policy_id, chunks)
+    return len(chunks)
+
+
+async def load_policy_chunks(
+    db_service,
+    settings,
+    policies: List[Dict[str, Any]],
+    chunks_table_available: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Load the stored passages of the given policies (records with "id" and "name")
+
+    Policies uploaded before the policy_chunks migration (or whose chunking failed)
+    are chunked on the fly and backfilled, so every policy is always searchable.
+    """
+    names = {p["id"]: p.get("name") for p in policies}
+    chunk_rows = []
+    if chunks_table_available:
+        try:
+            # Filtering a few policies server-side saves transfer; long ID lists would overflow the URL
+            chunk_rows = await db_service.get_policy_chunks(list(names) if len(names) <= 50 else None)
+        except Exception as e:
+            logger.warning(f"policy_chunks table unavailable, chunking policies on the fly: {str(e)}")
+            logger.warning("Run migration: add_policy_chunks_table.sql")
+            chunks_table_available = False
+
+    chunks = [
+        {**row, "policy_name": names.get(row["policy_id"])}
+        for row in chunk_rows
+        if row["policy_id"] in names
+    ]
+
+    chunked_ids = {row["policy_id"] for row in chunk_rows}
+    for policy in policies:
+        if policy["id"] in chunked_ids:
+            continue
+        full_policy = await db_service.get_policy_by_id(policy["id"])
+        text = (full_policy or {}).get("extracted_text") or ""
+        # The page index (offsets only) is enough to give the passages their pages
+        page_index = await load_policy_pages(db_service, policy["id"], include_content=False)
+        policy_chunks = chunk_text(
+            text,
+            chunk_tokens=settings.retrieval_chunk_tokens,
+            overlap_tokens=settings.retrieval_chunk_overlap_tokens,
+            pages=page_index
+        )
+        chunks.extend({**c, "policy_id": policy["id"], "policy_name": policy.get("name")} for c in policy_chunks)
+        if chunks_table_available and policy_chunks:
+            try:
+                await db_service.create_policy_chunks(policy["id"], policy_chunks)
+                logger.info(f"Backfilled {len(policy_chunks)} chunks for policy {policy['id']}")
+            except Exception as e:
+                logger.warning(f"Could not backfill chunks for policy {policy['id']}: {str(e)}")
+    return chunks
+
+
+class PolicyContext:
+    """Policy context source for a generation run: retrieved passages or the full corpus"""
+
+    def __init__(
+        self,
+        retriever: Optional[PolicyRetriever] = None,
+        full_text: str = "",
+        top_k: int = 8,
+        token_budget: int = 6000,
+        corpus_hash: Optional[str] = None,
+        batch_token_budget: Optional[int] = None
+    ):
+        """
+        Args:
+            retriever: Passage retriever (retrieval mode), or None to send full_text
+            full_text: Joined policy text sent with every question
+            top_k: Maximum passages per question
+            token_budget: Maximum policy context tokens per question
+            corpus_hash: Content hash of the policy corpus, when already known (see policy_corpus)
+            batch_token_budget: Maximum policy context tokens per batched request (defaults to token_budget)
+        """
+        self.retriever = retriever
+        self.full_text = full_text
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.batch_token_budget = batch_token_budget or token_budget
+        self.corpus_hash = corpus_hash
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        if self.retriever is not None:
+            return self.retriever.is_empty
+        return not self.full_text
+
+    @property
+    def is_shared(self) -> bool:
+        """True when every question gets the same context (so it can be prompt-cached)"""
+        return self.retriever is None
+
+    @property
+    def max_tokens(self) -> int:
+        """Upper bound on context tokens per question (used for rate limiting)"""
+        if self.retriever is not None:
+            return self.token_budget
+        return estimate_tokens(self.full_text)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the policy content and selection settings; changes when a policy is added, edited or deleted"""
+        if self._fingerprint is None:
+            if self.corpus_hash is not None:
+                mode = f"retrieval:{self.top_k}:{self.token_budget}" if self.retriever is not None else "full"
+                source = f"{mode}\n{self.corpus_hash}"
+            elif self.retriever is not None:
+                # Per-policy content hashes over the passages, in (policy, chunk) order
+                policies: Dict[str, Any] = defaultdict(hashlib.sha256)
+                for chunk in sorted(self.retriever.chunks, key=lambda c: (str(c.get("policy_id")), c.get("chunk_index", 0))):
+                    policies[str(chunk.get("policy_id"))].update(chunk["content"].encode("utf-8") + b"\0")
+                corpus = "\n".join(f"{policy_id}:{digest.hexdigest()}" for policy_id, digest in sorted(policies.items()))
+                source = f"retrieval:{self.top_k}:{self.token_budget}\n{corpus}"
+            else:
+                source = f"full\n{self.full_text}"
+            self._fingerprint = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def for_question(self, question: str) -> str:
+        """Policy context to send with a single question"""
+        if self.retriever is not None:
+            return self.retriever.select_context(question, self.top_k, self.token_budget)
+        return self.full_text
+
+    def for_questions(self, questions: List[str]) -> str:
+        """Policy context for several questions answered in one request (deduplicated passages, one shared budget)"""
+        if self.retriever is None:
+            return self.full_text
+
+        rankings = [self.retriever.rank_passages(question, self.top_k) for question in questions]
+        return format_passages(_fit_budget(rankings, self.batch_token_budget))
@@ -0,0 +1,186 @@
+"""
+Background ingestion pipeline for uploaded policies
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.answer_cache import invalidate_answer_cache
+from app.services.pdf_extraction import get_pdf_extraction_pool
+from app.services.policy_corpus import add_policy_to_corpus
+from app.services.policy_index import ingest_policy_chunks
+from app.services.policy_pages import join_page_records, store_policy_pages
+from app.services.upload_dedup import find_duplicate_policy, policy_text_hash
+from app.services.upload_spool import SpooledUpload
+
+logger = logging.getLogger(__name__)
+
+POLICY_QUEUED = "queued"
+POLICY_EXTRACTING = "extracting"
+POLICY_INDEXED = "indexed"
+POLICY_FAILED = "failed"
+POLICY_DUPLICATE = "duplicate"
+
+PROCESSING_STATUSES = (POLICY_QUEUED, POLICY_EXTRACTING)
+
+
+async def ingest_policy(db_service, policy_id: str, name: str, source, settings, force: bool = False) -> None:
+    """
+    Extract, store, chunk and index an uploaded policy, recording its status
+
+    Args:
+        db_service: Database service
+        policy_id: Policy created with status "queued"
+        name: Policy name
+        source: PDF bytes or path (see SpooledUpload.source)
+        settings: Application settings
+        force: Index the policy even if an existing policy has the same text
+
+    Raises:
+        Exception: If extraction or storing the text fails (the policy is marked failed first)
+    """
+    try:
+        await db_service.update_policy(policy_id, {"status": POLICY_EXTRACTING})
+        pages, normalization_report = await get_pdf_extraction_pool(settings).extract_paginated(source)
+        # extracted_text is derived from the pages, so page offsets hold in it
+        extracted_text = join_page_records(pages)
+        text_sha256 = policy_text_hash(extracted_text)
+
+        if not force:
+            duplicate = await find_duplicate_policy(db_service, text_sha256=text_sha256, exclude_id=policy_id)
+            if duplicate:
+                # Same document as one already indexed: store no second copy of its text
+                await db_service.update_policy(policy_id, {
+                    "status": POLICY_DUPLICATE,
+                    "status_message": f"Same content as '{duplicate['name']}'",
+                    "text_sha256": text_sha256,
+                })
+                logger.info(f"Policy {policy_id} duplicates policy {duplicate['id']}, not indexed")
+                return
+
+        # The text is stored before indexing so a corpus rebuild always sees it
+        updates = {"extracted_text": extracted_text, "text_sha256": text_sha256}
+        if normalization_report is not None:
+            updates["normalization_report"] = normalization_report
+        if not await db_service.update_policy(policy_id, updates):
+            logger.info(f"Policy {policy_id} was deleted during extraction, skipping indexing")
+            return
+    except Exception as e:
+        logger.error(f"Ingestion of policy {policy_id} failed: {str(e)}")
+        await _mark_failed(db_service, policy_id, str(e))
+        raise
+
+    # Pages are best effort: without them the policy is only served as a whole
+    try:
+        await store_policy_pages(db_service, policy_id, pages)
+    except Exception as e:
+        logger.warning(f"Could not store pages of policy {policy_id}: {str(e)}")
+        logger.warning("Run migration: add_policy_pages_table.sql")
+
+    # Chunking failures are not fatal: the retriever backfills missing chunks on first use
+    chunk_count = 0
+    try:
+        chunk_count = await ingest_policy_chunks(db_service, policy_id, extracted_text, settings, pages=pages)
+    except Exception as e:
+        logger.warning(f"Could not index policy {policy_id}: {str(e)}")
+
+    await add_policy_to_corpus(db_service, policy_id, name, extracted_text)
+    # Cached answers were generated without this policy
+    invalidate_answer_cache(settings)
+
+    await db_service.update_policy(policy_id, {"status": POLICY_INDEXED, "status_message": None})
+    logger.info(f"Policy {policy_id} indexed: {len(extracted_text)} characters, {chunk_count} passages")
+
+
+async def _mark_failed(db_service, policy_id: str, message: str) -> None:
+    try:
+        await db_service.update_policy(policy_id, {"status": POLICY_FAILED, "status_message": message[:1000]})
+    except Exception as e:
+        logger.error(f"Could not mark policy {policy_id} as failed: {str(e)}")
+
+
+def report_stale_ingestions(policies: List[Dict[str, Any]], stale_seconds: float) -> List[Dict[str, Any]]:
+    """
+    Report policies stuck in queued/extracting (their pipeline died with its process) as failed
+
+    Only the returned records change; the row is left for the user to delete or re-upload.
+    """
+    if stale_seconds <= 0:
+        return policies
+    cutoff = (datetime.utcnow() - timedelta(seconds=stale_seconds)).isoformat()
+    for policy in policies:
+        if policy.get("status") in PROCESSING_STATUSES and (policy.get("updated_at") or "") < cutoff:
+            policy["status"] = POLICY_FAILED
+            policy["status_message"] = "Processing was interrupted. Please upload the file again."
+    return policies
+
+
+class PolicyIngestionPipeline:
+    """Runs ingest_policy for uploaded policies in the background, a bounded number at a time"""
+
+    def __init__(self, settings, max_concurrency: int = 2):
+        """
+        Args:
+            settings: Application settings
+            max_concurrency: Policies processed at the same time in this process
+        """
+        self.settings = settings
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def submit(self, db_service, policy_id: str, name: str, upload: SpooledUpload, force: bool = False) -> None:
+        """Queue a policy for ingestion; the pipeline takes ownership of (and closes) the upload"""
+        task = asyncio.create_task(self._run(db_service, policy_id, name, upload, force))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, db_service, policy_id: str, name: str, upload: SpooledUpload, force: bool) -> None:
+        try:
+            async with self._semaphore:
+                await ingest_policy(db_service, policy_id, name, upload.source(), self.settings, force=force)
+        except asyncio.CancelledError:
+            await _mark_failed(db_service, policy_id, "Processing was interrupted by a server shutdown")
+            raise
+        except Exception:
+            # Already logged and recorded on the policy
+            pass
+        finally:
+            upload.close()
+
+    async def join(self) -> None:
+        """Wait for every queued policy to finish"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Cancel unfinished ingestions (they are marked failed)"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.info(f"Cancelling {len(tasks)} policy ingestions")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_pipeline: Optional[PolicyIngestionPipeline] = None
+
+
+def get_policy_ingestion_pipeline(settings) -> PolicyIngestionPipeline:
+    """Process-wide policy ingestion pipeline"""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = PolicyIngestionPipeline(settings, max_concurrency=settings.policy_ingestion_workers)
+    return _pipeline
+
+
+async def shutdown_policy_ingestion() -> None:
+    global _pipeline
+    if _pipeline is not None:
+        await _pipeline.shutdown()
+        _pipeline = None
@@ -0,0 +1,79 @@
+"""
+Per-page policy text with page-level provenance
+"""
+
+import bisect
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.pdf_processor import PAGE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+
+def join_page_records(pages: List[Dict[str, Any]]) -> str:
+    """The policy's extracted_text, derived from its page records"""
+    return PAGE_SEPARATOR.join(page["content"] for page in sorted(pages, key=lambda p: p["page_number"]))
+
+
+def pages_for_span(pages: List[Dict[str, Any]], start: int, end: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    First and last page numbers covering the text offsets [start, end)
+
+    Args:
+        pages: Page records (page_number, char_start) in page order
+        start: Offset of the first character in the joined text
+        end: Offset after the last character
+
+    Returns:
+        tuple: (page_start, page_end), or (None, None) without pages
+    """
+    if not pages:
+        return None, None
+    starts = [page["char_start"] for page in pages]
+    first = max(0, bisect.bisect_right(starts, start) - 1)
+    last = max(first, bisect.bisect_right(starts, max(start, end - 1)) - 1)
+    return pages[first]["page_number"], pages[last]["page_number"]
+
+
+def format_page_range(page_start: Optional[int], page_end: Optional[int]) -> str:
+    """Label for a page range ("Page 4", "Pages 4-5"); empty when the pages are unknown"""
+    if page_start is None:
+        return ""
+    if page_end is None or page_end == page_start:
+        return f"Page {page_start}"
+    return f"Pages {page_start}-{page_end}"
+
+
+async def store_policy_pages(db_service, policy_id: str, pages: List[Dict[str, Any]]) -> int:
+    """
+    Store a policy's pages (called from ingest_policy)
+
+    Returns:
+        int: Number of pages stored
+    """
+    return await db_service.create_policy_pages(policy_id, pages)
+
+
+async def load_policy_pages(
+    db_service,
+    policy_id: str,
+    start_page: Optional[int] = None,
+    end_page: Optional[int] = None,
+    include_content: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Load a page range of a policy (page numbers are 1-based and inclusive)
+
+    Without include_content only the page index (page_number, char_start, char_end)
+    is read. Policies stored before the policy_pages migration have no pages.
+
+    Returns:
+        List[Dict]: Page records in page order; empty if the policy has no stored pages
+    """
+    try:
+        return await db_service.get_policy_pages(policy_id, start_page, end_page, include_content=include_content)
+    except Exception as e:
+        logger.warning(f"Could not load pages of policy {policy_id}: {str(e)}")
+        logger.warning("Run migration: add_policy_pages_table.sql")
+        return []
@@ -0,0 +1,214 @@
+"""
+Live progress of answer generation runs, published as server-sent events
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Finished runs stay available this long so reconnecting clients get the final state
+FINISHED_RUN_TTL_SECONDS = 600
+
+# Coalesce token deltas per question to at most one event per interval
+TOKEN_FLUSH_INTERVAL_SECONDS = 0.1
+
+# Subscribers further behind than this stop receiving token deltas until they catch up
+MAX_QUEUED_TOKEN_EVENTS = 200
+
+
+class GenerationProgress:
+    """Progress state and subscribers of one generation run (events after it ended are dropped)"""
+
+    def __init__(self, questionnaire_id: str, total: int, mode: str):
+        self.questionnaire_id = questionnaire_id
+        self.mode = mode
+        self.status = "running"
+        self.counters: Dict[str, Any] = {"total": total, "succeeded": 0, "failed": 0}
+        self.active: Dict[str, str] = {}  # question_id -> text streamed so far
+        self.answers: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self._subscribers: List[asyncio.Queue] = []
+        self._pending_tokens: Dict[str, str] = {}
+        self._last_flush: Dict[str, float] = {}
+
+    @property
+    def finished(self) -> bool:
+        return self.status != "running"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything a newly connected client needs to render the run"""
+        return {
+            "questionnaire_id": self.questionnaire_id,
+            "mode": self.mode,
+            "status": self.status,
+            "counters": dict(self.counters),
+            "active": dict(self.active),
+            "answers": dict(self.answers),
+            "errors": dict(self.errors),
+        }
+
+    def question_started(self, question_id: str) -> None:
+        if self.finished:
+            return
+        self.active[question_id] = ""
+        self._publish("question_started", {"question_id": question_id})
+
+    def token_delta(self, question_id: str, text: str) -> None:
+        """Record streamed answer text; published at most every TOKEN_FLUSH_INTERVAL_SECONDS"""
+        if self.finished:
+            return
+        self.active[question_id] = self.active.get(question_id, "") + text
+        self._pending_tokens[question_id] = self._pending_tokens.get(question_id, "") + text
+        now = time.monotonic()
+        if now - self._last_flush.get(question_id, 0.0) >= TOKEN_FLUSH_INTERVAL_SECONDS:
+            self._flush_tokens(question_id, now)
+
+    def question_completed(self, question_id: str, answer: str, answer_source: str = "ai") -> None:
+        if self.finished:
+            return
+        self._pending_tokens.pop(question_id, None)
+        self._last_flush.pop(question_id, None)
+        self.active.pop(question_id, None)
+        self.errors.pop(question_id, None)
+        self.answers[question_id] = answer
+        self._publish("question_completed", {
+            "question_id": question_id,
+            "answer": answer,
+            "answer_source": answer_source,
+            "status": "unapproved"
+        })
+
+    def question_failed(self, question_id: str, error: str) -> None:
+        if self.finished:
+            return
+        self._pending_tokens.pop(question_id, None)
+        self._last_flush.pop(question_id, None)
+        self.active.pop(question_id, None)
+        self.errors[question_id] = error
+        self._publish("question_failed", {"question_id": question_id, "error": error})
+
+    def update_counters(self, stats: Any) -> None:
+        """Publish run-level counters from a GenerationStats"""
+        if self.finished:
+            return
+        self.counters.update({
+            "retries": stats.retries,
+            "throttled": stats.throttled,
+            "rate_limit_wait_seconds": round(stats.rate_limit_wait_seconds, 3),
+        })
+        self.counters["succeeded"] = len(self.answers)
+        self.counters["failed"] = len(self.errors)
+        self.counters["elapsed_seconds"] = round(time.time() - self.started_at, 3)
+        self._publish("progress", dict(self.counters))
+
+    def finish(self, stats: Any) -> None:
+        """Mark the run completed with its final GenerationStats"""
+        if self.finished:
+            return
+        self.counters.update({
+            "succeeded": stats.succeeded,
+            "failed": stats.failed,
+            "retries": stats.retries,
+            "throttled": stats.throttled,
+            "elapsed_seconds": round(stats.elapsed_seconds, 3),
+            "library_hits": stats.library_hits,
+            "answer_cache_hits": stats.answer_cache_hits,
+        })
+        self._end("completed", {"counters": dict(self.counters), "usage": stats.usage})
+
+    def fail(self, error: str) -> None:
+        """Mark the run as failed before it could complete"""
+        self._end("failed", {"counters": dict(self.counters), "error": error})
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a snapshot event, then live events until the run ends"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            # Decided at snapshot time: events queued while the client reads the snapshot are still delivered
+            finished = self.finished
+            yield {"event": "snapshot", "data": self.snapshot()}
+            if finished:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] in ("completed", "failed"):
+                    return
+        finally:
+            self._subscribers.remove(queue)
+
+    def _end(self, status: str, data: Dict[str, Any]) -> None:
+        if self.finished:
+            return
+        self.status = status
+        self.finished_at = time.time()
+        self.active.clear()
+        self._pending_tokens.clear()
+        self._publish(status, data)
+
+    def _flush_tokens(self, question_id: str, now: float) -> None:
+        text = self._pending_tokens.pop(question_id, "")
+        self._last_flush[question_id] = now
+        if not text:
+            return
+        event = {"event": "token", "data": {"question_id": question_id, "text": text}}
+        for queue in self._subscribers:
+            if queue.qsize() < MAX_QUEUED_TOKEN_EVENTS:
+                queue.put_nowait(event)
+
+    def _publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        event = {"event": event_type, "data": data}
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+
+class ProgressBroker:
+    """Registry of generation runs by questionnaire"""
+
+    def __init__(self):
+        self._runs: Dict[str, GenerationProgress] = {}
+
+    def start(self, questionnaire_id: str, total: int, mode: str) -> Tuple[GenerationProgress, bool]:
+        """
+        Register a new run unless the questionnaire already has a running one
+
+        Returns:
+            tuple: (the run, True if a new run was registered and should be started)
+        """
+        self._evict_finished()
+        previous = self._runs.get(questionnaire_id)
+        if previous and not previous.finished:
+            return previous, False
+        progress = GenerationProgress(questionnaire_id, total, mode)
+        self._runs[questionnaire_id] = progress
+        return progress, True
+
+    def get(self, questionnaire_id: str) -> Optional[GenerationProgress]:
+        return self._runs.get(questionnaire_id)
+
+    def _evict_finished(self) -> None:
+        cutoff = time.time() - FINISHED_RUN_TTL_SECONDS
+        for questionnaire_id, progress in list(self._runs.items()):
+            if progress.finished_at and progress.finished_at < cutoff:
+                del self._runs[questionnaire_id]
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode an event as a server-sent events frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+_broker = ProgressBroker()
+
+
+def get_progress_broker() -> ProgressBroker:
+    """Process-wide progress broker"""
+    return _broker
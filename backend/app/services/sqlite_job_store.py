@@ -0,0 +1,309 @@
+"""
+SQLite-backed generation job queue
+"""
+
+import logging
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generation_jobs (
+  id TEXT PRIMARY KEY,
+  questionnaire_id TEXT NOT NULL,
+  mode TEXT NOT NULL DEFAULT 'single',
+  batch_size INTEGER NOT NULL DEFAULT 1,
+  status TEXT NOT NULL DEFAULT 'queued',
+  total_count INTEGER NOT NULL DEFAULT 0,
+  succeeded_count INTEGER NOT NULL DEFAULT 0,
+  failed_count INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  error TEXT,
+  started_at REAL,
+  finished_at REAL,
+  created_at REAL NOT NULL,
+  updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generation_tasks (
+  id TEXT PRIMARY KEY,
+  job_id TEXT NOT NULL REFERENCES generation_jobs(id) ON DELETE CASCADE,
+  question_id TEXT NOT NULL,
+  question_text TEXT NOT NULL,
+  position INTEGER NOT NULL DEFAULT 0,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  lease_owner TEXT,
+  lease_expires_at REAL,
+  answer TEXT,
+  answer_source TEXT,
+  error TEXT,
+  finished_at REAL,
+  created_at REAL NOT NULL,
+  updated_at REAL NOT NULL,
+  UNIQUE (job_id, question_id)
+);
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_claim ON generation_tasks(job_id, status, position);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_finished ON generation_tasks(job_id, finished_at);
+"""
+
+# Pending tasks, and running tasks whose worker stopped renewing the lease
+CLAIMABLE = "(t.status = 'pending' OR (t.status = 'running' AND t.lease_expires_at < ?))"
+
+# Marks a job completed once every task has succeeded or failed
+FINISH_JOB = (
+    "UPDATE generation_jobs SET status = 'completed', finished_at = ?, updated_at = ? "
+    "WHERE id = ? AND status IN ('queued', 'running') AND succeeded_count + failed_count >= total_count"
+)
+
+
+class SQLiteJobStore:
+    """Generation job queue in a local SQLite database"""
+
+    def __init__(self, path: str, db_service: Optional[Any] = None, busy_timeout_seconds: float = 30.0):
+        """
+        Initialize SQLite job store
+
+        Args:
+            path: Database file (created if missing; shared by all workers on the host)
+            db_service: Optional DatabaseService that completed answers are saved to
+            busy_timeout_seconds: How long to wait for another process's write lock
+        """
+        self.path = path
+        self.db_service = db_service
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_seconds, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        # Stores created before library reuse lack the answer_source column
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(generation_tasks)")}
+        if "answer_source" not in columns:
+            self._conn.execute("ALTER TABLE generation_tasks ADD COLUMN answer_source TEXT")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+    async def create_generation_job(self, job_data: Dict[str, Any], questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Queue a generation job with one task per question"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO generation_jobs (id, questionnaire_id, mode, batch_size, status, total_count, max_attempts, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, job_data["questionnaire_id"], job_data.get("mode", "single"), job_data.get("batch_size", 1),
+                 len(questions), job_data.get("max_attempts", 3), now, now)
+            )
+            conn.executemany(
+                "INSERT INTO generation_tasks (id, job_id, question_id, question_text, position, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(str(uuid.uuid4()), job_id, q["id"], q["question_text"], position, now, now)
+                 for position, q in enumerate(questions)]
+            )
+        logger.info(f"Queued generation job {job_id} with {len(questions)} tasks")
+        return await self.get_generation_job(job_id)
+
+    async def get_generation_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM generation_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    async def get_generation_jobs(
+        self,
+        questionnaire_id: Optional[str] = None,
+        statuses: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        query, params = "SELECT * FROM generation_jobs WHERE 1 = 1", []
+        if questionnaire_id:
+            query += " AND questionnaire_id = ?"
+            params.append(questionnaire_id)
+        if statuses:
+            query += f" AND status IN ({', '.join('?' for _ in statuses)})"
+            params.extend(statuses)
+        rows = self._conn.execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [dict(row) for row in rows]
+
+    async def get_generation_tasks(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get every task of a job in question order"""
+        rows = self._conn.execute(
+            "SELECT * FROM generation_tasks WHERE job_id = ? ORDER BY position", (job_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    async def get_finished_generation_tasks(self, job_id: str, since: Optional[Any] = None) -> List[Dict[str, Any]]:
+        query = ("SELECT id, question_id, status, answer, answer_source, error, finished_at FROM generation_tasks "
+                 "WHERE job_id = ? AND status IN ('succeeded', 'failed')")
+        params: List[Any] = [job_id]
+        if since is not None:
+            query += " AND finished_at >= ?"
+            params.append(since)
+        rows = self._conn.execute(query + " ORDER BY finished_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    async def claim_generation_tasks(self, worker_id: str, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            exhausted = conn.execute(
+                "SELECT t.id, t.job_id, t.attempts FROM generation_tasks t JOIN generation_jobs j ON j.id = t.job_id "
+                "WHERE t.status = 'running' AND t.lease_expires_at < ? AND t.attempts >= j.max_attempts",
+                (now,)
+            ).fetchall()
+            for task in exhausted:
+                conn.execute(
+                    "UPDATE generation_tasks SET status = 'failed', error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                    "finished_at = ?, updated_at = ? WHERE id = ?",
+                    (f"Worker lease expired after {task['attempts']} attempts", now, now, task["id"])
+                )
+                conn.execute("UPDATE generation_jobs SET failed_count = failed_count + 1 WHERE id = ?", (task["job_id"],))
+            # A job whose last open tasks were just failed has no claimable task left to finish it
+            for job_id in {task["job_id"] for task in exhausted}:
+                if conn.execute(FINISH_JOB, (now, now, job_id)).rowcount:
+                    logger.warning(f"Generation job {job_id} completed after its last task leases expired")
+
+            job = conn.execute(
+                "SELECT j.* FROM generation_jobs j WHERE j.status IN ('queued', 'running') AND EXISTS ("
+                f"SELECT 1 FROM generation_tasks t WHERE t.job_id = j.id AND {CLAIMABLE}) "
+                "ORDER BY j.created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if job is None:
+                return []
+
+            conn.execute(
+                "UPDATE generation_jobs SET status = 'running', started_at = COALESCE(started_at, ?), updated_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (now, now, job["id"])
+            )
+            task_limit = limit * (max(job["batch_size"], 1) if job["mode"] == "batched" else 1)
+            task_ids = [row["id"] for row in conn.execute(
+                f"SELECT t.id FROM generation_tasks t WHERE t.job_id = ? AND {CLAIMABLE} ORDER BY t.position LIMIT ?",
+                (job["id"], now, task_limit)
+            ).fetchall()]
+            placeholders = ", ".join("?" for _ in task_ids)
+            conn.execute(
+                "UPDATE generation_tasks SET status = 'running', lease_owner = ?, lease_expires_at = ?, "
+                f"attempts = attempts + 1, updated_at = ? WHERE id IN ({placeholders})",
+                (worker_id, now + lease_seconds, now, *task_ids)
+            )
+            rows = conn.execute(
+                f"SELECT * FROM generation_tasks WHERE id IN ({placeholders}) ORDER BY position", task_ids
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    async def renew_generation_leases(self, worker_id: str, task_ids: List[str], lease_seconds: int) -> int:
+        if not task_ids:
+            return 0
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE generation_tasks SET lease_expires_at = ?, updated_at = ? "
+                f"WHERE id IN ({', '.join('?' for _ in task_ids)}) AND status = 'running' AND lease_owner = ?",
+                (now + lease_seconds, now, *task_ids, worker_id)
+            )
+            return cursor.rowcount
+
+    async def complete_generation_task(self, task_id: str, worker_id: str, answer: str, answer_source: str = "ai") -> bool:
+        task = self._held_task(task_id, worker_id)
+        if task is None:
+            return False
+        if self.db_service is not None:
+            # Saved before the task is marked succeeded: a crash in between re-runs the
+            # question rather than losing its answer
+            await self.db_service.update_question_answer(task["question_id"], answer, status="unapproved", answer_source=answer_source)
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE generation_tasks SET status = 'succeeded', answer = ?, answer_source = ?, error = NULL, "
+                "lease_owner = NULL, lease_expires_at = NULL, finished_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (answer, answer_source, now, now, task_id, worker_id)
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute("UPDATE generation_jobs SET succeeded_count = succeeded_count + 1, updated_at = ? WHERE id = ?",
+                         (now, task["job_id"]))
+        return True
+
+    async def fail_generation_task(self, task_id: str, worker_id: str, error: str) -> Optional[str]:
+        now = time.time()
+        with self._transaction() as conn:
+            task = conn.execute(
+                "SELECT t.job_id, t.attempts, j.max_attempts FROM generation_tasks t JOIN generation_jobs j ON j.id = t.job_id "
+                "WHERE t.id = ? AND t.status = 'running' AND t.lease_owner = ?",
+                (task_id, worker_id)
+            ).fetchone()
+            if task is None:
+                return None
+            status = "failed" if task["attempts"] >= task["max_attempts"] else "pending"
+            conn.execute(
+                "UPDATE generation_tasks SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "finished_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, now if status == "failed" else None, now, task_id)
+            )
+            if status == "failed":
+                conn.execute("UPDATE generation_jobs SET failed_count = failed_count + 1, updated_at = ? WHERE id = ?",
+                             (now, task["job_id"]))
+        return status
+
+    async def release_generation_tasks(self, worker_id: str, task_ids: List[str]) -> int:
+        if not task_ids:
+            return 0
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE generation_tasks SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? "
+                f"WHERE id IN ({', '.join('?' for _ in task_ids)}) AND status = 'running' AND lease_owner = ?",
+                (time.time(), *task_ids, worker_id)
+            )
+            return cursor.rowcount
+
+    async def finish_generation_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(FINISH_JOB, (now, now, job_id))
+            if cursor.rowcount == 0:
+                return None
+        return await self.get_generation_job(job_id)
+
+    async def fail_generation_job(self, job_id: str, error: str) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE generation_tasks SET status = 'failed', error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "finished_at = ?, updated_at = ? WHERE job_id = ? AND status IN ('pending', 'running')",
+                (error, now, now, job_id)
+            )
+            failed = cursor.rowcount
+            cursor = conn.execute(
+                "UPDATE generation_jobs SET status = 'failed', error = ?, failed_count = failed_count + ?, "
+                "finished_at = ?, updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                (error, failed, now, now, job_id)
+            )
+            return cursor.rowcount > 0
+
+    def _held_task(self, task_id: str, worker_id: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT * FROM generation_tasks WHERE id = ? AND status = 'running' AND lease_owner = ?",
+            (task_id, worker_id)
+        ).fetchone()
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
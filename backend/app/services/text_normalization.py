@@ -0,0 +1,176 @@
+"""
+Text normalisation of extracted policy pages before storage
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Non-empty lines at the top and at the bottom of a page checked for boilerplate
+EDGE_LINES = 3
+# A line is boilerplate when it is on at least this share of the pages...
+REPEAT_RATIO = 0.5
+# ...and on at least this many pages
+MIN_REPEAT_PAGES = 3
+
+_DIGITS = re.compile(r"\d+")
+_PAGE_NUMBER = re.compile(
+    r"^(?:page\s*)?[-–—(\[]?\s*(\d{1,4})\s*[-–—)\]]?(?:\s*(?:of|/)\s*\d{1,4})?$",
+    re.IGNORECASE
+)
+# Header/footer lines whose page number changes from page to page ("Page 3 of 40", "Policy | Page 3")
+_PAGE_REFERENCE = re.compile(r"\bpage\s*\d+\s*(?:(?:of|/)\s*\d+|$|[|•·–—-])", re.IGNORECASE)
+_HYPHENATED = re.compile(r"(\w+)-\n([a-z]\w*)")
+_WORDS = re.compile(r"\w+(?:-\w+)*")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# First parts of compounds that keep their hyphen across a line break ("self-assessment")
+_PREFIXES = frozenset("""
+anti co cross cyber e end full high inter intra long low multi non off on one out over part post pre
+pro re real right role self semi short sub third top two under up well wide
+""".split())
+
+
+def _line_key(line: str) -> str:
+    """Line compared across pages: whitespace collapsed, case folded, page numbers masked"""
+    key = " ".join(line.split()).casefold()
+    # Only page references: other numbers (a value, a year) make the line differ between pages
+    return _DIGITS.sub("#", key) if _PAGE_REFERENCE.search(key) else key
+
+
+def _edge_lines(lines: List[str]) -> List[int]:
+    """Indexes of the first and last EDGE_LINES non-empty lines"""
+    filled = [index for index, line in enumerate(lines) if line.strip()]
+    return sorted(set(filled[:EDGE_LINES] + filled[-EDGE_LINES:]))
+
+
+def find_boilerplate(pages: List[str]) -> set:
+    """Keys (see _line_key) of the lines repeated at the top or bottom of most pages"""
+    filled = [page for page in pages if page.strip()]
+    threshold = max(MIN_REPEAT_PAGES, math.ceil(REPEAT_RATIO * len(filled)))
+    if len(filled) < threshold:
+        return set()
+    counts = Counter()
+    for page in filled:
+        lines = page.splitlines()
+        counts.update({_line_key(lines[index]) for index in _edge_lines(lines)})
+    # A label ("Retention period (days):") introduces the text after it, it is not a header
+    return {key for key, count in counts.items() if count >= threshold and key and not key.endswith(":")}
+
+
+def find_page_numbers(pages: List[Tuple[int, str]]) -> set:
+    """
+    (page index, line index) of the page numbers: a page's first or last non-empty line
+    that is only a number ("7", "- 7 -", "Page 7 of 40"), kept only where the numbers
+    run in step with the pages (same offset from the page number) on at least two pages
+    """
+    candidates: Dict[str, List[Tuple[int, int, int]]] = {"first": [], "last": []}
+    for page_index, (page_num, text) in enumerate(pages):
+        lines = text.splitlines()
+        filled = [index for index, line in enumerate(lines) if line.strip()]
+        for edge, line_index in (("first", filled[0] if filled else None), ("last", filled[-1] if filled else None)):
+            if line_index is None:
+                continue
+            match = _PAGE_NUMBER.match(" ".join(lines[line_index].split()))
+            if match:
+                candidates[edge].append((page_index, line_index, int(match.group(1)) - page_num))
+
+    found = set()
+    for entries in candidates.values():
+        offsets = Counter(offset for _, _, offset in entries)
+        if not offsets:
+            continue
+        offset, count = offsets.most_common(1)[0]
+        if count >= 2:
+            found.update((page_index, line_index) for page_index, line_index, other in entries if other == offset)
+    return found
+
+
+def _clean_page(text: str, boilerplate: set, page_numbers: set) -> Tuple[str, int]:
+    """(page without boilerplate and page numbers, whitespace collapsed; lines removed)"""
+    lines = text.splitlines()
+    removed = {index for index in _edge_lines(lines) if _line_key(lines[index]) in boilerplate} | page_numbers
+    kept = [_SPACES.sub(" ", line).strip() for index, line in enumerate(lines) if index not in removed]
+    return _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip(), len(removed)
+
+
+def _word_counts(pages: List[str]) -> Counter:
+    """Case-folded words (hyphenated compounds as one) outside the line-end hyphenations"""
+    counts = Counter()
+    for page in pages:
+        counts.update(word.casefold() for word in _WORDS.findall(_HYPHENATED.sub(" ", page)))
+    return counts
+
+
+def _join_hyphenated(first: str, second: str, words: Counter) -> bool:
+    """
+    Whether a word hyphenated across a line end is one word rather than a compound
+
+    Whichever form the rest of the document uses more wins; when it uses neither,
+    a known prefix or two known words keep the hyphen.
+    """
+    joined = words[(first + second).casefold()]
+    hyphenated = words[f"{first}-{second}".casefold()]
+    if joined != hyphenated:
+        return joined > hyphenated
+    first, second = first.casefold(), second.casefold()
+    return not (first in _PREFIXES or (words[first] and words[second]))
+
+
+def _dehyphenate(page: str, words: Counter) -> Tuple[str, int]:
+    """(page with line-end hyphenations joined or kept as compounds; words joined)"""
+    joined = 0
+
+    def replace(match: "re.Match") -> str:
+        nonlocal joined
+        if _join_hyphenated(match.group(1), match.group(2), words):
+            joined += 1
+            return match.group(1) + match.group(2)
+        return f"{match.group(1)}-{match.group(2)}"
+
+    return _HYPHENATED.sub(replace, page), joined
+
+
+def normalize_pages(pages: List[Tuple[int, str]]) -> Tuple[List[Tuple[int, str]], Dict[str, Any]]:
+    """
+    Remove repeated headers/footers and page numbers, de-hyphenate and collapse whitespace
+
+    Args:
+        pages: (page number, text) for every page of a document, as extracted
+
+    Returns:
+        tuple: (normalised pages in the same order, report with the page count,
+            characters before and after, their ratio, the distinct boilerplate lines
+            found, the lines removed and the words de-hyphenated)
+    """
+    boilerplate = find_boilerplate([text for _, text in pages])
+    page_numbers = find_page_numbers(pages)
+    cleaned = []
+    lines_removed = 0
+    for page_index, (page_num, text) in enumerate(pages):
+        page, removed = _clean_page(text, boilerplate, {line for index, line in page_numbers if index == page_index})
+        cleaned.append((page_num, page))
+        lines_removed += removed
+
+    words = _word_counts([page for _, page in cleaned])
+    normalized = []
+    hyphenations = 0
+    for page_num, page in cleaned:
+        page, joined = _dehyphenate(page, words)
+        normalized.append((page_num, page))
+        hyphenations += joined
+
+    before = sum(len(text) for _, text in pages)
+    after = sum(len(text) for _, text in normalized)
+    report = {
+        "pages": len(pages),
+        "characters_before": before,
+        "characters_after": after,
+        "ratio": round(after / before, 4) if before else 1.0,
+        "boilerplate_lines": len(boilerplate),
+        "lines_removed": lines_removed,
+        "hyphenations": hyphenations,
+    }
+    return normalized, report
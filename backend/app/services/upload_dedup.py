@@ -0,0 +1,127 @@
+"""
+Duplicate-upload detection by content hashing
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app.services.answer_library import normalize_question
+
+logger = logging.getLogger(__name__)
+
+
+def policy_text_hash(text: str) -> str:
+    """Hash of a policy's extracted text, insensitive to whitespace and case"""
+    normalized = " ".join((text or "").split()).casefold()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class QuestionsHasher:
+    """questions_hash computed one question at a time, for questionnaires parsed as a stream"""
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self.count = 0
+
+    def update(self, question: Dict[str, Any]) -> None:
+        line = normalize_question(question.get("question_text") or "")
+        self._sha256.update((f"\n{line}" if self.count else line).encode("utf-8"))
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+class QuestionSpool:
+    """
+    Parsed questions hashed and held in a temporary spool (JSON lines), so the
+    questionnaire's text_sha256 is known before anything is stored
+    """
+
+    def __init__(self, memory_threshold: int = 2 * 1024 * 1024, spool_dir: Optional[str] = None, preview_size: int = 3):
+        """
+        Args:
+            memory_threshold: Spool size in bytes past which it moves to a temporary file
+            spool_dir: Directory for the temporary file ("" or None = system temp directory)
+            preview_size: Number of leading questions kept in preview
+        """
+        self.hasher = QuestionsHasher()
+        self.preview: List[Dict[str, Any]] = []
+        self.preview_size = preview_size
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=memory_threshold, mode="w+", encoding="utf-8", prefix="questions-", dir=spool_dir or None
+        )
+
+    @property
+    def count(self) -> int:
+        return self.hasher.count
+
+    def hexdigest(self) -> str:
+        return self.hasher.hexdigest()
+
+    def extend(self, questions: Iterable[Dict[str, Any]]) -> None:
+        for question in questions:
+            self.hasher.update(question)
+            if len(self.preview) < self.preview_size:
+                self.preview.append(question)
+            self._file.write(json.dumps(question, default=str) + "\n")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._file.seek(0)
+        for line in self._file:
+            yield json.loads(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "QuestionSpool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def questions_hash(questions: List[Dict[str, Any]]) -> str:
+    """Hash of a questionnaire's questions in order (numbering, case and punctuation ignored)"""
+    hasher = QuestionsHasher()
+    for question in questions:
+        hasher.update(question)
+    return hasher.hexdigest()
+
+
+async def find_duplicate_policy(
+    db_service,
+    content_sha256: Optional[str] = None,
+    text_sha256: Optional[str] = None,
+    exclude_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Existing policy with the same upload bytes or normalised text (best effort: None on error)"""
+    try:
+        for column, value in (("content_sha256", content_sha256), ("text_sha256", text_sha256)):
+            if value:
+                match = await db_service.find_policy_by_hash(column, value, exclude_id=exclude_id)
+                if match:
+                    return match
+    except Exception as e:
+        logger.warning(f"Could not check for duplicate policies: {str(e)}")
+    return None
+
+
+async def find_duplicate_questionnaire(
+    db_service,
+    content_sha256: Optional[str] = None,
+    text_sha256: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Existing questionnaire with the same upload bytes or questions (best effort: None on error)"""
+    try:
+        for column, value in (("content_sha256", content_sha256), ("text_sha256", text_sha256)):
+            if value:
+                match = await db_service.find_questionnaire_by_hash(column, value)
+                if match:
+                    return match
+    except Exception as e:
+        logger.warning(f"Could not check for duplicate questionnaires: {str(e)}")
+    return None
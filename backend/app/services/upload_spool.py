@@ -0,0 +1,188 @@
+"""
+Streaming, size-capped upload ingestion
+"""
+
+import hashlib
+import io
+import logging
+import tempfile
+from typing import BinaryIO, Dict, Optional, Union
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File size exceeds maximum allowed size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class SpooledUpload:
+    """An upload copied to memory or a temporary file, with its size and content hash"""
+
+    def __init__(self, memory_threshold: int, spool_dir: Optional[str] = None):
+        self.memory_threshold = memory_threshold
+        self.spool_dir = spool_dir or None
+        self.size = 0
+        self.sha256 = ""
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file = None
+
+    @property
+    def path(self) -> Optional[str]:
+        """Path of the temporary file, when the upload was spooled to disk"""
+        return self._file.name if self._file is not None else None
+
+    def write(self, chunk: bytes) -> None:
+        if self._file is None and self.size + len(chunk) > self.memory_threshold:
+            self._file = tempfile.NamedTemporaryFile(prefix="upload-", dir=self.spool_dir)
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+        (self._file or self._buffer).write(chunk)
+        self.size += len(chunk)
+
+    def source(self) -> Union[bytes, str]:
+        """The content for processors: a file path when spooled to disk, else the bytes"""
+        if self._file is not None:
+            self._file.flush()
+            return self._file.name
+        return self._buffer.getvalue()
+
+    def open(self) -> BinaryIO:
+        """Binary file object positioned at the start (shared; do not close)"""
+        stream = self._file if self._file is not None else self._buffer
+        stream.flush()
+        stream.seek(0)
+        return stream
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = None
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _copy_upload(source: BinaryIO, spool: SpooledUpload, max_size: int, chunk_size: int) -> None:
+    digest = hashlib.sha256()
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if spool.size + len(chunk) > max_size:
+            raise UploadTooLargeError(max_size)
+        digest.update(chunk)
+        spool.write(chunk)
+    spool.sha256 = digest.hexdigest()
+
+
+async def spool_upload(
+    upload,
+    max_size: int,
+    chunk_size: int = 1024 * 1024,
+    memory_threshold: int = 2 * 1024 * 1024,
+    spool_dir: Optional[str] = None
+) -> SpooledUpload:
+    """
+    Copy an UploadFile into a SpooledUpload in chunks (in a worker thread)
+
+    Args:
+        upload: FastAPI/Starlette UploadFile (or any object with a binary .file)
+        max_size: Maximum file size in bytes
+        chunk_size: Bytes read per chunk
+        memory_threshold: Uploads larger than this are spooled to a temporary file
+        spool_dir: Directory for temporary files (system default when empty)
+
+    Returns:
+        SpooledUpload: Caller must close it (use as a context manager)
+
+    Raises:
+        UploadTooLargeError: As soon as more than max_size bytes have been read
+    """
+    spool = SpooledUpload(memory_threshold, spool_dir)
+    try:
+        await run_in_threadpool(_copy_upload, upload.file, spool, max_size, chunk_size)
+    except BaseException:
+        spool.close()
+        raise
+    logger.info(
+        f"Spooled upload {getattr(upload, 'filename', '')}: {spool.size} bytes "
+        f"({'disk' if spool.path else 'memory'}), sha256 {spool.sha256[:12]}"
+    )
+    return spool
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware rejecting upload request bodies over a per-path limit with 413"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            app: ASGI application
+            limits: Maximum body size in bytes by path prefix (the longest matching prefix applies)
+        """
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    async def __call__(self, scope, receive, send):
+        max_body_size = None
+        if scope["type"] == "http":
+            max_body_size = next((limit for prefix, limit in self.limits if scope["path"].startswith(prefix)), None)
+        if max_body_size is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_size:
+            # Rejected before any of the body is read
+            await self._reject(scope, send, max_body_size)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    exceeded = True
+                    raise UploadTooLargeError(max_body_size)
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Once the limit was hit, the app's (error) response is replaced by the 413
+            if exceeded:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except UploadTooLargeError:
+            pass
+        if exceeded and not response_started:
+            await self._reject(scope, send, max_body_size)
+
+    async def _reject(self, scope, send, max_body_size: int) -> None:
+        logger.warning(f"Rejected upload to {scope['path']}: request body over {max_body_size} bytes")
+        body = f'{{"detail":"Upload exceeds maximum allowed size of {max_body_size} bytes"}}'.encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
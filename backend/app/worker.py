@@ -0,0 +1,87 @@
+"""
+Generation worker process for the durable job queue (python -m app.worker)
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.config.settings import get_settings
+from app.services.ai_service import AIService
+from app.services.answer_cache import get_answer_cache
+from app.services.answer_library import load_answer_library
+from app.services.anthropic_client import close_anthropic_clients
+from app.services.database import DatabaseService
+from app.services.database_client import close_database_clients
+from app.services.generation_jobs import GenerationWorker, close_job_stores, get_job_store
+from app.services.policy_corpus import load_policy_context
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(worker_id: Optional[str] = None, exit_when_idle: bool = False) -> int:
+    """Run one generation worker until stopped; returns the number of answered questions"""
+    settings = get_settings()
+    if not settings.anthropic_api_key:
+        raise ValueError("ANTHROPIC_API_KEY is not set")
+
+    db_service = DatabaseService(
+        supabase_url=settings.supabase_url,
+        supabase_key=settings.supabase_key
+    )
+    store = get_job_store(settings, db_service)
+    # The engine owns retries/backoff, so disable the SDK's own retry loop
+    ai_service = AIService(settings.anthropic_api_key, max_retries=0, prompt_caching=settings.ai_prompt_caching)
+    worker = GenerationWorker(
+        store,
+        ai_service,
+        settings,
+        load_context=lambda: load_policy_context(db_service, settings),
+        worker_id=worker_id,
+        load_library=lambda: load_answer_library(db_service, settings),
+        answer_cache=get_answer_cache(settings)
+    )
+
+    stop = asyncio.Event()
+    run_task = asyncio.ensure_future(worker.run(stop, exit_when_idle=exit_when_idle))
+
+    def handle_signal() -> None:
+        if stop.is_set():
+            logger.warning("Second stop signal: cancelling the current claim")
+            run_task.cancel()
+        else:
+            logger.info("Stop signal: finishing the current claim")
+            stop.set()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, handle_signal)
+
+    try:
+        return await run_task
+    except asyncio.CancelledError:
+        return 0
+    finally:
+        await close_anthropic_clients()
+        close_database_clients()
+        close_job_stores()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Answer generation worker")
+    parser.add_argument("--worker-id", help="Lease owner name (defaults to host:pid:random)")
+    parser.add_argument("--exit-when-idle", action="store_true", help="Exit once no task can be claimed")
+    args = parser.parse_args()
+
+    load_dotenv()
+    asyncio.run(run_worker(args.worker_id, args.exit_when_idle))
+
+
+if __name__ == "__main__":
+    main()
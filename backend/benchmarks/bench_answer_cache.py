@@ -0,0 +1,115 @@
+"""
+Benchmark: content-addressed answer cache across generation runs
+
+Runs generate_answers_for_questions against the fake Claude with a SQLite
+answer cache (app/services/answer_cache.py) in four steps:
+- cold: first run, every question is generated and cached
+- re-run: the same questionnaire again
+- re-upload: a copy of the questionnaire with new IDs and renumbered questions
+- policy added: the policy corpus changed, so every key misses
+Reports LLM calls, cache hits and wall time per step.
+
+Usage:
+    python benchmarks/bench_answer_cache.py
+    python benchmarks/bench_answer_cache.py --questions 500 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.answer_cache import AnswerCache
+from app.services.answer_generation import generate_answers_for_questions
+from app.services.policy_index import PolicyContext, PolicyRetriever, chunk_text
+from bench_policy_retrieval import TOPICS, build_corpus
+from fake_anthropic import FakeAnthropic
+
+
+class FakeDatabase:
+    """Collects saved answers instead of writing to Supabase"""
+
+    def __init__(self):
+        self.saved = {}
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        self.saved[question_id] = answer
+        return True
+
+
+def build_context(policy_count: int) -> PolicyContext:
+    chunks = []
+    for policy in build_corpus(policy_count, 40):
+        for chunk in chunk_text(policy["extracted_text"]):
+            chunks.append({**chunk, "policy_id": policy["id"], "policy_name": policy["name"]})
+    return PolicyContext(retriever=PolicyRetriever(chunks), top_k=8, token_budget=6000)
+
+
+def build_questions(count: int, prefix: str, numbered: bool):
+    questions = []
+    for i in range(count):
+        text = f"Describe your {TOPICS[i % len(TOPICS)][0]} controls for system {i}."
+        if numbered:
+            text = f"{i // 10 + 1}.{i % 10 + 1} {text}"
+        questions.append({"id": f"{prefix}-{i}", "question_text": text})
+    return questions
+
+
+async def run(args, cache: AnswerCache, context: PolicyContext, questions) -> dict:
+    client = FakeAnthropic(latency=args.latency, jitter=0.0)
+    ai_service = AIService(api_key="benchmark", client=client)
+    db = FakeDatabase()
+    settings = Settings(ai_max_concurrency=args.concurrency, ai_requests_per_minute=0, ai_prompt_caching=False)
+
+    started = time.perf_counter()
+    stats = await generate_answers_for_questions(
+        questions, db, ai_service, context, settings, mode="single", answer_cache=cache
+    )
+    return {
+        "answered": len(db.saved),
+        "calls": client.calls,
+        "hits": stats.answer_cache_hits,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--policies", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake seconds per Claude call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    path = os.path.join(tempfile.mkdtemp(prefix="answer-cache-"), "answer_cache.db")
+    cache = AnswerCache(path, max_entries=10 * args.questions)
+    context = build_context(args.policies)
+    questions = build_questions(args.questions, "q", numbered=False)
+
+    steps = [
+        ("cold", context, questions),
+        ("re-run", context, questions),
+        ("re-upload", context, build_questions(args.questions, "copy", numbered=True)),
+        ("policy added", build_context(args.policies + 1), questions),
+    ]
+
+    print(f"\n{args.questions} questions, {args.latency}s per call, concurrency {args.concurrency}\n")
+    print(f"{'step':<15}{'answered':>10}{'LLM calls':>11}{'cache hits':>12}{'wall ms':>10}")
+    for name, step_context, step_questions in steps:
+        result = asyncio.run(run(args, cache, step_context, step_questions))
+        print(f"{name:<15}{result['answered']:>10}{result['calls']:>11}{result['hits']:>12}{result['elapsed_ms']:>10.0f}")
+    print(f"\nCache entries: {len(cache)} ({path})\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: single-question vs multi-question batched generation
+
+Runs the real generation path (generate_answers_for_questions) over a
+questionnaire (grouped into topic sections, like real questionnaires) with
+BM25-retrieved or full-corpus context from the synthetic policy corpus,
+against a fake Claude whose latency grows with input and output tokens and
+which drops a fraction of batched items (retried singly). Reports API calls,
+total tokens and wall time per mode.
+
+Usage:
+    python benchmarks/bench_batching.py
+    python benchmarks/bench_batching.py --questions 300 --batch-sizes 5 10 20 --drop-rate 0.05
+    python benchmarks/bench_batching.py --context full
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.answer_generation import generate_answers_for_questions
+from app.services.policy_index import PolicyContext, PolicyRetriever, chunk_text
+from bench_policy_retrieval import TOPICS, build_corpus
+from fake_anthropic import FakeAnthropic
+
+
+class FakeDatabase:
+    """Collects saved answers instead of writing to Supabase"""
+
+    def __init__(self):
+        self.saved = {}
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        self.saved[question_id] = answer
+        return True
+
+
+def build_context(kind: str) -> PolicyContext:
+    if kind == "full":
+        policies = build_corpus(10, 30)
+        return PolicyContext(full_text="\n\n".join(p["extracted_text"] for p in policies))
+    chunks = []
+    for policy in build_corpus(60, 60):
+        for chunk in chunk_text(policy["extracted_text"]):
+            chunks.append({**chunk, "policy_id": policy["id"], "policy_name": policy["name"]})
+    return PolicyContext(retriever=PolicyRetriever(chunks), top_k=8, token_budget=6000)
+
+
+async def run(args, policy_context: PolicyContext, mode: str, batch_size: int) -> dict:
+    client = FakeAnthropic(
+        latency=0.2,
+        jitter=0.0,
+        latency_per_1k_tokens=args.latency_per_1k,
+        latency_per_output_token=args.latency_per_output_token,
+        batch_drop_rate=args.drop_rate,
+    )
+    ai_service = AIService(api_key="benchmark", client=client)
+    db = FakeDatabase()
+    settings = Settings(ai_max_concurrency=args.concurrency, ai_requests_per_minute=0, ai_prompt_caching=False)
+    questions = [
+        {"id": f"q-{i}", "question_text": f"Describe your {TOPICS[(i // args.section_size) % len(TOPICS)][0]} controls (item {i})."}
+        for i in range(args.questions)
+    ]
+
+    stats = await generate_answers_for_questions(
+        questions, db, ai_service, policy_context, settings, mode=mode, batch_size=batch_size
+    )
+    totals = client.usage_totals
+    return {
+        "answered": len(db.saved),
+        "calls": client.calls,
+        "input_tokens": totals["input_tokens"] + totals["cache_creation_input_tokens"] + totals["cache_read_input_tokens"],
+        "output_tokens": totals["output_tokens"],
+        "seconds": stats.elapsed_seconds,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=120)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--section-size", type=int, default=5, help="Consecutive questions sharing a topic")
+    parser.add_argument("--context", choices=["retrieval", "full"], default="retrieval")
+    parser.add_argument("--drop-rate", type=float, default=0.03, help="Fraction of batched items the fake omits")
+    parser.add_argument("--latency-per-1k", type=float, default=0.01, help="Fake seconds per 1k input tokens")
+    parser.add_argument("--latency-per-output-token", type=float, default=0.002)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    policy_context = build_context(args.context)
+
+    print(f"\n{args.questions} questions, {args.context} context, concurrency {args.concurrency}, "
+          f"batched drop rate {args.drop_rate:.0%}\n")
+    print(f"{'mode':<14}{'answered':>9}{'calls':>7}{'input tok':>12}{'output tok':>12}{'seconds':>9}{'tokens vs single':>18}")
+    print("-" * 81)
+    baseline = None
+    runs = [("single", "single", 1)] + [(f"batched x{size}", "batched", size) for size in args.batch_sizes]
+    for label, mode, size in runs:
+        r = await run(args, policy_context, mode, size)
+        total = r["input_tokens"] + r["output_tokens"]
+        baseline = baseline or total
+        print(f"{label:<14}{r['answered']:>9}{r['calls']:>7}{r['input_tokens']:>12,}{r['output_tokens']:>12,}"
+              f"{r['seconds']:>9.2f}{total / baseline:>17.2f}x")
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""
+Benchmark: bulk export and import (app/services/bulk_transfer.py)
+
+Moves a synthetic answers library (realistic question/answer lengths, 1% of rows
+invalid) through each bulk format against an in-memory fake database:
+- export: rows paged from the fake database into a CSV, JSONL or Parquet file
+- import: the file read a batch at a time, validated per column and upserted
+- legacy: the JSON body of POST /api/answers/bulk-import parsed and validated
+  by the pydantic model, then checked row by row as the endpoint and
+  bulk_create_answers do (the endpoint itself is capped at 1,000 rows per request)
+Reports rows/s, file size and peak Python heap (tracemalloc, measured in a
+separate run since it slows the code down).
+
+Usage:
+    python benchmarks/bench_bulk_transfer.py
+    python benchmarks/bench_bulk_transfer.py --rows 200000 --batch-rows 5000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.answers import BulkAnswerCreate
+from app.services.bulk_transfer import BULK_FORMATS, export_dataset, import_dataset
+
+WORDS = ("access", "control", "encryption", "policy", "review", "annual", "vendor", "incident",
+         "response", "backup", "retention", "customer", "data", "audit", "logging", "training")
+
+
+class FakeDatabase:
+    """iter_records/upsert_records over a list, counting the rows written"""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.upserted = 0
+
+    async def iter_records(self, table, page_size=1000, filters=None):
+        for start in range(0, len(self.rows), page_size):
+            yield self.rows[start:start + page_size]
+            await asyncio.sleep(0)
+
+    async def upsert_records(self, table, records):
+        self.upserted += len(records)
+        return len(records)
+
+
+def build_answers(rows: int) -> list:
+    rng = random.Random(7)
+    answers = []
+    for row in range(rows):
+        answers.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "question": " ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "?",
+            # 1% of rows have no answer and are rejected
+            "answer": "" if row % 100 == 99 else " ".join(rng.choices(WORDS, k=rng.randint(30, 120))),
+            "source_type": "user",
+            "source_name": "User",
+            "created_at": "2025-01-01T00:00:00+00:00",
+            "updated_at": "2025-01-01T00:00:00+00:00",
+        })
+    return answers
+
+
+def legacy_import(body: bytes) -> int:
+    """POST /api/answers/bulk-import: pydantic model, then the per-row checks"""
+    bulk_data = BulkAnswerCreate.model_validate_json(body)
+    answers_to_insert = []
+    for answer in bulk_data.answers:
+        if not answer.question.strip():
+            continue
+        if not answer.answer.strip():
+            continue
+        answers_to_insert.append({"question": answer.question.strip(), "answer": answer.answer.strip()})
+    insert_data = []
+    for answer in answers_to_insert:
+        if not answer.get("question") or not answer.get("answer"):
+            continue
+        insert_data.append({
+            "question": answer["question"],
+            "answer": answer["answer"],
+            "source_type": "user",
+            "source_name": "File",
+            "created_at": datetime.utcnow().isoformat(),
+            "updated_at": datetime.utcnow().isoformat()
+        })
+    return len(insert_data)
+
+
+def measure(run) -> dict:
+    started = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 1e6, "result": result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("app.services.bulk_transfer").setLevel(logging.WARNING)
+
+    answers = build_answers(args.rows)
+    print(f"\n{args.rows} library answers, {args.batch_rows} rows per batch\n")
+    print(f"{'format':<8}{'file MB':>9}{'export rows/s':>15}{'export MB':>11}"
+          f"{'import rows/s':>15}{'import MB':>11}{'imported':>10}{'rejected':>10}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in BULK_FORMATS:
+            path = os.path.join(directory, f"answers.{fmt}")
+
+            def export():
+                return asyncio.run(export_dataset(FakeDatabase(answers).iter_records("answers", args.batch_rows), fmt, "answers", path))
+
+            def load():
+                return asyncio.run(import_dataset(FakeDatabase(), path, fmt, "answers", args.batch_rows))
+
+            exported = measure(export)
+            imported = measure(load)
+            report = imported["result"]
+            print(f"{fmt:<8}{os.path.getsize(path) / 1e6:>9.1f}{args.rows / exported['seconds']:>15.0f}"
+                  f"{exported['peak_mb']:>11.1f}{args.rows / imported['seconds']:>15.0f}{imported['peak_mb']:>11.1f}"
+                  f"{report['imported']:>10}{report['rejected']:>10}")
+
+        body = json.dumps({"answers": [{"question": a["question"], "answer": a["answer"]} for a in answers]}).encode()
+        legacy = measure(lambda: legacy_import(body))
+        print(f"{'legacy':<8}{len(body) / 1e6:>9.1f}{'':>15}{'':>11}{args.rows / legacy['seconds']:>15.0f}"
+              f"{legacy['peak_mb']:>11.1f}{legacy['result']:>10}{args.rows - legacy['result']:>10}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Benchmark: per-call overhead of the Anthropic client setup
+
+Serves instant Messages API responses from a local mock HTTP server and
+compares:
+- legacy: the sync `anthropic.Anthropic` client run in a brand-new
+  ThreadPoolExecutor for every call (the previous AIService behaviour)
+- shared async: the process-wide pooled `AsyncAnthropic` client that AIService
+  now awaits directly (app/services/anthropic_client.py)
+
+Because the server answers immediately, the measured time is client overhead:
+thread spin-up/teardown, connection setup and SDK request handling. Reports
+mean/p95 latency for sequential calls, wall time for a concurrent burst and
+the number of TCP connections the server accepted.
+
+Usage:
+    python benchmarks/bench_client_overhead.py
+    python benchmarks/bench_client_overhead.py --calls 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anthropic
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.anthropic_client import create_anthropic_client
+
+RESPONSE = json.dumps({
+    "id": "msg_benchmark",
+    "type": "message",
+    "role": "assistant",
+    "model": "claude-3-5-haiku-20241022",
+    "content": [{"type": "text", "text": "Yes. MFA is enforced for all administrative access."}],
+    "stop_reason": "end_turn",
+    "stop_sequence": None,
+    "usage": {"input_tokens": 50, "output_tokens": 12},
+}).encode()
+
+
+class MockMessagesHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a fixed Messages API response, keeping connections alive"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = None  # Shared counter of accepted TCP connections
+
+    def setup(self):
+        super().setup()
+        with self.connections.get_lock():
+            self.connections.value += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port, connections) -> None:
+    MockMessagesHandler.connections = connections
+    server = ThreadingHTTPServer(("127.0.0.1", port.value), MockMessagesHandler)
+    server.daemon_threads = True
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+def start_server(connections) -> tuple:
+    """Run the mock server in its own process so it does not compete for the GIL"""
+    port = multiprocessing.Value("i", 0)
+    process = multiprocessing.Process(target=serve, args=(port, connections), daemon=True)
+    process.start()
+    while not port.value:
+        time.sleep(0.01)
+    return process, port.value
+
+
+def request_params() -> dict:
+    ai_service = AIService(api_key="benchmark", client=object())
+    system, user_message = ai_service._create_prompt("Do you enforce MFA?", "MFA is mandatory.")
+    return {
+        "model": ai_service.model,
+        "max_tokens": ai_service.max_tokens,
+        "system": system,
+        "messages": [{"role": "user", "content": user_message}],
+    }
+
+
+def make_legacy_call(client: anthropic.Anthropic):
+    params = request_params()
+
+    async def call():
+        loop = asyncio.get_event_loop()
+        with ThreadPoolExecutor() as executor:
+            response = await loop.run_in_executor(executor, lambda: client.messages.create(**params))
+        return response.content[0].text
+
+    return call
+
+
+def make_shared_call(client: anthropic.AsyncAnthropic):
+    params = request_params()
+
+    async def call():
+        response = await client.messages.create(**params)
+        return response.content[0].text
+
+    return call
+
+
+async def measure(call, calls: int, concurrency: int, connections) -> dict:
+    connections.value = 0
+    await call()  # Warm-up: first connection and SDK initialisation
+
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await call()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(calls)))
+    burst = time.perf_counter() - started
+
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000,
+        "burst_s": burst,
+        "connections": connections.value,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    connections = multiprocessing.Value("i", 0)
+    server, port = start_server(connections)
+    base_url = f"http://127.0.0.1:{port}"
+
+    legacy_client = anthropic.Anthropic(api_key="benchmark", base_url=base_url, max_retries=0)
+    legacy = await measure(make_legacy_call(legacy_client), args.calls, args.concurrency, connections)
+
+    # Plain-text mock server, so HTTP/2 (which needs TLS negotiation here) is not exercised
+    shared_client = create_anthropic_client("benchmark", Settings(ai_http2=False)).with_options(
+        base_url=base_url, max_retries=0
+    )
+    shared = await measure(make_shared_call(shared_client), args.calls, args.concurrency, connections)
+    await shared_client.close()
+    server.terminate()
+
+    print(f"\n{args.calls} calls against a local mock server, burst concurrency {args.concurrency}\n")
+    print(f"{'client':<16}{'mean ms':>10}{'p95 ms':>10}{'burst s':>10}{'connections':>13}")
+    print("-" * 59)
+    for label, r in (("legacy", legacy), ("shared async", shared)):
+        print(f"{label:<16}{r['mean_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['burst_s']:>10.2f}{r['connections']:>13}")
+    print(f"\nPer-call overhead reduction: {legacy['mean_ms'] / shared['mean_ms']:.1f}x   "
+          f"Burst speedup: {legacy['burst_s'] / shared['burst_s']:.1f}x\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark: per-request Supabase clients vs the shared pooled client (load test)
+
+Serves the real app with uvicorn and sends concurrent GET /api/questionnaires/
+requests to it. The database is the local PostgREST stand-in
+(benchmarks/postgrest_standin.py), with a fixed delay per database request for
+the network round trip and one per new connection for TCP and TLS setup:
+- per-request: every request builds its own client with create_client(), and
+  with it a new HTTP session and connection, as the routes did before
+- pooled: every request gets a DatabaseService on the process-wide client
+  created in the app lifespan (app/services/database_client.py), whose
+  keep-alive connections are reused
+Reports p50/p99 latency, throughput and the database connections opened.
+
+Usage:
+    python benchmarks/bench_db_client_pool.py
+    python benchmarks/bench_db_client_pool.py --requests 500 --concurrency 16 --connect-ms 30
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_questionnaire_list import SCHEMA, VIEW, seed
+from postgrest_standin import PostgRESTStandIn
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def load(url: str, requests: int, concurrency: int):
+    """Send requests GETs from concurrency clients; returns the latencies and the elapsed time"""
+    import httpx
+
+    timings = []
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def user():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(url)
+                timings.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        return timings, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--questionnaires", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay per database request")
+    parser.add_argument("--connect-ms", type=float, default=20.0, help="Delay per new database connection (TCP + TLS)")
+    args = parser.parse_args()
+
+    server = PostgRESTStandIn(SCHEMA, latency_ms=args.latency_ms, connect_ms=args.connect_ms)
+    supabase_url = server.start()
+    os.environ["SUPABASE_URL"] = supabase_url
+    os.environ["SUPABASE_KEY"] = "standin"
+    seed(server, args.questionnaires, 40)
+    server.conn.executescript(VIEW)
+    # Also the batch resume at startup, which finds no generation_batches table here
+    logging.disable(logging.ERROR)
+
+    import uvicorn
+    from supabase import create_client
+    from app.main import app
+    from app.services.database import DatabaseService, get_database_service
+
+    port = free_port()
+    api = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=api.run, daemon=True)
+    thread.start()
+    while not api.started:
+        time.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/api/questionnaires/"
+    variants = {
+        # The routes before: a new client (and HTTP session) per request
+        "per-request": lambda: DatabaseService(client=create_client(supabase_url, "standin")),
+        "pooled": None,
+    }
+
+    print(
+        f"\n{args.requests} requests from {args.concurrency} concurrent clients, {args.questionnaires} questionnaires, "
+        f"{args.latency_ms:g} ms per database request, {args.connect_ms:g} ms per new connection\n"
+    )
+    print(f"{'variant':<13}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>9}{'db connections':>16}")
+    for variant, override in variants.items():
+        if override:
+            app.dependency_overrides[get_database_service] = override
+        else:
+            app.dependency_overrides.pop(get_database_service, None)
+        asyncio.run(load(url, args.concurrency, args.concurrency))  # Warm-up
+        connections = server.connections
+        timings, elapsed = asyncio.run(load(url, args.requests, args.concurrency))
+        p99 = statistics.quantiles(timings, n=100)[98]
+        print(
+            f"{variant:<13}{statistics.median(timings) * 1000:>9.1f}{p99 * 1000:>9.1f}"
+            f"{len(timings) / elapsed:>9.1f}{server.connections - connections:>16}"
+        )
+
+    api.should_exit = True
+    thread.join()
+    server.stop()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: questionnaire Excel export (app/services/excel_export.py)
+
+Exports a synthetic questionnaire of answered questions with:
+- legacy: the export before streaming (every question loaded into a list, an
+  in-memory Workbook filled cell by cell, every cell walked again to size the
+  columns, the file built in memory)
+- stream: ExportWriter fed 1,000-question pages, as GET
+  /api/questionnaires/{id}/export.xlsx reads them from the database, written
+  to a temporary file; once for questions without ID/Section (the legacy
+  Question/Answer/Status columns) and once with them (5 columns)
+- round trip: write_answers_to_workbook filling the answers into the original
+  workbook (the POST variant of the endpoint)
+Reports time and peak Python heap (tracemalloc, measured in a separate run
+since it slows the code down) and the size of the file produced.
+
+Usage:
+    python benchmarks/bench_excel_export.py
+    python benchmarks/bench_excel_export.py --rows 50000
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import openpyxl
+
+from app.services.excel_export import write_answers_to_workbook, write_export_workbook
+from bench_excel_parsing import SECTIONS, build_workbook
+
+PAGE_SIZE = 1000
+
+
+def make_question(row: int, source_columns: bool = True) -> dict:
+    """A stored question as the database returns it"""
+    question = {
+        "id": f"00000000-0000-0000-0000-{row:012d}",
+        "questionnaire_id": "00000000-0000-0000-0000-000000000000",
+        "question_text": f"Describe how your organisation handles control {row + 1} for customer data?",
+        "answer": f"Control {row + 1} is covered by our Information Security Policy, reviewed annually "
+                  "by the security team and evidenced in our SOC 2 Type II report.",
+        "status": "approved" if row % 2 else "unapproved",
+        "answer_source": "policy",
+        "sheet_name": "Section 1",
+        "row_number": row + 4,
+        "section": SECTIONS[row % len(SECTIONS)],
+        "external_id": f"Q-{row + 1:05d}",
+        "created_at": "2025-01-01T00:00:00+00:00",
+        "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+    if not source_columns:
+        question.update(section=None, external_id=None)
+    return question
+
+
+def legacy_export(questions: list) -> bytes:
+    """The export before streaming (ExcelProcessor.create_export_excel)"""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = "Questionnaire Answers"
+    for col_idx, header in enumerate(["Question", "Answer", "Status"], 1):
+        worksheet.cell(row=1, column=col_idx, value=header)
+    for row_idx, question in enumerate(questions, 2):
+        worksheet.cell(row=row_idx, column=1, value=question.get("question_text", ""))
+        worksheet.cell(row=row_idx, column=2, value=question.get("answer", ""))
+        worksheet.cell(row=row_idx, column=3, value=question.get("status", ""))
+    for column in worksheet.columns:
+        max_length = max(len(str(cell.value)) for cell in column)
+        worksheet.column_dimensions[column[0].column_letter].width = min(max_length + 2, 100)
+    stream = io.BytesIO()
+    workbook.save(stream)
+    workbook.close()
+    return stream.getvalue()
+
+
+async def fake_pages(rows: int, source_columns: bool):
+    """Pages of questions as DatabaseService.iter_questions yields them"""
+    for start in range(0, rows, PAGE_SIZE):
+        yield [make_question(row, source_columns) for row in range(start, min(rows, start + PAGE_SIZE))]
+        await asyncio.sleep(0)
+
+
+def measure(run) -> dict:
+    started = time.perf_counter()
+    size = run()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 1e6, "size_mb": size / 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    logging.getLogger("app.services.excel_export").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as directory:
+        original = os.path.join(directory, "original.xlsx")
+        build_workbook(original, args.rows, 1)
+        export_path = os.path.join(directory, "export.xlsx")
+
+        def legacy():
+            questions = [make_question(row) for row in range(args.rows)]
+            return len(legacy_export(questions))
+
+        def stream(source_columns):
+            asyncio.run(write_export_workbook(fake_pages(args.rows, source_columns), export_path))
+            return os.path.getsize(export_path)
+
+        def round_trip():
+            questions = [make_question(row) for row in range(args.rows)]
+            content, written = write_answers_to_workbook(original, questions)
+            assert written == args.rows, written
+            return len(content)
+
+        print(f"\n{args.rows} answered questions\n")
+        print(f"{'export':<16}{'seconds':>9}{'rows/s':>9}{'peak MB':>10}{'file MB':>9}")
+        runs = (
+            ("legacy", legacy),
+            ("stream", lambda: stream(False)),
+            ("stream 5 cols", lambda: stream(True)),
+            ("round trip", round_trip),
+        )
+        for name, run in runs:
+            result = measure(run)
+            print(f"{name:<16}{result['seconds']:>9.2f}{args.rows / result['seconds']:>9.0f}"
+                  f"{result['peak_mb']:>10.1f}{result['size_mb']:>9.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
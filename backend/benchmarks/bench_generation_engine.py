@@ -0,0 +1,140 @@
+"""
+Benchmark: GenerationEngine throughput at different concurrency levels
+
+Runs AIService.generate_answer against a fake Anthropic client that injects
+latency, a server-side concurrency cap (429 when exceeded) and random 429/529
+errors, then prints throughput for concurrency 1, 4, 16 and 32.
+
+Usage:
+    python benchmarks/bench_generation_engine.py
+    python benchmarks/bench_generation_engine.py --questions 300 --latency 0.5 --legacy
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ai_service import AIService
+from app.services.generation_engine import GenerationEngine, estimate_tokens
+from fake_anthropic import FakeAnthropic
+
+POLICY_CONTEXT = "Access to production systems requires MFA and quarterly access reviews. " * 200
+
+
+def make_questions(count: int) -> list:
+    return [
+        {"id": f"q-{i}", "question_text": f"Question {i}: Do you enforce MFA for administrative access?"}
+        for i in range(count)
+    ]
+
+
+def make_client(args) -> FakeAnthropic:
+    return FakeAnthropic(
+        latency=args.latency,
+        jitter=args.latency / 4,
+        capacity=args.capacity,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+    )
+
+
+async def run_engine(args, concurrency: int) -> dict:
+    client = make_client(args)
+    ai_service = AIService(api_key="benchmark", client=client)
+    engine = GenerationEngine(
+        max_concurrency=concurrency,
+        requests_per_minute=args.rpm,
+        max_retries=8,
+        backoff_base_seconds=0.25,
+        backoff_max_seconds=5.0,
+    )
+
+    async def handler(question):
+        return await ai_service.generate_answer(question["question_text"], POLICY_CONTEXT)
+
+    stats = await engine.run(
+        make_questions(args.questions),
+        handler,
+        estimate_tokens=lambda q: estimate_tokens(POLICY_CONTEXT + q["question_text"]),
+    )
+    result = stats.to_dict()
+    result["api_calls"] = client.calls
+    result["injected_429"] = client.rate_limited
+    result["injected_529"] = client.overloaded
+    return result
+
+
+async def run_legacy(args) -> dict:
+    """The previous behaviour: one question at a time with a fixed 0.5 s sleep"""
+    client = make_client(args)
+    ai_service = AIService(api_key="benchmark", client=client)
+    succeeded = failed = 0
+    started = time.monotonic()
+    for question in make_questions(args.questions):
+        try:
+            await ai_service.generate_answer(question["question_text"], POLICY_CONTEXT)
+            succeeded += 1
+            await asyncio.sleep(0.5)
+        except Exception:
+            failed += 1
+    elapsed = time.monotonic() - started
+    return {
+        "succeeded": succeeded,
+        "failed": failed,
+        "retries": 0,
+        "throttled": 0,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_minute": round(succeeded / elapsed * 60, 2),
+        "api_calls": client.calls,
+    }
+
+
+def print_row(label: str, result: dict, baseline: float) -> None:
+    speedup = baseline / result["elapsed_seconds"] if result["elapsed_seconds"] else 0
+    print(
+        f"{label:<14}{result['succeeded']:>6}{result['failed']:>6}{result['retries']:>8}"
+        f"{result['throttled']:>10}{result['api_calls']:>7}{result['elapsed_seconds']:>10.2f}"
+        f"{result['throughput_per_minute']:>11.1f}{speedup:>9.2f}x"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=96)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake API latency in seconds")
+    parser.add_argument("--capacity", type=int, default=24, help="Fake server concurrency cap (429 above it)")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Random 429/529 probability")
+    parser.add_argument("--retry-after", type=float, default=0.25)
+    parser.add_argument("--rpm", type=int, default=0, help="Client-side requests per minute (0 = off)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--legacy", action="store_true", help="Also run the old sequential loop")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(f"\n{args.questions} questions, latency {args.latency}s, server capacity {args.capacity}, "
+          f"random error rate {args.error_rate:.0%}\n")
+    print(f"{'mode':<14}{'ok':>6}{'fail':>6}{'retries':>8}{'throttled':>10}{'calls':>7}{'seconds':>10}{'q/minute':>11}{'speedup':>10}")
+    print("-" * 82)
+
+    results = []
+    if args.legacy:
+        results.append(("legacy+sleep", await run_legacy(args)))
+    for concurrency in args.concurrency:
+        results.append((f"concurrency {concurrency}", await run_engine(args, concurrency)))
+
+    baseline = results[0][1]["elapsed_seconds"]
+    for label, result in results:
+        print_row(label, result, baseline)
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+"""
+Crash test: generation job queue workers killed mid-run
+
+Queues one job on the SQLite job store (app/services/sqlite_job_store.py), starts
+several worker processes (GenerationWorker against the fake Claude) and SIGKILLs a
+random worker every --kill-interval seconds, starting a replacement each time.
+Killed workers' tasks are claimed again once their leases expire.
+
+Checks, and exits non-zero if any fails:
+- lost: every question ends with a saved answer
+- saved twice: no answer is saved by more than one worker
+- double-charged: a question is only paid for more than once when a worker was
+  killed after its API call returned but before the answer was saved
+
+Usage:
+    python benchmarks/bench_job_queue_crash.py
+    python benchmarks/bench_job_queue_crash.py --questions 400 --workers 4 --mode batched
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import multiprocessing
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.generation_jobs import GenerationWorker, enqueue_generation_job
+from app.services.policy_index import PolicyContext
+from app.services.sqlite_job_store import SQLiteJobStore
+from fake_anthropic import FakeAnthropic
+
+QUESTION_ID = re.compile(r"\[(q-\d+)\]")
+
+
+class ChargeLoggingAnthropic(FakeAnthropic):
+    """Fake Claude that appends the question IDs of every returned (billed) response to a log"""
+
+    def __init__(self, log_path: str, **kwargs):
+        super().__init__(**kwargs)
+        self._log = open(log_path, "a", buffering=1)
+
+    async def _create(self, **kwargs):
+        message = await super()._create(**kwargs)
+        prompt = "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+        for question_id in QUESTION_ID.findall(prompt):
+            self._log.write(f"{question_id}\n")
+        return message
+
+
+class CompletionLoggingStore(SQLiteJobStore):
+    """Job store that appends the question ID of every answer it saves to a log"""
+
+    def __init__(self, path: str, log_path: str):
+        super().__init__(path)
+        self._log = open(log_path, "a", buffering=1)
+
+    async def complete_generation_task(self, task_id, worker_id, answer, answer_source="ai"):
+        task = self._held_task(task_id, worker_id)
+        saved = await super().complete_generation_task(task_id, worker_id, answer, answer_source)
+        if saved:
+            self._log.write(f"{task['question_id']}\n")
+        return saved
+
+
+def settings_for(args) -> Settings:
+    return Settings(
+        ai_max_concurrency=args.concurrency,
+        ai_requests_per_minute=0,
+        ai_prompt_caching=False,
+        ai_batch_size=args.batch_size,
+        generation_lease_seconds=args.lease_seconds,
+        generation_task_max_attempts=args.max_attempts,
+        generation_worker_poll_seconds=0.2
+    )
+
+
+def worker_process(db_path: str, log_dir: str, seed: int, args) -> None:
+    logging.disable(logging.WARNING)
+    pid = os.getpid()
+    client = ChargeLoggingAnthropic(
+        os.path.join(log_dir, f"charges-{pid}.log"),
+        latency=args.latency,
+        jitter=args.latency / 2,
+        seed=seed
+    )
+    store = CompletionLoggingStore(db_path, os.path.join(log_dir, f"saves-{pid}.log"))
+    context = PolicyContext(full_text="Multi-factor authentication is mandatory for all remote and privileged access.")
+
+    async def load_context() -> PolicyContext:
+        return context
+
+    worker = GenerationWorker(
+        store,
+        AIService(api_key="benchmark", client=client),
+        settings_for(args),
+        load_context=load_context,
+        worker_id=f"worker-{pid}"
+    )
+    asyncio.run(worker.run())
+
+
+def read_logs(log_dir: str, prefix: str) -> dict:
+    """question_id -> list of pids that logged it"""
+    entries = collections.defaultdict(list)
+    for name in os.listdir(log_dir):
+        if not name.startswith(prefix):
+            continue
+        pid = int(name[len(prefix):-len(".log")])
+        with open(os.path.join(log_dir, name)) as f:
+            for line in f:
+                entries[line.strip()].append(pid)
+    return entries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight per worker")
+    parser.add_argument("--mode", choices=["single", "batched"], default="single")
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.4, help="Fake seconds per Claude call")
+    parser.add_argument("--kill-interval", type=float, default=1.5, help="Seconds between worker kills")
+    parser.add_argument("--lease-seconds", type=int, default=2)
+    parser.add_argument("--max-attempts", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="job-queue-crash-")
+    db_path = os.path.join(workdir, "queue.db")
+    store = SQLiteJobStore(db_path)
+    questions = [
+        {"id": f"q-{i}", "question_text": f"[q-{i}] Do you enforce multi-factor authentication for system {i}?"}
+        for i in range(args.questions)
+    ]
+    job, _ = asyncio.run(enqueue_generation_job(
+        store, "questionnaire-1", questions, settings_for(args), mode=args.mode, batch_size=args.batch_size
+    ))
+
+    rng = random.Random(args.seed)
+    spawn = multiprocessing.get_context("spawn")
+    workers = []
+    killed = set()
+
+    def start_worker():
+        process = spawn.Process(target=worker_process, args=(db_path, workdir, rng.randrange(1 << 30), args))
+        process.start()
+        workers.append(process)
+
+    started = time.monotonic()
+    for _ in range(args.workers):
+        start_worker()
+
+    next_kill = time.monotonic() + args.kill_interval
+    while asyncio.run(store.get_generation_job(job["id"]))["status"] not in ("completed", "failed"):
+        time.sleep(0.1)
+        if time.monotonic() >= next_kill:
+            alive = [p for p in workers if p.is_alive()]
+            victim = rng.choice(alive)
+            victim.kill()
+            victim.join()
+            killed.add(victim.pid)
+            start_worker()
+            next_kill = time.monotonic() + args.kill_interval
+    elapsed = time.monotonic() - started
+
+    for process in workers:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    final_job = asyncio.run(store.get_generation_job(job["id"]))
+    tasks = asyncio.run(store.get_generation_tasks(job["id"]))
+    charges = read_logs(workdir, "charges-")
+    saves = read_logs(workdir, "saves-")
+
+    lost = [t["question_id"] for t in tasks if t["status"] != "succeeded" or not t["answer"]]
+    saved_twice = [qid for qid, pids in saves.items() if len(pids) > 1]
+    recharged = unexplained = 0
+    for question_id, pids in charges.items():
+        # Charges by killed workers that never saved the answer are the cost of the crash
+        extra = len(pids) - 1
+        explained = sum(1 for pid in pids if pid in killed and pid not in saves.get(question_id, []))
+        recharged += min(extra, explained)
+        unexplained += max(0, extra - explained)
+
+    calls = sum(len(pids) for pids in charges.values())
+    print(f"\n{args.questions} questions, {args.mode} mode, {args.workers} workers, "
+          f"lease {args.lease_seconds}s, one kill every {args.kill_interval}s\n")
+    print(f"{'job status':<32}{final_job['status']}")
+    print(f"{'elapsed':<32}{elapsed:.1f}s")
+    print(f"{'workers killed':<32}{len(killed)}")
+    print(f"{'questions billed':<32}{calls}")
+    print(f"{'re-billed after a kill':<32}{recharged}")
+    print(f"{'lost':<32}{len(lost)}")
+    print(f"{'saved twice':<32}{len(saved_twice)}")
+    print(f"{'double-charged (unexplained)':<32}{unexplained}")
+
+    passed = final_job["status"] == "completed" and not lost and not saved_twice and not unexplained
+    print(f"\n{'PASS' if passed else 'FAIL'} (logs and database in {workdir})\n")
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Benchmark: Answers Library reuse before calling Claude
+
+Builds a synthetic Answers Library (one approved answer per control/scope pair,
+for a random subset of pairs) and a questionnaire mixing:
+- exact: library questions with new numbering, case and punctuation
+- reworded: library questions with light rewording ("Does your organization ...")
+- new: control/scope pairs that are not in the library (near misses that share
+  most of their words with library questions)
+
+Reports, per match threshold, the hit rate, precision (hits that picked the right
+library entry) and matching time, then runs generate_answers_for_questions
+against the fake Claude with and without the library and reports LLM calls,
+wall time and the latency saved estimate from GenerationStats.
+
+Usage:
+    python benchmarks/bench_library_reuse.py
+    python benchmarks/bench_library_reuse.py --questions 400 --thresholds 0.7 0.8 0.9 1.0
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.answer_generation import generate_answers_for_questions
+from app.services.answer_library import AnswerLibrary
+from app.services.policy_index import PolicyContext
+from fake_anthropic import FakeAnthropic
+
+CONTROLS = [
+    "multi-factor authentication", "encryption at rest", "encryption in transit", "vulnerability scanning",
+    "penetration testing", "security awareness training", "background checks", "quarterly access reviews",
+    "centralized log monitoring", "backup restore testing", "incident response exercises", "data retention limits",
+    "vendor risk assessments", "change management approvals", "endpoint protection", "privileged access management",
+]
+SCOPES = [
+    "production systems", "employee laptops", "customer data", "cloud infrastructure",
+    "third-party vendors", "source code repositories", "remote access", "administrative accounts",
+]
+REWORDINGS = [
+    "Does your organization enforce {control} for {scope}?",
+    "Do you enforce {control} for all {scope}?",
+    "Please confirm: do you enforce {control} for {scope}",
+    "Do you currently enforce {control} for {scope}?",
+]
+
+
+class FakeDatabase:
+    """Collects saved answers instead of writing to Supabase"""
+
+    def __init__(self):
+        self.saved = {}
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        self.saved[question_id] = (answer, answer_source)
+        return True
+
+
+def build_library(rng: random.Random, coverage: float):
+    pairs = [(c, s) for c in CONTROLS for s in SCOPES]
+    rng.shuffle(pairs)
+    covered = pairs[:int(len(pairs) * coverage)]
+    entries = [
+        {
+            "id": f"a-{i}",
+            "question": f"Do you enforce {control} for {scope}?",
+            "answer": f"Yes. {control.capitalize()} is enforced for {scope} and reviewed annually.",
+        }
+        for i, (control, scope) in enumerate(covered)
+    ]
+    return entries, {pair: entry["id"] for pair, entry in zip(covered, entries)}, pairs[len(covered):]
+
+
+def build_questionnaire(rng: random.Random, count: int, covered: dict, uncovered: list):
+    """Questions with the library entry each one should match (None for new questions)"""
+    covered_pairs = list(covered)
+    questions = []
+    for i in range(count):
+        kind = rng.choice(["exact", "reworded", "new"])
+        if kind == "new" and uncovered:
+            control, scope = rng.choice(uncovered)
+            text = f"Do you enforce {control} for {scope}?"
+            expected = None
+        else:
+            kind = "exact" if kind == "new" else kind
+            control, scope = rng.choice(covered_pairs)
+            if kind == "exact":
+                text = f"{i // 10 + 1}.{i % 10 + 1}) DO YOU ENFORCE {control.upper()} FOR {scope.upper()}"
+            else:
+                text = rng.choice(REWORDINGS).format(control=control, scope=scope)
+            expected = covered[(control, scope)]
+        questions.append({"id": f"q-{i}", "question_text": text, "kind": kind, "expected": expected})
+    return questions
+
+
+def evaluate(entries, questions, threshold: float) -> dict:
+    library = AnswerLibrary(entries, threshold=threshold)
+    started = time.perf_counter()
+    matches = [library.match(q["question_text"]) for q in questions]
+    match_seconds = time.perf_counter() - started
+
+    hits = correct = 0
+    by_kind = {"exact": [0, 0], "reworded": [0, 0], "new": [0, 0]}
+    for question, match in zip(questions, matches):
+        by_kind[question["kind"]][1] += 1
+        if match is None:
+            continue
+        hits += 1
+        by_kind[question["kind"]][0] += 1
+        correct += match.answer_id == question["expected"]
+    return {
+        "hit_rate": hits / len(questions),
+        "precision": correct / hits if hits else 1.0,
+        "by_kind": by_kind,
+        "match_ms": match_seconds * 1000,
+    }
+
+
+async def run_generation(args, entries, questions, use_library: bool) -> dict:
+    client = FakeAnthropic(latency=args.latency, jitter=0.0)
+    ai_service = AIService(api_key="benchmark", client=client)
+    db = FakeDatabase()
+    settings = Settings(ai_max_concurrency=args.concurrency, ai_requests_per_minute=0, ai_prompt_caching=False)
+    context = PolicyContext(full_text="Multi-factor authentication is mandatory for all remote and privileged access.")
+    library = AnswerLibrary(entries, threshold=args.threshold) if use_library else None
+
+    started = time.monotonic()
+    stats = await generate_answers_for_questions(
+        questions, db, ai_service, context, settings, mode="single", library=library
+    )
+    return {
+        "answered": len(db.saved),
+        "calls": client.calls,
+        "elapsed": time.monotonic() - started,
+        "hits": stats.library_hits,
+        "saved_estimate": stats.library_seconds_saved,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--coverage", type=float, default=0.6, help="Share of control/scope pairs in the library")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9, 1.0])
+    parser.add_argument("--threshold", type=float, default=0.9, help="Threshold for the generation runs")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake seconds per Claude call")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    rng = random.Random(args.seed)
+    entries, covered, uncovered = build_library(rng, args.coverage)
+    questions = build_questionnaire(rng, args.questions, covered, uncovered)
+
+    print(f"\nLibrary of {len(entries)} answers, {len(questions)} questions\n")
+    print(f"{'threshold':<11}{'hit rate':>10}{'precision':>11}{'exact':>9}{'reworded':>10}{'new':>8}{'match ms':>10}")
+    for threshold in args.thresholds:
+        result = evaluate(entries, questions, threshold)
+        kinds = "".join(
+            f"{f'{hit}/{total}':>{width}}"
+            for (hit, total), width in zip(result["by_kind"].values(), (9, 10, 8))
+        )
+        print(f"{threshold:<11}{result['hit_rate']:>10.1%}{result['precision']:>11.1%}{kinds}{result['match_ms']:>10.1f}")
+
+    print(f"\nGeneration at threshold {args.threshold}, {args.latency}s per call, concurrency {args.concurrency}\n")
+    print(f"{'run':<16}{'answered':>10}{'LLM calls':>11}{'library':>9}{'wall s':>9}{'saved s (est.)':>16}")
+    for use_library in (False, True):
+        result = asyncio.run(run_generation(args, entries, questions, use_library))
+        name = "with library" if use_library else "no library"
+        print(f"{name:<16}{result['answered']:>10}{result['calls']:>11}{result['hits']:>9}"
+              f"{result['elapsed']:>9.1f}{result['saved_estimate']:>16.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
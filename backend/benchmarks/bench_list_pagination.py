@@ -0,0 +1,181 @@
+"""
+Benchmark: paginated list endpoints (GET /api/answers/, GET /api/questionnaires/{id}/questions)
+
+Runs the real endpoints and DatabaseService against the local PostgREST stand-in
+(benchmarks/postgrest_standin.py: SQLite behind PostgREST's HTTP API, with a
+fixed delay per request, and the indexes of migrations/add_list_pagination_indexes.sql)
+as the Answers Library and one questionnaire grow:
+- legacy: every row with select("*"), as the endpoints returned before
+- first: the first page (limit=50)
+- deep: a page near the end, from a cursor (keyset: no OFFSET to skip)
+- filtered: the first page with a status filter and a text search (answers only)
+Reports the median latency and the response size of each.
+
+Usage:
+    python benchmarks/bench_list_pagination.py
+    python benchmarks/bench_list_pagination.py --sizes 1000,10000,100000 --latency-ms 5
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from postgrest_standin import PostgRESTStandIn
+
+# The tables the lists read, in SQLite (see supabase_complete_schema.sql), with the pagination indexes
+SCHEMA = """
+CREATE TABLE answers (
+  id TEXT PRIMARY KEY,
+  question TEXT NOT NULL,
+  answer TEXT NOT NULL,
+  source_type TEXT NOT NULL DEFAULT 'user',
+  source_name TEXT NOT NULL DEFAULT 'User',
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX idx_answers_created_at_id ON answers(created_at DESC, id DESC);
+CREATE INDEX idx_answers_source_type_created_at_id ON answers(source_type, created_at DESC, id DESC);
+CREATE TABLE questionnaires (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  filename TEXT NOT NULL,
+  status TEXT DEFAULT 'in_progress',
+  upload_date TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE TABLE questions (
+  id TEXT PRIMARY KEY,
+  question_text TEXT NOT NULL,
+  answer TEXT,
+  status TEXT DEFAULT 'unapproved',
+  answer_source TEXT,
+  questionnaire_id TEXT REFERENCES questionnaires(id) ON DELETE CASCADE,
+  row_number INTEGER,
+  sheet_name TEXT,
+  section TEXT,
+  external_id TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX idx_questions_questionnaire_created_at_id ON questions(questionnaire_id, created_at, id);
+"""
+
+WORDS = ("access", "control", "encryption", "policy", "review", "annual", "vendor", "incident",
+         "response", "backup", "retention", "customer", "data", "audit", "logging", "training")
+
+
+def seed(server: PostgRESTStandIn, rows: int) -> str:
+    """rows library answers and one questionnaire with rows questions; returns the questionnaire id"""
+    rng = random.Random(7)
+    server.conn.execute("DELETE FROM answers")
+    server.conn.execute("DELETE FROM questions")
+    server.conn.execute("DELETE FROM questionnaires")
+    questionnaire_id = str(uuid.uuid4())
+    answers, questions = [], []
+    for index in range(rows):
+        stamp = f"2025-01-01T00:00:00.{index:06d}+00:00"
+        question = " ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "?"
+        answer = " ".join(rng.choices(WORDS, k=rng.randint(30, 120)))
+        answers.append((str(uuid.uuid4()), question, answer, ("user", "questionnaire")[index % 2], "User", stamp, stamp))
+        questions.append((
+            str(uuid.uuid4()), question, answer, ("approved", "unapproved")[index % 3 == 0], "ai",
+            questionnaire_id, index + 2, "Sheet1", None, None, stamp, stamp
+        ))
+    server.conn.execute("BEGIN")
+    server.conn.execute(
+        "INSERT INTO questionnaires (id, name, filename, upload_date, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (questionnaire_id, "Questionnaire", "questionnaire.xlsx", "2025-01-01", "2025-01-01", "2025-01-01")
+    )
+    server.conn.executemany("INSERT INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)", answers)
+    server.conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", questions)
+    server.conn.execute("COMMIT")
+    return questionnaire_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Rows in the library and the questionnaire")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay per database request")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = PostgRESTStandIn(SCHEMA, latency_ms=args.latency_ms)
+    os.environ["SUPABASE_URL"] = server.start()
+    os.environ["SUPABASE_KEY"] = "standin"
+    logging.disable(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.database import DatabaseService
+    from app.services.pagination import encode_cursor
+
+    # The endpoints as they were: every row
+    @app.get("/legacy/answers")
+    async def legacy_answers():
+        answers = await DatabaseService().get_all_answers()
+        return {"success": True, "answers": answers, "count": len(answers)}
+
+    @app.get("/legacy/questions/{questionnaire_id}")
+    async def legacy_questions(questionnaire_id: str):
+        questions = await DatabaseService().get_questions_by_questionnaire(questionnaire_id)
+        return {"success": True, "questionnaire_id": questionnaire_id, "questions": questions}
+
+    client = TestClient(app)
+
+    def measure(url: str, params=None):
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            response = client.get(url, params=params)
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+        return statistics.median(timings) * 1000, len(response.content) / 1024, response.json()
+
+    print(f"\n{args.latency_ms:g} ms per database request, median of {args.runs} runs\n")
+    print(f"{'rows':>8}  {'list':<10}{'variant':<10}{'median ms':>11}{'response KB':>13}{'rows returned':>15}")
+    for size in [int(value) for value in args.sizes.split(",")]:
+        questionnaire_id = seed(server, size)
+        # The row the deep page continues after, 100 rows from the end
+        deep_answer = dict(server.conn.execute(
+            "SELECT id, created_at FROM answers ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET ?", (max(size - 100, 0),)
+        ).fetchone())
+        deep_question = dict(server.conn.execute(
+            "SELECT id, created_at FROM questions ORDER BY created_at, id LIMIT 1 OFFSET ?", (max(size - 100, 0),)
+        ).fetchone())
+        lists = {
+            "answers": (
+                "/api/answers/", "/legacy/answers", "answers",
+                encode_cursor("created_at", "desc", deep_answer),
+            ),
+            "questions": (
+                f"/api/questionnaires/{questionnaire_id}/questions", f"/legacy/questions/{questionnaire_id}", "questions",
+                encode_cursor("created_at", "asc", deep_question),
+            ),
+        }
+        for name, (url, legacy_url, key, cursor) in lists.items():
+            variants = {
+                "legacy": (legacy_url, None),
+                "first": (url, {"limit": 50}),
+                "deep": (url, {"limit": 50, "cursor": cursor}),
+            }
+            if name == "answers":
+                variants["filtered"] = (url, {"limit": 50, "status": "user", "q": "encryption"})
+            for variant, (target, params) in variants.items():
+                median_ms, size_kb, body = measure(target, params)
+                print(f"{size:>8}  {name:<10}{variant:<10}{median_ms:>11.1f}{size_kb:>13.1f}{len(body[key]):>15}")
+    server.stop()
+    print()
+
+
+if __name__ == "__main__":
+    main()
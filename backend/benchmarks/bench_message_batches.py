@@ -0,0 +1,112 @@
+"""
+Offline run of "batch" mode (Message Batches API) against the fake batch server
+
+Drives generate_answers_in_batch end to end with an in-memory database and
+app.services.fake_batches.FakeMessageBatches, in scenarios covering a clean
+run, per-request errors, per-request expiry and a batch that expires entirely.
+Errored/expired requests are resubmitted in follow-up batches up to
+--max-resubmits. Reports answers saved, failures, batches submitted and time.
+
+Usage:
+    python benchmarks/bench_message_batches.py
+    python benchmarks/bench_message_batches.py --questions 500 --max-resubmits 1
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.batch_generation import generate_answers_in_batch
+from app.services.fake_batches import FakeMessageBatches
+from app.services.policy_index import PolicyContext
+from bench_policy_retrieval import TOPICS
+from fake_anthropic import FakeAnthropic
+
+SCENARIOS = [
+    ("clean", {}),
+    ("10% errored", {"error_rate": 0.1}),
+    ("20% expired", {"expire_rate": 0.2}),
+    ("batch expired", {"expire_batch": True}),
+]
+
+
+class FakeDatabase:
+    """Records batches and saved answers instead of writing to Supabase"""
+
+    def __init__(self):
+        self.saved = {}
+        self.batches = {}
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        self.saved[question_id] = answer
+        return True
+
+    async def bulk_update_question_answers(self, answers, status="unapproved", answer_source=None):
+        self.saved.update(answers)
+        return {"updated_count": len(answers), "updated_ids": list(answers), "errors": []}
+
+    async def create_generation_batch(self, batch_data):
+        self.batches[batch_data["batch_id"]] = dict(batch_data, status="in_progress")
+        return batch_data["batch_id"]
+
+    async def update_generation_batch(self, batch_id, update_data):
+        self.batches[batch_id].update(update_data)
+        return True
+
+
+async def run(args, scenario: dict) -> dict:
+    batches = FakeMessageBatches(processing_seconds=args.processing_seconds, **scenario)
+    ai_service = AIService(api_key="benchmark", client=FakeAnthropic())
+    db = FakeDatabase()
+    settings = Settings(
+        ai_batch_backend="fake",
+        ai_batch_poll_interval_seconds=args.poll_interval,
+        ai_batch_max_resubmits=args.max_resubmits,
+    )
+    policy_context = PolicyContext(full_text="POL-01 Information Security Policy\n\nAll data is encrypted at rest.")
+    questions = [
+        {"id": f"q-{i}", "questionnaire_id": "questionnaire-1",
+         "question_text": f"Describe your {TOPICS[i % len(TOPICS)][0]} controls."}
+        for i in range(args.questions)
+    ]
+
+    stats = await generate_answers_in_batch(questions, db, ai_service, policy_context, settings, batches=batches)
+    assert all(b["status"] == "collected" for b in db.batches.values())
+    return {
+        "saved": len(db.saved),
+        "failed": stats.failed,
+        "batches": len(db.batches),
+        "resubmitted": stats.retries,
+        "seconds": stats.elapsed_seconds,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=300)
+    parser.add_argument("--max-resubmits", type=int, default=2)
+    parser.add_argument("--processing-seconds", type=float, default=0.3, help="Fake time until a batch ends")
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    print(f"\n{args.questions} questions, up to {args.max_resubmits} resubmissions\n")
+    print(f"{'scenario':<16}{'saved':>7}{'failed':>8}{'batches':>9}{'resubmitted':>13}{'seconds':>9}")
+    print("-" * 62)
+    for label, scenario in SCENARIOS:
+        r = await run(args, scenario)
+        print(f"{label:<16}{r['saved']:>7}{r['failed']:>8}{r['batches']:>9}{r['resubmitted']:>13}{r['seconds']:>9.2f}")
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
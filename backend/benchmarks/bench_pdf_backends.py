@@ -0,0 +1,166 @@
+"""
+Benchmark: PDF extraction backends (app/services/pdf_backends.py)
+
+Generates a corpus of synthetic policy PDFs whose text is known, in three
+layouts:
+- single: one column of text lines
+- columns: two columns, drawn row by row (left line, right line, ...) so the
+  content-stream order is not the reading order
+- table: a four-column table, one row per line
+and extracts every page with each backend in a fresh spawned process. Reports:
+- pages/s: extraction throughput
+- peak MB: the extracting process' peak RSS (ru_maxrss); the "none" row is a
+  process that receives the document and imports the backends but extracts nothing
+- similarity: difflib ratio of the extracted text against the ground truth in
+  reading order, whitespace normalised (1.000 = identical), over sampled pages
+Backends whose library is not installed are skipped.
+
+Usage:
+    python benchmarks/bench_pdf_backends.py
+    python benchmarks/bench_pdf_backends.py --pages 400 --backends pypdf2,pdfium
+"""
+
+import argparse
+import difflib
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.pdf_backends import PDF_BACKENDS
+from bench_policy_retrieval import build_corpus
+
+LAYOUTS = ("single", "columns", "table")
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_lines(words, layout: str, rows: int):
+    """(x, y, text) of every line drawn on one page, in content-stream order, and the page's ground truth"""
+    take = lambda n: [next(words) for _ in range(n)]
+    if layout == "single":
+        lines = [" ".join(take(12)) for _ in range(rows)]
+        return [(50, 800 - 12 * row, line) for row, line in enumerate(lines)], "\n".join(lines)
+    if layout == "columns":
+        left = [" ".join(take(6)) for _ in range(rows)]
+        right = [" ".join(take(6)) for _ in range(rows)]
+        drawn = []
+        for row in range(rows):
+            drawn.append((50, 800 - 12 * row, left[row]))
+            drawn.append((320, 800 - 12 * row, right[row]))
+        return drawn, "\n".join(left + right)
+    cells = [[" ".join(take(2)) for _ in range(4)] for _ in range(rows)]
+    drawn = [(50 + 130 * column, 800 - 12 * row, cell) for row, line in enumerate(cells) for column, cell in enumerate(line)]
+    return drawn, "\n".join(" ".join(line) for line in cells)
+
+
+def build_pdf(paragraphs, pages: int, layout: str, rows: int = 45):
+    """
+    Minimal PDF with absolutely positioned Helvetica lines
+
+    Returns:
+        tuple: (PDF bytes, ground-truth text of every page in reading order)
+    """
+    vocabulary = " ".join(paragraphs).split()
+    words = (vocabulary[i % len(vocabulary)] for i in range(10 ** 9))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    truth = []
+    for _ in range(pages):
+        drawn, page_truth = _page_lines(words, layout, rows)
+        truth.append(page_truth)
+        text = " ".join(f"1 0 0 1 {x} {y} Tm ({_escape(line)}) Tj" for x, y, line in drawn)
+        stream = f"BT /F1 10 Tf {text} ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out), truth
+
+
+def extract(backend: str, content: bytes, sample):
+    """Worker (fresh process): extract every page, return timing, peak RSS and the sampled pages"""
+    from app.services.pdf_processor import PDFProcessor
+
+    if backend == "none":
+        for name in PDF_BACKENDS:
+            available(name)
+        return 0.0, 0, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, ["" for _ in sample]
+    started = time.perf_counter()
+    page_count, pages = PDFProcessor(backend).extract_page_range(content, 0, None)
+    elapsed = time.perf_counter() - started
+    texts = dict(pages)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, page_count, peak_kb, [texts.get(index, "") for index in sample]
+
+
+def similarity(extracted: str, truth: str) -> float:
+    return difflib.SequenceMatcher(None, " ".join(extracted.split()), " ".join(truth.split()), autojunk=False).ratio()
+
+
+def available(backend: str) -> bool:
+    from app.services.pdf_backends import get_pdf_backend
+    try:
+        get_pdf_backend(backend)
+        return True
+    except Exception:
+        return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--sample", type=int, default=10, help="Pages per document compared with the ground truth")
+    parser.add_argument("--backends", default=",".join(PDF_BACKENDS))
+    args = parser.parse_args()
+
+    random.seed(7)
+    paragraphs = build_corpus(1, 60)[0]["extracted_text"].split("\n\n")
+    context = multiprocessing.get_context("spawn")
+    backends = [name for name in args.backends.split(",") if available(name)]
+    skipped = [name for name in args.backends.split(",") if name not in backends]
+
+    print(f"\n{args.pages} pages per layout, {args.sample} pages per layout checked against the ground truth")
+    if skipped:
+        print(f"skipped (not installed): {', '.join(skipped)}")
+    print()
+    print(f"{'layout':<10}{'backend':<10}{'pages/s':>10}{'peak MB':>10}{'similarity':>12}")
+    for layout in LAYOUTS:
+        content, truth = build_pdf(paragraphs, args.pages, layout)
+        sample = sorted(random.sample(range(args.pages), min(args.sample, args.pages)))
+        for backend in ["none"] + backends:
+            # A process per run so peak RSS is the backend's own
+            with context.Pool(1) as pool:
+                elapsed, page_count, peak_kb, texts = pool.apply(extract, (backend, content, sample))
+            if backend == "none":
+                print(f"{layout:<10}{backend:<10}{'':>10}{peak_kb / 1024:>10.0f}")
+                continue
+            score = sum(similarity(text, truth[index]) for text, index in zip(texts, sample)) / len(sample)
+            print(f"{layout:<10}{backend:<10}{page_count / elapsed:>10.0f}{peak_kb / 1024:>10.0f}{score:>12.3f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: PDF extraction on the event loop vs the extraction process pool
+
+Generates synthetic policy PDFs (hundreds of text pages each) and extracts
+them concurrently, while a heartbeat coroutine ticking every 10 ms records the
+longest time the event loop was blocked. Compares:
+- inline: PDFProcessor.extract_text_from_bytes called in the async route, as
+  the upload endpoint did before app/services/pdf_extraction.py
+- pool: PDFExtractionPool with page ranges extracted in parallel
+Reports pages per second and the longest event-loop stall.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py
+    python benchmarks/bench_pdf_extraction.py --documents 4 --pages 500 --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.pdf_extraction import PDFExtractionPool
+from app.services.pdf_processor import PDFProcessor
+from bench_policy_retrieval import build_corpus
+
+
+def build_pdf(paragraphs, pages: int, lines_per_page: int = 45) -> bytes:
+    """Minimal multi-page PDF with one Helvetica text stream per page"""
+    words = " ".join(paragraphs).split()
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = []
+        for n in range(lines_per_page):
+            line = lines[(page * lines_per_page + n) % len(lines)]
+            line = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            text.append(f"({line}) Tj T*")
+        stream = f"BT /F1 10 Tf 12 TL 50 800 Td {' '.join(text)} ET".encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Longest delay beyond the interval between ticks (event-loop stall)"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(documents, strategy: str, pool: PDFExtractionPool) -> dict:
+    processor = PDFProcessor()
+
+    async def extract(content: bytes) -> str:
+        if strategy == "inline":
+            return processor.extract_text_from_bytes(content)
+        return await pool.extract_text(content)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    texts = await asyncio.gather(*(extract(content) for content in documents))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return {"elapsed": elapsed, "stall": await monitor, "characters": sum(len(t) for t in texts)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--pages-per-task", type=int, default=25)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    paragraphs = [p["extracted_text"] for p in build_corpus(args.documents, 30)]
+    documents = [build_pdf(paragraphs[i].split("\n\n"), args.pages) for i in range(args.documents)]
+    total_pages = args.documents * args.pages
+    print(f"\n{args.documents} PDFs x {args.pages} pages ({sum(map(len, documents)) / 1e6:.1f} MB), "
+          f"{args.workers} workers, {args.pages_per_task} pages per task, {os.cpu_count()} CPUs\n")
+
+    pool = PDFExtractionPool(max_workers=args.workers, pages_per_task=args.pages_per_task, timeout_seconds=0)
+    # Warm the pool so process start-up is not counted
+    asyncio.run(pool.extract_text(build_pdf(["warm up"], 1)))
+
+    print(f"{'strategy':<10}{'wall s':>9}{'pages/s':>10}{'max loop stall ms':>20}{'characters':>12}")
+    for strategy in ("inline", "pool"):
+        result = asyncio.run(run(documents, strategy, pool))
+        print(f"{strategy:<10}{result['elapsed']:>9.2f}{total_pages / result['elapsed']:>10.0f}"
+              f"{result['stall'] * 1000:>20.0f}{result['characters']:>12}")
+    pool.shutdown()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark: per-call policy loading vs the precomputed, versioned policy corpus
+
+Simulates a sequence of generate calls (e.g. single-answer clicks) against a
+fake Supabase that serialises every response to JSON, counts the bytes and
+sleeps for a round trip plus transfer time. One policy is uploaded halfway.
+Compares, with retrieval on and off:
+- per-call: every call reads the policies (full extracted_text, or every passage)
+  and rebuilds the context, as before the policy_corpus table
+- corpus: app/services/policy_corpus.py; calls read the version number and reuse
+  the in-process corpus, the upload rewrites only the manifest, and the next call
+  only fetches the new policy's text or passages
+Reports bytes transferred and load latency per call, and the bytes written by
+the corpus update on upload.
+
+Usage:
+    python benchmarks/bench_policy_corpus.py
+    python benchmarks/bench_policy_corpus.py --policies 120 --calls 40 --bandwidth-mbps 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services import policy_corpus
+from app.services.policy_index import PolicyContext, PolicyRetriever, chunk_text
+from bench_policy_retrieval import build_corpus
+
+
+class FakeSupabase:
+    """In-memory policies/policy_chunks/policy_corpus tables with simulated network cost"""
+
+    def __init__(self, rtt_ms: float, bandwidth_mbps: float):
+        self.rtt = rtt_ms / 1000
+        self.bytes_per_second = bandwidth_mbps * 1_000_000 / 8
+        self.policies = []
+        self.chunks = []
+        self.corpus = None
+        self.bytes = 0
+
+    async def _respond(self, data):
+        size = len(json.dumps(data))
+        self.bytes += size
+        await asyncio.sleep(self.rtt + size / self.bytes_per_second)
+        return data
+
+    def add_policy(self, policy, settings):
+        self.policies.insert(0, policy)
+        for chunk in chunk_text(policy["extracted_text"], settings.retrieval_chunk_tokens, settings.retrieval_chunk_overlap_tokens):
+            self.chunks.append({"id": str(uuid.uuid4()), "policy_id": policy["id"], **chunk})
+
+    async def get_all_policies(self, include_text=True):
+        columns = ("id", "name", "filename", "file_size")
+        rows = [dict(p) if include_text else {k: p.get(k) for k in columns} for p in self.policies]
+        return await self._respond(rows)
+
+    async def get_policy_by_id(self, policy_id):
+        return await self._respond(next((dict(p) for p in self.policies if p["id"] == policy_id), None))
+
+    async def get_policy_chunks(self, policy_ids=None):
+        wanted = set(policy_ids) if policy_ids is not None else None
+        return await self._respond([c for c in self.chunks if wanted is None or c["policy_id"] in wanted])
+
+    async def create_policy_chunks(self, policy_id, chunks):
+        return len(chunks)
+
+    async def get_policy_corpus_version(self):
+        return await self._respond(self.corpus["version"] if self.corpus else None)
+
+    async def get_policy_texts(self, policy_ids):
+        wanted = set(policy_ids)
+        return await self._respond({p["id"]: p["extracted_text"] for p in self.policies if p["id"] in wanted})
+
+    async def get_policy_corpus(self):
+        return await self._respond(self.corpus)
+
+    async def save_policy_corpus(self, corpus_data, expected_version=None):
+        await self._respond(corpus_data)
+        if expected_version is None:
+            if self.corpus is not None:
+                return False
+            self.corpus = {"stale": False, **corpus_data}
+            return True
+        if (self.corpus or {}).get("version") != expected_version:
+            return False
+        self.corpus.update(corpus_data)
+        return True
+
+
+async def load_per_call(db, settings) -> PolicyContext:
+    """Context loading before the policy corpus: read everything on every call"""
+    if settings.retrieval_enabled:
+        policies = await db.get_all_policies(include_text=False)
+        names = {p["id"]: p["name"] for p in policies}
+        chunks = [{**c, "policy_name": names.get(c["policy_id"])} for c in await db.get_policy_chunks()]
+        return PolicyContext(retriever=PolicyRetriever(chunks), top_k=settings.retrieval_top_k)
+    policies = await db.get_all_policies()
+    return PolicyContext(full_text="\n\n".join(p["extracted_text"] for p in policies if p.get("extracted_text")))
+
+
+async def run(args, strategy: str, retrieval: bool) -> dict:
+    settings = Settings(retrieval_enabled=retrieval)
+    db = FakeSupabase(args.rtt_ms, args.bandwidth_mbps)
+    corpus = build_corpus(args.policies + 1, args.paragraphs)
+    for policy in corpus[:-1]:
+        db.add_policy({**policy, "filename": policy["name"], "file_size": len(policy["extracted_text"])}, settings)
+    policy_corpus._corpus = None
+    if strategy == "corpus":
+        await policy_corpus.rebuild_policy_corpus(db)
+
+    per_call = []
+    upload_bytes = 0
+    for call in range(args.calls):
+        if call == args.calls // 2:
+            uploaded = corpus[-1]
+            db.add_policy({**uploaded, "filename": uploaded["name"], "file_size": 0}, settings)
+            if strategy == "corpus":
+                before = db.bytes
+                await policy_corpus.add_policy_to_corpus(db, uploaded["id"], uploaded["name"], uploaded["extracted_text"])
+                upload_bytes = db.bytes - before
+        before = db.bytes
+        started = time.perf_counter()
+        if strategy == "corpus":
+            context = await policy_corpus.load_policy_context(db, settings)
+        else:
+            context = await load_per_call(db, settings)
+        assert not context.is_empty
+        per_call.append((db.bytes - before, (time.perf_counter() - started) * 1000))
+
+    steady = per_call[1:args.calls // 2] + per_call[args.calls // 2 + 1:]
+    return {
+        "first": per_call[0],
+        "steady_bytes": statistics.median(b for b, _ in steady),
+        "steady_ms": statistics.median(ms for _, ms in steady),
+        "after_upload": per_call[args.calls // 2],
+        "total_bytes": sum(b for b, _ in per_call),
+        "upload_bytes": upload_bytes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", type=int, default=60)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=100.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print(f"\n{args.policies} policies, {args.calls} generate calls (one upload halfway), "
+          f"{args.rtt_ms:.0f} ms RTT, {args.bandwidth_mbps:.0f} Mbit/s\n")
+    header = f"{'context':<11}{'strategy':<10}{'first call':>16}{'steady call':>16}{'after upload':>16}{'total KB':>10}{'update KB':>11}"
+    print(header)
+    print("-" * len(header))
+    for retrieval in (True, False):
+        for strategy in ("per-call", "corpus"):
+            r = asyncio.run(run(args, strategy, retrieval))
+            cell = lambda b, ms: f"{b / 1024:.0f}KB {ms:.0f}ms"
+            print(f"{'retrieval' if retrieval else 'full':<11}{strategy:<10}{cell(*r['first']):>16}"
+                  f"{cell(r['steady_bytes'], r['steady_ms']):>16}{cell(*r['after_upload']):>16}"
+                  f"{r['total_bytes'] / 1024:>10.0f}{r['upload_bytes'] / 1024:>11.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: inline PDF processing in the upload request vs the background ingestion pipeline
+
+Uploads a batch of synthetic multi-hundred-page PDFs against a fake database
+with a simulated round-trip time. Compares:
+- inline: each upload request extracts, stores, chunks and indexes the PDF
+  before responding, one request after another (as the upload dialog did)
+- pipeline: one batch request spools the files and creates "queued" policies,
+  then app/services/policy_ingestion.py processes them in the background
+Reports the slowest upload request (what gunicorn's 30 s timeout applies to)
+and the time until every policy is indexed.
+
+Usage:
+    python benchmarks/bench_policy_ingestion.py
+    python benchmarks/bench_policy_ingestion.py --documents 12 --pages 400 --ingestion-workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import sys
+import time
+import uuid
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services import pdf_extraction
+from app.services.policy_ingestion import POLICY_QUEUED, PolicyIngestionPipeline, ingest_policy
+from app.services.upload_spool import spool_upload
+from bench_pdf_extraction import build_pdf
+from bench_policy_retrieval import build_corpus
+
+
+class FakeDatabase:
+    """policies/policy_chunks tables in memory, with a round trip per call"""
+
+    def __init__(self, rtt_ms: float):
+        self.rtt = rtt_ms / 1000
+        self.policies = {}
+
+    async def create_policy(self, policy_data):
+        await asyncio.sleep(self.rtt)
+        policy_id = str(uuid.uuid4())
+        self.policies[policy_id] = dict(policy_data)
+        return policy_id
+
+    async def update_policy(self, policy_id, updates):
+        await asyncio.sleep(self.rtt)
+        if policy_id not in self.policies:
+            return False
+        self.policies[policy_id].update(updates)
+        return True
+
+    async def create_policy_chunks(self, policy_id, chunks):
+        await asyncio.sleep(self.rtt)
+        return len(chunks)
+
+    async def create_policy_pages(self, policy_id, pages):
+        await asyncio.sleep(self.rtt)
+        return len(pages)
+
+    async def find_policy_by_hash(self, column, value, exclude_id=None):
+        await asyncio.sleep(self.rtt)
+        return None
+
+    async def get_policy_corpus(self):
+        # No corpus built yet: add_policy_to_corpus leaves it to the next load
+        await asyncio.sleep(self.rtt)
+        return None
+
+
+class Upload:
+    def __init__(self, filename: str, content: bytes):
+        self.filename = filename
+        self.file = io.BytesIO(content)
+
+
+async def run(strategy: str, documents, settings: Settings, rtt_ms: float) -> dict:
+    db = FakeDatabase(rtt_ms)
+    request_seconds = []
+    started = time.perf_counter()
+
+    if strategy == "inline":
+        for name, content in documents:
+            request_started = time.perf_counter()
+            with await spool_upload(Upload(name, content), max_size=settings.max_file_size) as upload:
+                policy_id = await db.create_policy({"name": name, "file_size": upload.size, "status": POLICY_QUEUED})
+                await ingest_policy(db, policy_id, name, upload.source(), settings)
+            request_seconds.append(time.perf_counter() - request_started)
+    else:
+        pipeline = PolicyIngestionPipeline(settings, max_concurrency=settings.policy_ingestion_workers)
+        request_started = time.perf_counter()
+        for name, content in documents:
+            upload = await spool_upload(Upload(name, content), max_size=settings.max_file_size)
+            policy_id = await db.create_policy({"name": name, "file_size": upload.size, "status": POLICY_QUEUED})
+            pipeline.submit(db, policy_id, name, upload)
+        request_seconds.append(time.perf_counter() - request_started)
+        await pipeline.join()
+
+    statuses = {p.get("status") for p in db.policies.values()}
+    assert statuses == {"indexed"}, statuses
+    return {"slowest_request": max(request_seconds), "all_indexed": time.perf_counter() - started}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--ingestion-workers", type=int, default=2)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    corpus = build_corpus(args.documents, 30)
+    documents = [
+        (f"{policy['name']}.pdf", build_pdf(policy["extracted_text"].split("\n\n"), args.pages))
+        for policy in corpus
+    ]
+    settings = Settings(
+        answer_cache_enabled=False,
+        policy_ingestion_workers=args.ingestion_workers,
+        max_file_size=max(len(content) for _, content in documents)
+    )
+    pool = pdf_extraction.get_pdf_extraction_pool(settings)
+
+    print(f"\n{args.documents} PDFs x {args.pages} pages, {pool.max_workers} extraction workers, "
+          f"{args.ingestion_workers} ingestion workers, {args.rtt_ms:.0f} ms database round trip\n")
+    print(f"{'strategy':<10}{'slowest upload request s':>26}{'all indexed s':>15}")
+    for strategy in ("inline", "pipeline"):
+        result = asyncio.run(run(strategy, documents, settings, args.rtt_ms))
+        print(f"{strategy:<10}{result['slowest_request']:>26.2f}{result['all_indexed']:>15.2f}")
+    pdf_extraction.shutdown_pdf_extraction_pool()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: whole-document vs per-page policy reads
+
+Paginates a synthetic knowledge base of long policies the way ingestion does
+(PDFProcessor.paginate), stores it in a fake database that serialises every
+response as JSON (the PostgREST payload), and compares for each policy:
+- whole: reading the policy to show the page a cited passage came from
+  (get_policy_by_id, the whole extracted_text)
+- pages: reading only the cited page range (get_policy_pages)
+- index: reading the page index without text (include_content=False)
+Also reports chunking time with and without page provenance.
+
+Usage:
+    python benchmarks/bench_policy_pages.py
+    python benchmarks/bench_policy_pages.py --policies 40 --pages 300
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.pdf_processor import PDFProcessor
+from app.services.policy_index import chunk_text
+from app.services.policy_pages import join_page_records, load_policy_pages
+from bench_policy_retrieval import build_corpus
+
+
+class FakeDatabase:
+    """policies/policy_pages tables in memory; counts the JSON bytes of every response"""
+
+    def __init__(self):
+        self.policies = {}
+        self.pages = {}
+        self.bytes_read = 0
+
+    def _respond(self, data):
+        self.bytes_read += len(json.dumps(data))
+        return data
+
+    async def get_policy_by_id(self, policy_id, include_text=True):
+        return self._respond(self.policies.get(policy_id))
+
+    async def get_policy_pages(self, policy_id, start_page=None, end_page=None, include_content=True):
+        pages = [
+            page if include_content else {k: v for k, v in page.items() if k != "content"}
+            for page in self.pages.get(policy_id, [])
+            if (start_page is None or page["page_number"] >= start_page)
+            and (end_page is None or page["page_number"] <= end_page)
+        ]
+        return self._respond(pages)
+
+
+def build_pages(text: str, page_count: int):
+    """Split a policy's paragraphs over page_count pages, as (page index, text) pairs"""
+    paragraphs = text.split("\n\n")
+    per_page = max(1, -(-len(paragraphs) // page_count))
+    return [
+        (page, "\n\n".join(paragraphs[page * per_page:(page + 1) * per_page]))
+        for page in range(page_count)
+    ]
+
+
+async def run(db: FakeDatabase, citations) -> dict:
+    results = {}
+    for strategy in ("whole", "pages", "index"):
+        db.bytes_read = 0
+        started = time.perf_counter()
+        for policy_id, page_start, page_end in citations:
+            if strategy == "whole":
+                await db.get_policy_by_id(policy_id)
+            elif strategy == "pages":
+                await load_policy_pages(db, policy_id, page_start, page_end)
+            else:
+                await load_policy_pages(db, policy_id, include_content=False)
+        results[strategy] = {"bytes": db.bytes_read, "seconds": time.perf_counter() - started}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--pages", type=int, default=120)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    random.seed(7)
+    db = FakeDatabase()
+    citations = []
+    chunk_seconds = {"without pages": 0.0, "with pages": 0.0}
+    for policy in build_corpus(args.policies, args.paragraphs):
+        records = PDFProcessor().paginate(build_pages(policy["extracted_text"], args.pages))
+        text = join_page_records(records)
+        db.policies[policy["id"]] = {"id": policy["id"], "name": policy["name"], "extracted_text": text}
+        db.pages[policy["id"]] = records
+
+        started = time.perf_counter()
+        chunk_text(text)
+        chunk_seconds["without pages"] += time.perf_counter() - started
+        started = time.perf_counter()
+        chunks = chunk_text(text, pages=records)
+        chunk_seconds["with pages"] += time.perf_counter() - started
+
+        # One cited passage per policy
+        chunk = random.choice(chunks)
+        citations.append((policy["id"], chunk["page_start"], chunk["page_end"]))
+
+    results = asyncio.run(run(db, citations))
+    average_text = sum(len(p["extracted_text"]) for p in db.policies.values()) / len(db.policies)
+    print(f"\n{args.policies} policies x {args.pages} pages ({average_text / 1000:.0f} K characters each), "
+          f"one cited passage per policy\n")
+    print(f"{'read':<8}{'KB read':>12}{'KB per citation':>18}")
+    for strategy, result in results.items():
+        print(f"{strategy:<8}{result['bytes'] / 1000:>12.1f}{result['bytes'] / 1000 / len(citations):>18.2f}")
+    print()
+    for label, seconds in chunk_seconds.items():
+        print(f"chunking {label:<14}{seconds * 1000:>8.1f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark: full-corpus prompts vs BM25-retrieved policy passages
+
+Builds a synthetic knowledge base of 60 policies (each covering one security
+topic plus shared boilerplate), then for one question per topic compares:
+- Prompt size (characters and estimated tokens)
+- Index build and passage selection time
+- End-to-end generation time against a fake Claude whose latency grows with input size
+- Retrieval recall: whether the policy covering the topic made it into the context
+
+Usage:
+    python benchmarks/bench_policy_retrieval.py
+    python benchmarks/bench_policy_retrieval.py --policies 120 --paragraphs 80
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ai_service import AIService
+from app.services.generation_engine import GenerationEngine, estimate_tokens
+from app.services.policy_index import PolicyRetriever, chunk_text
+from fake_anthropic import FakeAnthropic
+
+TOPICS = [
+    ("encryption", "data at rest is encrypted with AES-256 and keys rotate annually in the key management service"),
+    ("multi-factor authentication", "MFA is mandatory for VPN, email and every administrative console"),
+    ("password", "passwords require 14 characters and are checked against breached password lists"),
+    ("backup", "backups run nightly, are stored offsite and restore tests happen quarterly"),
+    ("incident response", "security incidents are triaged within one hour and customers are notified within 72 hours"),
+    ("vulnerability scanning", "external vulnerability scans run weekly and critical findings are patched within 7 days"),
+    ("penetration test", "an independent penetration test is performed annually by a CREST certified firm"),
+    ("logging", "security logs are centralised in the SIEM and retained for 12 months"),
+    ("vendor management", "vendors handling customer data complete a security assessment before onboarding"),
+    ("background check", "employees undergo background checks before access to production is granted"),
+    ("security awareness training", "all staff complete security awareness training at hire and annually"),
+    ("access review", "user access to critical systems is reviewed quarterly by system owners"),
+    ("business continuity", "the business continuity plan is tested annually with an RTO of 4 hours"),
+    ("data retention", "customer data is deleted within 30 days of contract termination"),
+    ("change management", "production changes require peer review and an approved change ticket"),
+    ("physical security", "office access uses badge readers and visitor logs are retained for 90 days"),
+    ("endpoint protection", "all laptops run EDR software and full disk encryption"),
+    ("network segmentation", "production networks are segmented from corporate networks by firewalls"),
+    ("secure development", "code is scanned with SAST tools and dependencies are checked for known CVEs"),
+    ("privacy", "personal data processing follows GDPR and a DPO oversees privacy requests"),
+    ("asset inventory", "hardware and software assets are tracked in a central inventory updated monthly"),
+    ("mobile device", "mobile devices accessing email are enrolled in MDM with remote wipe"),
+    ("cloud security", "cloud accounts enforce guardrails through organisation policies and CSPM monitoring"),
+    ("risk assessment", "a formal risk assessment is performed annually and reviewed by leadership"),
+    ("disaster recovery", "disaster recovery fails over to a secondary region with an RPO of one hour"),
+    ("acceptable use", "employees acknowledge the acceptable use policy during onboarding"),
+    ("remote access", "remote access to internal systems requires the corporate VPN with device posture checks"),
+    ("wireless", "corporate wireless networks use WPA3 Enterprise and guest networks are isolated"),
+    ("segregation of duties", "developers cannot deploy their own changes to production without approval"),
+    ("monitoring", "infrastructure is monitored 24x7 with on-call alerting for security events"),
+]
+
+FILLER = [
+    "This policy applies to all employees, contractors and third parties of the organization.",
+    "The policy owner reviews this document at least annually and after significant changes.",
+    "Exceptions must be documented, approved by the CISO and reviewed every six months.",
+    "Violations of this policy may result in disciplinary action up to and including termination.",
+    "Definitions used in this document follow the information security glossary.",
+    "Questions about this policy should be directed to the security team.",
+]
+
+
+def build_corpus(policy_count: int, paragraphs: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    policies = []
+    for idx in range(policy_count):
+        topic, fact = TOPICS[idx % len(TOPICS)]
+        body = []
+        for p in range(paragraphs):
+            if p % 10 == 3:
+                body.append(f"{topic.title()} requirements: {fact}. This control is owned by the {topic} working group.")
+            else:
+                body.append(" ".join(rng.sample(FILLER, 4)))
+        policies.append({
+            "id": f"policy-{idx}",
+            "name": f"POL-{idx + 1:02d} {topic.title()} Policy",
+            "topic": topic,
+            "extracted_text": f"POL-{idx + 1:02d} {topic.title()} Policy\n\n" + "\n\n".join(body),
+        })
+    return policies
+
+
+async def run_generation(questions: list, context_for, concurrency: int, latency_per_1k: float) -> float:
+    client = FakeAnthropic(latency=0.1, jitter=0.0, latency_per_1k_tokens=latency_per_1k)
+    ai_service = AIService(api_key="benchmark", client=client)
+    engine = GenerationEngine(max_concurrency=concurrency)
+
+    async def handler(question):
+        return await ai_service.generate_answer(question["question_text"], context_for(question["question_text"]))
+
+    stats = await engine.run(questions, handler)
+    return stats.elapsed_seconds
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", type=int, default=60)
+    parser.add_argument("--paragraphs", type=int, default=60, help="Paragraphs per policy")
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--token-budget", type=int, default=6000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-per-1k", type=float, default=0.002, help="Fake seconds per 1k input tokens")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    policies = build_corpus(args.policies, args.paragraphs)
+    full_context = "\n\n".join(p["extracted_text"] for p in policies)
+
+    started = time.perf_counter()
+    chunks = []
+    for policy in policies:
+        for chunk in chunk_text(policy["extracted_text"]):
+            chunks.append({**chunk, "policy_id": policy["id"], "policy_name": policy["name"]})
+    chunk_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    retriever = PolicyRetriever(chunks)
+    index_seconds = time.perf_counter() - started
+
+    topics = sorted({p["topic"] for p in policies})
+    questions = [
+        {"id": f"q-{i}", "question_text": f"Describe your {topic} controls.", "topic": topic}
+        for i, topic in enumerate(topics)
+    ]
+
+    select_times, context_sizes, hits = [], [], 0
+    for question in questions:
+        started = time.perf_counter()
+        passages = retriever.select_passages(question["question_text"], args.top_k, args.token_budget)
+        select_times.append(time.perf_counter() - started)
+        context_sizes.append(sum(len(p["content"]) for p in passages))
+        if any(question["topic"].title() in (p["policy_name"] or "") for p in passages):
+            hits += 1
+
+    avg_retrieved = sum(context_sizes) / len(context_sizes)
+    full_seconds = await run_generation(questions, lambda q: full_context, args.concurrency, args.latency_per_1k)
+    retrieval_seconds = await run_generation(
+        questions,
+        lambda q: retriever.select_context(q, args.top_k, args.token_budget),
+        args.concurrency,
+        args.latency_per_1k,
+    )
+
+    print(f"\nCorpus: {len(policies)} policies, {len(full_context):,} characters, {len(chunks):,} passages")
+    print(f"Chunking: {chunk_seconds * 1000:.1f} ms   Index build: {index_seconds * 1000:.1f} ms")
+    print(f"Selection: {sum(select_times) / len(select_times) * 1000:.2f} ms/question (avg)\n")
+    print(f"{'mode':<12}{'context chars':>16}{'~tokens':>12}{'run seconds':>14}")
+    print("-" * 54)
+    print(f"{'full':<12}{len(full_context):>16,}{estimate_tokens(full_context):>12,}{full_seconds:>14.2f}")
+    print(f"{'retrieval':<12}{int(avg_retrieved):>16,}{int(avg_retrieved / 4):>12,}{retrieval_seconds:>14.2f}")
+    print(f"\nPrompt size reduction: {len(full_context) / avg_retrieved:.1f}x   "
+          f"Run time reduction: {full_seconds / retrieval_seconds:.1f}x   "
+          f"Recall (topic policy retrieved): {hits}/{len(questions)}\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""
+Benchmark: full-list polling vs server-sent progress events
+
+Runs a single-mode generation (generate_answers_for_questions) against the fake
+Claude while two observers watch it:
+- polling: the previous frontend behaviour, fetching every question of the
+  questionnaire (as JSON) every --poll-interval seconds
+- events: a subscriber of the run's GenerationProgress, receiving the same SSE
+  frames the /generation-events endpoint sends
+
+Reports requests, bytes transferred and how long after an answer was saved the
+client could show it.
+
+Usage:
+    python benchmarks/bench_progress_events.py
+    python benchmarks/bench_progress_events.py --questions 300 --latency 2.0
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.settings import Settings
+from app.services.ai_service import AIService
+from app.services.answer_generation import generate_answers_for_questions
+from app.services.policy_index import PolicyContext
+from app.services.progress import format_sse, get_progress_broker
+from fake_anthropic import FakeAnthropic
+
+ANSWER = (
+    "Yes. Multi-factor authentication is enforced for all administrative access, VPN and email. "
+    "Access rights are reviewed quarterly by system owners and revoked within 24 hours of termination. "
+) * 3
+
+
+class FakeDatabase:
+    """Keeps question rows in memory and records when each answer was saved"""
+
+    def __init__(self, questions):
+        self.rows = {q["id"]: dict(q) for q in questions}
+        self.saved_at = {}
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        self.rows[question_id].update(answer=answer, status=status, answer_source=answer_source)
+        self.saved_at[question_id] = time.monotonic()
+        return True
+
+    def questions_json(self) -> str:
+        return json.dumps({"success": True, "questions": list(self.rows.values()), "count": len(self.rows)})
+
+
+async def poll(db: FakeDatabase, interval: float, done: asyncio.Event) -> dict:
+    requests = transferred = 0
+    seen_at = {}
+    while True:
+        body = db.questions_json()
+        requests += 1
+        transferred += len(body)
+        now = time.monotonic()
+        for question_id, row in db.rows.items():
+            if row.get("answer") and question_id not in seen_at:
+                seen_at[question_id] = now
+        if done.is_set() and len(seen_at) == len(db.saved_at):
+            return {"requests": requests, "bytes": transferred, "seen_at": seen_at}
+        await asyncio.sleep(interval)
+
+
+async def listen(progress) -> dict:
+    transferred = events = 0
+    seen_at = {}
+    async for event in progress.subscribe():
+        frame = format_sse(event["event"], event["data"])
+        events += 1
+        transferred += len(frame)
+        if event["event"] == "question_completed":
+            seen_at[event["data"]["question_id"]] = time.monotonic()
+    return {"requests": 1, "events": events, "bytes": transferred, "seen_at": seen_at}
+
+
+def delays(db: FakeDatabase, seen_at: dict) -> list:
+    return [seen_at[qid] - saved for qid, saved in db.saved_at.items() if qid in seen_at]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=1.0, help="Fake seconds per Claude call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--poll-interval", type=float, default=3.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    questions = [
+        {"id": f"q-{i}", "questionnaire_id": "questionnaire-1", "question_text": f"Question {i}: Do you enforce MFA?",
+         "answer": None, "status": "unapproved", "answer_source": None}
+        for i in range(args.questions)
+    ]
+    db = FakeDatabase(questions)
+    ai_service = AIService(api_key="benchmark", client=FakeAnthropic(latency=args.latency, jitter=args.latency / 4, answer=ANSWER))
+    settings = Settings(ai_max_concurrency=args.concurrency, ai_requests_per_minute=0, ai_prompt_caching=False)
+    progress, _ = get_progress_broker().start("questionnaire-1", total=len(questions), mode="single")
+
+    done = asyncio.Event()
+    poller = asyncio.create_task(poll(db, args.poll_interval, done))
+    listener = asyncio.create_task(listen(progress))
+
+    stats = await generate_answers_for_questions(
+        questions, db, ai_service, PolicyContext(full_text="MFA is mandatory."), settings, progress=progress
+    )
+    progress.finish(stats)
+    done.set()
+    polled, streamed = await poller, await listener
+
+    print(f"\n{args.questions} questions in {stats.elapsed_seconds:.1f}s, "
+          f"polling every {args.poll_interval:.0f}s vs one event stream\n")
+    print(f"{'client':<10}{'requests':>10}{'events':>8}{'KB':>10}{'visible after (mean/max s)':>30}")
+    print("-" * 68)
+    for label, result in (("polling", polled), ("events", streamed)):
+        lag = delays(db, result["seen_at"])
+        print(f"{label:<10}{result['requests']:>10}{result.get('events', '-'):>8}{result['bytes'] / 1024:>10.1f}"
+              f"{statistics.mean(lag):>18.3f} / {max(lag):.3f}")
+    print(f"\nTransfer reduction: {polled['bytes'] / streamed['bytes']:.1f}x\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
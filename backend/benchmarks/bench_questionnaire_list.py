@@ -0,0 +1,164 @@
+"""
+Benchmark: questionnaire list latency (GET /api/questionnaires/)
+
+Runs the real endpoint and DatabaseService against a local PostgREST stand-in
+(benchmarks/postgrest_standin.py: SQLite behind PostgREST's HTTP API, with a
+fixed delay per request for the network round trip to a hosted database). It
+compares three ways of getting the question counts:
+- legacy: two requests per questionnaire (every question id, then every
+  approved question id), counted with len()
+- fallback: without the migration, one paged scan of the listed
+  questionnaires' question statuses, counted in Python
+- view: the questionnaire_summaries view (migrations/
+  add_questionnaire_summaries_view.sql), with counts in the same query
+Reports the median endpoint latency, the database requests per call and the
+response size as the number of questionnaires grows. Every questionnaire is
+listed in one page (limit= the number of questionnaires); see
+bench_list_pagination.py for paging.
+
+Usage:
+    python benchmarks/bench_questionnaire_list.py
+    python benchmarks/bench_questionnaire_list.py --latency-ms 5 --sizes 10,100,1000
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from postgrest_standin import PostgRESTStandIn
+
+# The tables the list reads, in SQLite (see supabase_complete_schema.sql)
+SCHEMA = """
+CREATE TABLE questionnaires (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL,
+  filename TEXT NOT NULL,
+  status TEXT DEFAULT 'in_progress',
+  content_sha256 TEXT,
+  text_sha256 TEXT,
+  upload_date TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE TABLE questions (
+  id TEXT PRIMARY KEY,
+  question_text TEXT NOT NULL,
+  answer TEXT,
+  status TEXT DEFAULT 'unapproved',
+  questionnaire_id TEXT REFERENCES questionnaires(id) ON DELETE CASCADE,
+  created_at TEXT,
+  updated_at TEXT
+);
+CREATE INDEX idx_questions_questionnaire_id ON questions(questionnaire_id);
+CREATE INDEX idx_questions_questionnaire_status ON questions(questionnaire_id, status);
+"""
+
+VIEW = """
+CREATE VIEW questionnaire_summaries AS
+SELECT
+  qn.*,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id) AS question_count,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id AND q.status = 'approved') AS approved_count
+FROM questionnaires qn;
+"""
+
+
+async def legacy_get_all_questionnaires(self):
+    """DatabaseService.get_all_questionnaires before the summaries view"""
+    questionnaires = self.client.table("questionnaires").select("*").order("created_at", desc=True).execute().data
+    for questionnaire in questionnaires:
+        questions_result = self.client.table("questions").select("id").eq("questionnaire_id", questionnaire["id"]).execute()
+        questionnaire["question_count"] = len(questions_result.data)
+        approved_result = self.client.table("questions").select("id").eq("questionnaire_id", questionnaire["id"]).eq("status", "approved").execute()
+        questionnaire["approved_count"] = len(approved_result.data)
+    return questionnaires
+
+
+async def legacy_list_questionnaires(self, **query):
+    """DatabaseService.list_questionnaires standing in for the legacy method (one page of everything)"""
+    return await legacy_get_all_questionnaires(self), None
+
+
+def seed(server: PostgRESTStandIn, questionnaires: int, questions_per: int) -> None:
+    server.conn.execute("DELETE FROM questions")
+    server.conn.execute("DELETE FROM questionnaires")
+    rows, question_rows = [], []
+    for index in range(questionnaires):
+        questionnaire_id = str(uuid.uuid4())
+        stamp = f"2025-01-01T00:{index // 60 % 60:02d}:{index % 60:02d}+00:00"
+        rows.append((questionnaire_id, f"Questionnaire {index}", f"questionnaire_{index}.xlsx", stamp, stamp, stamp))
+        for number in range(questions_per):
+            question_rows.append((
+                str(uuid.uuid4()), f"Question {number} of questionnaire {index}?", "An answer.",
+                "approved" if number % 3 == 0 else "unapproved", questionnaire_id, stamp, stamp
+            ))
+    server.conn.execute("BEGIN")
+    server.conn.executemany(
+        "INSERT INTO questionnaires (id, name, filename, upload_date, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)", rows
+    )
+    server.conn.executemany(
+        "INSERT INTO questions (id, question_text, answer, status, questionnaire_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        question_rows
+    )
+    server.conn.execute("COMMIT")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,50,100,250,500", help="Questionnaire counts")
+    parser.add_argument("--questions", type=int, default=40, help="Questions per questionnaire")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Delay per database request")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = PostgRESTStandIn(SCHEMA, latency_ms=args.latency_ms)
+    os.environ["SUPABASE_URL"] = server.start()
+    os.environ["SUPABASE_KEY"] = "standin"
+    sizes = [int(value) for value in args.sizes.split(",")]
+    os.environ["LIST_MAX_PAGE_SIZE"] = str(max(sizes))
+    logging.disable(logging.WARNING)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.database import DatabaseService
+
+    client = TestClient(app)
+    current = DatabaseService.list_questionnaires
+
+    print(f"\n{args.questions} questions per questionnaire, {args.latency_ms:g} ms per database request\n")
+    print(f"{'questionnaires':>14}  {'variant':<9}{'median ms':>11}{'requests':>10}{'response KB':>13}")
+    for size in sizes:
+        seed(server, size, args.questions)
+        expected = None
+        for variant in ("legacy", "fallback", "view"):
+            server.conn.execute("DROP VIEW IF EXISTS questionnaire_summaries")
+            if variant == "view":
+                server.conn.executescript(VIEW)
+            DatabaseService.list_questionnaires = legacy_list_questionnaires if variant == "legacy" else current
+
+            timings = []
+            for _ in range(args.runs):
+                before = server.requests
+                started = time.perf_counter()
+                response = client.get("/api/questionnaires/", params={"limit": size})
+                timings.append(time.perf_counter() - started)
+                requests = server.requests - before
+            response.raise_for_status()
+            counts = sorted((q["id"], q["question_count"], q["approved_count"]) for q in response.json()["questionnaires"])
+            assert expected is None or counts == expected, f"{variant} counts differ"
+            expected = counts
+            print(f"{size:>14}  {variant:<9}{statistics.median(timings) * 1000:>11.1f}{requests:>10}{len(response.content) / 1024:>13.1f}")
+    server.stop()
+    print()
+
+
+if __name__ == "__main__":
+    main()
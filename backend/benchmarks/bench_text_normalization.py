@@ -0,0 +1,107 @@
+"""
+Benchmark: policy text normalisation (app/services/text_normalization.py)
+
+Builds a test corpus of 40-page policies laid out the way extracted PDF pages
+look: a company header and a confidentiality banner at the top of every page,
+a "Page N of M" footer and a document-control line at the bottom, words
+hyphenated at line ends and stray runs of spaces. The body text (the
+paragraphs of bench_policy_retrieval's corpus) is known, so the benchmark
+reports for each policy:
+- characters (and estimated prompt tokens, 4 characters each) before and after
+- body words kept: share of the body's words found, in order, in the
+  normalised text (1.000 = no body text lost)
+- boilerplate left: header/footer lines still present in the normalised text
+
+Usage:
+    python benchmarks/bench_text_normalization.py
+    python benchmarks/bench_text_normalization.py --policies 10 --pages 80
+"""
+
+import argparse
+import difflib
+import os
+import random
+import sys
+import time
+import textwrap
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.text_normalization import normalize_pages
+from bench_policy_retrieval import build_corpus
+
+HEADER = "Acme Financial Services Ltd  |  {name}  |  Version 3.2"
+BANNER = "CONFIDENTIAL - INTERNAL USE ONLY - DO NOT DISTRIBUTE"
+FOOTER = "Page {page} of {pages}"
+CONTROL = "Printed copies are uncontrolled. Document owner: Information Security Office. Last reviewed 14/03/2025"
+
+
+def _wrap(paragraph: str, rng: random.Random, width: int = 90):
+    """Wrap a paragraph into lines, hyphenating some long words across line ends"""
+    lines = textwrap.wrap(paragraph, width)
+    for index in range(len(lines) - 1):
+        following = lines[index + 1].split(" ", 1)
+        word = following[0]
+        if len(word) >= 8 and word.isalpha() and word.islower() and rng.random() < 0.3:
+            # Move the first half of the next line's first word to the end of this line
+            lines[index] += f" {word[:len(word) // 2]}-"
+            lines[index + 1] = " ".join([word[len(word) // 2:]] + following[1:])
+    # Extraction leaves irregular spacing
+    return [line.replace(" ", "   ", 1) if rng.random() < 0.2 else line for line in lines]
+
+
+def build_policy(name: str, paragraphs, pages: int, rng: random.Random):
+    """(page number, text) pages of one policy laid out with boilerplate, and its body text"""
+    body_lines = []
+    for paragraph in paragraphs:
+        body_lines.extend(_wrap(paragraph, rng) + [""])
+    per_page = max(1, -(-len(body_lines) // pages))
+    layout = []
+    for page in range(pages):
+        lines = [HEADER.format(name=name), BANNER, ""]
+        lines += body_lines[page * per_page:(page + 1) * per_page]
+        lines += ["", FOOTER.format(page=page + 1, pages=pages), CONTROL]
+        layout.append((page, "\n".join(lines)))
+    return layout, "\n\n".join(paragraphs)
+
+
+def body_words_kept(normalized: str, body: str) -> float:
+    """Share of the body's words found in order in the normalised text"""
+    truth = body.split()
+    matcher = difflib.SequenceMatcher(None, truth, normalized.split(), autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(truth)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--policies", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--paragraphs", type=int, default=160)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    corpus = build_corpus(args.policies, args.paragraphs)
+    print(f"\n{args.policies} policies x {args.pages} pages\n")
+    print(f"{'policy':<32}{'chars before':>14}{'chars after':>13}{'ratio':>8}"
+          f"{'tokens saved':>14}{'body kept':>11}{'boilerplate left':>18}{'ms':>7}")
+    totals = [0, 0]
+    for policy in corpus:
+        pages, body = build_policy(policy["name"], policy["extracted_text"].split("\n\n"), args.pages, rng)
+        started = time.perf_counter()
+        normalized, report = normalize_pages(pages)
+        elapsed = time.perf_counter() - started
+        text = "\n\n".join(page for _, page in normalized)
+        left = sum(text.count(line) for line in (BANNER, CONTROL, f"of {args.pages}", "Version 3.2"))
+        totals[0] += report["characters_before"]
+        totals[1] += report["characters_after"]
+        print(f"{policy['name'][:30]:<32}{report['characters_before']:>14}{report['characters_after']:>13}"
+              f"{report['ratio']:>8.1%}{(report['characters_before'] - report['characters_after']) // 4:>14}"
+              f"{body_words_kept(text, body):>11.3f}{left:>18}{elapsed * 1000:>7.1f}")
+    print(f"\ntotal: {totals[0]} -> {totals[1]} characters ({totals[1] / totals[0]:.1%}), "
+          f"~{(totals[0] - totals[1]) // 4} prompt tokens saved per question using every policy\n")
+
+
+if __name__ == "__main__":
+    main()
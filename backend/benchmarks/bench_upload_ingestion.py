@@ -0,0 +1,140 @@
+"""
+Benchmark: buffered vs streaming, size-capped upload ingestion
+
+Sends concurrent multipart uploads through a FastAPI app in-process (httpx
+ASGITransport, files streamed from disk) and measures peak Python heap
+(tracemalloc) while they are handled. Compares:
+- buffered: await file.read(), size check, processor reads a BytesIO copy, as
+  the upload endpoints did before app/services/upload_spool.py
+- spooled: spool_upload() in chunks (size limit and SHA-256 while reading,
+  temp file past the memory threshold) behind UploadSizeLimitMiddleware, the
+  processor reads the spooled file
+Also sends one oversized upload and reports how many body bytes the app read
+before rejecting it.
+
+Usage:
+    python benchmarks/bench_upload_ingestion.py
+    python benchmarks/bench_upload_ingestion.py --uploads 20 --size-mb 10
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, File, HTTPException, UploadFile
+
+from app.services.upload_spool import UploadSizeLimitMiddleware, UploadTooLargeError, spool_upload
+
+MAX_FILE_SIZE = 10 * 1024 * 1024
+
+
+def consume(stream) -> int:
+    """Stand-in for a processor reading the whole file"""
+    digest, total = hashlib.sha256(), 0
+    while chunk := stream.read(1024 * 1024):
+        digest.update(chunk)
+        total += len(chunk)
+    return total
+
+
+def build_app(strategy: str, max_file_size: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/upload/file")
+    async def upload(file: UploadFile = File(...)):
+        if strategy == "buffered":
+            content = await file.read()
+            if len(content) > max_file_size:
+                raise HTTPException(status_code=413, detail="too large")
+            return {"size": consume(io.BytesIO(content)), "sha256": hashlib.sha256(content).hexdigest()}
+        try:
+            with await spool_upload(file, max_size=max_file_size) as spooled:
+                return {"size": consume(spooled.open()), "sha256": spooled.sha256}
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+
+    if strategy == "spooled":
+        app.add_middleware(UploadSizeLimitMiddleware, limits={"/api/upload": max_file_size + 64 * 1024})
+    return app
+
+
+class CountingTransport(httpx.ASGITransport):
+    """Counts request body bytes the app actually pulled through receive()"""
+
+    def __init__(self, app):
+        self.received = 0
+
+        async def counting_app(scope, receive, send):
+            async def counted():
+                message = await receive()
+                self.received += len(message.get("body", b""))
+                return message
+            await app(scope, counted, send)
+
+        super().__init__(app=counting_app)
+
+
+async def run(strategy: str, path: str, oversized_path: str, uploads: int) -> dict:
+    transport = CountingTransport(build_app(strategy, MAX_FILE_SIZE))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def send(file_path):
+            with open(file_path, "rb") as f:
+                return await client.post("/api/upload/file", files={"file": (os.path.basename(file_path), f)})
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(send(path) for _ in range(uploads)))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert all(r.status_code == 200 for r in responses), [r.text for r in responses if r.status_code != 200]
+
+        transport.received = 0
+        rejected = await send(oversized_path)
+    return {
+        "elapsed": elapsed,
+        "peak": peak,
+        "rejected_status": rejected.status_code,
+        "rejected_read": transport.received,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--size-mb", type=float, default=9.5, help="Size of each upload (under the 10MB limit)")
+    parser.add_argument("--oversized-mb", type=float, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    directory = tempfile.mkdtemp(prefix="upload-bench-")
+    path = os.path.join(directory, "policy.pdf")
+    oversized_path = os.path.join(directory, "oversized.pdf")
+    with open(path, "wb") as f:
+        f.write(os.urandom(int(args.size_mb * 1024 * 1024)))
+    with open(oversized_path, "wb") as f:
+        f.write(os.urandom(int(args.oversized_mb * 1024 * 1024)))
+
+    print(f"\n{args.uploads} concurrent uploads of {args.size_mb} MB; one {args.oversized_mb:.0f} MB upload "
+          f"over the {MAX_FILE_SIZE // (1024 * 1024)} MB limit\n")
+    print(f"{'strategy':<10}{'wall s':>8}{'peak heap MB':>14}{'oversized':>11}{'read before 413 MB':>20}")
+    for strategy in ("buffered", "spooled"):
+        r = asyncio.run(run(strategy, path, oversized_path, args.uploads))
+        print(f"{strategy:<10}{r['elapsed']:>8.2f}{r['peak'] / 1e6:>14.1f}{r['rejected_status']:>11}"
+              f"{r['rejected_read'] / 1e6:>20.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
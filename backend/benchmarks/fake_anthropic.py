@@ -0,0 +1,211 @@
+"""
+Fake Anthropic client for offline benchmarks
+
+Mimics `anthropic.AsyncAnthropic().messages.create(...)` closely enough for AIService:
+- Every call sleeps for a configurable latency (plus jitter)
+- Calls beyond a server-side concurrency capacity are rejected with a real
+  `anthropic.RateLimitError` (HTTP 429, with a retry-after header)
+- A configurable fraction of calls randomly fails with 429 or 529 (overloaded)
+- Latency can grow with prompt size to model time spent processing input tokens
+- System blocks marked with cache_control emulate prompt caching: the first call
+  writes the prefix, later calls read it (reported in usage, and 10x cheaper in latency)
+- Batched prompts (<question id="..."> blocks) get a JSON answer array; a configurable
+  fraction of items is dropped to exercise the single-question retry path
+- messages.stream() replays the answer as small text deltas (after the call's latency)
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+from types import SimpleNamespace
+from typing import Optional
+
+import anthropic
+import httpx
+
+_REQUEST = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+
+def make_status_error(status_code: int, retry_after: Optional[float] = None) -> anthropic.APIStatusError:
+    """Build the same exception type the SDK raises for a given HTTP status"""
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    response = httpx.Response(status_code, headers=headers, request=_REQUEST)
+    if status_code == 429:
+        return anthropic.RateLimitError("rate_limit_error: Too many requests", response=response, body=None)
+    return anthropic.InternalServerError("overloaded_error: Overloaded", response=response, body=None)
+
+
+class _FakeMessages:
+    def __init__(self, owner: "FakeAnthropic"):
+        self._owner = owner
+
+    async def create(self, **kwargs):
+        return await self._owner._create(**kwargs)
+
+    def stream(self, **kwargs) -> "_FakeMessageStream":
+        return _FakeMessageStream(self._owner, kwargs)
+
+
+class _FakeMessageStream:
+    """Async context manager shaped like the SDK's MessageStream"""
+
+    def __init__(self, owner: "FakeAnthropic", kwargs: dict, chunk_size: int = 16):
+        self._owner = owner
+        self._kwargs = kwargs
+        self._chunk_size = chunk_size
+        self._message = None
+
+    async def __aenter__(self) -> "_FakeMessageStream":
+        self._message = await self._owner._create(**self._kwargs)
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    @property
+    def text_stream(self):
+        return self._iter_text()
+
+    async def _iter_text(self):
+        text = self._message.content[0].text
+        for start in range(0, len(text), self._chunk_size):
+            yield text[start:start + self._chunk_size]
+
+    async def get_final_message(self):
+        return self._message
+
+
+class FakeAnthropic:
+    """Stand-in for the async Anthropic client"""
+
+    def __init__(
+        self,
+        latency: float = 0.2,
+        jitter: float = 0.05,
+        latency_per_1k_tokens: float = 0.0,
+        latency_per_output_token: float = 0.0,
+        capacity: int = 0,
+        error_rate: float = 0.0,
+        batch_drop_rate: float = 0.0,
+        retry_after: Optional[float] = 0.25,
+        answer: str = "Yes. The organization maintains a documented policy covering this control.",
+        seed: int = 7,
+    ):
+        """
+        Args:
+            latency: Base seconds per call
+            jitter: Uniform +/- seconds added to each call
+            latency_per_1k_tokens: Extra seconds per 1,000 input tokens (~4,000 characters)
+            latency_per_output_token: Extra seconds per generated output token
+            capacity: Max concurrent calls before returning 429 (0 = unlimited)
+            error_rate: Probability of a random 429/529 on any call
+            batch_drop_rate: Probability of omitting each item from a batched JSON answer
+            retry_after: retry-after header value sent with injected errors
+            answer: Text returned for successful calls
+            seed: Random seed for reproducible runs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.latency_per_output_token = latency_per_output_token
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.batch_drop_rate = batch_drop_rate
+        self.retry_after = retry_after
+        self.answer = answer
+        self.messages = _FakeMessages(self)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+        self.input_characters = 0
+        self.usage_totals = {
+            "input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": 0,
+        }
+        self._cached_prefixes = set()
+
+    async def _create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            if self.capacity and self.in_flight >= self.capacity:
+                self.rate_limited += 1
+                raise make_status_error(429, self.retry_after)
+            if roll < self.error_rate:
+                status = 429 if roll < self.error_rate / 2 else 529
+                if status == 429:
+                    self.rate_limited += 1
+                else:
+                    self.overloaded += 1
+                raise make_status_error(status, self.retry_after)
+            self.in_flight += 1
+            usage = self._usage_for(kwargs)
+            characters = sum(len(str(m.get("content", ""))) for m in kwargs.get("messages", []))
+            characters += sum(len(b.get("text", "")) for b in self._system_blocks(kwargs))
+            self.input_characters += characters
+            uncached_tokens = usage["input_tokens"] + usage["cache_creation_input_tokens"]
+            delay += self.latency_per_1k_tokens * (uncached_tokens + usage["cache_read_input_tokens"] / 10) / 1000
+            text = self._response_text(kwargs)
+            usage["output_tokens"] = max(1, len(text) // 4)
+            self.usage_totals["output_tokens"] += usage["output_tokens"]
+            delay += self.latency_per_output_token * usage["output_tokens"]
+
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(**usage),
+        )
+
+    def _response_text(self, kwargs) -> str:
+        """Plain answer for single prompts, JSON array for batched prompts (caller holds the lock)"""
+        user_message = "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+        question_ids = re.findall(r'<question id="([^"]+)">', user_message)
+        if not question_ids:
+            return self.answer
+        items = [
+            {"id": question_id, "answer": self.answer}
+            for question_id in question_ids
+            if self._random.random() >= self.batch_drop_rate
+        ]
+        return json.dumps(items)
+
+    @staticmethod
+    def _system_blocks(kwargs) -> list:
+        system = kwargs.get("system") or []
+        if isinstance(system, str):
+            return [{"type": "text", "text": system}]
+        return system
+
+    def _usage_for(self, kwargs) -> dict:
+        """Split input tokens into cache write/read/uncached like the real API (caller holds the lock)"""
+        blocks = self._system_blocks(kwargs)
+        breakpoint_idx = max((i for i, b in enumerate(blocks) if b.get("cache_control")), default=-1)
+        prefix = "".join(b.get("text", "") for b in blocks[:breakpoint_idx + 1])
+        rest = "".join(b.get("text", "") for b in blocks[breakpoint_idx + 1:])
+        rest += "".join(str(m.get("content", "")) for m in kwargs.get("messages", []))
+
+        usage = {"input_tokens": len(rest) // 4, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if prefix:
+            key = hash(prefix)
+            if key in self._cached_prefixes:
+                usage["cache_read_input_tokens"] = len(prefix) // 4
+            else:
+                self._cached_prefixes.add(key)
+                usage["cache_creation_input_tokens"] = len(prefix) // 4
+        for name, value in usage.items():
+            self.usage_totals[name] += value
+        return usage
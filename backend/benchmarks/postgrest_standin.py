@@ -0,0 +1,320 @@
+"""
+Local PostgREST stand-in for benchmarks: a SQLite database behind the subset of
+the PostgREST HTTP API that DatabaseService uses, so the real supabase client
+and DatabaseService run unchanged against it.
+
+Supported:
+- GET/HEAD /rest/v1/{table}: select (column list or *), filters (eq, neq, gt,
+  gte, lt, lte, like, ilike, is, in, not.*, or=(...), and=(...)), order,
+  limit/offset, Prefer: count=exact/planned/estimated (always exact, in
+  Content-Range), double-quoted values
+- POST (insert; upsert with Prefer: resolution=merge-duplicates), PATCH and
+  DELETE with filters, Prefer: return=representation
+- Errors shaped like PostgREST's (missing table: PGRST205, missing column: 42703)
+latency_ms adds a fixed delay per request to stand in for the network round trip
+to a hosted database, and connect_ms one per new connection for TCP and TLS
+setup; connections counts the connections opened.
+
+Usage (from a benchmark):
+    server = PostgRESTStandIn(schema_sql, latency_ms=1.0)
+    url = server.start()
+    db_service = DatabaseService(supabase_url=url, supabase_key="standin")
+    ...
+    server.stop()
+"""
+
+import json
+import re
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split "a.eq.1,and(b.eq.2,c.eq.\"x,y\")" on the commas outside parentheses and quotes"""
+    parts, depth, current, quoted, escaped = [], 0, [], False, False
+    for char in text:
+        if escaped:
+            escaped = False
+        elif quoted and char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == "," and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+            continue
+        elif not quoted:
+            depth += char == "("
+            depth -= char == ")"
+        current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part]
+
+
+def _unquote(value: str) -> str:
+    """'"a \\"b\\""' -> 'a "b"' (double-quoted values in filters)"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+class PostgRESTStandIn:
+    """SQLite-backed PostgREST subset served over HTTP/1.1 (keep-alive) on localhost"""
+
+    def __init__(self, schema_sql: str, latency_ms: float = 0.0, path: str = ":memory:", connect_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.connect_latency = connect_ms / 1000
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(schema_sql)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # Schema
+
+    def columns(self, table: str) -> List[str]:
+        rows = self.conn.execute(f"PRAGMA table_info({_quote(table)})").fetchall()
+        if not rows:
+            raise RequestError(404, "PGRST205", f"Could not find the table 'public.{table}' in the schema cache")
+        return [row["name"] for row in rows]
+
+    def _column(self, table: str, name: str) -> str:
+        name = name.strip().strip('"')
+        if name not in self.columns(table):
+            raise RequestError(400, "42703", f"column {table}.{name} does not exist")
+        return _quote(name)
+
+    # Query building
+
+    def _condition(self, table: str, column: str, expression: str, args: List[Any]) -> str:
+        negate = expression.startswith("not.")
+        if negate:
+            expression = expression[4:]
+        operator, _, value = expression.partition(".")
+        value = _unquote(value)
+        quoted = self._column(table, column)
+        if operator in OPERATORS:
+            if operator in ("like", "ilike"):
+                value = value.replace("*", "%")
+            sql = f"{quoted} {OPERATORS[operator]} ?"
+            if operator == "ilike":
+                sql = f"LOWER({quoted}) LIKE LOWER(?)"
+            args.append(value)
+        elif operator == "is":
+            literal = {"null": "NULL", "true": "1", "false": "0"}.get(value.lower())
+            if literal is None:
+                raise RequestError(400, "PGRST100", f"Invalid is value: {value}")
+            sql = f"{quoted} IS {literal}"
+        elif operator == "in":
+            values = [_unquote(item.strip()) for item in _split_top_level(value.strip("()"))]
+            sql = f"{quoted} IN ({', '.join('?' for _ in values)})" if values else "0"
+            args.extend(values)
+        else:
+            raise RequestError(400, "PGRST100", f"Unsupported operator: {operator}")
+        return f"NOT ({sql})" if negate else sql
+
+    def _logic(self, table: str, operator: str, body: str, args: List[Any]) -> str:
+        """or=(a.eq.1,and(b.eq.2,c.lt.3))"""
+        terms = []
+        for term in _split_top_level(body.strip()[1:-1]):
+            match = re.match(r"^(not\.)?(and|or)(\(.*\))$", term)
+            if match:
+                sql = self._logic(table, match.group(2), match.group(3), args)
+                terms.append(f"NOT {sql}" if match.group(1) else sql)
+            else:
+                column, _, expression = term.partition(".")
+                terms.append(self._condition(table, column, expression, args))
+        return "(" + f" {operator.upper()} ".join(terms) + ")"
+
+    def _where(self, table: str, params: List[Tuple[str, str]]) -> Tuple[str, List[Any]]:
+        conditions, args = [], []
+        for key, value in params:
+            if key in RESERVED_PARAMS:
+                continue
+            if key in ("or", "and", "not.or", "not.and"):
+                sql = self._logic(table, key.split(".")[-1], value, args)
+                conditions.append(f"NOT {sql}" if key.startswith("not.") else sql)
+            else:
+                conditions.append(self._condition(table, key, value, args))
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", args
+
+    def _select(self, table: str, select: str) -> str:
+        if select.strip() in ("", "*"):
+            self.columns(table)
+            return "*"
+        columns = []
+        for item in select.split(","):
+            if "(" in item:
+                raise RequestError(400, "PGRST100", f"Embedded resources are not supported: {item}")
+            alias, _, name = item.rpartition(":")
+            quoted = self._column(table, name)
+            columns.append(f"{quoted} AS {_quote(alias.strip())}" if alias else quoted)
+        return ", ".join(columns)
+
+    def _order(self, table: str, order: str) -> str:
+        terms = []
+        for term in order.split(","):
+            parts = term.split(".")
+            sql = self._column(table, parts[0])
+            if "desc" in parts[1:]:
+                sql += " DESC"
+            if "nullsfirst" in parts[1:]:
+                sql += " NULLS FIRST"
+            elif "nullslast" in parts[1:]:
+                sql += " NULLS LAST"
+            terms.append(sql)
+        return " ORDER BY " + ", ".join(terms)
+
+    # Request handling
+
+    def handle(self, method: str, path: str, query: str, headers: Dict[str, str], body: bytes):
+        """Returns (status, response headers, JSON-serialisable payload or None)"""
+        match = re.match(r"^/rest/v1/([A-Za-z_][A-Za-z0-9_]*)$", path)
+        if not match:
+            raise RequestError(404, "PGRST125", f"Invalid path: {path}")
+        table = match.group(1)
+        params = parse_qsl(query, keep_blank_values=True)
+        single = dict(params)
+        prefer = headers.get("prefer", "")
+        where, args = self._where(table, params)
+
+        if method in ("GET", "HEAD"):
+            sql = f"SELECT {self._select(table, single.get('select', '*'))} FROM {_quote(table)}{where}"
+            if "order" in single:
+                sql += self._order(table, single["order"])
+            offset = int(single.get("offset", 0))
+            if "limit" in single or offset:
+                sql += f" LIMIT {int(single.get('limit', -1))} OFFSET {offset}"
+            rows = [dict(row) for row in self.conn.execute(sql, args).fetchall()]
+            response_headers = {}
+            if re.search(r"count=(exact|planned|estimated)", prefer):
+                total = self.conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", args).fetchone()[0]
+                end = offset + len(rows) - 1
+                response_headers["Content-Range"] = f"{offset}-{end}/{total}" if rows else f"*/{total}"
+            return 200, response_headers, None if method == "HEAD" else rows
+
+        returning = " RETURNING *" if "return=representation" in prefer else ""
+        payload = json.loads(body or b"null")
+        if method == "POST":
+            records = payload if isinstance(payload, list) else [payload]
+            if not records:
+                return 201, {}, []
+            names = list(dict.fromkeys(key for record in records for key in record))
+            quoted = [self._column(table, name) for name in names]
+            sql = f"INSERT INTO {_quote(table)} ({', '.join(quoted)}) VALUES ({', '.join('?' for _ in names)})"
+            if "resolution=merge-duplicates" in prefer:
+                conflict = [self._column(table, name) for name in (single.get("on_conflict") or "id").split(",")]
+                updates = ", ".join(f"{column} = excluded.{column}" for column in quoted)
+                sql += f" ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {updates}"
+            elif "resolution=ignore-duplicates" in prefer:
+                sql += " ON CONFLICT DO NOTHING"
+            sql += returning
+            rows = []
+            self.conn.execute("BEGIN")
+            try:
+                for record in records:
+                    values = [self._value(record.get(name)) for name in names]
+                    rows.extend(dict(row) for row in self.conn.execute(sql, values).fetchall())
+                self.conn.execute("COMMIT")
+            except sqlite3.IntegrityError as e:
+                self.conn.execute("ROLLBACK")
+                raise RequestError(409, "23505", str(e))
+            return 201, {}, rows
+        if method == "PATCH":
+            names = list(payload)
+            assignments = ", ".join(f"{self._column(table, name)} = ?" for name in names)
+            sql = f"UPDATE {_quote(table)} SET {assignments}{where}{returning}"
+            rows = self.conn.execute(sql, [self._value(payload[name]) for name in names] + args).fetchall()
+            return 200, {}, [dict(row) for row in rows]
+        if method == "DELETE":
+            rows = self.conn.execute(f"DELETE FROM {_quote(table)}{where}{returning}", args).fetchall()
+            return 200, {}, [dict(row) for row in rows]
+        raise RequestError(405, "PGRST117", f"Unsupported method {method}")
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+    # Server
+
+    def start(self) -> str:
+        """Serve on a free localhost port in a background thread; returns the base URL"""
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are separate writes; without this, Nagle + delayed ACK add ~40 ms
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stand_in.lock:
+                    stand_in.connections += 1
+                if stand_in.connect_latency:
+                    time.sleep(stand_in.connect_latency)
+
+            def _respond(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                headers = {key.lower(): value for key, value in self.headers.items()}
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+                try:
+                    with stand_in.lock:
+                        stand_in.requests += 1
+                        status, extra, payload = stand_in.handle(self.command, url.path, url.query, headers, body)
+                except RequestError as e:
+                    status, extra, payload = e.status, {}, {"code": e.code, "message": e.message, "details": None, "hint": None}
+                except sqlite3.Error as e:
+                    status, extra, payload = 400, {}, {"code": "PGRST000", "message": str(e), "details": None, "hint": None}
+                content = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in extra.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(content)
+
+            do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.conn.close()
@@ -0,0 +1,45 @@
+-- =====================================================
+-- Migration: Add content hashes for duplicate-upload detection
+-- =====================================================
+-- Uploads are matched against existing records before they are parsed and
+-- stored again:
+-- - content_sha256: SHA-256 of the uploaded file (policies already have it
+--   from add_policy_ingestion_status.sql)
+-- - text_sha256: SHA-256 of the normalised content (policy text, or the
+--   questionnaire's questions), which also matches re-saved copies
+-- A policy whose text matches an existing policy gets the new 'duplicate'
+-- status and is not indexed
+-- Run this in your Supabase SQL Editor (after add_policy_ingestion_status.sql)
+
+ALTER TABLE policies
+ADD COLUMN IF NOT EXISTS text_sha256 TEXT;
+
+ALTER TABLE questionnaires
+ADD COLUMN IF NOT EXISTS content_sha256 TEXT,
+ADD COLUMN IF NOT EXISTS text_sha256 TEXT;
+
+ALTER TABLE policies DROP CONSTRAINT IF EXISTS policies_status_check;
+ALTER TABLE policies
+ADD CONSTRAINT policies_status_check CHECK (status IN ('queued', 'extracting', 'indexed', 'failed', 'duplicate'));
+
+-- Every upload looks up both hashes
+CREATE INDEX IF NOT EXISTS idx_policies_content_sha256 ON policies(content_sha256);
+CREATE INDEX IF NOT EXISTS idx_policies_text_sha256 ON policies(text_sha256);
+CREATE INDEX IF NOT EXISTS idx_questionnaires_content_sha256 ON questionnaires(content_sha256);
+
+-- text_sha256 is unique among questionnaires, so two concurrent uploads of the
+-- same questions cannot both be stored (a forced copy is stored without it).
+-- Earlier forced copies keep their questions but lose the hash to the oldest one
+UPDATE questionnaires q SET text_sha256 = NULL
+WHERE q.text_sha256 IS NOT NULL
+  AND EXISTS (
+    SELECT 1 FROM questionnaires o
+    WHERE o.text_sha256 = q.text_sha256 AND (o.created_at, o.id) < (q.created_at, q.id)
+  );
+DROP INDEX IF EXISTS idx_questionnaires_text_sha256;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_questionnaires_text_sha256 ON questionnaires(text_sha256) WHERE text_sha256 IS NOT NULL;
+
+-- Existing records have no hashes and are not matched until uploaded again
+
+-- Verify the columns were added
+-- SELECT text_sha256, COUNT(*) FROM policies GROUP BY text_sha256 HAVING COUNT(*) > 1;
@@ -0,0 +1,47 @@
+-- =====================================================
+-- Migration: Add generation_batches table for Message Batches runs
+-- =====================================================
+-- Records every asynchronous Anthropic message batch submitted for a
+-- questionnaire so results can be collected after a restart
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS generation_batches (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  questionnaire_id UUID NOT NULL REFERENCES questionnaires(id) ON DELETE CASCADE,
+  batch_id TEXT NOT NULL UNIQUE,
+  backend TEXT NOT NULL DEFAULT 'anthropic',
+  status TEXT NOT NULL DEFAULT 'in_progress',
+  request_count INTEGER NOT NULL DEFAULT 0,
+  succeeded_count INTEGER NOT NULL DEFAULT 0,
+  errored_count INTEGER NOT NULL DEFAULT 0,
+  expired_count INTEGER NOT NULL DEFAULT 0,
+  attempt INTEGER NOT NULL DEFAULT 0,
+  ended_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  CONSTRAINT generation_batches_status_check CHECK (status IN ('in_progress', 'ended', 'collected', 'failed'))
+);
+
+-- Create indexes for looking up a questionnaire's batches and unfinished batches
+CREATE INDEX IF NOT EXISTS idx_generation_batches_questionnaire_id ON generation_batches(questionnaire_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_generation_batches_status ON generation_batches(status);
+
+-- Enable Row Level Security on generation_batches
+ALTER TABLE generation_batches ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for generation_batches table (allow all operations for now)
+DROP POLICY IF EXISTS "Allow all operations on generation_batches" ON generation_batches;
+CREATE POLICY "Allow all operations on generation_batches" ON generation_batches
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- Keep updated_at current
+DROP TRIGGER IF EXISTS update_generation_batches_updated_at ON generation_batches;
+CREATE TRIGGER update_generation_batches_updated_at
+  BEFORE UPDATE ON generation_batches
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at_column();
+
+-- Verify the table was created
+-- SELECT COUNT(*) FROM generation_batches;
@@ -0,0 +1,291 @@
+-- =====================================================
+-- Migration: Add generation_jobs and generation_tasks tables for the job queue
+-- =====================================================
+-- Durable answer generation runs: one job per run, one task per question.
+-- Worker processes (python -m app.worker) claim tasks with time-limited leases,
+-- so a run survives restarts and deploys and resumes where it stopped
+-- Requires add_answer_source_column.sql
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS generation_jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  questionnaire_id UUID NOT NULL REFERENCES questionnaires(id) ON DELETE CASCADE,
+  mode TEXT NOT NULL DEFAULT 'single',
+  batch_size INTEGER NOT NULL DEFAULT 1,
+  status TEXT NOT NULL DEFAULT 'queued',
+  total_count INTEGER NOT NULL DEFAULT 0,
+  succeeded_count INTEGER NOT NULL DEFAULT 0,
+  failed_count INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  error TEXT,
+  started_at TIMESTAMPTZ,
+  finished_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  CONSTRAINT generation_jobs_mode_check CHECK (mode IN ('single', 'batched')),
+  CONSTRAINT generation_jobs_status_check CHECK (status IN ('queued', 'running', 'completed', 'failed'))
+);
+
+CREATE TABLE IF NOT EXISTS generation_tasks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  job_id UUID NOT NULL REFERENCES generation_jobs(id) ON DELETE CASCADE,
+  question_id UUID NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+  question_text TEXT NOT NULL,
+  position INTEGER NOT NULL DEFAULT 0,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  lease_owner TEXT,
+  lease_expires_at TIMESTAMPTZ,
+  error TEXT,
+  finished_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  CONSTRAINT generation_tasks_job_question_unique UNIQUE (job_id, question_id),
+  CONSTRAINT generation_tasks_status_check CHECK (status IN ('pending', 'running', 'succeeded', 'failed'))
+);
+
+-- Create indexes for finding active jobs, claimable tasks and recently finished tasks
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_questionnaire_id ON generation_jobs(questionnaire_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_claim ON generation_tasks(job_id, status, position);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_lease ON generation_tasks(status, lease_expires_at);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_finished ON generation_tasks(job_id, finished_at);
+
+-- Enable Row Level Security
+ALTER TABLE generation_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE generation_tasks ENABLE ROW LEVEL SECURITY;
+
+-- Create policies (allow all operations for now)
+DROP POLICY IF EXISTS "Allow all operations on generation_jobs" ON generation_jobs;
+CREATE POLICY "Allow all operations on generation_jobs" ON generation_jobs
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Allow all operations on generation_tasks" ON generation_tasks;
+CREATE POLICY "Allow all operations on generation_tasks" ON generation_tasks
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- Keep updated_at current
+DROP TRIGGER IF EXISTS update_generation_jobs_updated_at ON generation_jobs;
+CREATE TRIGGER update_generation_jobs_updated_at
+  BEFORE UPDATE ON generation_jobs
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at_column();
+
+DROP TRIGGER IF EXISTS update_generation_tasks_updated_at ON generation_tasks;
+CREATE TRIGGER update_generation_tasks_updated_at
+  BEFORE UPDATE ON generation_tasks
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at_column();
+
+-- =====================================================
+-- Queue functions (called by workers through supabase rpc)
+-- =====================================================
+
+-- Claim up to p_limit requests' worth of tasks from the oldest job with work left.
+-- Pending tasks and tasks whose lease expired (their worker died) are claimable;
+-- expired tasks that already used max_attempts are failed instead, and jobs left
+-- with no open task are completed.
+-- SKIP LOCKED lets concurrent workers claim disjoint tasks without waiting.
+CREATE OR REPLACE FUNCTION claim_generation_tasks(p_worker_id TEXT, p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS SETOF generation_tasks
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_job generation_jobs%ROWTYPE;
+BEGIN
+  WITH exhausted AS (
+    UPDATE generation_tasks t
+    SET status = 'failed',
+        error = 'Worker lease expired after ' || t.attempts || ' attempts',
+        lease_owner = NULL,
+        lease_expires_at = NULL,
+        finished_at = NOW()
+    FROM generation_jobs j
+    WHERE t.job_id = j.id
+      AND t.status = 'running'
+      AND t.lease_expires_at < NOW()
+      AND t.attempts >= j.max_attempts
+    RETURNING t.job_id
+  )
+  UPDATE generation_jobs j
+  SET failed_count = j.failed_count + e.n
+  FROM (SELECT job_id, COUNT(*) AS n FROM exhausted GROUP BY job_id) e
+  WHERE j.id = e.job_id;
+
+  -- Jobs whose last open tasks were just failed have nothing left to claim: finish them here
+  UPDATE generation_jobs
+  SET status = 'completed', finished_at = NOW()
+  WHERE status IN ('queued', 'running')
+    AND succeeded_count + failed_count >= total_count;
+
+  SELECT j.* INTO v_job
+  FROM generation_jobs j
+  WHERE j.status IN ('queued', 'running')
+    AND EXISTS (
+      SELECT 1 FROM generation_tasks t
+      WHERE t.job_id = j.id
+        AND (t.status = 'pending' OR (t.status = 'running' AND t.lease_expires_at < NOW()))
+    )
+  ORDER BY j.created_at
+  LIMIT 1;
+
+  IF NOT FOUND THEN
+    RETURN;
+  END IF;
+
+  UPDATE generation_jobs
+  SET status = 'running', started_at = COALESCE(started_at, NOW())
+  WHERE id = v_job.id AND status = 'queued';
+
+  RETURN QUERY
+  UPDATE generation_tasks t
+  SET status = 'running',
+      lease_owner = p_worker_id,
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+      attempts = t.attempts + 1
+  WHERE t.id IN (
+    SELECT c.id FROM generation_tasks c
+    WHERE c.job_id = v_job.id
+      AND (c.status = 'pending' OR (c.status = 'running' AND c.lease_expires_at < NOW()))
+    ORDER BY c.position
+    LIMIT p_limit * CASE WHEN v_job.mode = 'batched' THEN GREATEST(v_job.batch_size, 1) ELSE 1 END
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING t.*;
+END;
+$$;
+
+-- Extend the leases a live worker still holds
+CREATE OR REPLACE FUNCTION renew_generation_leases(p_worker_id TEXT, p_task_ids UUID[], p_lease_seconds INTEGER)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  UPDATE generation_tasks
+  SET lease_expires_at = NOW() + make_interval(secs => p_lease_seconds)
+  WHERE id = ANY(p_task_ids) AND status = 'running' AND lease_owner = p_worker_id;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
+
+-- Save a task's answer and mark it succeeded in one transaction.
+-- Only the current lease holder can complete a task, so an answer is saved once.
+-- p_answer_source is 'ai', or 'library' for answers reused from the Answers Library
+DROP FUNCTION IF EXISTS complete_generation_task(UUID, TEXT, TEXT);
+CREATE OR REPLACE FUNCTION complete_generation_task(p_task_id UUID, p_worker_id TEXT, p_answer TEXT, p_answer_source TEXT DEFAULT 'ai')
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_task generation_tasks%ROWTYPE;
+BEGIN
+  UPDATE generation_tasks
+  SET status = 'succeeded', lease_owner = NULL, lease_expires_at = NULL, error = NULL, finished_at = NOW()
+  WHERE id = p_task_id AND status = 'running' AND lease_owner = p_worker_id
+  RETURNING * INTO v_task;
+
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  UPDATE questions
+  SET answer = p_answer, status = 'unapproved', answer_source = p_answer_source, updated_at = NOW()
+  WHERE id = v_task.question_id;
+
+  UPDATE generation_jobs SET succeeded_count = succeeded_count + 1 WHERE id = v_task.job_id;
+  RETURN TRUE;
+END;
+$$;
+
+-- Record a failed attempt: back to pending while attempts remain, otherwise failed.
+-- Returns the task's new status, or NULL when the worker no longer holds the lease.
+CREATE OR REPLACE FUNCTION fail_generation_task(p_task_id UUID, p_worker_id TEXT, p_error TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_task generation_tasks%ROWTYPE;
+BEGIN
+  UPDATE generation_tasks t
+  SET status = CASE WHEN t.attempts >= j.max_attempts THEN 'failed' ELSE 'pending' END,
+      finished_at = CASE WHEN t.attempts >= j.max_attempts THEN NOW() ELSE NULL END,
+      lease_owner = NULL,
+      lease_expires_at = NULL,
+      error = p_error
+  FROM generation_jobs j
+  WHERE t.job_id = j.id AND t.id = p_task_id AND t.status = 'running' AND t.lease_owner = p_worker_id
+  RETURNING t.* INTO v_task;
+
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+
+  IF v_task.status = 'failed' THEN
+    UPDATE generation_jobs SET failed_count = failed_count + 1 WHERE id = v_task.job_id;
+  END IF;
+  RETURN v_task.status;
+END;
+$$;
+
+-- Hand unstarted tasks back on a graceful shutdown without using up an attempt
+CREATE OR REPLACE FUNCTION release_generation_tasks(p_worker_id TEXT, p_task_ids UUID[])
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  UPDATE generation_tasks
+  SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL, attempts = GREATEST(attempts - 1, 0)
+  WHERE id = ANY(p_task_ids) AND status = 'running' AND lease_owner = p_worker_id;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
+
+-- Mark a job completed once every task has succeeded or failed
+CREATE OR REPLACE FUNCTION finish_generation_job(p_job_id UUID)
+RETURNS SETOF generation_jobs
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE generation_jobs
+  SET status = 'completed', finished_at = NOW()
+  WHERE id = p_job_id
+    AND status IN ('queued', 'running')
+    AND succeeded_count + failed_count >= total_count
+  RETURNING *;
+END;
+$$;
+
+-- Fail a job that cannot run at all (e.g. no policy documents), with its unfinished tasks
+CREATE OR REPLACE FUNCTION fail_generation_job(p_job_id UUID, p_error TEXT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  UPDATE generation_tasks
+  SET status = 'failed', error = p_error, lease_owner = NULL, lease_expires_at = NULL, finished_at = NOW()
+  WHERE job_id = p_job_id AND status IN ('pending', 'running');
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  UPDATE generation_jobs
+  SET status = 'failed', error = p_error, failed_count = failed_count + v_count, finished_at = NOW()
+  WHERE id = p_job_id AND status IN ('queued', 'running');
+  RETURN FOUND;
+END;
+$$;
+
+-- Verify the tables were created
+-- SELECT COUNT(*) FROM generation_jobs;
+-- SELECT COUNT(*) FROM generation_tasks;
@@ -0,0 +1,19 @@
+-- =====================================================
+-- Migration: Allow answer_source = 'library' on questions
+-- =====================================================
+-- Answer generation reuses answers from the Answers Library for questions that
+-- match a library entry; those answers are saved with answer_source 'library'
+-- Requires add_answer_source_column.sql
+-- Run this in your Supabase SQL Editor
+
+ALTER TABLE questions
+DROP CONSTRAINT IF EXISTS questions_answer_source_check;
+
+ALTER TABLE questions
+ADD CONSTRAINT questions_answer_source_check
+CHECK (answer_source IN ('ai', 'user', 'copied', 'not_found', 'library') OR answer_source IS NULL);
+
+COMMENT ON COLUMN questions.answer_source IS 'Tracks the source of the answer: ai (AI-generated), user (manually entered), copied (from previous questionnaire), not_found (AI could not find answer), library (reused from the Answers Library)';
+
+-- Verify the constraint
+-- SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conname = 'questions_answer_source_check';
@@ -0,0 +1,38 @@
+-- =====================================================
+-- Migration: Add indexes for paginated lists
+-- =====================================================
+-- The questionnaire, policy, answer and question lists return one page at a
+-- time (keyset pagination, see app/services/pagination.py): rows ordered by a
+-- sort column then id, each page starting after the last row of the previous
+-- one. These indexes match those orders, so every page is a short index range
+-- scan however many rows there are:
+-- - (sort column, id) for each sort the lists offer
+-- - (status, created_at, id) for the default order with a status filter
+-- - trigram indexes for the Answers Library text search (q=)
+-- Run this in your Supabase SQL Editor (after add_content_hashes.sql)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Questionnaires: newest first (default), by name, by status
+CREATE INDEX IF NOT EXISTS idx_questionnaires_created_at_id ON questionnaires(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_questionnaires_name_id ON questionnaires(name, id);
+CREATE INDEX IF NOT EXISTS idx_questionnaires_status_created_at_id ON questionnaires(status, created_at DESC, id DESC);
+
+-- Policies: newest first (default), by name, by ingestion status
+CREATE INDEX IF NOT EXISTS idx_policies_created_at_id ON policies(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_policies_name_id ON policies(name, id);
+CREATE INDEX IF NOT EXISTS idx_policies_status_created_at_id ON policies(status, created_at DESC, id DESC);
+
+-- Answers Library: newest first (default), recently updated, by source type, text search
+CREATE INDEX IF NOT EXISTS idx_answers_created_at_id ON answers(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_updated_at_id ON answers(updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_source_type_created_at_id ON answers(source_type, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_question_trgm ON answers USING gin (question gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_answers_answer_trgm ON answers USING gin (answer gin_trgm_ops);
+
+-- Questions: a questionnaire's questions in order, optionally by status
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_created_at_id ON questions(questionnaire_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_status_created_at_id ON questions(questionnaire_id, status, created_at, id);
+
+-- Verify a page is an index scan
+-- EXPLAIN SELECT id, name FROM questionnaires ORDER BY created_at DESC, id DESC LIMIT 51;
@@ -0,0 +1,35 @@
+-- =====================================================
+-- Migration: Add policy_chunks table for retrieval
+-- =====================================================
+-- Stores each policy split into ~400-token passages so that only the
+-- passages relevant to a question are sent to Claude (BM25 retrieval)
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS policy_chunks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  policy_id UUID NOT NULL REFERENCES policies(id) ON DELETE CASCADE,
+  chunk_index INTEGER NOT NULL,
+  content TEXT NOT NULL,
+  token_count INTEGER NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE (policy_id, chunk_index)
+);
+
+-- Create index for loading chunks in document order
+CREATE INDEX IF NOT EXISTS idx_policy_chunks_policy_id ON policy_chunks(policy_id, chunk_index);
+
+-- Enable Row Level Security on policy_chunks
+ALTER TABLE policy_chunks ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for policy_chunks table (allow all operations for now)
+DROP POLICY IF EXISTS "Allow all operations on policy_chunks" ON policy_chunks;
+CREATE POLICY "Allow all operations on policy_chunks" ON policy_chunks
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- Existing policies do not need a backfill: they are chunked automatically
+-- the first time answers are generated after this migration
+
+-- Verify the table was created
+-- SELECT COUNT(*) FROM policy_chunks;
@@ -0,0 +1,44 @@
+-- =====================================================
+-- Migration: Add policy_corpus table (precomputed, versioned policy corpus)
+-- =====================================================
+-- A single row holding the policy corpus used for answer generation: a version
+-- number and a manifest of policies (id, name, content hash, text length). It
+-- is updated incrementally when policies are uploaded or deleted, so generation
+-- reads the small version number instead of every policy's full text. Policy
+-- texts stay in the policies table; each process fetches a policy's text once
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS policy_corpus (
+  id SMALLINT PRIMARY KEY DEFAULT 1,
+  version BIGINT NOT NULL DEFAULT 0,
+  manifest JSONB NOT NULL DEFAULT '[]'::jsonb,
+  full_text TEXT NOT NULL DEFAULT '',
+  stale BOOLEAN NOT NULL DEFAULT false,
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  CONSTRAINT policy_corpus_single_row CHECK (id = 1)
+);
+
+-- full_text is no longer written (only the manifest is, so an upload does not
+-- rewrite the whole corpus); the column is kept for older deployments. Clear it
+-- once every process runs the manifest-only version:
+-- UPDATE policy_corpus SET full_text = '';
+
+-- A failed incremental update marks the corpus stale under a new version (versions
+-- only ever increase) so every process rebuilds it from the policies table
+ALTER TABLE policy_corpus ADD COLUMN IF NOT EXISTS stale BOOLEAN NOT NULL DEFAULT false;
+
+-- Enable Row Level Security on policy_corpus
+ALTER TABLE policy_corpus ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for policy_corpus table (allow all operations for now)
+DROP POLICY IF EXISTS "Allow all operations on policy_corpus" ON policy_corpus;
+CREATE POLICY "Allow all operations on policy_corpus" ON policy_corpus
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- Existing policies do not need a backfill: the corpus is built automatically
+-- from the policies table the first time it is needed after this migration
+
+-- Verify the table was created
+-- SELECT version, jsonb_array_length(manifest), stale FROM policy_corpus;
@@ -0,0 +1,29 @@
+-- =====================================================
+-- Migration: Add ingestion status columns to policies
+-- =====================================================
+-- PDF uploads return immediately and the document is extracted, chunked and
+-- indexed in the background. The status column tracks that pipeline
+-- (queued -> extracting -> indexed, or failed with status_message) so the
+-- knowledge base can show documents that are still processing.
+-- content_sha256 is the SHA-256 of the uploaded file
+-- Run this in your Supabase SQL Editor
+
+ALTER TABLE policies
+ADD COLUMN IF NOT EXISTS status TEXT NOT NULL DEFAULT 'indexed',
+ADD COLUMN IF NOT EXISTS status_message TEXT,
+ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+DO $$ BEGIN
+  ALTER TABLE policies
+  ADD CONSTRAINT policies_status_check CHECK (status IN ('queued', 'extracting', 'indexed', 'failed'));
+EXCEPTION
+  WHEN duplicate_object THEN null;
+END $$;
+
+-- Policies still processing are looked up when listing the knowledge base
+CREATE INDEX IF NOT EXISTS idx_policies_status ON policies(status) WHERE status <> 'indexed';
+
+-- Existing policies were processed inline at upload time and keep the default 'indexed'
+
+-- Verify the columns were added
+-- SELECT status, COUNT(*) FROM policies GROUP BY status;
@@ -0,0 +1,17 @@
+-- =====================================================
+-- Migration: Add the text normalisation report to policies
+-- =====================================================
+-- Extracted policy text is normalised before storage (repeated headers,
+-- footers and page numbers removed, hyphenation and whitespace fixed). The
+-- report of that pass (pages, characters before and after, their ratio, lines
+-- removed, words de-hyphenated) is kept on the policy and returned with the
+-- policies list
+-- Run this in your Supabase SQL Editor
+
+ALTER TABLE policies
+ADD COLUMN IF NOT EXISTS normalization_report JSONB;
+
+-- Existing policies have no report until uploaded again
+
+-- Verify the column was added
+-- SELECT name, normalization_report->>'ratio' FROM policies WHERE normalization_report IS NOT NULL;
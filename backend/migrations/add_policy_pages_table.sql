@@ -0,0 +1,43 @@
+-- =====================================================
+-- Migration: Add policy_pages table for per-page policy text
+-- =====================================================
+-- Stores each non-empty page of an uploaded PDF with its page number and
+-- its offsets in policies.extracted_text (which is the pages joined with a
+-- blank line), so a page range can be read without the whole document.
+-- Retrieval passages record the pages they span (page_start, page_end) so
+-- generated answers can cite page numbers
+-- Run this in your Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS policy_pages (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  policy_id UUID NOT NULL REFERENCES policies(id) ON DELETE CASCADE,
+  page_number INTEGER NOT NULL,
+  char_start INTEGER NOT NULL,
+  char_end INTEGER NOT NULL,
+  content TEXT NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE (policy_id, page_number)
+);
+
+-- The unique constraint's index serves page range reads in page order
+
+-- Enable Row Level Security on policy_pages
+ALTER TABLE policy_pages ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for policy_pages table (allow all operations for now)
+DROP POLICY IF EXISTS "Allow all operations on policy_pages" ON policy_pages;
+CREATE POLICY "Allow all operations on policy_pages" ON policy_pages
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- Pages spanned by each retrieval passage
+ALTER TABLE policy_chunks
+ADD COLUMN IF NOT EXISTS page_start INTEGER,
+ADD COLUMN IF NOT EXISTS page_end INTEGER;
+
+-- Existing policies keep only extracted_text (the PDF is not kept, so their
+-- pages cannot be recovered); upload them again to get page numbers
+
+-- Verify the table was created
+-- SELECT policy_id, COUNT(*) AS pages FROM policy_pages GROUP BY policy_id;
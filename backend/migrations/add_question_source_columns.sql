@@ -0,0 +1,21 @@
+-- =====================================================
+-- Migration: Add question source columns
+-- =====================================================
+-- Questionnaires are parsed from every worksheet of the uploaded workbook, with
+-- the question, answer, ID and section columns found from the header row.
+-- Each question records where it came from:
+-- - sheet_name, row_number: Worksheet and row of the question in the file
+-- - section: Value of the section/category column, if the sheet has one
+-- - external_id: The questionnaire's own question ID or reference, if any
+-- Run this in your Supabase SQL Editor
+
+ALTER TABLE questions
+ADD COLUMN IF NOT EXISTS sheet_name TEXT,
+ADD COLUMN IF NOT EXISTS row_number INTEGER,
+ADD COLUMN IF NOT EXISTS section TEXT,
+ADD COLUMN IF NOT EXISTS external_id TEXT;
+
+-- Existing questions keep NULL source columns
+
+-- Verify the columns were added
+-- SELECT sheet_name, section, COUNT(*) FROM questions GROUP BY sheet_name, section;
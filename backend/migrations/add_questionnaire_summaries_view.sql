@@ -0,0 +1,27 @@
+-- =====================================================
+-- Migration: Add questionnaire_summaries view
+-- =====================================================
+-- The questionnaire list needs each questionnaire's question and approved
+-- counts. They used to take two requests per questionnaire (fetching every
+-- question id just to count them). This view returns every questionnaire column
+-- plus:
+-- - question_count: Number of questions
+-- - approved_count: Number of approved questions
+-- The counts are correlated subqueries, answered from the index below and only
+-- evaluated for the rows a request returns.
+-- Run this in your Supabase SQL Editor
+
+-- Covers both counts (index-only scans)
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_status ON questions(questionnaire_id, status);
+
+-- Re-run after adding columns to questionnaires (qn.* is expanded when the view is created)
+CREATE OR REPLACE VIEW questionnaire_summaries
+WITH (security_invoker = true) AS
+SELECT
+  qn.*,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id) AS question_count,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id AND q.status = 'approved') AS approved_count
+FROM questionnaires qn;
+
+-- Verify the view returns the counts
+-- SELECT id, name, question_count, approved_count FROM questionnaire_summaries ORDER BY created_at DESC LIMIT 10;
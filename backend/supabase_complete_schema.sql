@@ -15,6 +15,11 @@ CREATE TABLE IF NOT EXISTS policies (
   filename TEXT NOT NULL,
   extracted_text TEXT,
   file_size INTEGER,
+  status TEXT NOT NULL DEFAULT 'indexed' CHECK (status IN ('queued', 'extracting', 'indexed', 'failed', 'duplicate')),
+  status_message TEXT,
+  content_sha256 TEXT,
+  text_sha256 TEXT,
+  normalization_report JSONB,
   upload_date TIMESTAMPTZ DEFAULT NOW(),
   created_at TIMESTAMPTZ DEFAULT NOW(),
   updated_at TIMESTAMPTZ DEFAULT NOW()
@@ -23,6 +28,13 @@ CREATE TABLE IF NOT EXISTS policies (
 -- Create indexes for policies table
 CREATE INDEX IF NOT EXISTS idx_policies_created_at ON policies(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_policies_upload_date ON policies(upload_date DESC);
+CREATE INDEX IF NOT EXISTS idx_policies_status ON policies(status) WHERE status <> 'indexed';
+CREATE INDEX IF NOT EXISTS idx_policies_content_sha256 ON policies(content_sha256);
+CREATE INDEX IF NOT EXISTS idx_policies_text_sha256 ON policies(text_sha256);
+-- Keyset pagination of the list (see app/services/pagination.py)
+CREATE INDEX IF NOT EXISTS idx_policies_created_at_id ON policies(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_policies_name_id ON policies(name, id);
+CREATE INDEX IF NOT EXISTS idx_policies_status_created_at_id ON policies(status, created_at DESC, id DESC);
 
 -- Enable Row Level Security on policies
 ALTER TABLE policies ENABLE ROW LEVEL SECURITY;
@@ -42,6 +54,8 @@ CREATE TABLE IF NOT EXISTS questionnaires (
   id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
   name TEXT NOT NULL,
   filename TEXT NOT NULL,
+  content_sha256 TEXT,
+  text_sha256 TEXT,
   upload_date TIMESTAMPTZ DEFAULT NOW(),
   created_at TIMESTAMPTZ DEFAULT NOW(),
   updated_at TIMESTAMPTZ DEFAULT NOW()
@@ -50,6 +64,12 @@ CREATE TABLE IF NOT EXISTS questionnaires (
 -- Create indexes for questionnaires table
 CREATE INDEX IF NOT EXISTS idx_questionnaires_created_at ON questionnaires(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_questionnaires_upload_date ON questionnaires(upload_date DESC);
+CREATE INDEX IF NOT EXISTS idx_questionnaires_content_sha256 ON questionnaires(content_sha256);
+-- Unique, so two concurrent uploads of the same questions cannot both be stored
+CREATE UNIQUE INDEX IF NOT EXISTS idx_questionnaires_text_sha256 ON questionnaires(text_sha256) WHERE text_sha256 IS NOT NULL;
+-- Keyset pagination of the list (see app/services/pagination.py)
+CREATE INDEX IF NOT EXISTS idx_questionnaires_created_at_id ON questionnaires(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_questionnaires_name_id ON questionnaires(name, id);
 
 -- Enable Row Level Security on questionnaires
 ALTER TABLE questionnaires ENABLE ROW LEVEL SECURITY;
@@ -78,6 +98,10 @@ CREATE TABLE IF NOT EXISTS questions (
   answer TEXT,
   status question_status DEFAULT 'unapproved',
   questionnaire_id UUID REFERENCES questionnaires(id) ON DELETE CASCADE,
+  sheet_name TEXT,
+  row_number INTEGER,
+  section TEXT,
+  external_id TEXT,
   created_at TIMESTAMPTZ DEFAULT NOW(),
   updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -86,6 +110,9 @@ CREATE TABLE IF NOT EXISTS questions (
 CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_id ON questions(questionnaire_id);
 CREATE INDEX IF NOT EXISTS idx_questions_status ON questions(status);
 CREATE INDEX IF NOT EXISTS idx_questions_created_at ON questions(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_status ON questions(questionnaire_id, status);
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_created_at_id ON questions(questionnaire_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_questions_questionnaire_status_created_at_id ON questions(questionnaire_id, status, created_at, id);
 
 -- Enable Row Level Security on questions
 ALTER TABLE questions ENABLE ROW LEVEL SECURITY;
@@ -96,6 +123,15 @@ CREATE POLICY "Allow all operations on questions" ON questions
   USING (true)
   WITH CHECK (true);
 
+-- Questionnaires with their question and approved counts (one query for the list)
+CREATE OR REPLACE VIEW questionnaire_summaries
+WITH (security_invoker = true) AS
+SELECT
+  qn.*,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id) AS question_count,
+  (SELECT COUNT(*) FROM questions q WHERE q.questionnaire_id = qn.id AND q.status = 'approved') AS approved_count
+FROM questionnaires qn;
+
 -- =====================================================
 -- 4. ANSWERS LIBRARY TABLE
 -- =====================================================
@@ -114,6 +150,13 @@ CREATE TABLE IF NOT EXISTS answers (
 -- Create indexes for answers table
 CREATE INDEX IF NOT EXISTS idx_answers_created_at ON answers(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_answers_source_type ON answers(source_type);
+-- Keyset pagination and text search of the library (see app/services/pagination.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_answers_created_at_id ON answers(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_updated_at_id ON answers(updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_source_type_created_at_id ON answers(source_type, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_answers_question_trgm ON answers USING gin (question gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_answers_answer_trgm ON answers USING gin (answer gin_trgm_ops);
 
 -- Enable Row Level Security on answers
 ALTER TABLE answers ENABLE ROW LEVEL SECURITY;
@@ -125,7 +168,92 @@ CREATE POLICY "Allow all operations on answers" ON answers
   WITH CHECK (true);
 
 -- =====================================================
--- 5. TRIGGERS AND FUNCTIONS
+-- 5. POLICY CHUNKS AND PAGES TABLES
+-- =====================================================
+-- Stores policies split into retrieval passages (BM25 context selection),
+-- and the text of each page with its offsets in policies.extracted_text
+
+CREATE TABLE IF NOT EXISTS policy_chunks (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  policy_id UUID NOT NULL REFERENCES policies(id) ON DELETE CASCADE,
+  chunk_index INTEGER NOT NULL,
+  content TEXT NOT NULL,
+  token_count INTEGER NOT NULL DEFAULT 0,
+  page_start INTEGER,
+  page_end INTEGER,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE (policy_id, chunk_index)
+);
+
+-- Create index for policy_chunks table
+CREATE INDEX IF NOT EXISTS idx_policy_chunks_policy_id ON policy_chunks(policy_id, chunk_index);
+
+-- Enable Row Level Security on policy_chunks
+ALTER TABLE policy_chunks ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for policy_chunks table (allow all operations for now)
+CREATE POLICY "Allow all operations on policy_chunks" ON policy_chunks
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+CREATE TABLE IF NOT EXISTS policy_pages (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  policy_id UUID NOT NULL REFERENCES policies(id) ON DELETE CASCADE,
+  page_number INTEGER NOT NULL,
+  char_start INTEGER NOT NULL,
+  char_end INTEGER NOT NULL,
+  content TEXT NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  UNIQUE (policy_id, page_number)
+);
+
+-- Enable Row Level Security on policy_pages
+ALTER TABLE policy_pages ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for policy_pages table (allow all operations for now)
+CREATE POLICY "Allow all operations on policy_pages" ON policy_pages
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- =====================================================
+-- 6. GENERATION BATCHES TABLE
+-- =====================================================
+-- Tracks asynchronous message batches submitted in "batch" generation mode
+
+CREATE TABLE IF NOT EXISTS generation_batches (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  questionnaire_id UUID NOT NULL REFERENCES questionnaires(id) ON DELETE CASCADE,
+  batch_id TEXT NOT NULL UNIQUE,
+  backend TEXT NOT NULL DEFAULT 'anthropic',
+  status TEXT NOT NULL DEFAULT 'in_progress',
+  request_count INTEGER NOT NULL DEFAULT 0,
+  succeeded_count INTEGER NOT NULL DEFAULT 0,
+  errored_count INTEGER NOT NULL DEFAULT 0,
+  expired_count INTEGER NOT NULL DEFAULT 0,
+  attempt INTEGER NOT NULL DEFAULT 0,
+  ended_at TIMESTAMPTZ,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  CONSTRAINT generation_batches_status_check CHECK (status IN ('in_progress', 'ended', 'collected', 'failed'))
+);
+
+-- Create indexes for generation_batches table
+CREATE INDEX IF NOT EXISTS idx_generation_batches_questionnaire_id ON generation_batches(questionnaire_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_generation_batches_status ON generation_batches(status);
+
+-- Enable Row Level Security on generation_batches
+ALTER TABLE generation_batches ENABLE ROW LEVEL SECURITY;
+
+-- Create policy for generation_batches table (allow all operations for now)
+CREATE POLICY "Allow all operations on generation_batches" ON generation_batches
+  FOR ALL
+  USING (true)
+  WITH CHECK (true);
+
+-- =====================================================
+-- 7. TRIGGERS AND FUNCTIONS
 -- =====================================================
 
 -- Function to automatically update updated_at timestamp
@@ -165,8 +293,15 @@ CREATE TRIGGER update_answers_updated_at
   FOR EACH ROW 
   EXECUTE FUNCTION update_updated_at_column();
 
+-- Create trigger for generation_batches table
+DROP TRIGGER IF EXISTS update_generation_batches_updated_at ON generation_batches;
+CREATE TRIGGER update_generation_batches_updated_at 
+  BEFORE UPDATE ON generation_batches
+  FOR EACH ROW 
+  EXECUTE FUNCTION update_updated_at_column();
+
 -- =====================================================
--- 6. VERIFICATION QUERIES
+-- 8. VERIFICATION QUERIES
 -- =====================================================
 -- Run these queries to verify everything was created successfully
 
@@ -185,6 +320,12 @@ CREATE TRIGGER update_answers_updated_at
 -- Check answers table
 -- SELECT * FROM answers LIMIT 1;
 
+-- Check policy_chunks table
+-- SELECT * FROM policy_chunks LIMIT 1;
+
+-- Check generation_batches table
+-- SELECT * FROM generation_batches LIMIT 1;
+
 -- =====================================================
 -- SCHEMA SETUP COMPLETE
 -- =====================================================
@@ -50,7 +50,7 @@ async def test_ai_service():
     # Test API key validation
     print("\n🔍 Validating API key...")
     try:
-        is_valid = ai_service.validate_api_key()
+        is_valid = await ai_service.validate_api_key()
         if is_valid:
             print("✓ API key is valid!")
         else:
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.services.answer_cache import AnswerCache
+from app.services.answer_generation import _CachingAnswerSink
+
+
+class PartlyFailingDatabase:
+    """Saves every answer except those of the questions in `missing`"""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+
+    async def update_question_answer(self, question_id, answer, status="unapproved", answer_source=None):
+        return question_id not in self.missing
+
+    async def bulk_update_question_answers(self, answers, status="unapproved", answer_source=None):
+        saved = [qid for qid in answers if qid not in self.missing]
+        return {"updated_count": len(saved), "updated_ids": saved,
+                "errors": [f"Question {qid} not found" for qid in answers if qid in self.missing]}
+
+
+def test_only_saved_answers_are_cached(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"))
+    keys = {"q1": "key-1", "q2": "key-2", "q3": "key-3"}
+    sink = _CachingAnswerSink(PartlyFailingDatabase(missing={"q2", "q3"}), cache, keys)
+
+    result = asyncio.run(sink.bulk_update_question_answers({"q1": "Yes.", "q2": "No."}, answer_source="ai"))
+    assert result["updated_count"] == 1
+    assert not asyncio.run(sink.update_question_answer("q3", "Quarterly.", answer_source="ai"))
+
+    assert cache.get_many(keys.values()) == {"key-1": "Yes."}
+
+
+def test_library_answers_are_not_cached(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.db"))
+    sink = _CachingAnswerSink(PartlyFailingDatabase(), cache, {"q1": "key-1"})
+
+    asyncio.run(sink.bulk_update_question_answers({"q1": "Yes."}, answer_source="library"))
+    assert cache.get_many(["key-1"]) == {}
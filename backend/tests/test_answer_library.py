@@ -0,0 +1,67 @@
+import pytest
+
+from app.services.answer_library import AnswerLibrary, normalize_question
+
+ENTRIES = [
+    {"id": "a1", "question": "Do you encrypt customer data at rest?", "answer": "Yes, AES-256."},
+    {"id": "a2", "question": "Do you enforce multi-factor authentication for all administrators?", "answer": "Yes."},
+    {"id": "a3", "question": "How often are access reviews performed?", "answer": "Quarterly."},
+]
+
+
+@pytest.fixture
+def library():
+    return AnswerLibrary(ENTRIES, threshold=0.9)
+
+
+def test_normalize_question_drops_numbering_case_and_punctuation():
+    assert normalize_question("Q12: Do you encrypt customer data at REST?") == "do you encrypt customer data at rest"
+    assert normalize_question("2.3) Is 2FA enforced 24/7?") == "is 2fa enforced 24 7"
+
+
+def test_exact_match(library):
+    match = library.match("1. Do you encrypt customer data at rest")
+    assert match.answer_id == "a1"
+    assert match.exact and match.score == 1.0
+
+
+def test_near_duplicate_match(library):
+    match = library.match("Do you encrypt customers' data at rest?")
+    assert match.answer_id == "a1"
+    assert not match.exact and match.score >= 0.9
+
+    question = "How frequently are access reviews performed?"
+    assert library.match(question) is None
+    match = AnswerLibrary(ENTRIES, threshold=0.7).match(question)
+    assert match.answer_id == "a3"
+    assert not match.exact and 0.7 <= match.score < 1.0
+
+
+@pytest.mark.parametrize("question", [
+    "Do you not encrypt customer data at rest?",
+    "Don't you encrypt customer data at rest?",
+    "Do you encrypt customer data at rest? If not, why?",
+    "Do you never encrypt customer data at rest?",
+])
+def test_negated_question_does_not_match(library, question):
+    assert library.match(question) is None
+
+
+@pytest.mark.parametrize("question", [
+    "Do you enforce multi-factor authentication for administrators?",
+    "Do you enforce multi-factor authentication for some administrators?",
+    "Do you enforce multi-factor authentication for no administrators?",
+])
+def test_changed_quantifier_does_not_match(question):
+    assert AnswerLibrary(ENTRIES, threshold=0.5).match(question) is None
+
+
+def test_quantifier_synonyms_match():
+    match = AnswerLibrary(ENTRIES, threshold=0.9).match("Do you enforce multi-factor authentication for every administrator?")
+    assert match.answer_id == "a2"
+
+
+def test_threshold_one_allows_exact_matches_only():
+    library = AnswerLibrary(ENTRIES, threshold=1.0)
+    assert library.match("Do you encrypt customer data at rest") is not None
+    assert library.match("Do you encrypt customer records at rest?") is None
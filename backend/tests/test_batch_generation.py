@@ -0,0 +1,107 @@
+import asyncio
+import functools
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.config.settings import Settings
+from app.services import batch_generation
+from app.services.ai_service import AIService
+from app.services.fake_batches import FakeMessageBatches
+from app.services.policy_index import PolicyContext
+
+
+class FakeBatchDatabase:
+    """generation_batches and saved answers with the DatabaseService semantics"""
+
+    def __init__(self):
+        self.batches = {}
+        self.saves = []
+
+    async def bulk_update_question_answers(self, answers, status="unapproved", answer_source=None):
+        self.saves.append(dict(answers))
+        return {"updated_count": len(answers), "updated_ids": list(answers), "errors": []}
+
+    async def create_generation_batch(self, batch_data):
+        self.batches[batch_data["batch_id"]] = dict(batch_data, status="in_progress", updated_at=_now())
+        return batch_data["batch_id"]
+
+    async def update_generation_batch(self, batch_id, update_data):
+        self.batches[batch_id].update(update_data, updated_at=_now())
+        return True
+
+    async def claim_generation_batch(self, batch_id, updated_at):
+        await asyncio.sleep(0)  # Both resumes read the records before either claims
+        record = self.batches[batch_id]
+        if record["updated_at"] != updated_at or record["status"] not in ("in_progress", "ended"):
+            return False
+        record["updated_at"] = _now()
+        return True
+
+    async def get_generation_batches(self, questionnaire_id=None, status=None):
+        return [dict(r) for r in self.batches.values() if status is None or r["status"] == status]
+
+
+def _now(offset_seconds=0.0):
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
+
+
+def questions(count):
+    return [{"id": f"q{i}", "questionnaire_id": "qn", "question_text": f"Do you test control {i}?"} for i in range(count)]
+
+
+def settings(**overrides):
+    return Settings(ai_batch_backend="fake", ai_batch_poll_interval_seconds=0.01, **overrides)
+
+
+def test_split_batch_requests_respects_count_and_size():
+    requests = [{"custom_id": str(i), "params": {"text": "x" * 100}} for i in range(10)]
+    size = len(json.dumps(requests[0]))
+
+    assert [len(c) for c in batch_generation.split_batch_requests(requests, max_requests=4)] == [4, 4, 2]
+    assert [len(c) for c in batch_generation.split_batch_requests(requests, max_bytes=3 * size)] == [3, 3, 3, 1]
+    chunks = batch_generation.split_batch_requests(requests, max_requests=4, max_bytes=3 * size)
+    assert [r for chunk in chunks for r in chunk] == requests
+    assert batch_generation.split_batch_requests([]) == []
+
+
+def test_large_run_is_split_into_several_batches(monkeypatch):
+    monkeypatch.setattr(
+        batch_generation, "split_batch_requests",
+        functools.partial(batch_generation.split_batch_requests, max_requests=4)
+    )
+    db = FakeBatchDatabase()
+    stats = asyncio.run(batch_generation.generate_answers_in_batch(
+        questions(10), db, AIService(api_key="test", client=object()), PolicyContext(full_text="Policy text."),
+        settings(), batches=FakeMessageBatches()
+    ))
+
+    assert stats.succeeded == 10 and stats.failed == 0
+    assert sorted(r["request_count"] for r in db.batches.values()) == [2, 4, 4]
+    assert all(r["status"] == "collected" for r in db.batches.values())
+    assert sorted(q for save in db.saves for q in save) == sorted(f"q{i}" for i in range(10))
+
+
+def test_resume_collects_a_stale_batch_once_across_processes():
+    batches = FakeMessageBatches()
+    db = FakeBatchDatabase()
+    ai_service = AIService(api_key="test", client=object())
+
+    async def scenario():
+        stale = await batches.create(requests=[ai_service.create_batch_request("q0", "Do you encrypt data?", "Policy")])
+        fresh = await batches.create(requests=[ai_service.create_batch_request("q1", "Do you log access?", "Policy")])
+        await db.create_generation_batch({"questionnaire_id": "qn", "batch_id": stale.id, "backend": "fake"})
+        await db.create_generation_batch({"questionnaire_id": "qn", "batch_id": fresh.id, "backend": "fake"})
+        db.batches[stale.id]["updated_at"] = _now(-600)
+
+        # Two API processes resume at the same time
+        collected = await asyncio.gather(*(
+            batch_generation.resume_generation_batches(settings(), db_service=db, batches=batches) for _ in range(2)
+        ))
+        return collected, stale.id, fresh.id
+
+    collected, stale_id, fresh_id = asyncio.run(scenario())
+    assert sorted(collected) == [0, 1]
+    assert [list(save) for save in db.saves] == [["q0"]]
+    assert db.batches[stale_id]["status"] == "collected"
+    # Still polled by the process that submitted it
+    assert db.batches[fresh_id]["status"] == "in_progress"
@@ -0,0 +1,80 @@
+import io
+
+import openpyxl
+
+from app.services.excel_processor import ExcelProcessor, locate_columns, parse_column_mapping
+
+
+def rows(*values):
+    return [(number, row) for number, row in enumerate(values, 1)]
+
+
+def workbook(**sheets):
+    book = openpyxl.Workbook()
+    book.remove(book.active)
+    for title, sheet_rows in sheets.items():
+        sheet = book.create_sheet(title)
+        for row in sheet_rows:
+            sheet.append(row)
+    stream = io.BytesIO()
+    book.save(stream)
+    return stream.getvalue()
+
+
+def test_locate_columns_after_a_title_block():
+    top = rows(
+        ("Vendor Security Assessment", None, None, None),
+        ("Acme Ltd", None, None, None),
+        ("Ref", "Category", "Question", "Supplier Response"),
+        ("1.1", "Access", "Do you enforce MFA?", "Yes"),
+    )
+    assert locate_columns(top) == (2, {"id": 0, "section": 1, "question": 2, "answer": 3})
+
+
+def test_locate_columns_accepts_partial_names_on_the_first_row():
+    top = rows(("Control question", "Supplier response"), ("Do you encrypt backups?", "Yes"))
+    assert locate_columns(top) == (0, {"question": 0, "answer": 1})
+
+
+def test_locate_columns_ignores_data_rows_containing_header_words():
+    top = rows(
+        ("Do you have an incident response plan?", "Yes"),
+        ("Is the plan tested yearly?", "Yes"),
+        ("Are incidents reported within 24 hours?", "No"),
+        ("Incident response item", "Documented"),
+    )
+    assert locate_columns(top) == (None, None)
+
+
+def test_locate_columns_with_a_mapping():
+    top = rows(("Title", None, None), ("ID", "Requirement", "Response"))
+    assert locate_columns(top, parse_column_mapping("question=Requirement,answer=Response")) == (1, {"question": 1, "answer": 2})
+    assert locate_columns(top, parse_column_mapping("question=B,answer=C")) == (1, {"question": 1, "answer": 2})
+
+
+def test_headerless_sheet_keeps_every_row():
+    source = workbook(Questions=[
+        ("Do you have an incident response plan?", "Yes"),
+        ("Is the plan tested yearly?", "Yes"),
+        ("Are incidents reported within 24 hours?", "No"),
+        ("Incident response item", "Documented"),
+    ])
+    questions = ExcelProcessor().extract_questions(source)
+    assert [q["row_number"] for q in questions] == [1, 2, 3, 4]
+
+
+def test_sheets_without_a_header_are_skipped_when_another_has_one():
+    source = workbook(
+        Questions=[("Question", "Answer"), ("Do you enforce MFA?", "Yes")],
+        Instructions=[("Return by Friday.",), ("Contact security@example.com",)],
+    )
+    questions = ExcelProcessor().extract_questions(source)
+    assert [q["question_text"] for q in questions] == ["Do you enforce MFA?"]
+    # Named explicitly, the sheet is imported (column A/B)
+    named = ExcelProcessor().extract_questions(source, sheets=["Instructions"])
+    assert [q["question_text"] for q in named] == ["Return by Friday.", "Contact security@example.com"]
+
+
+def test_headerless_workbook_reads_its_first_sheet():
+    source = workbook(Main=[("Do you enforce MFA?", "Yes")], Notes=[("Return by Friday.",)])
+    assert [q["question_text"] for q in ExcelProcessor().extract_questions(source)] == ["Do you enforce MFA?"]
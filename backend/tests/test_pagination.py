@@ -0,0 +1,75 @@
+import pytest
+
+from app.services.pagination import build_list_query, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips():
+    row = {"id": "b6a1c3de-0000-4000-8000-000000000001", "created_at": "2024-03-01T10:00:00+00:00", "name": "Q1"}
+    cursor = encode_cursor("created_at", "desc", row)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "created_at", "desc") == (row["created_at"], row["id"])
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", encode_cursor("name", "asc", {"id": "a", "name": None})])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, "name", "asc")
+
+
+def test_decode_cursor_rejects_another_sort():
+    cursor = encode_cursor("created_at", "desc", {"id": "a", "created_at": "2024-03-01"})
+    with pytest.raises(ValueError, match="sort=created_at&order=desc"):
+        decode_cursor(cursor, "created_at", "asc")
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "name", "desc")
+
+
+def test_build_list_query_defaults():
+    query = build_list_query("policies", 50)
+    assert query["sort"] == "created_at"
+    assert query["descending"] is True
+    assert query["after"] is None
+    assert "extracted_text" not in query["columns"]
+    assert query["search"] is None and query["search_columns"] == ()
+
+    # Another sort defaults to ascending; questionnaires return every column
+    query = build_list_query("questionnaires", 20, sort="name")
+    assert query["descending"] is False
+    assert query["columns"] is None
+
+
+def test_build_list_query_adds_id_and_sort_columns():
+    query = build_list_query("answers", 10, fields="question, answer", sort="updated_at")
+    assert query["columns"] == ["id", "updated_at", "question", "answer"]
+
+
+def test_build_list_query_decodes_cursor_for_its_sort():
+    cursor = encode_cursor("created_at", "asc", {"id": "q-1", "created_at": "2024-01-01T00:00:00"})
+    query = build_list_query("questions", 100, cursor=cursor)
+    assert query["after"] == ("2024-01-01T00:00:00", "q-1")
+    with pytest.raises(ValueError):
+        build_list_query("questions", 100, cursor=cursor, order="desc")
+
+
+def test_build_list_query_filters_and_search():
+    query = build_list_query(
+        "answers", 10, status="user, questionnaire", created_after="2024-01-01", created_before="2024-02-01T00:00:00Z",
+        q="  encryption "
+    )
+    assert query["filters"] == {"source_type": ["user", "questionnaire"]}
+    assert query["created_after"] == "2024-01-01T00:00:00"
+    assert query["created_before"] == "2024-02-01T00:00:00+00:00"
+    assert query["search"] == "encryption"
+    assert query["search_columns"] == ("question", "answer")
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ({"fields": "id,extracted_text"}, "Unknown policies fields: extracted_text"),
+    ({"sort": "file_size"}, "Cannot sort policies by 'file_size'"),
+    ({"order": "sideways"}, "order must be 'asc' or 'desc'"),
+    ({"status": "indexed,archived"}, "Invalid status: archived"),
+    ({"created_after": "last week"}, "created_after must be an ISO 8601"),
+])
+def test_build_list_query_rejects_invalid_parameters(arguments, message):
+    with pytest.raises(ValueError, match=message):
+        build_list_query("policies", 10, **arguments)
@@ -0,0 +1,122 @@
+import asyncio
+import io
+import os
+import sys
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+
+import pypdfium2
+import pytest
+
+from app.services.pdf_ocr import PageOCR, run_tesseract
+
+FAKE_TESSERACT = """\
+#!{python}
+# Stands in for tesseract: logs the call and reads the page width from the PGM header
+import os, sys, time
+image = sys.stdin.buffer.read()
+with open(os.environ["FAKE_TESSERACT_LOG"], "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+time.sleep(float(os.environ.get("FAKE_TESSERACT_SLEEP", "0")))
+if os.environ.get("FAKE_TESSERACT_FAIL"):
+    sys.stderr.write("Error opening data file")
+    sys.exit(1)
+print("Scanned page %s wide" % image.split(b"\\n")[1].split()[0].decode())
+"""
+
+
+@pytest.fixture
+def tesseract(tmp_path, monkeypatch):
+    """A fake `tesseract` on PATH; returns a function giving the calls made so far"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "tesseract"
+    script.write_text(textwrap.dedent(FAKE_TESSERACT).format(python=sys.executable))
+    script.chmod(0o755)
+    log = tmp_path / "tesseract.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("FAKE_TESSERACT_LOG", str(log))
+    return lambda: log.read_text().splitlines() if log.exists() else []
+
+
+def blank_pdf(widths):
+    """A PDF of blank pages (no text layer), one per width in points"""
+    document = pypdfium2.PdfDocument.new()
+    for width in widths:
+        document.new_page(width, 100)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    document.close()
+    return buffer.getvalue()
+
+
+def ocr_empty_pages(ocr, source, pages):
+    """Run in a fresh process pool, like the extraction pool (which holds the cache connections)"""
+    async def run():
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            return await ocr.ocr_empty_pages(executor, source, pages)
+
+    return asyncio.run(run())
+
+
+def test_only_pages_without_text_are_ocred(tesseract, tmp_path):
+    ocr = PageOCR(dpi=72, cache_path=str(tmp_path / "ocr.db"))
+    source = blank_pdf([100, 120, 140])
+    pages = [(0, "Text layer"), (1, ""), (2, " \n ")]
+
+    assert ocr_empty_pages(ocr, source, pages) == [
+        (0, "Text layer"), (1, "Scanned page 120 wide"), (2, "Scanned page 140 wide")
+    ]
+    assert tesseract() == ["stdin stdout -l eng"] * 2
+
+
+def test_pages_with_text_skip_ocr(tesseract, tmp_path):
+    ocr = PageOCR(cache_path=str(tmp_path / "ocr.db"))
+    pages = [(0, "Text layer"), (1, "More text")]
+
+    assert ocr_empty_pages(ocr, b"not rendered", pages) == pages
+    assert tesseract() == []
+
+
+def test_cached_pages_are_not_ocred_again(tesseract, tmp_path):
+    source = blank_pdf([100, 120])
+    pages = [(0, ""), (1, "")]
+    first = ocr_empty_pages(PageOCR(dpi=72, cache_path=str(tmp_path / "ocr.db")), source, pages)
+    assert len(tesseract()) == 2
+
+    # New worker processes (e.g. after a restart) read the same cache file
+    again = ocr_empty_pages(PageOCR(dpi=72, cache_path=str(tmp_path / "ocr.db")), source, pages)
+    assert again == first
+    assert len(tesseract()) == 2
+
+    # The key includes the language
+    ocr_empty_pages(PageOCR(language="deu", dpi=72, cache_path=str(tmp_path / "ocr.db")), source, pages)
+    assert tesseract()[2:] == ["stdin stdout -l deu"] * 2
+
+
+def test_timed_out_page_is_left_empty_and_not_cached(tesseract, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_TESSERACT_SLEEP", "10")
+    with pytest.raises(Exception, match="timed out after 0.5s"):
+        run_tesseract(b"P5\n1 1\n255\n\0", timeout_seconds=0.5)
+
+    ocr = PageOCR(dpi=72, timeout_seconds=0.5, cache_path=str(tmp_path / "ocr.db"))
+    source = blank_pdf([100])
+    assert ocr_empty_pages(ocr, source, [(0, "")]) == [(0, "")]
+
+    monkeypatch.delenv("FAKE_TESSERACT_SLEEP")
+    assert ocr_empty_pages(ocr, source, [(0, "")]) == [(0, "Scanned page 100 wide")]
+    assert len(tesseract()) == 3
+
+
+def test_failed_tesseract_leaves_the_page_empty(tesseract, tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_TESSERACT_FAIL", "1")
+    with pytest.raises(Exception, match="Tesseract failed: Error opening data file"):
+        run_tesseract(b"P5\n1 1\n255\n\0")
+
+    ocr = PageOCR(dpi=72, cache_path="")
+    assert ocr_empty_pages(ocr, blank_pdf([100, 120]), [(0, "Text layer"), (1, "")]) == [(0, "Text layer"), (1, "")]
+
+
+def test_missing_tesseract_is_reported(tmp_path):
+    with pytest.raises(Exception, match="requires Tesseract"):
+        PageOCR(command=str(tmp_path / "no-tesseract"))
@@ -0,0 +1,167 @@
+import asyncio
+
+from app.config.settings import Settings
+from app.services import policy_corpus
+
+
+class FakeCorpusDatabase:
+    """In-memory policies and policy_corpus tables with the DatabaseService semantics"""
+
+    def __init__(self, policies):
+        self.policies = policies
+        self.corpus = None
+        self.fail_updates = False
+        self.before_save = None
+        self.conflicts = 0
+        self.saves = []
+        self.text_requests = []
+
+    async def get_all_policies(self, include_text=True):
+        return [dict(p) for p in self.policies]
+
+    async def get_policy_corpus_version(self):
+        return self.corpus["version"] if self.corpus else None
+
+    async def get_policy_texts(self, policy_ids):
+        self.text_requests.append(list(policy_ids))
+        return {p["id"]: p["extracted_text"] for p in self.policies if p["id"] in policy_ids}
+
+    async def get_policy_corpus(self):
+        return dict(self.corpus) if self.corpus else None
+
+    async def save_policy_corpus(self, corpus_data, expected_version=None):
+        self.saves.append(corpus_data)
+        if self.before_save:
+            hook, self.before_save = self.before_save, None
+            await hook()
+        if self.conflicts and self.corpus is not None:
+            # Another process saved first
+            self.conflicts -= 1
+            self.corpus["version"] += 1
+        if expected_version is None:
+            if self.corpus is not None:
+                return False
+            self.corpus = {"stale": False, **corpus_data}
+            return True
+        if self.corpus is None or self.corpus["version"] != expected_version:
+            return False
+        # Incremental updates fail; rebuilds (which clear stale) still succeed
+        if self.fail_updates and "manifest" in corpus_data and "stale" not in corpus_data:
+            raise Exception("update failed")
+        self.corpus.update(corpus_data)
+        return True
+
+
+def policy(policy_id, text):
+    return {"id": policy_id, "name": f"Policy {policy_id}", "extracted_text": text}
+
+
+def load(db):
+    async def corpus_with_text():
+        corpus = await policy_corpus.get_policy_corpus(db, Settings(retrieval_enabled=False))
+        await corpus.get_full_text(db)
+        return corpus
+
+    return asyncio.run(corpus_with_text())
+
+
+def test_incremental_update_bumps_the_version():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha")])
+    assert load(db).version == 1
+
+    db.policies.insert(0, policy("b", "Beta"))
+    asyncio.run(policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta"))
+    corpus = load(db)
+    assert corpus.version == 2
+    assert corpus.full_text == "Beta\n\nAlpha"
+
+
+def test_failed_update_never_reuses_a_cached_version():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha")])
+    cached = load(db)
+    assert cached.version == 1
+
+    # The incremental update fails: the corpus is marked stale under a newer version
+    db.fail_updates = True
+    db.policies.insert(0, policy("b", "Beta"))
+    asyncio.run(policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta"))
+    assert db.corpus["stale"]
+    assert db.corpus["version"] == 2
+
+    # Another process still caching version 1 rebuilds instead of serving it
+    corpus = load(db)
+    assert corpus is not cached
+    assert corpus.version == 3
+    assert corpus.full_text == "Beta\n\nAlpha"
+    assert not db.corpus["stale"]
+
+
+def test_rebuild_does_not_overwrite_a_concurrent_update():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha")])
+    load(db)
+
+    async def concurrent_upload():
+        # Lands between the rebuild reading the policies and saving the corpus
+        db.policies.insert(0, policy("b", "Beta"))
+        await policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta")
+
+    db.before_save = concurrent_upload
+    version = asyncio.run(policy_corpus.rebuild_policy_corpus(db))
+    assert version == 3
+    assert [p["id"] for p in db.corpus["manifest"]] == ["b", "a"]
+    assert load(db).full_text == "Beta\n\nAlpha"
+
+
+def test_update_rewrites_the_manifest_and_fetches_only_new_texts():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha"), policy("c", "Gamma")])
+    assert load(db).full_text == "Alpha\n\nGamma"
+    assert db.text_requests == [["a", "c"]]
+
+    db.policies.insert(0, policy("b", "Beta"))
+    asyncio.run(policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta"))
+    asyncio.run(policy_corpus.remove_policies_from_corpus(db, ["c"]))
+    assert all("full_text" not in saved for saved in db.saves)
+
+    corpus = load(db)
+    assert corpus.version == 3
+    assert corpus.full_text == "Beta\n\nAlpha"
+    assert db.text_requests[1:] == [["b"]]
+
+
+def test_update_retries_after_a_concurrent_save():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha")])
+    load(db)
+
+    async def concurrent_upload():
+        # Lands between this update reading the manifest and saving it
+        db.policies.insert(0, policy("b", "Beta"))
+        await policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta")
+
+    db.before_save = concurrent_upload
+    db.policies.insert(0, policy("c", "Gamma"))
+    asyncio.run(policy_corpus.add_policy_to_corpus(db, "c", "Policy c", "Gamma"))
+
+    assert db.corpus["version"] == 3
+    assert not db.corpus["stale"]
+    assert load(db).full_text == "Gamma\n\nBeta\n\nAlpha"
+
+
+def test_update_marks_the_corpus_stale_after_repeated_conflicts():
+    policy_corpus._corpus = None
+    db = FakeCorpusDatabase([policy("a", "Alpha")])
+    load(db)
+
+    db.conflicts = policy_corpus.MAX_UPDATE_ATTEMPTS
+    db.policies.insert(0, policy("b", "Beta"))
+    asyncio.run(policy_corpus.add_policy_to_corpus(db, "b", "Policy b", "Beta"))
+    assert db.corpus["stale"]
+    assert [p["id"] for p in db.corpus["manifest"]] == ["a"]
+
+    corpus = load(db)
+    assert corpus.full_text == "Beta\n\nAlpha"
+    assert not db.corpus["stale"]
@@ -0,0 +1,53 @@
+from app.services.policy_index import PolicyContext, PolicyRetriever
+
+
+def make_chunks(count: int, tokens: int = 100):
+    # Passage i mentions topic i, and every passage mentions "policy"
+    return [
+        {
+            "policy_id": "p1",
+            "policy_name": "Security Policy",
+            "chunk_index": i,
+            "content": f"policy topic{i} " + "filler " * (tokens * 4 // 7),
+            "token_count": tokens,
+        }
+        for i in range(count)
+    ]
+
+
+def test_for_question_respects_token_budget():
+    context = PolicyContext(retriever=PolicyRetriever(make_chunks(20)), top_k=8, token_budget=300)
+    text = context.for_question("policy topic1")
+    assert text.count("[Policy:") == 3
+    assert "Section 2]" in text
+
+
+def test_for_questions_shares_one_budget_across_the_batch():
+    context = PolicyContext(
+        retriever=PolicyRetriever(make_chunks(20)), top_k=8, token_budget=300, batch_token_budget=500
+    )
+    questions = [f"policy topic{i}" for i in range(10)]
+    text = context.for_questions(questions)
+    # Ten questions of up to 300 tokens each, capped at 500 for the whole request
+    assert text.count("[Policy:") == 5
+
+
+def test_for_questions_takes_each_questions_best_passage_first():
+    context = PolicyContext(
+        retriever=PolicyRetriever(make_chunks(20)), top_k=8, token_budget=800, batch_token_budget=300
+    )
+    text = context.for_questions(["policy topic3", "policy topic7", "policy topic11"])
+    for section in (4, 8, 12):
+        assert f"Section {section}]" in text
+
+
+def test_for_questions_deduplicates_passages():
+    context = PolicyContext(retriever=PolicyRetriever(make_chunks(5)), top_k=8, token_budget=1000)
+    text = context.for_questions(["policy topic2", "policy topic2 policy"])
+    assert text.count("Section 3]") == 1
+
+
+def test_full_text_mode_sends_the_corpus():
+    context = PolicyContext(full_text="All of it")
+    assert context.for_questions(["a", "b"]) == "All of it"
+    assert context.is_shared
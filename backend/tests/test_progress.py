@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.progress import ProgressBroker
+
+
+def stats(succeeded=0, failed=0):
+    return SimpleNamespace(
+        succeeded=succeeded, failed=failed, retries=0, throttled=0, rate_limit_wait_seconds=0.0,
+        elapsed_seconds=1.0, library_hits=0, answer_cache_hits=0, usage={}
+    )
+
+
+def test_start_refuses_while_a_run_is_active():
+    broker = ProgressBroker()
+    first, started = broker.start("qn", total=2, mode="single")
+    assert started
+
+    again, started = broker.start("qn", total=5, mode="batched")
+    assert not started and again is first
+    assert not first.finished
+
+    first.finish(stats(succeeded=2))
+    second, started = broker.start("qn", total=5, mode="batched")
+    assert started and second is not first
+    assert broker.get("qn") is second
+
+
+def test_finished_run_drops_later_events():
+    broker = ProgressBroker()
+    progress, _ = broker.start("qn", total=2, mode="single")
+
+    async def scenario():
+        events = progress.subscribe()
+        assert (await events.__anext__())["event"] == "snapshot"
+        progress.question_completed("q1", "Yes.")
+        progress.fail("Stopped")
+        # A late answer and a second end from the stopped run
+        progress.question_completed("q2", "No.")
+        progress.finish(stats(succeeded=2))
+        return [event async for event in events]
+
+    received = asyncio.run(scenario())
+    assert [event["event"] for event in received] == ["question_completed", "failed"]
+    assert progress.status == "failed"
+    assert progress.answers == {"q1": "Yes."}
@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.config.settings import Settings
+from app.services.generation_jobs import close_job_stores, get_job_store
+from app.services.sqlite_job_store import SQLiteJobStore
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def make_store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def questions(count):
+    return [{"id": f"q{i}", "question_text": f"Question {i}?"} for i in range(count)]
+
+
+def test_expired_leases_out_of_attempts_complete_the_job(tmp_path):
+    store = make_store(tmp_path)
+    job = run(store.create_generation_job({"questionnaire_id": "qn", "max_attempts": 1}, questions(2)))
+
+    # The worker holding both tasks dies: its 0 s lease expires at once
+    assert len(run(store.claim_generation_tasks("dead", 10, 0))) == 2
+    assert run(store.claim_generation_tasks("live", 10, 60)) == []
+
+    job = run(store.get_generation_job(job["id"]))
+    assert job["status"] == "completed"
+    assert job["failed_count"] == job["total_count"] == 2
+    assert job["finished_at"] is not None
+    assert all(task["status"] == "failed" for task in run(store.get_generation_tasks(job["id"])))
+    assert run(store.get_generation_jobs(questionnaire_id="qn", statuses=["queued", "running"])) == []
+    store.close()
+
+
+def test_expired_lease_with_attempts_left_is_claimed_again(tmp_path):
+    store = make_store(tmp_path)
+    job = run(store.create_generation_job({"questionnaire_id": "qn", "max_attempts": 2}, questions(1)))
+
+    run(store.claim_generation_tasks("dead", 10, 0))
+    claimed = run(store.claim_generation_tasks("live", 10, 60))
+    assert [task["attempts"] for task in claimed] == [2]
+    assert run(store.complete_generation_task(claimed[0]["id"], "live", "Yes"))
+
+    finished = run(store.finish_generation_job(job["id"]))
+    assert finished["status"] == "completed"
+    assert (finished["succeeded_count"], finished["failed_count"]) == (1, 0)
+    store.close()
+
+
+def test_exhausted_lease_leaves_a_job_with_open_tasks_running(tmp_path):
+    store = make_store(tmp_path)
+    job = run(store.create_generation_job({"questionnaire_id": "qn", "max_attempts": 1}, questions(2)))
+
+    run(store.claim_generation_tasks("dead", 1, 0))
+    claimed = run(store.claim_generation_tasks("live", 10, 60))
+    assert [task["question_id"] for task in claimed] == ["q1"]
+    assert run(store.get_generation_job(job["id"]))["status"] == "running"
+    store.close()
+
+
+def test_get_job_store_shares_one_store_per_path(tmp_path):
+    settings = Settings(generation_queue_backend="sqlite", generation_queue_sqlite_path=str(tmp_path / "jobs.db"))
+    store = get_job_store(settings)
+    db_service = object()
+    assert get_job_store(settings, db_service) is store
+    assert store.db_service is db_service
+
+    close_job_stores()
+    with pytest.raises(sqlite3.ProgrammingError):
+        run(store.get_generation_job("missing"))
+    assert get_job_store(settings) is not store
+    close_job_stores()
@@ -0,0 +1,67 @@
+from app.services.text_normalization import normalize_pages
+
+HEADER = "Acme Ltd | Information Security Policy | Version 3.2"
+BANNER = "CONFIDENTIAL - INTERNAL USE ONLY"
+
+
+def body(index):
+    return "\n".join(f"Paragraph {line} of section {index} on control objective {index * 10 + line}." for line in range(6))
+
+
+def layout(bodies, footer="Page {page} of {pages}"):
+    return [
+        (index, "\n".join([HEADER, BANNER, "", text, "", footer.format(page=index + 1, pages=len(bodies))]))
+        for index, text in enumerate(bodies)
+    ]
+
+
+def texts(pages):
+    return [text for _, text in normalize_pages(pages)[0]]
+
+
+def test_removes_repeated_headers_and_page_footers():
+    bodies = [body(index) for index in range(4)]
+    normalized, report = normalize_pages(layout(bodies))
+    assert [text for _, text in normalized] == bodies
+    assert report["lines_removed"] == 12
+    assert report["ratio"] == round(report["characters_after"] / report["characters_before"], 4)
+
+
+def test_keeps_repeated_labels_whose_values_change():
+    bodies = [f"Retention period (days): {365 + index}\n{body(index)}" for index in range(4)]
+    assert texts(layout(bodies)) == bodies
+
+
+def test_keeps_values_and_years_near_the_page_edges():
+    bodies = [f"Retention period (days):\n{365 + index}\n{body(index)}" for index in range(4)]
+    bodies[0] += "\nReview due:\n2023"
+    normalized = texts([(index, text) for index, text in enumerate(bodies)])
+    for index, text in enumerate(normalized):
+        assert text.startswith(f"Retention period (days):\n{365 + index}\n")
+    assert normalized[0].endswith("\n2023")
+
+
+def test_removes_standalone_page_numbers_that_follow_the_pages():
+    pages = [(index, f"{body(index)}\n- {index + 3} -") for index in range(3)]
+    assert texts(pages) == [body(index) for index in range(3)]
+
+
+def test_keeps_standalone_numbers_off_the_first_and_last_lines():
+    bodies = [f"{body(index)}\n{index + 1}\nEnd of section {index}." for index in range(3)]
+    assert texts([(index, text) for index, text in enumerate(bodies)]) == bodies
+
+
+def test_dehyphenation_keeps_compounds():
+    pages = [
+        (0, "The self-\nassessment covers risk-\nbased controls and infor-\nmation handling."),
+        (1, "Every risk review is based on information from the owners."),
+    ]
+    assert texts(pages)[0] == "The self-assessment covers risk-based controls and information handling."
+
+
+def test_dehyphenation_follows_the_documents_spelling():
+    pages = [
+        (0, "Run a pen-\ntest and a back-\nup every quarter."),
+        (1, "The pentest and the backup are logged; the pentest report is kept, as is the back-up."),
+    ]
+    assert texts(pages)[0] == "Run a pentest and a backup every quarter."
@@ -0,0 +1,20 @@
+from app.services.upload_dedup import QuestionSpool, questions_hash
+
+
+def test_question_spool_round_trips_and_hashes_questions():
+    questions = [
+        {"question_text": f"{i}. Do you encrypt data at rest (system {i})?", "answer": None, "row_number": i + 2}
+        for i in range(200)
+    ]
+    with QuestionSpool(memory_threshold=1024, preview_size=2) as spool:
+        spool.extend(iter(questions))
+        assert spool.count == 200
+        assert spool.preview == questions[:2]
+        assert spool.hexdigest() == questions_hash(questions)
+        # Read back (from the temporary file past the threshold), twice
+        assert list(spool) == questions
+        assert list(spool) == questions
+
+
+def test_questions_hash_ignores_numbering_and_case():
+    assert questions_hash([{"question_text": "1. Do you use MFA?"}]) == questions_hash([{"question_text": "do you use mfa"}])
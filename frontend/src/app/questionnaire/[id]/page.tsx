@@ -4,8 +4,17 @@ import { AppLayout, BannerActionButton, LoadingSpinner, MultiSelectBanner } from
 import QuestionnaireDetailView from '@/components/QuestionnaireDetailView';
 import QuestionsTable from '@/components/QuestionsTable';
 import { TooltipProvider } from '@/components/ui/tooltip';
-import { api, ApiError } from '@/lib/api';
-import { GenerateAnswersResponse, Question, Questionnaire } from '@/types';
+import { api, ApiError, ListParams } from '@/lib/api';
+import { useDebouncedValue, usePaginatedList } from '@/lib/pagination';
+import {
+  GenerateAnswersResponse,
+  GenerationCounters,
+  GenerationFinishedEvent,
+  GenerationQuestionEvent,
+  GenerationSnapshot,
+  Question,
+  Questionnaire,
+} from '@/types';
 import { useRouter } from 'next/navigation';
 import { use, useCallback, useEffect, useRef, useState } from 'react';
 import { toast } from 'sonner';
@@ -15,155 +24,230 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
 
   const router = useRouter();
   const [questionnaire, setQuestionnaire] = useState<Questionnaire | null>(null);
-  const [questions, setQuestions] = useState<Question[]>([]);
   const [isLoading, setIsLoading] = useState(true);
-  const [isLoadingQuestions, setIsLoadingQuestions] = useState(false);
   const [isGenerating, setIsGenerating] = useState(false);
   const [editingQuestionId, setEditingQuestionId] = useState<string | null>(null);
   const [editingAnswer, setEditingAnswer] = useState('');
   const [selectedQuestions, setSelectedQuestions] = useState<Set<string>>(new Set());
-  const [pollingInterval, setPollingInterval] = useState<NodeJS.Timeout | null>(null);
   const [generatingQuestionIds, setGeneratingQuestionIds] = useState<Set<string>>(new Set());
+  const [streamingAnswers, setStreamingAnswers] = useState<Record<string, string>>({});
   const [generationProgress, setGenerationProgress] = useState<{
     total: number;
     completed: number;
   } | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
-  const isGeneratingRef = useRef(false);
+  const search = useDebouncedValue(searchTerm.trim());
+  const eventSourceRef = useRef<EventSource | null>(null);
 
-  // Keep ref in sync with state
-  useEffect(() => {
-    isGeneratingRef.current = isGenerating;
-  }, [isGenerating]);
+  // Questions a page at a time in questionnaire order, searched by the backend
+  const loadQuestionsPage = useCallback(
+    (listParams: ListParams) => api.getQuestions(id, listParams),
+    [id],
+  );
+  const {
+    items: questions,
+    setItems: setQuestions,
+    total: matchingCount,
+    setTotal: setMatchingCount,
+    hasMore,
+    isLoading: isLoadingQuestions,
+    loadMore,
+    refresh: refreshQuestions,
+  } = usePaginatedList<Question>({
+    load: loadQuestionsPage,
+    itemsKey: 'questions',
+    params: { q: search },
+    onError: (error) => {
+      console.error('Error loading questions:', error);
+      toast.error('Failed to load questions');
+    },
+  });
 
   useEffect(() => {
     loadQuestionnaire();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [id]);
 
-  // Update generating question IDs and progress whenever questions change during generation
-  useEffect(() => {
-    if (isGeneratingRef.current && questions.length > 0) {
-      // Remove question IDs that now have answers from the generating set
-      setGeneratingQuestionIds((prev) => {
-        const newSet = new Set(prev);
-        questions.forEach((q) => {
-          if (q.answer && q.answer.trim() !== '' && q.answer !== null) {
-            newSet.delete(q.id);
-          }
-        });
-        return newSet;
-      });
-
-      // Update generation progress
-      const answeredCount = questions.filter(
-        (q: Question) => q.answer && q.answer.trim() !== '' && q.answer !== null,
-      ).length;
-
-      setGenerationProgress({
-        total: questions.length,
-        completed: answeredCount,
-      });
-    }
-  }, [questions]);
-
-  // Cleanup polling interval on unmount
+  // Close the generation event stream on unmount
   useEffect(() => {
     return () => {
-      if (pollingInterval) {
-        clearInterval(pollingInterval);
-      }
+      eventSourceRef.current?.close();
     };
-  }, [pollingInterval]);
+  }, []);
 
   const loadQuestionnaire = async () => {
     try {
       setIsLoading(true);
-      const response = await api.getQuestionnaires();
+      const response = await api.getQuestionnaire(id);
       if (response.success) {
-        const found = response.questionnaires?.find((q: Questionnaire) => q.id === id);
-        if (found) {
-          setQuestionnaire(found);
-          // Load questions immediately after setting questionnaire
-          await loadQuestions(found.id);
-        } else {
-          toast.error('Questionnaire not found');
-          router.push('/questionnaire');
-        }
+        setQuestionnaire(response.questionnaire);
       }
     } catch (error) {
       console.error('Error loading questionnaire:', error);
-      toast.error('Failed to load questionnaire');
+      if (error instanceof ApiError && error.status === 404) {
+        toast.error('Questionnaire not found');
+      } else {
+        toast.error('Failed to load questionnaire');
+      }
       router.push('/questionnaire');
     } finally {
       setIsLoading(false);
     }
   };
 
-  const loadQuestions = async (questionnaireId: string) => {
+  // Question, approved and answered counts of the whole questionnaire (not just the loaded rows)
+  const refreshCounts = async () => {
     try {
-      setIsLoadingQuestions(true);
-      const response = await api.getQuestions(questionnaireId);
+      const response = await api.getQuestionnaire(id);
       if (response.success) {
-        const newQuestions = response.questions || [];
-        setQuestions(newQuestions);
+        setQuestionnaire(response.questionnaire);
       }
     } catch (error) {
-      console.error('Error loading questions:', error);
-      toast.error('Failed to load questions');
-    } finally {
-      setIsLoadingQuestions(false);
+      console.error('Error refreshing questionnaire counts:', error);
     }
   };
 
-  const startPolling = (questionnaireId: string) => {
-    if (pollingInterval) {
-      clearInterval(pollingInterval);
-    }
+  // Re-read the loaded questions and the counts, e.g. after a generation run
+  const loadQuestions = async () => {
+    await Promise.all([refreshQuestions(), refreshCounts()]);
+  };
 
-    const interval = setInterval(() => {
-      loadQuestions(questionnaireId);
-    }, 3000); // Poll every 3 seconds for faster updates
+  const removeFromGenerating = (questionId: string) => {
+    setGeneratingQuestionIds((prev) => {
+      const newSet = new Set(prev);
+      newSet.delete(questionId);
+      return newSet;
+    });
+    setStreamingAnswers((prev) => {
+      const next = { ...prev };
+      delete next[questionId];
+      return next;
+    });
+  };
 
-    setPollingInterval(interval);
+  const applyGeneratedAnswer = (
+    questionId: string,
+    answer: string,
+    answerSource: 'ai' | 'library' = 'ai',
+  ) => {
+    setQuestions((prev) =>
+      prev.map((q) =>
+        q.id === questionId
+          ? {
+              ...q,
+              answer,
+              status: 'unapproved' as const,
+              answer_source: answerSource,
+            }
+          : q,
+      ),
+    );
+    removeFromGenerating(questionId);
+  };
 
-    setTimeout(() => {
-      if (pollingInterval) {
-        stopPolling();
-        toast.warning('Answer generation timed out. Some answers may still be processing.');
-      }
-    }, 10 * 60 * 1000);
+  const updateProgress = (counters: GenerationCounters) => {
+    setGenerationProgress({
+      total: counters.total,
+      completed: counters.succeeded + counters.failed,
+    });
   };
 
-  const stopPolling = useCallback(() => {
-    if (pollingInterval) {
-      clearInterval(pollingInterval);
-      setPollingInterval(null);
-    }
+  const stopGeneration = useCallback(() => {
+    eventSourceRef.current?.close();
+    eventSourceRef.current = null;
     setIsGenerating(false);
     setGeneratingQuestionIds(new Set());
+    setStreamingAnswers({});
     // Keep generationProgress to show final state
-  }, [pollingInterval]);
+  }, []);
+
+  // Follow a generation run through server-sent events instead of polling the question list
+  const startEventStream = (questionnaireId: string) => {
+    eventSourceRef.current?.close();
+    const source = api.openGenerationEvents(questionnaireId);
+    eventSourceRef.current = source;
+
+    const parse = <T,>(event: Event): T => JSON.parse((event as MessageEvent).data) as T;
+
+    const finish = (status: string, data: GenerationFinishedEvent) => {
+      stopGeneration();
+      updateProgress(data.counters);
+      if (status === 'completed') {
+        toast.success(`${data.counters.succeeded} answers have been generated!`);
+        if (data.counters.failed > 0) {
+          toast.warning(`${data.counters.failed} questions had errors`);
+        }
+      } else {
+        toast.error(data.error || 'Answer generation failed');
+      }
+      // One refresh to reconcile with the database
+      loadQuestions();
+    };
 
-  // Check if generation is complete during polling
-  useEffect(() => {
-    if (isGeneratingRef.current && questions.length > 0) {
-      const questionsWithAnswers = questions.filter(
-        (q: Question) => q.answer && q.answer.trim() !== '' && q.answer !== null,
-      ).length;
-
-      // Check if all questions have been answered
-      if (questionsWithAnswers === questions.length && questionsWithAnswers > 0) {
-        stopPolling();
-        toast.success(`All ${questionsWithAnswers} answers have been generated!`);
+    // Sent first (also after a reconnect): everything generated so far
+    source.addEventListener('snapshot', (event) => {
+      const snapshot = parse<GenerationSnapshot>(event);
+      Object.entries(snapshot.answers).forEach(([questionId, answer]) =>
+        applyGeneratedAnswer(questionId, answer),
+      );
+      setStreamingAnswers(snapshot.active);
+      updateProgress(snapshot.counters);
+      if (snapshot.status !== 'running') {
+        finish(snapshot.status, { counters: snapshot.counters });
       }
-    }
-  }, [questions, stopPolling]);
+    });
+
+    source.addEventListener('question_started', (event) => {
+      const { question_id } = parse<GenerationQuestionEvent>(event);
+      setGeneratingQuestionIds((prev) => new Set(prev).add(question_id));
+    });
+
+    source.addEventListener('token', (event) => {
+      const { question_id, text } = parse<GenerationQuestionEvent>(event);
+      setStreamingAnswers((prev) => ({ ...prev, [question_id]: (prev[question_id] || '') + text }));
+    });
+
+    source.addEventListener('question_completed', (event) => {
+      const { question_id, answer, answer_source } = parse<GenerationQuestionEvent>(event);
+      applyGeneratedAnswer(question_id, answer || '', answer_source);
+    });
+
+    source.addEventListener('question_failed', (event) => {
+      const { question_id } = parse<GenerationQuestionEvent>(event);
+      removeFromGenerating(question_id);
+    });
+
+    source.addEventListener('progress', (event) => {
+      updateProgress(parse<GenerationCounters>(event));
+    });
+
+    source.addEventListener('completed', (event) => {
+      finish('completed', parse<GenerationFinishedEvent>(event));
+    });
+
+    source.addEventListener('failed', (event) => {
+      finish('failed', parse<GenerationFinishedEvent>(event));
+    });
+
+    // No run known to the server (e.g. it restarted): show whatever was saved
+    source.addEventListener('idle', () => {
+      stopGeneration();
+      loadQuestions();
+    });
+
+    source.onerror = () => {
+      // EventSource reconnects on its own unless the connection was closed for good
+      if (source.readyState === EventSource.CLOSED) {
+        stopGeneration();
+        toast.warning('Lost connection to answer generation. Refresh to see the latest answers.');
+      }
+    };
+  };
 
   const handleGenerateAnswers = async () => {
     if (!questionnaire) return;
 
-    // Identify questions that need answers generated
+    // Identify loaded questions that need answers generated
     const questionsToGenerate = questions.filter(
       (q: Question) => !q.answer || q.answer.trim() === '' || q.answer === null,
     );
@@ -172,14 +256,10 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
     setGeneratingQuestionIds(new Set(questionsToGenerate.map((q) => q.id)));
     setIsGenerating(true);
 
-    // Initialize generation progress
-    const initialCompleted = questions.filter(
-      (q: Question) => q.answer && q.answer.trim() !== '' && q.answer !== null,
-    ).length;
-
+    // Initialize generation progress from the questionnaire's counts
     setGenerationProgress({
-      total: questions.length,
-      completed: initialCompleted,
+      total: totalCount,
+      completed: answeredCount,
     });
 
     try {
@@ -192,8 +272,8 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
             duration: 5000,
           });
 
-          // Start polling for real-time updates
-          startPolling(questionnaire.id);
+          // Follow progress over server-sent events
+          startEventStream(questionnaire.id);
         } else {
           toast.success(`Generated answers for ${response.generated_count || 0} questions`);
 
@@ -201,7 +281,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
             toast.warning(`${response.errors.length} questions had errors`);
           }
 
-          await loadQuestions(questionnaire.id);
+          await loadQuestions();
           setIsGenerating(false);
           setGeneratingQuestionIds(new Set());
         }
@@ -249,6 +329,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
 
       setEditingQuestionId(null);
       setEditingAnswer('');
+      refreshCounts();
     } catch (error) {
       console.error('Save answer error:', error);
       toast.error('Failed to save answer');
@@ -276,6 +357,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
       );
 
       toast.success(`Answer ${newStatus}`);
+      refreshCounts();
     } catch (error) {
       console.error('Toggle approval error:', error);
       toast.error('Failed to update status');
@@ -285,42 +367,23 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
   const handleExport = async () => {
     if (!questionnaire) return;
 
-    // Filter questions that have answers (regardless of approval status)
-    const questionsWithAnswers = questions.filter(
-      (q) => q.answer && q.answer.trim() !== '' && q.answer !== null,
-    );
-
-    if (questionsWithAnswers.length === 0) {
+    // Questions that have answers (regardless of approval status), across the whole questionnaire
+    if (answeredCount === 0) {
       toast.error('No answers found to export');
       return;
     }
 
     try {
-      // Create CSV content from local questions data
-      const csvContent = [
-        ['Question', 'Answer', 'Status'],
-        ...questionsWithAnswers.map((q) => [
-          q.question_text,
-          q.answer || '',
-          q.status || 'unapproved',
-        ]),
-      ]
-        .map((row) => row.map((cell: any) => `"${String(cell).replace(/"/g, '""')}"`).join(','))
-        .join('\n');
-
-      const blob = new Blob([csvContent], { type: 'text/csv' });
+      // Built server-side from the stored answers, so large questionnaires export too
+      const blob = await api.downloadAnswersXlsx(questionnaire.id);
       const url = URL.createObjectURL(blob);
       const a = document.createElement('a');
       a.href = url;
-      a.download = `${questionnaire.name}_answers.csv`;
+      a.download = `${questionnaire.name.replace(/\.[^.]+$/, '')}_answers.xlsx`;
       a.click();
       URL.revokeObjectURL(url);
 
-      toast.success(
-        `Exported ${questionsWithAnswers.length} answered question${
-          questionsWithAnswers.length !== 1 ? 's' : ''
-        }`,
-      );
+      toast.success(`Exported ${answeredCount} answered question${answeredCount !== 1 ? 's' : ''}`);
     } catch (error) {
       console.error('Export error:', error);
       toast.error('Failed to export answers');
@@ -354,6 +417,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
 
       if (response.success) {
         toast.success('Answer generated successfully!');
+        refreshCounts();
 
         // Update the question in the list with the new answer
         setQuestions((prev) =>
@@ -401,6 +465,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
 
       if (response.success) {
         toast.success('Answer regenerated successfully!');
+        refreshCounts();
 
         // Update the question in the list with the new answer
         setQuestions((prev) =>
@@ -462,6 +527,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
         }`,
       );
       setSelectedQuestions(new Set());
+      refreshCounts();
     } catch (error) {
       console.error('Bulk approve error:', error);
       toast.error('Failed to approve some answers');
@@ -492,6 +558,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
         `Unapproved ${approvedQuestions.length} answer${approvedQuestions.length !== 1 ? 's' : ''}`,
       );
       setSelectedQuestions(new Set());
+      refreshCounts();
     } catch (error) {
       console.error('Bulk unapprove error:', error);
       toast.error('Failed to unapprove some answers');
@@ -513,6 +580,8 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
       if (response.success) {
         // Remove deleted questions from state
         setQuestions((prev) => prev.filter((q) => !selectedQuestions.has(q.id)));
+        setMatchingCount((count) => (count === null ? count : count - response.deleted_count));
+        refreshCounts();
 
         toast.success(
           `Deleted ${response.deleted_count} question${response.deleted_count !== 1 ? 's' : ''}`,
@@ -577,6 +646,8 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
 
         // Remove question from state
         setQuestions((prev) => prev.filter((q) => q.id !== question.id));
+        setMatchingCount((count) => (count === null ? count : count - 1));
+        refreshCounts();
       } else {
         toast.error('Failed to delete question');
       }
@@ -590,21 +661,10 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
     }
   };
 
-  const filteredQuestions = questions.filter((question) => {
-    if (!searchTerm.trim()) return true;
-
-    const searchLower = searchTerm.toLowerCase();
-    const questionMatch = question.question_text.toLowerCase().includes(searchLower);
-    const answerMatch = question.answer?.toLowerCase().includes(searchLower) || false;
-
-    return questionMatch || answerMatch;
-  });
-
-  const approvedCount = questions.filter((q) => q.status === 'approved').length;
-
-  const answeredCount = questions.filter(
-    (q) => q.answer && q.answer.trim() !== '' && q.answer !== null,
-  ).length;
+  // Counted by the backend over every question, not just the loaded pages
+  const totalCount = questionnaire?.question_count ?? 0;
+  const approvedCount = questionnaire?.approved_count ?? 0;
+  const answeredCount = questionnaire?.answered_count ?? 0;
 
   // Show spinner ONLY in table area while loading questionnaire or questions
   // BUT not during polling/generation to avoid UI flickering
@@ -644,7 +704,7 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
             onStatusChange={handleStatusChange}
             approvedCount={approvedCount}
             answeredCount={answeredCount}
-            totalCount={questions.length}
+            totalCount={totalCount}
             isGenerating={isGenerating}
             isLoading={isLoading}
             generationProgress={generationProgress}
@@ -652,14 +712,14 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
           >
             {showTableSpinner ? (
               <LoadingSpinner />
-            ) : questions.length === 0 ? (
+            ) : questions.length === 0 && !search ? (
               <div className='text-center py-12 space-y-3'>
                 <div className='text-lg font-medium text-gray-500'>No questions found</div>
                 <div className='text-sm text-gray-500'>
                   Upload an Excel questionnaire to get started
                 </div>
               </div>
-            ) : filteredQuestions.length === 0 && searchTerm ? (
+            ) : questions.length === 0 ? (
               <div className='text-center py-12 space-y-3'>
                 <div className='text-lg font-medium text-gray-500'>
                   No questions match your search
@@ -670,12 +730,12 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
               </div>
             ) : (
               <QuestionsTable
-                data={filteredQuestions}
+                data={questions}
                 selectedRows={selectedQuestions}
                 onRowSelect={toggleQuestionSelection}
                 onSelectAll={(selected) => {
                   if (selected) {
-                    setSelectedQuestions(new Set(filteredQuestions.map((q) => q.id)));
+                    setSelectedQuestions(new Set(questions.map((q) => q.id)));
                   } else {
                     setSelectedQuestions(new Set());
                   }
@@ -692,6 +752,10 @@ export default function QuestionnaireDetailPage({ params }: { params: Promise<{
                 onSaveAnswer={saveAnswer}
                 onCancelEdit={cancelEditing}
                 generatingQuestionIds={generatingQuestionIds}
+                streamingAnswers={streamingAnswers}
+                hasMore={hasMore}
+                onLoadMore={loadMore}
+                totalCount={matchingCount}
               />
             )}
           </QuestionnaireDetailView>
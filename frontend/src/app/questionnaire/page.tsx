@@ -7,38 +7,40 @@ import SearchField from '@/components/SearchField';
 import { ExcelUploadDialog } from '@/components/dialogs';
 import { Button } from '@/components/ui/button';
 import { api, ApiError } from '@/lib/api';
+import { useDebouncedValue, usePaginatedList } from '@/lib/pagination';
 import { Questionnaire } from '@/types';
 import { useRouter } from 'next/navigation';
-import { useEffect, useState } from 'react';
+import { useState } from 'react';
 import { toast } from 'sonner';
 
 export default function QuestionnairePage() {
   const router = useRouter();
-  const [questionnaires, setQuestionnaires] = useState<Questionnaire[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
   const [selectedQuestionnaireRows, setSelectedQuestionnaireRows] = useState<Set<string>>(
     new Set(),
   );
   const [searchTerm, setSearchTerm] = useState('');
-
-  useEffect(() => {
-    loadQuestionnaires();
-  }, []);
-
-  const loadQuestionnaires = async () => {
-    try {
-      setIsLoading(true);
-      const response = await api.getQuestionnaires();
-      if (response.success) {
-        setQuestionnaires(response.questionnaires || []);
-      }
-    } catch (error) {
+  const search = useDebouncedValue(searchTerm.trim());
+
+  // Questionnaires from the backend a page at a time, searched by name by the backend
+  const {
+    items: questionnaires,
+    setItems: setQuestionnaires,
+    total,
+    setTotal,
+    hasMore,
+    isLoading,
+    loadMore,
+    reload: loadQuestionnaires,
+    refresh,
+  } = usePaginatedList<Questionnaire>({
+    load: api.getQuestionnaires.bind(api),
+    itemsKey: 'questionnaires',
+    params: { q: search },
+    onError: (error) => {
       console.error('Error loading questionnaires:', error);
       toast.error('Failed to load questionnaires');
-    } finally {
-      setIsLoading(false);
-    }
-  };
+    },
+  });
 
   const handleQuestionnaireRowSelect = (id: string) => {
     const newSelection = new Set(selectedQuestionnaireRows);
@@ -70,6 +72,7 @@ export default function QuestionnairePage() {
       if (response.success) {
         toast.success(response.message);
         setQuestionnaires((prev) => prev.filter((q) => q.id !== questionnaire.id));
+        setTotal((count) => (count === null ? count : count - 1));
       } else {
         toast.error('Failed to delete questionnaire');
       }
@@ -92,7 +95,7 @@ export default function QuestionnairePage() {
 
       if (response.success) {
         // Reload questionnaires after bulk deletion
-        await loadQuestionnaires();
+        await refresh();
         // Clear selection
         setSelectedQuestionnaireRows(new Set());
         toast.success(response.message);
@@ -115,11 +118,6 @@ export default function QuestionnairePage() {
     setSelectedQuestionnaireRows(new Set());
   };
 
-  // Filter questionnaires based on search term
-  const filteredQuestionnaires = questionnaires.filter((questionnaire) =>
-    questionnaire.name.toLowerCase().includes(searchTerm.toLowerCase()),
-  );
-
   return (
     <AppLayout>
       <div className='p-6 space-y-4'>
@@ -158,16 +156,19 @@ export default function QuestionnairePage() {
         {/* Questionnaires Table */}
         {isLoading ? (
           <LoadingSpinner />
-        ) : filteredQuestionnaires.length > 0 ? (
+        ) : questionnaires.length > 0 ? (
           <QuestionnairesTable
-            data={filteredQuestionnaires}
+            data={questionnaires}
             selectedRows={selectedQuestionnaireRows}
             onRowSelect={handleQuestionnaireRowSelect}
             onSelectAll={handleQuestionnaireSelectAll}
             onView={handleViewQuestionnaire}
             onDelete={handleDeleteQuestionnaire}
+            hasMore={hasMore}
+            onLoadMore={loadMore}
+            totalCount={total}
           />
-        ) : questionnaires.length === 0 ? (
+        ) : !search ? (
           <div className='text-center space-y-3 py-12'>
             <div className='text-lg font-medium text-gray-500'>No questionnaires found</div>
             <div className='text-sm text-gray-500'>
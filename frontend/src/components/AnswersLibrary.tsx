@@ -6,6 +6,7 @@ import { BannerActionButton, MultiSelectBanner } from '@/components/MultiSelectB
 import SearchField from '@/components/SearchField';
 import { AddAnswerDialog, ImportQuestionnaireDialog } from '@/components/dialogs';
 import { api } from '@/lib/api';
+import { useDebouncedValue, usePaginatedList } from '@/lib/pagination';
 import { Answer } from '@/types';
 import { Import, Plus } from 'lucide-react';
 import { useEffect, useState } from 'react';
@@ -17,39 +18,39 @@ interface AnswersLibraryProps {
 }
 
 const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
-  const [answers, setAnswers] = useState<Answer[]>([]);
   const [selectedRows, setSelectedRows] = useState<Set<string>>(new Set());
   const [editingAnswer, setEditingAnswer] = useState<Answer | null>(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isImportDialogOpen, setIsImportDialogOpen] = useState(false);
-  const [isLoading, setIsLoading] = useState(true);
-
-  // Fetch answers from backend on mount
-  useEffect(() => {
-    fetchAnswers();
-  }, []);
+  const search = useDebouncedValue(searchTerm.trim());
+
+  // Answers from the backend a page at a time, searched by the backend
+  const {
+    items: answers,
+    setItems: setAnswers,
+    total,
+    setTotal,
+    hasMore,
+    isLoading,
+    loadMore,
+    refresh: fetchAnswers,
+  } = usePaginatedList<Answer>({
+    load: api.getAnswers.bind(api),
+    itemsKey: 'answers',
+    params: { q: search },
+    onError: (error) => {
+      console.error('Error fetching answers:', error);
+      toast.error('Failed to load answers');
+    },
+  });
 
   // Notify parent component when answers count changes
   useEffect(() => {
-    onCountChange?.(answers.length);
-  }, [answers.length, onCountChange]);
-
-  const fetchAnswers = async () => {
-    try {
-      setIsLoading(true);
-      const response = await api.getAnswers();
-
-      if (response.success) {
-        setAnswers(response.answers);
-      }
-    } catch (error) {
-      console.error('Error fetching answers:', error);
-      toast.error('Failed to load answers');
-    } finally {
-      setIsLoading(false);
+    if (!search) {
+      onCountChange?.(total ?? answers.length);
     }
-  };
+  }, [search, total, answers.length, onCountChange]);
 
   const handleRowSelect = (id: string) => {
     const newSelected = new Set(selectedRows);
@@ -63,7 +64,7 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
 
   const handleSelectAll = (selected: boolean) => {
     if (selected) {
-      setSelectedRows(new Set(filteredAnswers.map((a) => a.id)));
+      setSelectedRows(new Set(answers.map((a) => a.id)));
     } else {
       setSelectedRows(new Set());
     }
@@ -75,6 +76,7 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
 
       if (response.success) {
         setAnswers(answers.filter((a) => a.id !== answer.id));
+        setTotal((count) => (count === null ? count : count - 1));
         toast.success('Answer deleted successfully');
       }
     } catch (error) {
@@ -109,6 +111,7 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
 
         if (response.success && response.answer) {
           setAnswers([response.answer, ...answers]);
+          setTotal((count) => (count === null ? count : count + 1));
           toast.success('Answer added successfully');
         }
       }
@@ -178,13 +181,6 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
     setSelectedRows(new Set());
   };
 
-  // Filter answers based on search term
-  const filteredAnswers = answers.filter(
-    (answer) =>
-      answer.question.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      answer.answer.toLowerCase().includes(searchTerm.toLowerCase()),
-  );
-
   return (
     <div className='space-y-4'>
       {/* Multi-Select Banner */}
@@ -222,14 +218,14 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
       {/* Answers List */}
       {isLoading ? (
         <LoadingSpinner />
-      ) : answers.length === 0 ? (
+      ) : answers.length === 0 && !search ? (
         <div className='text-center py-8 space-y-3'>
           <div className='text-base font-medium text-gray-500'>No answers available</div>
           <div className='text-sm text-gray-500'>
             Add your first answer or import a questionnaire to get started
           </div>
         </div>
-      ) : filteredAnswers.length === 0 ? (
+      ) : answers.length === 0 ? (
         <div className='text-center py-8 space-y-3'>
           <div className='text-base font-medium text-gray-500'>No answers match your search</div>
           <div className='text-sm text-gray-500'>
@@ -238,12 +234,15 @@ const AnswersLibrary = ({ onCountChange }: AnswersLibraryProps) => {
         </div>
       ) : (
         <AnswersLibraryTable
-          data={filteredAnswers}
+          data={answers}
           selectedRows={selectedRows}
           onRowSelect={handleRowSelect}
           onSelectAll={handleSelectAll}
           onEdit={handleEditAnswer}
           onDelete={handleDeleteAnswer}
+          hasMore={hasMore}
+          onLoadMore={loadMore}
+          totalCount={total}
         />
       )}
 
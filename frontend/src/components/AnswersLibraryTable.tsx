@@ -1,11 +1,11 @@
 'use client';
 
-import { GenericTable, TableAction, TableColumn } from '@/components/tables';
+import { GenericTable, TableAction, TableColumn, TablePaginationProps } from '@/components/tables';
 import { SimpleTooltip } from '@/components/ui/tooltip';
 import { Answer } from '@/types';
 import { ClipboardList, FileSpreadsheet, User } from 'lucide-react';
 
-interface AnswersLibraryTableProps {
+interface AnswersLibraryTableProps extends TablePaginationProps {
   data: Answer[];
   selectedRows: Set<string>;
   onRowSelect: (id: string) => void;
@@ -21,6 +21,9 @@ const AnswersLibraryTable = ({
   onSelectAll,
   onEdit,
   onDelete,
+  hasMore,
+  onLoadMore,
+  totalCount,
 }: AnswersLibraryTableProps) => {
   const formatDate = (dateString: string) => {
     const date = new Date(dateString);
@@ -110,6 +113,9 @@ const AnswersLibraryTable = ({
       getRowId={(answer) => answer.id}
       itemsPerPage={10}
       showCheckbox={true}
+      hasMore={hasMore}
+      onLoadMore={onLoadMore}
+      totalCount={totalCount}
     />
   );
 };
@@ -7,6 +7,7 @@ import SearchField from '@/components/SearchField';
 import { Button } from '@/components/ui/button';
 import { UploadDialog } from '@/components/UploadDialog';
 import { api, ApiError } from '@/lib/api';
+import { useDebouncedValue, usePaginatedList } from '@/lib/pagination';
 import { Policy } from '@/types';
 import { Plus } from 'lucide-react';
 import { forwardRef, useEffect, useImperativeHandle, useState } from 'react';
@@ -21,44 +22,50 @@ interface KnowledgeBaseProps {
 }
 
 const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCountChange }, ref) => {
-  const [policies, setPolicies] = useState<Policy[]>([]);
-  const [isLoading, setIsLoading] = useState(true);
   const [selectedRows, setSelectedRows] = useState<Set<string>>(new Set());
   const [searchTerm, setSearchTerm] = useState('');
-
-  // Load policies on component mount
-  useEffect(() => {
-    loadPolicies();
-  }, []);
+  const search = useDebouncedValue(searchTerm.trim());
+
+  // Policies a page at a time (without their extracted text), searched by the backend
+  const {
+    items: policies,
+    total,
+    hasMore,
+    isLoading,
+    loadMore,
+    reload,
+    refresh,
+  } = usePaginatedList<Policy>({
+    load: api.getPolicies.bind(api),
+    itemsKey: 'policies',
+    params: { q: search },
+    onError: (error) => {
+      console.error('Error loading policies:', error);
+      toast.error('Failed to load policies');
+    },
+  });
 
   // Notify parent component when policies count changes
   useEffect(() => {
-    onCountChange?.(policies.length);
-  }, [policies.length, onCountChange]);
-
-  const loadPolicies = async () => {
-    try {
-      setIsLoading(true);
-      const response = await api.getPolicies();
-
-      if (response.success && response.policies) {
-        setPolicies(response.policies);
-        console.log(`Loaded ${response.policies.length} policies from database`);
-      } else {
-        setPolicies([]);
-      }
-    } catch (error) {
-      console.error('Error loading policies:', error);
-      toast.error('Failed to load policies');
-      setPolicies([]);
-    } finally {
-      setIsLoading(false);
+    if (!search) {
+      onCountChange?.(total ?? policies.length);
     }
-  };
+  }, [search, total, policies.length, onCountChange]);
+
+  // Refresh while uploaded documents are still being processed in the background
+  const isProcessing = policies.some(
+    (policy) => policy.status === 'queued' || policy.status === 'extracting',
+  );
+  useEffect(() => {
+    if (!isProcessing) return;
+    // Re-reads the rows already loaded, not just the first page
+    const timer = setInterval(() => refresh(), 3000);
+    return () => clearInterval(timer);
+  }, [isProcessing, refresh]);
 
   const handleUploadSuccess = async () => {
     // Reload policies from database to ensure consistency
-    await loadPolicies();
+    await reload();
   };
 
   useImperativeHandle(ref, () => ({
@@ -77,7 +84,7 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
 
   const handleSelectAll = (selected: boolean) => {
     if (selected) {
-      setSelectedRows(new Set(filteredPolicies.map((p) => p.id)));
+      setSelectedRows(new Set(policies.map((p) => p.id)));
     } else {
       setSelectedRows(new Set());
     }
@@ -90,7 +97,7 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
       if (response.success) {
         toast.success(response.message);
         // Reload policies from database
-        await loadPolicies();
+        await refresh();
       } else {
         toast.error('Failed to delete policy');
       }
@@ -113,7 +120,7 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
 
       if (response.success) {
         // Reload policies from database
-        await loadPolicies();
+        await refresh();
         // Clear selection
         setSelectedRows(new Set());
         toast.success(response.message);
@@ -136,11 +143,6 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
     setSelectedRows(new Set());
   };
 
-  // Filter policies based on search term
-  const filteredPolicies = policies.filter((policy) =>
-    policy.name.toLowerCase().includes(searchTerm.toLowerCase()),
-  );
-
   return (
     <div className='space-y-4'>
       {/* Multi-Select Banner */}
@@ -172,12 +174,12 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
       {/* Policies List */}
       {isLoading ? (
         <LoadingSpinner />
-      ) : policies.length === 0 ? (
+      ) : policies.length === 0 && !search ? (
         <div className='text-center py-8 space-y-3'>
           <div className='text-base font-medium text-gray-500'>No resources added</div>
           <div className='text-sm text-gray-500'>Upload your first document to get started</div>
         </div>
-      ) : filteredPolicies.length === 0 ? (
+      ) : policies.length === 0 ? (
         <div className='text-center py-8 space-y-3'>
           <div className='text-base font-medium text-gray-500'>No documents match your search</div>
           <div className='text-sm text-gray-500'>
@@ -186,11 +188,14 @@ const KnowledgeBase = forwardRef<KnowledgeBaseRef, KnowledgeBaseProps>(({ onCoun
         </div>
       ) : (
         <KnowledgeBaseTable
-          data={filteredPolicies}
+          data={policies}
           selectedRows={selectedRows}
           onRowSelect={handleRowSelect}
           onSelectAll={handleSelectAll}
           onDelete={handleDeletePolicy}
+          hasMore={hasMore}
+          onLoadMore={loadMore}
+          totalCount={total}
         />
       )}
     </div>
@@ -1,11 +1,12 @@
 'use client';
 
-import { GenericTable, TableColumn } from '@/components/tables';
+import { GenericTable, TableColumn, TablePaginationProps } from '@/components/tables';
+import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { Policy } from '@/types';
-import { FileText, Trash2 } from 'lucide-react';
+import { FileText, Loader2, Trash2 } from 'lucide-react';
 
-interface KnowledgeBaseTableProps {
+interface KnowledgeBaseTableProps extends TablePaginationProps {
   data: Policy[];
   selectedRows: Set<string>;
   onRowSelect: (id: string) => void;
@@ -19,6 +20,9 @@ const KnowledgeBaseTable = ({
   onRowSelect,
   onSelectAll,
   onDelete,
+  hasMore,
+  onLoadMore,
+  totalCount,
 }: KnowledgeBaseTableProps) => {
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleDateString('en-GB', {
@@ -39,6 +43,50 @@ const KnowledgeBaseTable = ({
         </div>
       ),
     },
+    {
+      key: 'status',
+      header: 'Status',
+      width: '120px',
+      render: (policy) => {
+        const status = policy.status || 'indexed';
+
+        if (status === 'queued' || status === 'extracting') {
+          return (
+            <Badge variant='pending'>
+              <Loader2 className='animate-spin' />
+              {status === 'queued' ? 'Queued' : 'Processing'}
+            </Badge>
+          );
+        }
+        if (status === 'failed') {
+          return (
+            <Badge variant='destructive' title={policy.status_message || undefined}>
+              Failed
+            </Badge>
+          );
+        }
+        if (status === 'duplicate') {
+          return (
+            <Badge variant='pending' title={policy.status_message || undefined}>
+              Duplicate
+            </Badge>
+          );
+        }
+        const report = policy.normalization_report;
+        return (
+          <Badge
+            variant='approved'
+            title={
+              report
+                ? `Stored text is ${Math.round(report.ratio * 100)}% of the extracted text (${report.lines_removed} header/footer lines removed)`
+                : undefined
+            }
+          >
+            Ready
+          </Badge>
+        );
+      },
+    },
     {
       key: 'upload_date',
       header: 'Upload date',
@@ -80,6 +128,9 @@ const KnowledgeBaseTable = ({
       getRowId={(policy) => policy.id}
       itemsPerPage={10}
       showCheckbox={true}
+      hasMore={hasMore}
+      onLoadMore={onLoadMore}
+      totalCount={totalCount}
     />
   );
 };
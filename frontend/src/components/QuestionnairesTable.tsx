@@ -1,11 +1,11 @@
 'use client';
 
 import { ApprovalStatusIcon } from '@/components/icons';
-import { GenericTable, TableAction, TableColumn } from '@/components/tables';
+import { GenericTable, TableAction, TableColumn, TablePaginationProps } from '@/components/tables';
 import { Badge } from '@/components/ui/badge';
 import { Questionnaire } from '@/types';
 
-interface QuestionnairesTableProps {
+interface QuestionnairesTableProps extends TablePaginationProps {
   data: Questionnaire[];
   selectedRows: Set<string>;
   onRowSelect: (id: string) => void;
@@ -21,6 +21,9 @@ const QuestionnairesTable = ({
   onSelectAll,
   onView,
   onDelete,
+  hasMore,
+  onLoadMore,
+  totalCount,
 }: QuestionnairesTableProps) => {
   const formatDate = (dateString: string | null | undefined) => {
     if (!dateString) return '—';
@@ -116,6 +119,9 @@ const QuestionnairesTable = ({
       getRowId={(questionnaire) => questionnaire.id}
       itemsPerPage={10}
       showCheckbox={true}
+      hasMore={hasMore}
+      onLoadMore={onLoadMore}
+      totalCount={totalCount}
     />
   );
 };
@@ -1,14 +1,20 @@
 'use client';
 
 import SkeletonLoader from '@/components/SkeletonLoader';
-import { GenericTable, TableAction, TableColumn, TableInlineAction } from '@/components/tables';
+import {
+  GenericTable,
+  TableAction,
+  TableColumn,
+  TableInlineAction,
+  TablePaginationProps,
+} from '@/components/tables';
 import { Badge } from '@/components/ui/badge';
 import { SimpleTooltip } from '@/components/ui/tooltip';
 import { Question } from '@/types';
-import { Check, ClipboardCopy, Edit, RefreshCw, Sparkles, Undo2, User, X } from 'lucide-react';
+import { BookOpen, Check, ClipboardCopy, Edit, RefreshCw, Sparkles, Undo2, User, X } from 'lucide-react';
 import { ReactNode } from 'react';
 
-interface QuestionsTableProps {
+interface QuestionsTableProps extends TablePaginationProps {
   data: Question[];
   selectedRows: Set<string>;
   onRowSelect: (id: string) => void;
@@ -25,6 +31,7 @@ interface QuestionsTableProps {
   onSaveAnswer?: (questionId: string) => void;
   onCancelEdit?: () => void;
   generatingQuestionIds?: Set<string>;
+  streamingAnswers?: Record<string, string>;
 }
 
 const QuestionsTable = ({
@@ -44,6 +51,10 @@ const QuestionsTable = ({
   onSaveAnswer,
   onCancelEdit,
   generatingQuestionIds = new Set(),
+  streamingAnswers = {},
+  hasMore,
+  onLoadMore,
+  totalCount,
 }: QuestionsTableProps) => {
   // Format date as DD.MM.YYYY
   const formatDate = (dateString: string) => {
@@ -59,7 +70,18 @@ const QuestionsTable = ({
     // Check if this question is currently being generated
     const isGenerating = generatingQuestionIds.has(question.id);
 
-    // Show skeleton loader with sparkles icon if generating
+    // Show the answer text streamed so far, or a skeleton loader until the first tokens arrive
+    if (isGenerating && streamingAnswers[question.id]) {
+      return (
+        <div className='flex items-start gap-2'>
+          <Sparkles className='w-3.5 h-3.5 text-violet-600 flex-shrink-0 mt-[2px] animate-pulse' />
+          <span className='text-sm text-gray-500 leading-5 line-clamp-2 flex-1'>
+            {streamingAnswers[question.id]}
+          </span>
+        </div>
+      );
+    }
+
     if (isGenerating) {
       return (
         <div className='flex items-start gap-2'>
@@ -251,6 +273,40 @@ const QuestionsTable = ({
       );
     }
 
+    if (answerSource === 'library') {
+      // Reused from the Answers Library
+      return (
+        <div className='flex items-center gap-2 group'>
+          <div className='flex items-center gap-1.5 flex-1 min-w-0'>
+            <SimpleTooltip content='Reused from Answers Library'>
+              <BookOpen className='w-3.5 h-3.5 text-gray-600 flex-shrink-0' />
+            </SimpleTooltip>
+            <SimpleTooltip content={question.answer || ''}>
+              <span className='text-sm text-gray-900 leading-5 line-clamp-2 flex-1'>
+                {question.answer}
+              </span>
+            </SimpleTooltip>
+          </div>
+          <div className='flex items-center gap-3 opacity-0 group-hover:opacity-100 transition-opacity'>
+            <button
+              onClick={() => onGenerateAI(question)}
+              className='w-[30px] h-[30px] border border-gray-300 rounded bg-white flex items-center justify-center hover:bg-gray-50 transition-colors cursor-pointer'
+              title='Generate AI answer'
+            >
+              <Sparkles className='w-4 h-4 text-gray-600' />
+            </button>
+            <button
+              onClick={() => onEdit(question)}
+              className='w-[30px] h-[30px] border border-gray-300 rounded bg-white flex items-center justify-center hover:bg-gray-50 transition-colors cursor-pointer'
+              title='Edit answer'
+            >
+              <Edit className='w-4 h-4 text-gray-600' />
+            </button>
+          </div>
+        </div>
+      );
+    }
+
     // Default: just show answer text
     return <span className='text-sm text-gray-900 leading-5 line-clamp-2'>{question.answer}</span>;
   };
@@ -347,6 +403,9 @@ const QuestionsTable = ({
       getRowId={(question) => question.id}
       itemsPerPage={10}
       showCheckbox={true}
+      hasMore={hasMore}
+      onLoadMore={onLoadMore}
+      totalCount={totalCount}
     />
   );
 };
@@ -135,31 +135,43 @@ export const UploadDialog = ({ children, onUploadSuccess }: UploadDialogProps) =
 
     const totalFiles = uploadedFiles.length;
     let successCount = 0;
+    const duplicateFiles: string[] = [];
     const failedFiles: string[] = [];
 
     try {
-      // Upload files sequentially
-      for (let i = 0; i < uploadedFiles.length; i++) {
-        const file = uploadedFiles[i];
-        setUploadProgress({ current: i + 1, total: totalFiles });
+      // Upload in batches; the server queues each file and processes it in the background
+      for (let i = 0; i < uploadedFiles.length; i += appConfig.maxBatchUploadFiles) {
+        const batch = uploadedFiles.slice(i, i + appConfig.maxBatchUploadFiles);
+        setUploadProgress({ current: Math.min(i + batch.length, totalFiles), total: totalFiles });
 
         try {
-          const response = await api.uploadPdf(file);
-
-          if (response.success) {
-            successCount++;
-          } else {
-            failedFiles.push(file.name);
-          }
+          const response = await api.uploadPdfBatch(batch);
+          successCount += response.policies.length;
+          response.policies
+            .filter((policy) => policy.duplicate)
+            .forEach((policy) => duplicateFiles.push(policy.filename));
+          response.errors.forEach((error) => {
+            console.error(`Error uploading ${error.filename}:`, error.error);
+            failedFiles.push(error.filename);
+          });
         } catch (error) {
-          console.error(`Error uploading ${file.name}:`, error);
-          failedFiles.push(file.name);
+          console.error('Error uploading files:', error);
+          failedFiles.push(...batch.map((file) => file.name));
         }
       }
 
+      // Files already in the knowledge base were not imported again
+      if (duplicateFiles.length > 0) {
+        toast.info(
+          `${duplicateFiles.length} file${duplicateFiles.length !== 1 ? 's were' : ' was'} already uploaded: ${duplicateFiles.join(', ')}`,
+        );
+      }
+
       // Show results
       if (successCount === totalFiles) {
-        toast.success(`Successfully uploaded ${successCount} file${successCount !== 1 ? 's' : ''}`);
+        toast.success(
+          `Uploaded ${successCount} file${successCount !== 1 ? 's' : ''}, processing in the background`,
+        );
         onUploadSuccess?.();
         setOpen(false);
         resetForm();
@@ -85,9 +85,29 @@ export const ExcelUploadDialog = ({ children, onUploadSuccess }: ExcelUploadDial
     setError(null);
 
     try {
-      const response = await api.uploadExcel(uploadedFile);
-
-      if (response.success) {
+      const file = uploadedFile;
+      const response = await api.uploadExcel(file);
+
+      if (response.success && response.duplicate) {
+        // Already uploaded: the existing questionnaire is kept unless the user imports it again
+        toast.info(response.message, {
+          action: {
+            label: 'Upload anyway',
+            onClick: async () => {
+              try {
+                const forced = await api.uploadExcel(file, true);
+                toast.success(forced.message || 'Questionnaire uploaded successfully');
+                onUploadSuccess?.();
+              } catch (error) {
+                console.error('Excel upload error:', error);
+                toast.error('Failed to upload Excel file. Please try again.');
+              }
+            },
+          },
+        });
+        setOpen(false);
+        resetForm();
+      } else if (response.success) {
         toast.success(response.message || 'Questionnaire uploaded successfully');
         onUploadSuccess?.();
         setOpen(false);
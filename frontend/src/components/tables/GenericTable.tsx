@@ -1,7 +1,7 @@
 'use client';
 
 import { ChevronLeft, ChevronRight, MoreHorizontal } from 'lucide-react';
-import { ReactNode, useRef, useState } from 'react';
+import { ReactNode, useEffect, useRef, useState } from 'react';
 
 export interface TableColumn<T> {
   key: string;
@@ -24,7 +24,14 @@ export interface TableInlineAction<T> {
   show?: (item: T) => boolean;
 }
 
-interface GenericTableProps<T> {
+// Rows loaded a page at a time from a paginated list endpoint
+export interface TablePaginationProps {
+  hasMore?: boolean;
+  onLoadMore?: () => Promise<void>;
+  totalCount?: number | null;
+}
+
+interface GenericTableProps<T> extends TablePaginationProps {
   data: T[];
   columns: TableColumn<T>[];
   actions?: TableAction<T>[];
@@ -53,8 +60,12 @@ const GenericTable = <T,>({
   getRowId,
   itemsPerPage = 10,
   showCheckbox = true,
+  hasMore = false,
+  onLoadMore,
+  totalCount,
 }: GenericTableProps<T>) => {
   const [currentPage, setCurrentPage] = useState(1);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [openMenuId, setOpenMenuId] = useState<string | null>(null);
   const [dropdownPosition, setDropdownPosition] = useState<DropdownPosition>({ top: 0, left: 0 });
   const buttonRefs = useRef<{ [key: string]: HTMLButtonElement | null }>({});
@@ -65,6 +76,15 @@ const GenericTable = <T,>({
   const startIndex = (currentPage - 1) * itemsPerPage;
   const endIndex = Math.min(startIndex + itemsPerPage, data.length);
   const currentData = data.slice(startIndex, endIndex);
+  const canLoadMore = hasMore && !!onLoadMore;
+  const hasNextPage = currentPage < totalPages || canLoadMore;
+
+  // Stay on a page that exists when rows are removed or the list is reloaded
+  useEffect(() => {
+    if (currentPage > Math.max(totalPages, 1)) {
+      setCurrentPage(Math.max(totalPages, 1));
+    }
+  }, [currentPage, totalPages]);
 
   const handlePreviousPage = () => {
     if (currentPage > 1) {
@@ -72,9 +92,20 @@ const GenericTable = <T,>({
     }
   };
 
-  const handleNextPage = () => {
+  const handleNextPage = async () => {
     if (currentPage < totalPages) {
       setCurrentPage(currentPage + 1);
+      return;
+    }
+    // On the last loaded page: fetch the next page from the server first
+    if (hasMore && onLoadMore && !isLoadingMore) {
+      setIsLoadingMore(true);
+      try {
+        await onLoadMore();
+        setCurrentPage(currentPage + 1);
+      } finally {
+        setIsLoadingMore(false);
+      }
     }
   };
 
@@ -252,7 +283,8 @@ const GenericTable = <T,>({
           <span className='font-medium'>
             {startIndex + 1}-{endIndex}
           </span>
-          {` of ${data.length}`}
+          {` of ${Math.max(totalCount ?? 0, data.length)}`}
+          {canLoadMore && totalCount == null && '+'}
         </p>
         <div className='flex items-center gap-6'>
           <button
@@ -266,9 +298,9 @@ const GenericTable = <T,>({
           </button>
           <button
             onClick={handleNextPage}
-            disabled={currentPage >= totalPages}
+            disabled={!hasNextPage || isLoadingMore}
             className={`w-5 h-5 flex items-center justify-center transition-opacity cursor-pointer ${
-              currentPage >= totalPages ? 'opacity-30' : 'opacity-100 hover:opacity-70'
+              !hasNextPage || isLoadingMore ? 'opacity-30' : 'opacity-100 hover:opacity-70'
             }`}
           >
             <ChevronRight className='w-5 h-5 text-gray-600' />
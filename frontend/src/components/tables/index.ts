@@ -1,2 +1,7 @@
 export { default as GenericTable } from './GenericTable';
-export type { TableAction, TableColumn, TableInlineAction } from './GenericTable';
+export type {
+  TableAction,
+  TableColumn,
+  TableInlineAction,
+  TablePaginationProps,
+} from './GenericTable';
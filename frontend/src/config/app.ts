@@ -3,6 +3,7 @@ export const appConfig = {
   apiUrl: process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000',
   apiBaseUrl: process.env.NEXT_PUBLIC_API_BASE_URL || 'http://localhost:8000/api',
   maxFileSize: parseInt(process.env.NEXT_PUBLIC_MAX_FILE_SIZE || '10485760'), // 10MB
+  maxBatchUploadFiles: 10, // PDFs per upload request (the backend allows MAX_BATCH_UPLOAD_FILES)
   allowedFileTypes: {
     pdf: ['.pdf'] as string[],
     excel: ['.xlsx', '.xls'] as string[],
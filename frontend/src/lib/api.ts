@@ -7,6 +7,38 @@ export class ApiError extends Error {
   }
 }
 
+// Query parameters of the paginated list endpoints (see backend app/services/pagination.py)
+export interface ListParams {
+  limit?: number;
+  cursor?: string | null;
+  fields?: string[];
+  sort?: string;
+  order?: 'asc' | 'desc';
+  status?: string[];
+  created_after?: string;
+  created_before?: string;
+  q?: string;
+  with_total?: boolean;
+}
+
+const listQuery = (params: ListParams = {}) => {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value === undefined || value === null || value === '' || value === false) {
+      return;
+    }
+    if (Array.isArray(value)) {
+      if (value.length > 0) {
+        query.set(key, value.join(','));
+      }
+      return;
+    }
+    query.set(key, String(value));
+  });
+  const search = query.toString();
+  return search ? `?${search}` : '';
+};
+
 class ApiClient {
   private baseUrl: string;
 
@@ -89,19 +121,52 @@ class ApiClient {
     return this.request<any>('/health');
   }
 
-  // PDF Upload
-  async uploadPdf(file: File) {
-    return this.uploadFile<any>('/upload/pdf', file);
+  // PDF Upload (force imports a file that was already uploaded)
+  async uploadPdf(file: File, force = false) {
+    return this.uploadFile<any>(`/upload/pdf${force ? '?force=true' : ''}`, file);
   }
 
-  // Excel Upload
-  async uploadExcel(file: File) {
-    return this.uploadFile<any>('/upload/excel', file);
+  // Several PDFs in one request; each is queued for background processing
+  async uploadPdfBatch(files: File[], force = false) {
+    const formData = new FormData();
+    files.forEach((file) => formData.append('files', file));
+
+    const response = await fetch(`${this.baseUrl}/upload/pdf/batch${force ? '?force=true' : ''}`, {
+      method: 'POST',
+      body: formData,
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new ApiError(
+        errorData.detail || `HTTP error! status: ${response.status}`,
+        response.status,
+        errorData,
+      );
+    }
+
+    return response.json() as Promise<{
+      success: boolean;
+      message: string;
+      policies: {
+        policy_id: string;
+        filename: string;
+        status: string;
+        duplicate: boolean;
+        duplicate_of?: string;
+      }[];
+      errors: { filename: string; error: string }[];
+    }>;
+  }
+
+  // Excel Upload (force imports a file that was already uploaded)
+  async uploadExcel(file: File, force = false) {
+    return this.uploadFile<any>(`/upload/excel${force ? '?force=true' : ''}`, file);
   }
 
   // Policies
-  async getPolicies() {
-    return this.request<any>('/questionnaires/policies');
+  async getPolicies(params?: ListParams) {
+    return this.request<any>(`/questionnaires/policies${listQuery(params)}`);
   }
 
   async deletePolicy(policyId: string) {
@@ -111,8 +176,13 @@ class ApiClient {
   }
 
   // Questionnaires
-  async getQuestionnaires() {
-    return this.request<any>('/questionnaires/');
+  async getQuestionnaires(params?: ListParams) {
+    return this.request<any>(`/questionnaires/${listQuery(params)}`);
+  }
+
+  // One questionnaire with its question, approved and answered counts
+  async getQuestionnaire(questionnaireId: string) {
+    return this.request<any>(`/questionnaires/${questionnaireId}`);
   }
 
   async deleteQuestionnaire(questionnaireId: string) {
@@ -138,8 +208,8 @@ class ApiClient {
     });
   }
 
-  async getQuestions(questionnaireId: string) {
-    return this.request<any>(`/questionnaires/${questionnaireId}/questions`);
+  async getQuestions(questionnaireId: string, params?: ListParams) {
+    return this.request<any>(`/questionnaires/${questionnaireId}/questions${listQuery(params)}`);
   }
 
   async generateAnswers(questionnaireId: string) {
@@ -148,6 +218,11 @@ class ApiClient {
     });
   }
 
+  // Live generation progress (server-sent events); the caller closes the EventSource
+  openGenerationEvents(questionnaireId: string) {
+    return new EventSource(`${this.baseUrl}/questionnaires/${questionnaireId}/generation-events`);
+  }
+
   async updateAnswer(
     questionId: string,
     answer: string,
@@ -194,6 +269,24 @@ class ApiClient {
     return this.request<any>(`/questionnaires/${questionnaireId}/export`);
   }
 
+  // Answered questions as an Excel file, streamed by the server
+  async downloadAnswersXlsx(questionnaireId: string) {
+    const response = await fetch(
+      `${this.baseUrl}/questionnaires/${questionnaireId}/export.xlsx?answered_only=true`,
+    );
+
+    if (!response.ok) {
+      const errorData = await response.json().catch(() => ({}));
+      throw new ApiError(
+        errorData.detail || `HTTP error! status: ${response.status}`,
+        response.status,
+        errorData,
+      );
+    }
+
+    return response.blob();
+  }
+
   async generateSingleAnswer(questionId: string) {
     return this.request<any>(`/questionnaires/questions/${questionId}/generate-answer`, {
       method: 'POST',
@@ -201,8 +294,8 @@ class ApiClient {
   }
 
   // Answers Library
-  async getAnswers() {
-    return this.request<any>('/answers/');
+  async getAnswers(params?: ListParams) {
+    return this.request<any>(`/answers/${listQuery(params)}`);
   }
 
   async createAnswer(question: string, answer: string) {
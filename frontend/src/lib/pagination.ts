@@ -0,0 +1,126 @@
+'use client';
+
+import { ListParams } from '@/lib/api';
+import { useCallback, useEffect, useRef, useState } from 'react';
+
+// Rows fetched per request; the tables show them 10 at a time
+export const LIST_PAGE_SIZE = 50;
+
+// value, once it has stopped changing for delay ms (e.g. a search term)
+export function useDebouncedValue<T>(value: T, delay = 300) {
+  const [debounced, setDebounced] = useState(value);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+}
+
+interface PaginatedListOptions {
+  // Fetches one page; the response has the rows under itemsKey, next_cursor, has_more and total
+  load: (params: ListParams) => Promise<any>;
+  itemsKey: string;
+  // Filters, search and sort; the list reloads from its first page when they change
+  params?: ListParams;
+  onError?: (error: unknown) => void;
+}
+
+// A list endpoint read a page at a time (keyset cursors, see backend app/services/pagination.py)
+export function usePaginatedList<T>({
+  load,
+  itemsKey,
+  params = {},
+  onError,
+}: PaginatedListOptions) {
+  const [items, setItems] = useState<T[]>([]);
+  const [total, setTotal] = useState<number | null>(null);
+  const [cursor, setCursor] = useState<string | null>(null);
+  const [isLoading, setIsLoading] = useState(true);
+
+  const paramsKey = JSON.stringify(params);
+  const loadRef = useRef(load);
+  const onErrorRef = useRef(onError);
+  const itemCountRef = useRef(0);
+  const requestRef = useRef(0);
+  loadRef.current = load;
+  onErrorRef.current = onError;
+  itemCountRef.current = items.length;
+
+  // The first page; refresh re-reads as many rows as are loaded, without the loading state
+  const fetchFirstPage = useCallback(
+    async (refresh: boolean) => {
+      const request = ++requestRef.current;
+      if (!refresh) {
+        setIsLoading(true);
+      }
+      try {
+        const response = await loadRef.current({
+          ...JSON.parse(paramsKey),
+          limit: refresh ? Math.max(itemCountRef.current, LIST_PAGE_SIZE) : LIST_PAGE_SIZE,
+          with_total: true,
+        });
+        // A newer request (e.g. the next keystroke of a search) replaced this one
+        if (request !== requestRef.current || !response.success) {
+          return;
+        }
+        setItems(response[itemsKey] ?? []);
+        setCursor(response.has_more ? response.next_cursor : null);
+        setTotal(response.total ?? null);
+      } catch (error) {
+        // A failed refresh keeps the rows on screen
+        if (refresh) {
+          console.error('Error refreshing list:', error);
+        } else {
+          onErrorRef.current?.(error);
+        }
+      } finally {
+        if (request === requestRef.current) {
+          setIsLoading(false);
+        }
+      }
+    },
+    [paramsKey, itemsKey],
+  );
+
+  useEffect(() => {
+    fetchFirstPage(false);
+  }, [fetchFirstPage]);
+
+  const reload = useCallback(() => fetchFirstPage(false), [fetchFirstPage]);
+  const refresh = useCallback(() => fetchFirstPage(true), [fetchFirstPage]);
+
+  const loadMore = useCallback(async () => {
+    if (!cursor) {
+      return;
+    }
+    const request = requestRef.current;
+    try {
+      const response = await loadRef.current({
+        ...JSON.parse(paramsKey),
+        limit: LIST_PAGE_SIZE,
+        cursor,
+      });
+      if (request !== requestRef.current || !response.success) {
+        return;
+      }
+      setItems((current) => [...current, ...(response[itemsKey] ?? [])]);
+      setCursor(response.has_more ? response.next_cursor : null);
+    } catch (error) {
+      onErrorRef.current?.(error);
+    }
+  }, [cursor, paramsKey, itemsKey]);
+
+  return {
+    items,
+    setItems,
+    total,
+    setTotal,
+    hasMore: cursor !== null,
+    isLoading,
+    loadMore,
+    reload,
+    refresh,
+  };
+}
@@ -1,9 +1,26 @@
+export type PolicyStatus = 'queued' | 'extracting' | 'indexed' | 'failed' | 'duplicate';
+
+// Text normalisation of an ingested policy (backend app/services/text_normalization.py)
+export interface PolicyNormalizationReport {
+  pages: number;
+  characters_before: number;
+  characters_after: number;
+  ratio: number;
+  boilerplate_lines: number;
+  lines_removed: number;
+  hyphenations: number;
+}
+
 export interface Policy {
   id: string;
   name: string;
   filename: string;
   file_size: number;
   extracted_text?: string;
+  status?: PolicyStatus;
+  status_message?: string | null;
+  content_sha256?: string | null;
+  normalization_report?: PolicyNormalizationReport | null;
   upload_date: string;
   created_at: string;
   updated_at: string;
@@ -22,6 +39,7 @@ export interface Questionnaire {
   updated_at: string;
   question_count?: number;
   approved_count?: number;
+  answered_count?: number;
   approved_date?: string | null;
   status?: 'in_progress' | 'approved' | 'complete';
   owner?: {
@@ -39,7 +57,10 @@ export interface Question {
   created_at: string;
   updated_at: string;
   row_number?: number;
-  answer_source?: 'ai' | 'user' | 'copied' | 'not_found' | null;
+  sheet_name?: string | null;
+  section?: string | null;
+  external_id?: string | null;
+  answer_source?: 'ai' | 'user' | 'copied' | 'not_found' | 'library' | null;
   owner?: {
     name: string;
     avatar?: string;
@@ -54,6 +75,10 @@ export interface UploadResponse {
   text_length?: number;
   text_preview?: string;
   policy_id?: string;
+  status?: PolicyStatus;
+  content_sha256?: string;
+  duplicate?: boolean;
+  duplicate_of?: string;
   questionnaire_id?: string;
   questions_count?: number;
   questions_preview?: Partial<Question>[];
@@ -67,9 +92,45 @@ export interface GenerateAnswersResponse {
   total_questions: number;
   errors?: string[];
   status?: string;
+  mode?: string;
+  events_url?: string;
+  job_id?: string;
   note?: string;
 }
 
+export interface GenerationCounters {
+  total: number;
+  succeeded: number;
+  failed: number;
+  retries?: number;
+  throttled?: number;
+  library_hits?: number;
+  elapsed_seconds?: number;
+}
+
+export interface GenerationSnapshot {
+  questionnaire_id: string;
+  mode: string;
+  status: 'running' | 'completed' | 'failed';
+  counters: GenerationCounters;
+  active: Record<string, string>;
+  answers: Record<string, string>;
+  errors: Record<string, string>;
+}
+
+export interface GenerationQuestionEvent {
+  question_id: string;
+  text?: string;
+  answer?: string;
+  answer_source?: 'ai' | 'library';
+  error?: string;
+}
+
+export interface GenerationFinishedEvent {
+  counters: GenerationCounters;
+  error?: string;
+}
+
 export interface ExportResponse {
   success: boolean;
   message: string;